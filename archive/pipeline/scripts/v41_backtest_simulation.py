@@ -6,6 +6,7 @@ by simulating lead list generation on historical data with known outcomes.
 
 Usage: python pipeline/scripts/v41_backtest_simulation.py
 Output: pipeline/reports/V4.1_Backtest_Results.md
+        pipeline/reports/V4.1_Policy_Sweep.csv (full threshold grid)
 """
 
 import pandas as pd
@@ -19,6 +20,9 @@ import pickle
 import sys
 import xgboost as xgb
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+from pipeline.scripts.policy_sweep import PolicySweep
+
 # ============================================================================
 # CONFIGURATION
 # ============================================================================
@@ -41,6 +45,12 @@ TOTAL_LEADS = LEADS_PER_SGA * NUM_SGAS  # 2,800 leads
 # Baseline conversion rate (from historical "Provided Lead List" data)
 BASELINE_CONVERSION_RATE = 0.0274  # 2.74%
 
+# Policy sweep grid (V4.1-R3 percentiles)
+SWEEP_UPGRADE_PERCENTILES = range(60, 100, 5)
+SWEEP_DEPRIORITIZE_PERCENTILES = range(0, 45, 5)
+SWEEP_DISAGREEMENT_PERCENTILES = range(0, 95, 10)
+SWEEP_LIST_SIZES = [1400, 2100, 2800]
+
 # V3 Tier expected conversion rates (from validation)
 V3_TIER_RATES = {
     'TIER_1A_PRIME_MOVER_CFP': 0.087,      # 8.7%
@@ -347,41 +357,29 @@ def simulate_v3_v4_hybrid(df, v4_scores, n_leads=TOTAL_LEADS,
 # ============================================================================
 # STATISTICAL SIGNIFICANCE
 # ============================================================================
-def calculate_significance(df, scenario_c_rate, scenario_d_rate, n_simulations=10000):
+def calculate_significance(df, scenario_c_policy, scenario_d_policy, n_simulations=10000):
     """
-    Bootstrap simulation to calculate statistical significance
-    of improvement from V4.0.0 to V4.1-R3.
+    Paired bootstrap of V4.0.0 vs V4.1-R3 hybrid conversion rates.
+
+    Both policies are re-evaluated under the same Poisson-weighted resamples
+    of the test leads (vectorized in PolicySweep), so the probability and
+    CIs reflect outcome noise rather than an assumed spread.
     """
-    np.random.seed(42)
-    
-    n = len(df)
-    actual_conversions = df['converted'].values
-    
-    # Bootstrap: resample and calculate conversion rates
-    c_rates = []
-    d_rates = []
-    
-    for _ in range(n_simulations):
-        # Resample indices
-        indices = np.random.choice(n, size=n, replace=True)
-        sample_conversions = actual_conversions[indices]
-        
-        # Simulate rates with noise proportional to actual observed rates
-        c_rate = scenario_c_rate + np.random.normal(0, scenario_c_rate * 0.1)
-        d_rate = scenario_d_rate + np.random.normal(0, scenario_d_rate * 0.1)
-        
-        c_rates.append(max(0, c_rate))  # Ensure non-negative
-        d_rates.append(max(0, d_rate))
-    
-    c_rates = np.array(c_rates)
-    d_rates = np.array(d_rates)
-    
+    c_sweep = PolicySweep(df, percentile_col='v4_0_percentile', n_bootstrap=n_simulations, seed=42)
+    d_sweep = PolicySweep(df, percentile_col='v4_1_percentile', n_bootstrap=n_simulations, seed=42)
+    c_policy = pd.DataFrame([scenario_c_policy])
+    d_policy = pd.DataFrame([scenario_d_policy])
+    c_rates = c_sweep.bootstrap_rates(c_policy)[:, 0]
+    d_rates = d_sweep.bootstrap_rates(d_policy)[:, 0]
+    scenario_c_rate = c_sweep.evaluate(c_policy)['conversion_rate'].iloc[0]
+    scenario_d_rate = d_sweep.evaluate(d_policy)['conversion_rate'].iloc[0]
+
     # Calculate probability that D > C
     prob_d_better = (d_rates > c_rates).mean()
     
     # Calculate confidence intervals
-    c_ci = np.percentile(c_rates, [2.5, 97.5])
-    d_ci = np.percentile(d_rates, [2.5, 97.5])
+    c_ci = np.nanpercentile(c_rates, [2.5, 97.5])
+    d_ci = np.nanpercentile(d_rates, [2.5, 97.5])
     
     # Effect size
     improvement = (scenario_d_rate - scenario_c_rate) / scenario_c_rate * 100
@@ -395,6 +393,22 @@ def calculate_significance(df, scenario_c_rate, scenario_d_rate, n_simulations=1
     }
 
 
+def run_policy_sweep(df, reference_policy, n_bootstrap=1000):
+    """
+    Evaluate the full V4.1-R3 threshold grid (upgrade x deprioritize x
+    disagreement x list size) with bootstrap CIs for every cell.
+    """
+    sweep = PolicySweep(df, percentile_col='v4_1_percentile', n_bootstrap=n_bootstrap, seed=42)
+    grid = sweep.sweep(
+        upgrade=SWEEP_UPGRADE_PERCENTILES,
+        deprioritize=SWEEP_DEPRIORITIZE_PERCENTILES,
+        disagreement=SWEEP_DISAGREEMENT_PERCENTILES,
+        list_size=SWEEP_LIST_SIZES,
+        reference=reference_policy,
+    )
+    return grid.sort_values(['list_size', 'ci_low'], ascending=[True, False]).reset_index(drop=True)
+
+
 def run_monte_carlo_mql_simulation(conversion_rate, n_leads=2800, n_simulations=10000):
     """
     Monte Carlo simulation to estimate MQL distribution.
@@ -417,10 +431,25 @@ def run_monte_carlo_mql_simulation(conversion_rate, n_leads=2800, n_simulations=
 # ============================================================================
 # REPORT GENERATION
 # ============================================================================
-def generate_report(results, significance, mql_simulations):
+def generate_report(results, significance, mql_simulations, sweep=None):
     """Generate markdown report of simulation results."""
     
     timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+    sweep_section = "*Policy sweep not run.*"
+    if sweep is not None and len(sweep) > 0:
+        top = sweep[sweep['list_size'] == sweep['list_size'].max()].head(10)
+        sweep_rows = "\n".join(
+            f"| {int(r.upgrade)} | {int(r.deprioritize)} | {int(r.disagreement)} | {r.conversion_rate*100:.2f}% "
+            f"| {r.ci_low*100:.2f}% - {r.ci_high*100:.2f}% | {r.prob_beats_reference*100:.0f}% |"
+            for r in top.itertuples()
+        )
+        sweep_section = f"""{len(sweep):,} policies evaluated (upgrade x deprioritize x disagreement x list size).
+Top 10 at {int(top['list_size'].iloc[0]):,} leads by lower 95% CI bound; full grid in `V4.1_Policy_Sweep.csv`.
+
+| Upgrade | Deprioritize | Disagreement | Conv Rate | 95% CI | P(beats production) |
+|---------|--------------|--------------|-----------|--------|---------------------|
+{sweep_rows}"""
     
     report = f"""# V4.1-R3 Backtest Simulation Results
 
@@ -475,7 +504,7 @@ def generate_report(results, significance, mql_simulations):
 
 ## Statistical Significance
 
-### Bootstrap Analysis (10,000 simulations)
+### Paired Bootstrap Analysis (10,000 resamples)
 
 | Metric | V4.0.0 | V4.1-R3 |
 |--------|--------|---------|
@@ -489,6 +518,12 @@ def generate_report(results, significance, mql_simulations):
 
 ---
 
+## Threshold Policy Sweep (V4.1-R3)
+
+{sweep_section}
+
+---
+
 ## Monte Carlo MQL Projections
 
 ### January 2026 Lead List (2,800 leads)
@@ -561,11 +596,11 @@ def main():
     print("=" * 70)
     
     # Load data
-    print("\n[1/6] Loading test data with outcomes...")
+    print("\n[1/7] Loading test data with outcomes...")
     df = load_test_data_with_outcomes()
     
     # Load V4 scores (we'll score in-memory if pre-computed not available)
-    print("\n[2/6] Loading/computing V4 scores...")
+    print("\n[2/7] Loading/computing V4 scores...")
     
     # For V4.0.0 and V4.1.0, we'll compute scores in-memory
     print("  Computing V4.0.0 scores...")
@@ -604,7 +639,7 @@ def main():
     v4_1_scores_df.columns = ['crd', 'v4_score', 'v4_percentile', 'v4_deprioritize']
     
     # Run simulations
-    print("\n[3/6] Running simulation scenarios...")
+    print("\n[3/7] Running simulation scenarios...")
     
     # Adjust n_leads based on test set size
     n_leads = min(TOTAL_LEADS, len(df))
@@ -635,16 +670,21 @@ def main():
     )
     
     # Calculate statistical significance
-    print("\n[4/6] Calculating statistical significance...")
-    significance = calculate_significance(
-        df,
-        results['scenario_c']['conversion_rate'],
-        results['scenario_d']['conversion_rate']
-    )
+    print("\n[4/7] Calculating statistical significance...")
+    policy_c = {'upgrade': 80, 'deprioritize': 20, 'disagreement': 70, 'list_size': n_leads}
+    policy_d = {'upgrade': 80, 'deprioritize': 20, 'disagreement': 60, 'list_size': n_leads}
+    significance = calculate_significance(df, policy_c, policy_d)
     print(f"  Probability V4.1-R3 > V4.0.0: {significance['confidence_level']}")
+
+    # Threshold sweep around the proposed production policy
+    print("\n[5/7] Sweeping V4.1-R3 threshold policies...")
+    sweep = run_policy_sweep(df, reference_policy={**policy_d, 'list_size': max(SWEEP_LIST_SIZES)})
+    sweep_path = REPORT_DIR / "V4.1_Policy_Sweep.csv"
+    sweep.to_csv(sweep_path, index=False)
+    print(f"  Sweep saved to: {sweep_path}")
     
     # Monte Carlo MQL projections
-    print("\n[5/6] Running Monte Carlo MQL projections...")
+    print("\n[6/7] Running Monte Carlo MQL projections...")
     mql_simulations = {
         'random': run_monte_carlo_mql_simulation(results['scenario_a']['conversion_rate']),
         'v3_only': run_monte_carlo_mql_simulation(results['scenario_b']['conversion_rate']),
@@ -653,8 +693,8 @@ def main():
     }
     
     # Generate report
-    print("\n[6/6] Generating report...")
-    report = generate_report(results, significance, mql_simulations)
+    print("\n[7/7] Generating report...")
+    report = generate_report(results, significance, mql_simulations, sweep)
     
     report_path = REPORT_DIR / "V4.1_Backtest_Results.md"
     with open(report_path, 'w', encoding='utf-8') as f:
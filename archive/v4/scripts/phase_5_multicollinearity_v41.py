@@ -4,13 +4,15 @@ Check for high correlations and VIF to identify redundant features.
 """
 
 import pandas as pd
-import numpy as np
 from google.cloud import bigquery
-from statsmodels.stats.outliers_influence import variance_inflation_factor
 from pathlib import Path
 import json
+import sys
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent.parent))
+from v3.utils.multicollinearity import CorrelationAccumulator, stream_query_chunks
+
 # Configuration
 PROJECT_ID = "savvy-gtm-analytics"
 WORKING_DIR = Path(r"C:\Users\russe\Documents\lead_scoring_production\v4")
@@ -54,8 +56,8 @@ ALL_FEATURES = ORIGINAL_FEATURES + NEW_BLEEDING_FEATURES + NEW_FIRM_REP_FEATURES
 
 
 def load_feature_data():
-    """Load feature data from BigQuery."""
-    print("\n[1/4] Loading feature data from BigQuery...")
+    """Stream feature data from BigQuery into a one-pass correlation accumulator."""
+    print("\n[1/4] Streaming feature data from BigQuery...")
     client = bigquery.Client(project=PROJECT_ID)
     
     # Build query with all numeric features
@@ -89,69 +91,30 @@ def load_feature_data():
     WHERE target IS NOT NULL
     """
     
-    df = client.query(query).to_dataframe()
-    print(f"      Loaded {len(df):,} rows with {len(ALL_FEATURES)} features")
-    return df
+    acc = CorrelationAccumulator(ALL_FEATURES)
+    for chunk in stream_query_chunks(client, query):
+        acc.update(chunk)
+    print(f"      Streamed {acc.n_rows:,} rows with {len(ALL_FEATURES)} features")
+    return acc
 
 
-def calculate_correlation_matrix(df):
+def calculate_correlation_matrix(acc):
     """Calculate correlation matrix and flag high correlations."""
     print("\n[2/4] Calculating correlation matrix...")
     
-    # Prepare numeric features only
-    numeric_features = [f for f in ALL_FEATURES if f in df.columns]
-    corr_matrix = df[numeric_features].corr()
-    
-    # Find high correlations
-    high_corr_pairs = []
-    for i, feat1 in enumerate(numeric_features):
-        for j, feat2 in enumerate(numeric_features):
-            if i < j:  # Upper triangle only
-                corr = corr_matrix.loc[feat1, feat2]
-                if abs(corr) > 0.7:
-                    high_corr_pairs.append({
-                        'feature_1': feat1,
-                        'feature_2': feat2,
-                        'correlation': round(corr, 4),
-                        'status': 'CRITICAL' if abs(corr) > 0.85 else 'WARNING'
-                    })
+    corr_matrix = acc.correlation()
+    high_corr_pairs = acc.high_correlation_pairs(threshold=0.7, critical=0.85)
     
     print(f"      Found {len(high_corr_pairs)} high correlation pairs (|r| > 0.7)")
     return corr_matrix, high_corr_pairs
 
 
-def calculate_vif(df):
-    """Calculate Variance Inflation Factor for each feature."""
+def calculate_vif(acc):
+    """Calculate Variance Inflation Factor for each feature (closed form, all at once)."""
     print("\n[3/4] Calculating VIF (Variance Inflation Factor)...")
     
-    # Prepare numeric features only
-    numeric_features = [f for f in ALL_FEATURES if f in df.columns]
-    X = df[numeric_features].fillna(0).astype(float)
-    
-    # Remove any features with zero variance
-    X = X.loc[:, X.var() > 0]
-    numeric_features = [f for f in numeric_features if f in X.columns]
-    
-    vif_data = []
-    for i, feature in enumerate(numeric_features):
-        try:
-            vif = variance_inflation_factor(X.values, i)
-            if np.isinf(vif) or np.isnan(vif):
-                vif = 999.0  # Flag as problematic
-            vif_data.append({
-                'feature': feature,
-                'vif': round(vif, 2),
-                'status': 'CRITICAL' if vif > 10 else ('WARNING' if vif > 5 else 'OK')
-            })
-        except Exception as e:
-            vif_data.append({
-                'feature': feature,
-                'vif': np.nan,
-                'status': 'ERROR',
-                'error': str(e)
-            })
-    
-    vif_df = pd.DataFrame(vif_data).sort_values('vif', ascending=False, na_position='last')
+    # Zero-filled, zero-variance features dropped; VIF_j = diag(inverse correlation matrix)
+    vif_df = acc.vif()
     print(f"      Calculated VIF for {len(vif_df)} features")
     print(f"      Critical VIF (>10): {len(vif_df[vif_df['status'] == 'CRITICAL'])}")
     print(f"      Warning VIF (5-10): {len(vif_df[vif_df['status'] == 'WARNING'])}")
@@ -338,9 +301,9 @@ if __name__ == "__main__":
     print("=" * 80)
     
     try:
-        df = load_feature_data()
-        corr_matrix, high_corr_pairs = calculate_correlation_matrix(df)
-        vif_df = calculate_vif(df)
+        acc = load_feature_data()
+        corr_matrix, high_corr_pairs = calculate_correlation_matrix(acc)
+        vif_df = calculate_vif(acc)
         passed, results = generate_report(corr_matrix, high_corr_pairs, vif_df)
         
         print("\n" + "=" * 80)
@@ -8,8 +8,8 @@ import numpy as np
 import pickle
 import xgboost as xgb
 from sklearn.metrics import roc_auc_score, average_precision_score
-from sklearn.model_selection import cross_val_score, StratifiedKFold
 from pathlib import Path
+import sys
 from google.cloud import bigquery
 import json
 from datetime import datetime
@@ -22,6 +22,9 @@ REPORT_DIR = WORKING_DIR / "reports" / "v4.1"
 
 REPORT_DIR.mkdir(parents=True, exist_ok=True)
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent.parent))
+from v4.training.time_series_cv import run_time_series_cv
+
 # Feature list (22 features, same as Phase 7 R3)
 FEATURES_V41_R3 = [
     'tenure_months',
@@ -110,41 +113,40 @@ def calculate_lift_by_decile(y_true, y_pred):
     return decile_stats, baseline
 
 
-def run_cross_validation(X, y, n_splits=5):
-    """Run stratified k-fold cross-validation."""
-    print("\n[4/5] Running cross-validation...")
-    
-    from xgboost import XGBClassifier
+def run_cross_validation(X, y, dates, num_boost_round, n_splits=5):
+    """Run temporal (expanding-window) cross-validation with the full-size model."""
+    print("\n[4/5] Running temporal cross-validation...")
     
     # Calculate scale_pos_weight
     neg_count = (y == 0).sum()
     pos_count = (y == 1).sum()
     scale_pos_weight = neg_count / pos_count if pos_count > 0 else 1.0
     
-    model = XGBClassifier(
-        max_depth=2,  # R3 hyperparameters
-        min_child_weight=30,
-        gamma=0.3,
-        subsample=0.6,
-        colsample_bytree=0.6,
-        reg_alpha=1.0,
-        reg_lambda=5.0,
-        learning_rate=0.01,
-        n_estimators=100,  # Reduced for CV speed
-        base_score=0.5,
-        scale_pos_weight=scale_pos_weight,
-        use_label_encoder=False,
-        eval_metric='logloss',
-        random_state=42
-    )
+    params = {
+        'objective': 'binary:logistic',
+        'max_depth': 2,  # R3 hyperparameters
+        'min_child_weight': 30,
+        'gamma': 0.3,
+        'subsample': 0.6,
+        'colsample_bytree': 0.6,
+        'reg_alpha': 1.0,
+        'reg_lambda': 5.0,
+        'learning_rate': 0.01,
+        'base_score': 0.5,
+        'scale_pos_weight': scale_pos_weight,
+        'eval_metric': 'logloss',
+        'seed': 42
+    }
     
-    cv = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=42)
-    scores = cross_val_score(model, X, y, cv=cv, scoring='roc_auc', n_jobs=1)
+    # Folds only train on the past, with the DateConfiguration gap before each test window
+    cv = run_time_series_cv(X, y, dates, params, num_boost_round=num_boost_round,
+                            n_splits=n_splits, strategy='expanding')
+    scores = cv['scores']
     
     print(f"      CV scores: {scores}")
     print(f"      CV mean: {scores.mean():.4f}, std: {scores.std():.4f}")
     
-    return scores
+    return scores, cv['folds']
 
 
 def generate_report(metrics, gates_results, metrics_r1=None, metrics_r2=None):
@@ -197,7 +199,7 @@ R3 was retrained with:
 | Top Decile Lift | {metrics['train_top_lift']:.2f}x | {metrics['test_top_lift']:.2f}x | {metrics['lift_gap']:.2f}x | < 0.5x | {'[PASS]' if gates_results['G8.2'] else '[FAIL]'} |
 | AUC-PR (Train) | {metrics.get('train_auc_pr', 0):.4f} | {metrics.get('test_auc_pr', 0):.4f} | - | - | - |
 
-## Cross-Validation Results
+## Cross-Validation Results (expanding-window temporal folds)
 
 - **Mean AUC**: {metrics['cv_mean']:.4f}
 - **Std AUC**: {metrics['cv_std']:.4f}
@@ -366,7 +368,10 @@ def run_phase_8_r3():
         test_lift_table = test_lift_df.to_string(index=False) if len(test_lift_df) > 0 else "N/A"
         
         # Cross-validation
-        cv_scores = run_cross_validation(X_train, y_train, n_splits=5)
+        cv_scores, cv_folds = run_cross_validation(
+            X_train, y_train, train_df['contacted_date'],
+            num_boost_round=getattr(model, 'best_iteration', 222) + 1, n_splits=5
+        )
         cv_mean = cv_scores.mean()
         cv_std = cv_scores.std()
         
@@ -406,6 +411,7 @@ def run_phase_8_r3():
             'cv_mean': cv_mean,
             'cv_std': cv_std,
             'cv_scores': cv_scores.tolist(),
+            'cv_folds': cv_folds.to_dict(orient='records'),
             'train_lift_table': train_lift_table,
             'test_lift_table': test_lift_table,
             'best_iteration': 223  # From Phase 7 R3
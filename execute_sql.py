@@ -1,37 +1,51 @@
-"""Execute SQL files using BigQuery MCP"""
+"""Execute SQL files in BigQuery
+
+Statements within and across the given files run as concurrent jobs;
+statements that depend on each other's tables still run in order
+(see v3/utils/job_manager.py).
+
+Usage: python execute_sql.py <sql_file_path> [<sql_file_path> ...]
+"""
 from google.cloud import bigquery
 from pathlib import Path
 import sys
 
-def execute_sql_file(sql_file_path, project_id='savvy-gtm-analytics'):
-    """Execute a SQL file in BigQuery"""
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from v3.utils.job_manager import JobManager
+
+def execute_sql_files(sql_file_paths, project_id='savvy-gtm-analytics'):
+    """Execute SQL files in BigQuery, independent statements in parallel"""
     client = bigquery.Client(project=project_id)
+    jobs = JobManager(client)
     
-    sql_path = Path(sql_file_path)
-    if not sql_path.exists():
-        print(f"Error: File not found: {sql_file_path}")
-        return False
+    for sql_file_path in sql_file_paths:
+        sql_path = Path(sql_file_path)
+        if not sql_path.exists():
+            print(f"Error: File not found: {sql_file_path}")
+            return False
+        print(f"Reading SQL file: {sql_file_path}")
+        jobs.add_sql_file(sql_path)
     
-    print(f"Reading SQL file: {sql_file_path}")
-    sql = sql_path.read_text(encoding='utf-8')
-    
-    print(f"Executing SQL query...")
-    try:
-        job = client.query(sql)
-        job.result()  # Wait for completion
-        print(f"[OK] Query executed successfully!")
-        if hasattr(job, 'num_dml_affected_rows') and job.num_dml_affected_rows:
-            print(f"   Rows affected: {job.num_dml_affected_rows:,}")
-        return True
-    except Exception as e:
-        print(f"[ERROR] Error executing query: {e}")
-        return False
+    print(f"Executing {len(jobs.jobs)} SQL statement(s)...")
+    results = jobs.run(raise_on_error=False)
+    for result in results.values():
+        if result.state == 'DONE':
+            print(f"[OK] {result.name} executed successfully!")
+            if result.num_dml_affected_rows:
+                print(f"   Rows affected: {result.num_dml_affected_rows:,}")
+        else:
+            print(f"[ERROR] {result.name}: {result.state} {result.error or ''}")
+    print(jobs.summary().to_string(index=False))
+    return all(result.state == 'DONE' for result in results.values())
+
+def execute_sql_file(sql_file_path, project_id='savvy-gtm-analytics'):
+    """Execute a SQL file in BigQuery"""
+    return execute_sql_files([sql_file_path], project_id)
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("Usage: python execute_sql.py <sql_file_path>")
+        print("Usage: python execute_sql.py <sql_file_path> [<sql_file_path> ...]")
         sys.exit(1)
     
-    sql_file = sys.argv[1]
-    success = execute_sql_file(sql_file)
+    success = execute_sql_files(sys.argv[1:])
     sys.exit(0 if success else 1)
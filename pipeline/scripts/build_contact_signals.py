@@ -0,0 +1,397 @@
+"""
+Contact Text Signal Index (credential + title flags as a per-CRD bitset)
+
+Tiering and lead-list queries detect credentials and title classes with
+dozens of LIKE predicates over CONTACT_BIO, REP_LICENSES and TITLE_NAME,
+re-scanning the free text of every contact on every run. This stage does the
+text matching once per FinTrx refresh and stores one INT64 bitset per CRD:
+
+    ml_features.contact_text_signals
+        crd, text_fingerprint, signals_version, signal_bits, updated_at
+
+plus a view exposing each bit as a narrow 0/1 column:
+
+    ml_features.contact_signal_flags
+        crd, has_cfp, has_series_65_only, has_series_7, has_cfa,
+        is_hv_wealth_title, is_excluded_title, is_senior_title,
+        is_promotee_title
+
+Matching:
+- Every LIKE pattern below is compiled to an anchored regex with LIKE
+  semantics (% = any run, _ = any char). BigQuery LIKE is case-sensitive:
+  title-class patterns are applied to UPPER(TITLE_NAME) like the SQL, while
+  the CFP/CFA credential checks match the raw TITLE_NAME (c.TITLE_NAME LIKE
+  '%CFP%' in the tiering SQL), so 'Cfp' does not count.
+- All patterns of a field are compiled into ONE regex (an optional lookahead
+  group per pattern), so a single match reports every pattern that holds.
+- Texts repeat heavily (titles especially), so each field is matched once
+  per DISTINCT value and the pattern bits are broadcast back to contacts.
+- NULL text yields 0 for every flag on that field (same as the SQL CASE).
+
+Incremental:
+- text_fingerprint = FARM_FINGERPRINT over the three text fields. A run only
+  pulls contacts that are new, whose text changed, or that were indexed with
+  a different signals_version (the hash of the pattern definitions below),
+  then MERGEs them and drops CRDs that left ria_contacts_current.
+
+Definitions mirror lead_certifications in v3/sql/phase_4_v3_tiered_scoring.sql,
+is_senior_title in pipeline/sql/create_ma_eligible_advisors.sql and the title
+part of is_likely_recent_promotee in pipeline/sql/v4_prospect_features.sql
+(the tenure condition stays in SQL).
+
+Usage:
+    python pipeline/scripts/build_contact_signals.py            # incremental
+    python pipeline/scripts/build_contact_signals.py --full     # rebuild
+
+Author: Lead Scoring Team
+Date: 2026-10-19
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+from google.cloud import bigquery
+from google.api_core.exceptions import NotFound
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from v3.utils.warehouse import get_client
+
+PROJECT_ID = "savvy-gtm-analytics"
+CONTACTS_TABLE = f"{PROJECT_ID}.FinTrx_data_CA.ria_contacts_current"
+SIGNALS_TABLE = f"{PROJECT_ID}.ml_features.contact_text_signals"
+FLAGS_VIEW = f"{PROJECT_ID}.ml_features.contact_signal_flags"
+STAGING_TABLE = SIGNALS_TABLE + "_staging"
+
+# (source column, upper-case before matching)
+TEXT_FIELDS = {
+    'bio': ('CONTACT_BIO', False),
+    'licenses': ('REP_LICENSES', False),
+    'title': ('TITLE_NAME', True),
+    'raw_title': ('TITLE_NAME', False),
+}
+TEXT_COLUMNS = list(dict.fromkeys(column for column, _ in TEXT_FIELDS.values()))
+
+WEALTH_MGMT_ADVISOR = '%WEALTH MANAGEMENT ADVISOR%'
+
+# Flag definitions: 'any' = OR of (field, LIKE pattern); each 'all' entry must
+# also hold; 'none' patterns must NOT match. Order defines the bit position -
+# append new flags at the end so existing bits keep their meaning.
+SIGNAL_DEFINITIONS = [
+    ('has_cfp', {
+        'any': [('bio', '%CFP%'), ('bio', '%Certified Financial Planner%'), ('raw_title', '%CFP%')],
+    }),
+    ('has_series_65_only', {
+        'any': [('licenses', '%Series 65%')],
+        'none': [('licenses', '%Series 7%')],
+    }),
+    ('has_series_7', {
+        'any': [('licenses', '%Series 7%')],
+    }),
+    ('has_cfa', {
+        'any': [('bio', '%CFA%'), ('bio', '%Chartered Financial Analyst%'), ('raw_title', '%CFA%')],
+    }),
+    ('is_hv_wealth_title', {
+        'any_groups': [
+            {'any': [('title', '%WEALTH MANAGER%')],
+             'none': [('title', WEALTH_MGMT_ADVISOR), ('title', '%ASSOCIATE%'), ('title', '%ASSISTANT%')]},
+            {'any': [('title', '%DIRECTOR%WEALTH%'), ('title', '%WEALTH%DIRECTOR%'),
+                     ('title', '%SENIOR WEALTH ADVISOR%'),
+                     ('title', '%FOUNDER%WEALTH%'), ('title', '%WEALTH%FOUNDER%'),
+                     ('title', '%PRINCIPAL%WEALTH%'), ('title', '%WEALTH%PRINCIPAL%'),
+                     ('title', '%PRESIDENT%WEALTH%'), ('title', '%WEALTH%PRESIDENT%')]},
+            {'any': [('title', '%SENIOR VICE%WEALTH%'), ('title', '%SVP%WEALTH%'),
+                     ('title', '%PARTNER%WEALTH%'), ('title', '%MANAGING DIRECTOR%WEALTH%')],
+             'none': [('title', WEALTH_MGMT_ADVISOR)]},
+        ],
+    }),
+    ('is_excluded_title', {
+        'any_groups': [
+            {'any': [('title', p) for p in [
+                '%FINANCIAL SOLUTIONS ADVISOR%', '%FINANCIAL SOLUTION ADVISOR%', '%PARAPLANNER%',
+                '%ASSOCIATE ADVISOR%', '%ASSOCIATE WEALTH ADVISOR%', '%OPERATIONS MANAGER%',
+                '%DIRECTOR OF OPERATIONS%', '%OPERATIONS SPECIALIST%', '%OPERATIONS ASSOCIATE%',
+                '%CHIEF OPERATING OFFICER%', '%FIRST VICE PRESIDENT%', '%WHOLESALER%',
+                '%INTERNAL SALES%', '%EXTERNAL SALES%', '%COMPLIANCE OFFICER%', '%CHIEF COMPLIANCE%',
+                '%COMPLIANCE MANAGER%', '%SUPERVISION%', '%REGISTERED ASSISTANT%',
+                '%CLIENT SERVICE ASSOCIATE%', '%SALES ASSISTANT%', '%ADMINISTRATIVE ASSISTANT%',
+                '%BRANCH OFFICE ADMINISTRATOR%', '%INSURANCE%',
+                'SENIOR VICE PRESIDENT, FINANCIAL ADVISOR',
+                'SENIOR VICE PRESIDENT, WEALTH MANAGEMENT ADVISOR',
+                'SENIOR VICE PRESIDENT, SENIOR FINANCIAL ADVISOR',
+                'VICE PRESIDENT, SENIOR FINANCIAL ADVISOR',
+            ]]},
+            {'any': [('title', '%ANALYST%')],
+             'none': [('title', '%INVESTMENT ANALYST%'), ('title', '%FINANCIAL ANALYST%'),
+                      ('title', '%PORTFOLIO ANALYST%')]},
+        ],
+    }),
+    ('is_senior_title', {
+        'any': [('title', p) for p in ['%PRESIDENT%', '%PRINCIPAL%', '%PARTNER%', '%OWNER%',
+                                       '%FOUNDER%', '%DIRECTOR%', '%MANAGING%']],
+    }),
+    ('is_promotee_title', {
+        'any': [('title', p) for p in ['%FINANCIAL ADVISOR%', '%WEALTH ADVISOR%', '%INVESTMENT ADVISOR%',
+                                       '%FINANCIAL PLANNER%', '%PORTFOLIO MANAGER%', '%SENIOR%',
+                                       '%DIRECTOR%', '%MANAGING%', '%PRINCIPAL%', '%VP %',
+                                       '%VICE PRESIDENT%']],
+        'none': [('title', p) for p in ['%ASSOCIATE%', '%ASSISTANT%', '%PARAPLANNER%', '%JUNIOR%',
+                                        '%INTERN%', '%TRAINEE%', '%FOUNDER%', '%OWNER%', '%CEO%',
+                                        '% PRESIDENT%']],
+    }),
+]
+
+SIGNAL_NAMES = [name for name, _ in SIGNAL_DEFINITIONS]
+SIGNALS_VERSION = hashlib.sha256(json.dumps(SIGNAL_DEFINITIONS).encode('utf-8')).hexdigest()[:12]
+
+SIGNALS_SCHEMA = [
+    bigquery.SchemaField('crd', 'INT64'),
+    bigquery.SchemaField('text_fingerprint', 'INT64'),
+    bigquery.SchemaField('signals_version', 'STRING'),
+    bigquery.SchemaField('signal_bits', 'INT64'),
+    bigquery.SchemaField('updated_at', 'TIMESTAMP'),
+]
+
+
+# ============================================================================
+# MATCHING
+# ============================================================================
+
+def like_to_regex(pattern: str) -> re.Pattern:
+    """Compile a SQL LIKE pattern (% and _ wildcards) to an anchored regex."""
+    parts = []
+    for ch in pattern:
+        if ch == '%':
+            parts.append('.*')
+        elif ch == '_':
+            parts.append('.')
+        else:
+            parts.append(re.escape(ch))
+    return re.compile(''.join(parts), re.DOTALL)
+
+
+def field_regex(patterns: List[str]) -> re.Pattern:
+    """
+    Compile a field's LIKE patterns into one regex.
+
+    Each pattern becomes an optional lookahead capture group anchored at the
+    start, so one match of the whole regex sets group j+1 iff pattern j holds.
+    """
+    return re.compile(''.join(f"(?:(?=({like_to_regex(p).pattern}\\Z)))?" for p in patterns), re.DOTALL)
+
+
+def _iter_patterns(definition: dict):
+    groups = definition.get('any_groups', [definition])
+    for group in groups:
+        for key in ('any', 'none'):
+            yield from group.get(key, [])
+
+
+def _field_patterns() -> Dict[str, List[str]]:
+    """Distinct LIKE patterns used per text field."""
+    patterns = {field: [] for field in TEXT_FIELDS}
+    for _, definition in SIGNAL_DEFINITIONS:
+        for field, pattern in _iter_patterns(definition):
+            if pattern not in patterns[field]:
+                patterns[field].append(pattern)
+    return patterns
+
+
+def match_field(values: pd.Series, patterns: List[str], upper: bool) -> Dict[str, np.ndarray]:
+    """
+    Evaluate every pattern against a text column, once per distinct value.
+
+    Returns:
+        Dict pattern -> boolean array aligned with values (False for NULL)
+    """
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    texts = pd.Series(uniques, dtype=object).astype(str)
+    if upper:
+        texts = texts.str.upper()
+
+    unique_hits = np.zeros((len(texts) + 1, len(patterns)), dtype=bool)  # last row = NULL
+    if len(texts) and patterns:
+        unique_hits[:-1] = texts.str.extract(field_regex(patterns)).notna().to_numpy()
+
+    rows = np.where(codes < 0, len(texts), codes)
+    return {p: unique_hits[rows, j] for j, p in enumerate(patterns)}
+
+
+def compute_signal_bits(df: pd.DataFrame) -> np.ndarray:
+    """
+    Compute the per-contact signal bitset.
+
+    Args:
+        df: Contacts with CONTACT_BIO, REP_LICENSES, TITLE_NAME columns
+
+    Returns:
+        int64 array; bit i set = SIGNAL_NAMES[i]
+    """
+    n = len(df)
+    hits = {}
+    for field, patterns in _field_patterns().items():
+        column, upper = TEXT_FIELDS[field]
+        for pattern, mask in match_field(df[column], patterns, upper).items():
+            hits[(field, pattern)] = mask
+
+    def any_of(refs):
+        out = np.zeros(n, dtype=bool)
+        for ref in refs:
+            out |= hits[ref]
+        return out
+
+    bits = np.zeros(n, dtype=np.int64)
+    for bit, (_, definition) in enumerate(SIGNAL_DEFINITIONS):
+        flag = np.zeros(n, dtype=bool)
+        for group in definition.get('any_groups', [definition]):
+            flag |= any_of(group['any']) & ~any_of(group.get('none', []))
+        bits |= flag.astype(np.int64) << bit
+    return bits
+
+
+def decode_signal_bits(bits) -> pd.DataFrame:
+    """Expand a signal_bits column into one 0/1 column per signal."""
+    bits = np.asarray(bits, dtype=np.int64)
+    return pd.DataFrame({name: (bits >> i) & 1 for i, name in enumerate(SIGNAL_NAMES)})
+
+
+def signal_flags_sql(alias: str = 's') -> str:
+    """SELECT-list fragment decoding signal_bits into named 0/1 columns."""
+    return ',\n    '.join(f"({alias}.signal_bits >> {i}) & 1 AS {name}" for i, name in enumerate(SIGNAL_NAMES))
+
+
+# ============================================================================
+# BIGQUERY
+# ============================================================================
+
+def text_fingerprint_sql(alias: str = 'c') -> str:
+    fields = ', '.join(f"IFNULL({alias}.{col}, '\\x00')" for col in TEXT_COLUMNS)
+    return f"FARM_FINGERPRINT(ARRAY_TO_STRING([{fields}], '\\x1f'))"
+
+
+def fetch_contacts(client: bigquery.Client, full: bool) -> pd.DataFrame:
+    """Fetch contacts to (re)index: all of them, or only new/changed/stale ones."""
+    text_cols = ', '.join(f'c.{col}' for col in TEXT_COLUMNS)
+    current = f"""
+    SELECT
+        c.RIA_CONTACT_CRD_ID AS crd,
+        {text_cols},
+        {text_fingerprint_sql()} AS text_fingerprint
+    FROM `{CONTACTS_TABLE}` c
+    WHERE c.RIA_CONTACT_CRD_ID IS NOT NULL
+    """
+    if full:
+        query = current
+    else:
+        query = f"""
+        WITH current_contacts AS ({current})
+        SELECT c.*
+        FROM current_contacts c
+        LEFT JOIN `{SIGNALS_TABLE}` s ON c.crd = s.crd
+        WHERE s.crd IS NULL
+           OR s.text_fingerprint != c.text_fingerprint
+           OR s.signals_version != '{SIGNALS_VERSION}'
+        """
+    df = client.query(query).to_dataframe()
+    print(f"[INFO] {len(df):,} contacts to index ({'full' if full else 'incremental'})")
+    return df
+
+
+def signals_table_exists(client: bigquery.Client) -> bool:
+    try:
+        client.get_table(SIGNALS_TABLE)
+        return True
+    except NotFound:
+        return False
+
+
+def write_signals(client: bigquery.Client, df_signals: pd.DataFrame, full: bool) -> dict:
+    """Replace (full) or MERGE (incremental) the signals table."""
+    job_config = bigquery.LoadJobConfig(
+        write_disposition=bigquery.WriteDisposition.WRITE_TRUNCATE,
+        schema=SIGNALS_SCHEMA,
+    )
+    if full:
+        client.load_table_from_dataframe(df_signals, SIGNALS_TABLE, job_config=job_config).result()
+        return {'upserted': len(df_signals), 'removed': 0}
+
+    upserted = 0
+    if len(df_signals) > 0:
+        client.load_table_from_dataframe(df_signals, STAGING_TABLE, job_config=job_config).result()
+        columns = [field.name for field in SIGNALS_SCHEMA]
+        update_set = ', '.join(f'{col} = s.{col}' for col in columns if col != 'crd')
+        job = client.query(f"""
+        MERGE `{SIGNALS_TABLE}` t
+        USING `{STAGING_TABLE}` s
+        ON t.crd = s.crd
+        WHEN MATCHED THEN UPDATE SET {update_set}
+        WHEN NOT MATCHED THEN INSERT ({', '.join(columns)}) VALUES ({', '.join('s.' + c for c in columns)})
+        """)
+        job.result()
+        upserted = job.num_dml_affected_rows or 0
+        client.delete_table(STAGING_TABLE, not_found_ok=True)
+
+    job = client.query(f"""
+    DELETE FROM `{SIGNALS_TABLE}` t
+    WHERE NOT EXISTS (
+        SELECT 1 FROM `{CONTACTS_TABLE}` c WHERE c.RIA_CONTACT_CRD_ID = t.crd
+    )
+    """)
+    job.result()
+    return {'upserted': upserted, 'removed': job.num_dml_affected_rows or 0}
+
+
+def create_flags_view(client: bigquery.Client):
+    """(Re)create the view exposing each signal bit as a 0/1 column."""
+    client.query(f"""
+    CREATE OR REPLACE VIEW `{FLAGS_VIEW}` AS
+    SELECT
+        s.crd,
+        {signal_flags_sql('s')}
+    FROM `{SIGNALS_TABLE}` s
+    """).result()
+
+
+def main(full: bool = False):
+    print("=" * 70)
+    print("CONTACT TEXT SIGNAL INDEX")
+    print("=" * 70)
+    print(f"Signals: {', '.join(SIGNAL_NAMES)}")
+    print(f"Signals version: {SIGNALS_VERSION}")
+
+    client = get_client(PROJECT_ID)
+    if not full and not signals_table_exists(client):
+        print("[INFO] Signals table not found - running full build")
+        full = True
+
+    df = fetch_contacts(client, full)
+    df_signals = pd.DataFrame({
+        'crd': df['crd'].astype('int64'),
+        'text_fingerprint': df['text_fingerprint'].astype('int64'),
+        'signals_version': SIGNALS_VERSION,
+        'signal_bits': compute_signal_bits(df),
+        'updated_at': pd.Timestamp(datetime.now(timezone.utc)),
+    })
+
+    counts = decode_signal_bits(df_signals['signal_bits']).sum()
+    for name, count in counts.items():
+        print(f"  {name:<22} {count:>8,}")
+
+    result = write_signals(client, df_signals, full)
+    create_flags_view(client)
+    print(f"[INFO] Upserted {result['upserted']:,}, removed {result['removed']:,}")
+    print(f"[INFO] Flags view: {FLAGS_VIEW}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Build per-CRD credential/title signal bitsets')
+    parser.add_argument('--full', action='store_true', help='Rebuild every contact instead of only changed text')
+    args = parser.parse_args()
+    main(full=args.full)
@@ -0,0 +1,366 @@
+"""
+Memory-Mapped Per-Prospect Feature Contribution Store
+
+The scores table keeps only three narrative features per prospect
+(shap_top{1,2,3}_*). A full explanation for one CRD, or narratives
+re-rendered with different rules, used to need the model re-run. Each
+score_prospects_v43.py run now also persists every prospect's exact
+per-feature contributions (XGBoost TreeSHAP via pred_contribs, log-odds,
+same trees as predict_proba) to a local store:
+
+    <store_dir>/contributions.npy  float16 (n_prospects x n_features + 1),
+                                   rows in CRD order, last column = bias
+    <store_dir>/crds.npy           int64, sorted
+    <store_dir>/meta.json          model version, feature order, row count
+
+contributions.npy is opened memory-mapped: a lookup binary-searches the
+CRD index and reads only the requested rows, so explanations cost
+neither a model run nor a load of the whole matrix (~16 MB for 300k
+prospects). Contributions plus bias sum to the score's log-odds (to float16
+precision, ~3 significant digits).
+
+Default store: $LEAD_SCORING_CONTRIBUTIONS_DIR or <repo>/.cache/contributions
+
+Usage:
+    from contribution_store import ContributionStore
+
+    store = ContributionStore()
+    store.explain(1234567)                   # every feature, largest |contribution| first
+    store.top_k([1234567, 7654321], k=5)     # long format: crd, rank, feature, contribution, direction
+    store.aggregate(nurture_crds)            # mean / mean |contribution| per feature
+
+CLI:
+    python pipeline/scripts/contribution_store.py info
+    python pipeline/scripts/contribution_store.py explain 1234567
+    python pipeline/scripts/contribution_store.py top --k 5 --crds-csv list.csv
+    python pipeline/scripts/contribution_store.py aggregate --crds-csv list.csv
+
+Author: Lead Scoring Team
+Date: 2026-10-19
+"""
+
+import json
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CONTRIBUTIONS_DIR = Path(__file__).resolve().parent.parent.parent / ".cache" / "contributions"
+CONTRIBUTIONS_DIR_ENV_VAR = "LEAD_SCORING_CONTRIBUTIONS_DIR"
+BIAS_COLUMN = 'bias'
+MATRIX_FILE = "contributions.npy"
+CRDS_FILE = "crds.npy"
+META_FILE = "meta.json"
+DEFAULT_BATCH_SIZE = 50000
+AGGREGATE_CHUNK_ROWS = 100000
+
+
+def store_dir(directory: Optional[str] = None) -> Path:
+    """Store directory: argument, $LEAD_SCORING_CONTRIBUTIONS_DIR or .cache/contributions."""
+    return Path(directory or os.environ.get(CONTRIBUTIONS_DIR_ENV_VAR) or DEFAULT_CONTRIBUTIONS_DIR)
+
+
+def compute_contributions(model, X: pd.DataFrame, batch_size: int = DEFAULT_BATCH_SIZE) -> np.ndarray:
+    """
+    Exact per-feature contributions (log-odds) for every row of X.
+
+    Uses the trees predict_proba uses (up to best_iteration when set).
+
+    Args:
+        model: Loaded XGBClassifier
+        X: Feature frame in model column order
+        batch_size: Rows per pred_contribs call
+
+    Returns:
+        float16 array (len(X), n_features + 1); last column is the bias
+    """
+    import xgboost as xgb
+
+    booster = model.get_booster()
+    best = getattr(model, 'best_iteration', None)
+    iteration_range = (0, int(best) + 1) if best is not None else (0, 0)
+    out = np.empty((len(X), X.shape[1] + 1), dtype=np.float16)
+    for start in range(0, len(X), batch_size):
+        chunk = xgb.DMatrix(X.iloc[start:start + batch_size], feature_names=list(X.columns))
+        out[start:start + chunk.num_row()] = booster.predict(
+            chunk, pred_contribs=True, iteration_range=iteration_range)
+    return out
+
+
+def write_store(crds: Sequence[int], contributions: np.ndarray, features: Sequence[str],
+                model_version: str, directory: Optional[str] = None,
+                previous: Optional['ContributionStore'] = None,
+                current_crds: Optional[Sequence[int]] = None) -> 'ContributionStore':
+    """
+    Write (or incrementally update) the contribution store.
+
+    Args:
+        crds: CRDs of the contribution rows
+        contributions: Output of compute_contributions()
+        features: Feature order of the contribution columns (bias excluded)
+        model_version: Model the contributions come from
+        directory: Store directory (default: store_dir())
+        previous: Open store to carry unchanged rows over from (incremental
+            scoring). Rows for CRDs in `crds` are replaced. It is closed here.
+        current_crds: With previous, drop carried rows not in this set
+            (prospects that left the features table)
+
+    Returns:
+        The new store, opened
+    """
+    target = store_dir(directory)
+    crds = np.asarray(crds, dtype=np.int64)
+    contributions = np.asarray(contributions, dtype=np.float16)
+    if contributions.shape != (len(crds), len(features) + 1):
+        raise ValueError(f"Contributions shape {contributions.shape} does not match "
+                         f"{len(crds)} CRDs x {len(features)} features + bias")
+
+    if previous is not None:
+        if list(previous.features) != list(features):
+            raise ValueError("Previous contribution store has a different feature order")
+        keep = ~np.isin(previous.crds, crds)
+        if current_crds is not None:
+            keep &= np.isin(previous.crds, np.asarray(current_crds, dtype=np.int64))
+        crds = np.concatenate([previous.crds[keep], crds])
+        contributions = np.concatenate([previous.matrix[keep], contributions])
+        previous.close()
+
+    order = np.argsort(crds, kind='stable')
+    crds = crds[order]
+    if len(crds) > 1 and (np.diff(crds) == 0).any():
+        raise ValueError("Duplicate CRDs in contribution rows")
+
+    # Build next to the live store and swap, so readers never see a partial store
+    staging = target.with_name(target.name + ".tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+    matrix = np.lib.format.open_memmap(staging / MATRIX_FILE, mode='w+', dtype=np.float16,
+                                       shape=contributions.shape)
+    matrix[:] = contributions[order]
+    matrix.flush()
+    del matrix
+    np.save(staging / CRDS_FILE, crds)
+    meta = {
+        'model_version': model_version,
+        'features': list(features),
+        'n_prospects': int(len(crds)),
+        'dtype': 'float16',
+        'written_at': datetime.now().isoformat(timespec='seconds'),
+    }
+    (staging / META_FILE).write_text(json.dumps(meta, indent=2), encoding='utf-8')
+
+    retired = target.with_name(target.name + ".old")
+    shutil.rmtree(retired, ignore_errors=True)
+    if target.exists():
+        target.rename(retired)
+    staging.rename(target)
+    shutil.rmtree(retired, ignore_errors=True)
+    return ContributionStore(target)
+
+
+class ContributionStore:
+    """Read-only, memory-mapped view of a contribution store."""
+
+    def __init__(self, directory: Optional[str] = None):
+        """
+        Args:
+            directory: Store directory (default: $LEAD_SCORING_CONTRIBUTIONS_DIR or .cache/contributions)
+        """
+        self.directory = store_dir(directory)
+        meta_path = self.directory / META_FILE
+        if not meta_path.exists():
+            raise FileNotFoundError(f"No contribution store at {self.directory} "
+                                    f"(written by score_prospects_v43.py)")
+        self.meta = json.loads(meta_path.read_text(encoding='utf-8'))
+        self.features = list(self.meta['features'])
+        self.columns = self.features + [BIAS_COLUMN]
+        self.crds = np.load(self.directory / CRDS_FILE)
+        self.matrix = np.load(self.directory / MATRIX_FILE, mmap_mode='r')
+
+    @classmethod
+    def exists(cls, directory: Optional[str] = None) -> bool:
+        return (store_dir(directory) / META_FILE).exists()
+
+    @property
+    def model_version(self) -> str:
+        return self.meta['model_version']
+
+    def __len__(self) -> int:
+        return len(self.crds)
+
+    def __contains__(self, crd) -> bool:
+        i = np.searchsorted(self.crds, int(crd))
+        return i < len(self.crds) and self.crds[i] == int(crd)
+
+    def close(self):
+        """Release the memory map (needed before the files can be replaced on Windows)."""
+        self.matrix = None
+
+    def _rows(self, crds: Iterable[int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(requested CRDs, row index, found mask); unparseable CRDs are not found."""
+        wanted = np.asarray(crds if isinstance(crds, (np.ndarray, pd.Series, pd.Index)) else list(crds))
+        if wanted.dtype.kind in 'iu':
+            wanted, valid = wanted.astype(np.int64), np.ones(len(wanted), dtype=bool)
+        else:
+            parsed = pd.to_numeric(pd.Series(wanted, dtype=object), errors='coerce')
+            valid = parsed.notna().to_numpy()
+            wanted = parsed.fillna(-1).to_numpy(dtype=np.int64)
+        if len(self.crds) == 0:
+            return wanted, np.zeros(len(wanted), dtype=np.int64), np.zeros(len(wanted), dtype=bool)
+        rows = np.minimum(np.searchsorted(self.crds, wanted), len(self.crds) - 1)
+        return wanted, rows, valid & (self.crds[rows] == wanted)
+
+    def _read(self, rows: np.ndarray) -> np.ndarray:
+        """Rows of the matrix as float32, read in file order."""
+        order = np.argsort(rows, kind='stable')
+        out = np.empty((len(rows), len(self.columns)), dtype=np.float32)
+        out[order] = self.matrix[rows[order]]
+        return out
+
+    def contributions(self, crds: Iterable[int]) -> pd.DataFrame:
+        """
+        Full contribution rows (features + bias) indexed by CRD.
+
+        CRDs not in the store get all-NaN rows.
+        """
+        wanted, rows, found = self._rows(crds)
+        values = np.full((len(wanted), len(self.columns)), np.nan, dtype=np.float32)
+        values[found] = self._read(rows[found])
+        return pd.DataFrame(values, index=pd.Index(wanted, name='crd'), columns=self.columns)
+
+    def explain(self, crd: int) -> pd.DataFrame:
+        """
+        Every feature's contribution for one CRD, largest |contribution| first.
+
+        Raises:
+            KeyError: CRD not in the store
+        """
+        if crd not in self:
+            raise KeyError(f"CRD {crd} not in contribution store ({self.model_version})")
+        row = self.matrix[np.searchsorted(self.crds, int(crd))].astype(np.float32)
+        out = pd.DataFrame({'feature': self.features, 'contribution': row[:len(self.features)]})
+        out['direction'] = np.where(out['contribution'] >= 0, 'positive', 'negative')
+        return out.reindex(out['contribution'].abs().sort_values(ascending=False).index).reset_index(drop=True)
+
+    def top_k(self, crds: Iterable[int], k: int = 3) -> pd.DataFrame:
+        """
+        k largest |contributions| per CRD, long format.
+
+        Returns:
+            DataFrame with crd, rank (1..k), feature, contribution, direction;
+            CRDs not in the store are omitted
+        """
+        wanted, rows, found = self._rows(crds)
+        values = self._read(rows[found])[:, :len(self.features)]
+        k = min(k, len(self.features))
+        if len(values) == 0 or k <= 0:
+            return pd.DataFrame(columns=['crd', 'rank', 'feature', 'contribution', 'direction'])
+        magnitude = np.abs(values)
+        top = np.argpartition(-magnitude, k - 1, axis=1)[:, :k]
+        top = np.take_along_axis(top, np.argsort(-np.take_along_axis(magnitude, top, axis=1), axis=1), axis=1)
+        top_values = np.take_along_axis(values, top, axis=1)
+        return pd.DataFrame({
+            'crd': np.repeat(wanted[found], k),
+            'rank': np.tile(np.arange(1, k + 1), len(values)),
+            'feature': np.asarray(self.features, dtype=object)[top.ravel()],
+            'contribution': top_values.ravel(),
+            'direction': np.where(top_values.ravel() >= 0, 'positive', 'negative'),
+        })
+
+    def aggregate(self, crds: Optional[Iterable[int]] = None) -> pd.DataFrame:
+        """
+        Per-feature contribution summary over a set of CRDs (default: all), bias excluded.
+
+        Returns:
+            DataFrame with feature, mean_contribution, mean_abs_contribution,
+            positive_share, sorted by mean_abs_contribution; attrs['n_prospects']
+            holds how many of the CRDs were found
+        """
+        if crds is None:
+            rows = np.arange(len(self.crds))
+        else:
+            _, rows, found = self._rows(crds)
+            rows = np.unique(rows[found])
+        n_features = len(self.features)
+        total = np.zeros(n_features, dtype=np.float64)
+        total_abs = np.zeros(n_features, dtype=np.float64)
+        positive = np.zeros(n_features, dtype=np.int64)
+        for start in range(0, len(rows), AGGREGATE_CHUNK_ROWS):
+            block = np.asarray(self.matrix[rows[start:start + AGGREGATE_CHUNK_ROWS], :n_features], dtype=np.float32)
+            total += block.sum(axis=0)
+            total_abs += np.abs(block).sum(axis=0)
+            positive += (block > 0).sum(axis=0)
+        n = max(len(rows), 1)
+        out = pd.DataFrame({
+            'feature': self.features,
+            'mean_contribution': total / n,
+            'mean_abs_contribution': total_abs / n,
+            'positive_share': positive / n,
+        }).sort_values('mean_abs_contribution', ascending=False, ignore_index=True)
+        out.attrs['n_prospects'] = int(len(rows))
+        return out
+
+
+def _read_crds(args) -> list:
+    crds = list(args.crds or [])
+    if args.crds_csv:
+        df = pd.read_csv(args.crds_csv, dtype=str)
+        column = next((c for c in df.columns if c.lower() == 'crd'), None)
+        if column is None:
+            raise SystemExit(f"CSV must have a 'crd' column. Found: {list(df.columns)}")
+        crds += df[column].dropna().tolist()
+    return crds
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Query the per-prospect feature contribution store')
+    parser.add_argument('--dir', help=f'Store directory (default: ${CONTRIBUTIONS_DIR_ENV_VAR} or .cache/contributions)')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    sub.add_parser('info', help='Model version, row count and size')
+
+    p_explain = sub.add_parser('explain', help='Every feature contribution for one CRD')
+    p_explain.add_argument('crd', type=int)
+
+    for name, help_text in [('top', 'Top-k features per CRD'), ('aggregate', 'Mean contributions over CRDs')]:
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument('crds', nargs='*', help='CRDs (aggregate: default all prospects)')
+        p.add_argument('--crds-csv', type=Path, help="CSV with a 'crd' column")
+        p.add_argument('--output', type=Path, help='Write CSV instead of printing')
+        if name == 'top':
+            p.add_argument('--k', type=int, default=3)
+
+    args = parser.parse_args()
+    store = ContributionStore(args.dir)
+
+    if args.command == 'info':
+        size_mb = (store.directory / MATRIX_FILE).stat().st_size / 1e6
+        print(f"[INFO] {store.directory}")
+        print(f"[INFO] Model {store.model_version}, {len(store):,} prospects x {len(store.features)} features, "
+              f"{size_mb:.1f} MB, written {store.meta['written_at']}")
+    elif args.command == 'explain':
+        result = store.explain(args.crd)
+        bias = float(store.contributions([args.crd])[BIAS_COLUMN].iloc[0])
+        print(result.to_string(index=False))
+        margin = bias + result['contribution'].sum()
+        print(f"\n  bias {bias:+.3f}, log-odds {margin:+.3f}, score ~{1 / (1 + np.exp(-margin)):.4f}")
+    else:
+        crds = _read_crds(args)
+        if args.command == 'top':
+            if not crds:
+                parser.error('top needs CRDs or --crds-csv')
+            result = store.top_k(crds, args.k)
+        else:
+            result = store.aggregate(crds or None)
+            print(f"[INFO] Aggregated over {result.attrs['n_prospects']:,} prospects")
+        if args.output:
+            result.to_csv(args.output, index=False)
+            print(f"[INFO] Wrote {len(result):,} rows to {args.output}")
+        else:
+            print(result.to_string(index=False))
@@ -4,6 +4,9 @@ prospect_id, opportunity_id, disposition__c, closed_lost_details__c, closed_lost
 
 Follows List Enrichment playbook: Phase 4 (lead scoring) + grouping (FinTrx firm) + Phase 5 (Salesforce).
 Expects CSV to already have a CRD column (Phase 1–2 and Phase 3 can be run separately if needed).
+The scoring and grouping/Salesforce queries are independent and run concurrently.
+Salesforce fields come from crd_salesforce_activity, brought up to date first by
+an incremental extraction (salesforce_activity.py; skip with --no-activity-refresh).
 
 Usage:
   python pipeline/scripts/enrich_list_playbook.py "C:\path\to\True advisors - Sheet1.csv"
@@ -15,11 +18,18 @@ Requires: google-cloud-bigquery, pandas. Auth: gcloud auth application-default l
 import argparse
 import csv
 import re
+import sys
 from pathlib import Path
 
 from google.cloud import bigquery
 import pandas as pd
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from v3.utils.job_manager import JobManager
+from v3.utils.warehouse import get_client
+
+import salesforce_activity
+
 # Reuse scoring pipeline config
 PROJECT_ID = "savvy-gtm-analytics"
 DATASET = "ml_features"
@@ -136,40 +146,6 @@ input_crds AS (
   SELECT DISTINCT SAFE_CAST(crd AS INT64) AS crd
   FROM `{project}.{dataset}.{table}`
   WHERE crd IS NOT NULL AND SAFE_CAST(crd AS INT64) IS NOT NULL
-),
-lead_one AS (
-  SELECT
-    SAFE_CAST(FA_CRD__c AS INT64) AS crd,
-    Full_Prospect_ID__c AS prospect_id,
-    Disposition__c AS disposition__c
-  FROM (
-    SELECT
-      FA_CRD__c,
-      Full_Prospect_ID__c,
-      Disposition__c,
-      ROW_NUMBER() OVER (PARTITION BY FA_CRD__c ORDER BY LastModifiedDate DESC NULLS LAST, Id) AS rn
-    FROM `{project}.SavvyGTMData.Lead`
-    WHERE IsDeleted = FALSE AND FA_CRD__c IS NOT NULL
-  )
-  WHERE rn = 1
-),
-opp_one AS (
-  SELECT
-    SAFE_CAST(FA_CRD__c AS INT64) AS crd,
-    Full_Opportunity_ID__c AS opportunity_id,
-    Closed_Lost_Details__c AS closed_lost_details__c,
-    Closed_Lost_Reason__c AS closed_lost_reason__c
-  FROM (
-    SELECT
-      FA_CRD__c,
-      Full_Opportunity_ID__c,
-      Closed_Lost_Details__c,
-      Closed_Lost_Reason__c,
-      ROW_NUMBER() OVER (PARTITION BY FA_CRD__c ORDER BY LastModifiedDate DESC NULLS LAST, Id) AS rn
-    FROM `{project}.SavvyGTMData.Opportunity`
-    WHERE IsDeleted = FALSE AND FA_CRD__c IS NOT NULL
-  )
-  WHERE rn = 1
 )
 SELECT
   i.crd,
@@ -183,18 +159,18 @@ SELECT
       THEN 'Small RIA'
     ELSE 'Everyone else'
   END AS `grouping`,
-  l.prospect_id,
-  o.opportunity_id,
-  l.disposition__c,
-  o.closed_lost_details__c,
-  o.closed_lost_reason__c
+  sf.prospect_id,
+  sf.full_opportunity_id AS opportunity_id,
+  sf.disposition AS disposition__c,
+  sf.closed_lost_details AS closed_lost_details__c,
+  sf.closed_lost_reason AS closed_lost_reason__c
 FROM input_crds i
 LEFT JOIN `{project}.FinTrx_data_CA.ria_contacts_current` c
   ON SAFE_CAST(ROUND(SAFE_CAST(c.RIA_CONTACT_CRD_ID AS FLOAT64), 0) AS INT64) = i.crd
 LEFT JOIN `{project}.FinTrx_data_CA.ria_firms_current` f
   ON c.LATEST_REGISTERED_EMPLOYMENT_COMPANY_CRD_ID = f.CRD_ID
-LEFT JOIN lead_one l ON i.crd = l.crd
-LEFT JOIN opp_one o ON i.crd = o.crd
+-- Latest lead / opportunity per CRD, maintained incrementally by salesforce_activity.py
+LEFT JOIN `{activity}` sf ON i.crd = sf.crd
 ORDER BY i.crd
 """
 
@@ -299,20 +275,19 @@ def upload_crds_to_bq(client: bigquery.Client, crds: list[int]) -> None:
     print(f"[INFO] Uploaded {len(crds)} CRDs to {table_id}")
 
 
-def run_scoring_query(client: bigquery.Client) -> pd.DataFrame:
-    query = build_scoring_query()
-    print("[INFO] Running lead scoring (V3 + V4 + narrative)...")
-    return client.query(query).to_dataframe()
-
-
-def run_grouping_salesforce_query(client: bigquery.Client) -> pd.DataFrame:
-    query = GROUPING_SALESFORCE_SQL.format(
-        project=PROJECT_ID,
-        dataset=DATASET,
-        table=STAGING_TABLE,
+def run_enrichment_queries(client: bigquery.Client) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Run lead scoring and grouping + Salesforce lookup concurrently."""
+    jobs = JobManager(client)
+    jobs.submit("scoring", build_scoring_query(), fetch=True)
+    jobs.submit(
+        "grouping_salesforce",
+        GROUPING_SALESFORCE_SQL.format(project=PROJECT_ID, dataset=DATASET, table=STAGING_TABLE,
+                                       activity=salesforce_activity.SUMMARY_TABLE),
+        fetch=True,
     )
-    print("[INFO] Running grouping + Salesforce lookup...")
-    return client.query(query).to_dataframe()
+    print("[INFO] Running lead scoring (V3 + V4 + narrative) and grouping + Salesforce lookup...")
+    results = jobs.run()
+    return results["scoring"].rows, results["grouping_salesforce"].rows
 
 
 def _safe_str(val) -> str:
@@ -328,6 +303,8 @@ def main():
     parser.add_argument("input_csv", type=Path, help="Path to CSV with CRD column.")
     parser.add_argument("--output", "-o", type=Path, default=None, help="Output CSV path.")
     parser.add_argument("--crd-column", default=DEFAULT_CRD_COLUMN, help=f"CRD column name (default: {DEFAULT_CRD_COLUMN}).")
+    parser.add_argument("--no-activity-refresh", action="store_true",
+                        help="Use the Salesforce activity tables as they are (skip the incremental extraction).")
     args = parser.parse_args()
 
     input_path = args.input_csv.resolve()
@@ -344,10 +321,11 @@ def main():
     crds = list(dict.fromkeys(c for c, _ in rows_with_crd))
     print(f"[INFO] Loaded {len(rows_with_crd)} rows, {len(crds)} unique CRDs from {input_path}")
 
-    client = bigquery.Client(project=PROJECT_ID)
+    client = get_client(PROJECT_ID)
     upload_crds_to_bq(client, crds)
-    scores_df = run_scoring_query(client)
-    group_sf_df = run_grouping_salesforce_query(client)
+    if not args.no_activity_refresh:
+        salesforce_activity.refresh_activity(client)
+    scores_df, group_sf_df = run_enrichment_queries(client)
 
     score_by_crd = scores_df.set_index("crd").to_dict("index") if not scores_df.empty else {}
     group_sf_by_crd = group_sf_df.set_index("crd").to_dict("index") if not group_sf_df.empty else {}
@@ -0,0 +1,424 @@
+"""
+CRD Exclusion Sets: Sorted uint32 Arrays with Reason Codes
+
+Every lead-list build and CRD-list scoring call recomputes the same advisor
+exclusions as CTEs and anti-joins them (excluded_firm_crds,
+excluded_disposition_crds, excluded_closed_recent_crds, salesforce_crds,
+recent_promotee_exclusions, disclosure / title / age filters). This module
+materializes each one once as a set of advisor CRDs:
+
+- Storage: one DatasetCache snapshot per rule (zstd Parquet of a sorted
+  integer column), re-downloaded only when a source table is refreshed.
+  The snapshot's source modification times are the set's version.
+  Date-dependent rules embed the as-of date in their SQL, so they also
+  roll over daily.
+- Memory: a sorted, de-duplicated uint32 array per set (4 bytes per CRD)
+  plus a parallel uint32 reason bitmask. Single-CRD membership is a binary
+  search (about a microsecond). Bulk lists probe a packed bitmap built on
+  first use (1 bit per possible CRD, about 1 MB per set), which is ~40x
+  faster than binary-searching an unsorted list of lookups.
+- Set algebra (|, &, -) merges the arrays and ORs the reason bits, so the
+  combined `excluded` set still says why every CRD is in it.
+
+Rules mirror pipeline/sql/March_2026_Lead_List_V3_7_0.sql. The SQL stays
+the source of truth for list builds; these sets let Python list tools
+pre-filter and explain exclusions before touching the warehouse.
+
+Usage:
+    from exclusion_sets import ExclusionSets
+
+    sets = ExclusionSets().load()
+    123456 in sets.excluded                     # membership
+    sets.explain([123456, 234567])              # crd, excluded, exclusion_reasons, in_salesforce
+    kept, dropped = sets.filter(crds)           # pre-filter a CRD list
+    (sets['disclosure_hard'] | sets['disclosure_soft']) - sets['salesforce_crds']
+
+CLI:
+    python pipeline/scripts/exclusion_sets.py                    # load and summarize every set
+    python pipeline/scripts/exclusion_sets.py --explain 123456 234567
+    python pipeline/scripts/exclusion_sets.py --refresh          # force re-download
+
+Author: Lead Scoring Team
+Date: 2026-10-19
+"""
+
+import sys
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from v3.utils.dataset_cache import DatasetCache
+
+PROJECT_ID = "savvy-gtm-analytics"
+CONTACTS_TABLE = f"{PROJECT_ID}.FinTrx_data_CA.ria_contacts_current"
+LEAD_TABLE = f"{PROJECT_ID}.SavvyGTMData.Lead"
+EXCLUDED_FIRMS_TABLE = f"{PROJECT_ID}.ml_features.excluded_firms"
+EXCLUDED_FIRM_CRDS_TABLE = f"{PROJECT_ID}.ml_features.excluded_firm_crds"
+
+MAX_REASONS = 32        # one bit per reason code in a uint32 mask
+
+LEAD_CRD = "SAFE_CAST(REGEXP_REPLACE(CAST(FA_CRD__c AS STRING), r'[^0-9]', '') AS INT64)"
+
+EXCLUDED_TITLE_PATTERNS = (
+    'FINANCIAL SOLUTIONS ADVISOR', 'PARAPLANNER', 'ASSOCIATE ADVISOR', 'ASSOCIATE FINANCIAL PLANNER',
+    'ASSOCIATE WEALTH ADVISOR', 'OPERATIONS', 'WHOLESALER', 'COMPLIANCE', 'ASSISTANT', 'INSURANCE AGENT',
+    'INSURANCE', 'BRANCH MANAGER', 'CHIEF FINANCIAL OFFICER', 'CFO', 'CHIEF INVESTMENT OFFICER', 'CIO',
+    'VICE PRESIDENT', 'VP ',
+)
+PROMOTEE_TITLE_PATTERNS = (
+    'FINANCIAL ADVISOR', 'WEALTH ADVISOR', 'INVESTMENT ADVISOR', 'FINANCIAL PLANNER', 'PORTFOLIO MANAGER',
+    'SENIOR', 'DIRECTOR', 'MANAGING', 'PRINCIPAL', 'VP ', 'VICE PRESIDENT',
+)
+JUNIOR_TITLE_PATTERNS = ('ASSOCIATE', 'ASSISTANT', 'PARAPLANNER', 'JUNIOR', 'INTERN', 'TRAINEE')
+FOUNDER_TITLE_PATTERNS = ('FOUNDER', 'OWNER', 'CEO', ' PRESIDENT')
+OVER_70_AGE_RANGES = ('70-74', '75-79', '80-84', '85-89', '90-94', '95-99')
+HARD_DISCLOSURES = ('CRIMINAL', 'REGULATORY_EVENT', 'TERMINATION', 'INVESTIGATION')
+SOFT_DISCLOSURES = ('CUSTOMER_DISPUTE', 'CIVIL_EVENT', 'BOND')
+RECYCLABLE_DISPOSITIONS = ('Bad Lead Provided', 'Bad Contact Info - Uncontacted',
+                           'Wrong Phone Number - Contacted', 'No Show/Ghosted')
+
+
+def _title_like(patterns: Sequence[str]) -> str:
+    return "(" + " OR ".join(f"UPPER(c.TITLE_NAME) LIKE '%{p}%'" for p in patterns) + ")"
+
+
+def _flag_true(columns: Sequence[str]) -> str:
+    return "(" + " OR ".join(
+        f"LOWER(TRIM(CAST(c.CONTACT_HAS_DISCLOSED_{col} AS STRING))) = 'true'" for col in columns) + ")"
+
+
+def _in_list(values: Sequence[str]) -> str:
+    return ", ".join("'" + v.replace("'", "\\'") + "'" for v in values)
+
+
+@dataclass
+class ExclusionRule:
+    """One advisor-CRD set: a query returning a `crd` column."""
+    name: str                   # reason code (the lead-list CTE / filter it mirrors)
+    sql: str                    # may use {as_of} (YYYY-MM-DD)
+    description: str
+    exclude: bool = True        # False: informational membership (e.g. already in Salesforce)
+
+
+EXCLUSION_RULES = [
+    ExclusionRule('excluded_firm_crds', f"""
+SELECT DISTINCT c.RIA_CONTACT_CRD_ID AS crd
+FROM `{CONTACTS_TABLE}` c
+JOIN `{EXCLUDED_FIRM_CRDS_TABLE}` ec ON SAFE_CAST(c.PRIMARY_FIRM AS INT64) = ec.firm_crd
+""", 'Primary firm CRD on ml_features.excluded_firm_crds (e.g. Savvy, Ritholtz)'),
+    ExclusionRule('excluded_firms', f"""
+SELECT DISTINCT c.RIA_CONTACT_CRD_ID AS crd
+FROM `{CONTACTS_TABLE}` c
+JOIN `{EXCLUDED_FIRMS_TABLE}` ef ON UPPER(c.PRIMARY_FIRM_NAME) LIKE ef.pattern
+""", 'Primary firm name matches an ml_features.excluded_firms pattern (wirehouses, insurers, ...)'),
+    ExclusionRule('excluded_disposition_crds', f"""
+SELECT DISTINCT {LEAD_CRD} AS crd
+FROM `{LEAD_TABLE}`
+WHERE IsDeleted = false AND FA_CRD__c IS NOT NULL
+  AND Disposition__c IN ('No Book', 'Book Not Transferable', 'Not a Fit')
+""", 'Lead disposition No Book / Book Not Transferable / Not a Fit'),
+    ExclusionRule('excluded_closed_recent_crds', f"""
+SELECT DISTINCT {LEAD_CRD} AS crd
+FROM `{LEAD_TABLE}`
+WHERE IsDeleted = false AND FA_CRD__c IS NOT NULL AND Status = 'Closed'
+  AND DATE(COALESCE(Stage_Entered_Closed__c, LastModifiedDate)) >= DATE_SUB(DATE '{{as_of}}', INTERVAL 365 DAY)
+  AND (Disposition__c IS NULL OR Disposition__c NOT IN ({_in_list(RECYCLABLE_DISPOSITIONS)}))
+""", 'Closed in the last 365 days with a non-recyclable disposition'),
+    ExclusionRule('recent_promotee_exclusions', f"""
+SELECT DISTINCT c.RIA_CONTACT_CRD_ID AS crd
+FROM `{CONTACTS_TABLE}` c
+WHERE COALESCE(SAFE_CAST(c.INDUSTRY_TENURE_MONTHS AS INT64), 0) < 60
+  AND {_title_like(PROMOTEE_TITLE_PATTERNS)}
+  AND NOT {_title_like(JUNIOR_TITLE_PATTERNS)}
+  AND NOT {_title_like(FOUNDER_TITLE_PATTERNS)}
+""", 'Under 5 years industry tenure with a mid/senior title (likely recent promotee)'),
+    ExclusionRule('disclosure_hard', f"""
+SELECT DISTINCT c.RIA_CONTACT_CRD_ID AS crd
+FROM `{CONTACTS_TABLE}` c
+WHERE {_flag_true(HARD_DISCLOSURES)}
+""", 'Criminal, regulatory, termination or investigation disclosure'),
+    ExclusionRule('disclosure_soft', f"""
+SELECT DISTINCT c.RIA_CONTACT_CRD_ID AS crd
+FROM `{CONTACTS_TABLE}` c
+WHERE {_flag_true(SOFT_DISCLOSURES)}
+""", 'Customer dispute, civil event or bond disclosure'),
+    ExclusionRule('excluded_titles', f"""
+SELECT DISTINCT c.RIA_CONTACT_CRD_ID AS crd
+FROM `{CONTACTS_TABLE}` c
+WHERE {_title_like(EXCLUDED_TITLE_PATTERNS)}
+""", 'Excluded title (paraplanner, operations, insurance, executive, ...)'),
+    ExclusionRule('age_over_70', f"""
+SELECT DISTINCT c.RIA_CONTACT_CRD_ID AS crd
+FROM `{CONTACTS_TABLE}` c
+WHERE c.AGE_RANGE IN ({_in_list(OVER_70_AGE_RANGES)})
+""", 'AGE_RANGE over 70'),
+    ExclusionRule('salesforce_crds', f"""
+SELECT DISTINCT {LEAD_CRD} AS crd
+FROM `{LEAD_TABLE}`
+WHERE FA_CRD__c IS NOT NULL AND IsDeleted = false
+""", 'Already a Salesforce lead (IN_SALESFORCE prospect type)', exclude=False),
+]
+
+
+# =============================================================================
+# CRD SET
+# =============================================================================
+def _as_crds(values: Iterable) -> np.ndarray:
+    """Valid CRDs (positive integers below 2^32) as int64, invalid entries as -1."""
+    if isinstance(values, np.ndarray) and values.dtype.kind in 'iu':
+        crds = values.astype(np.int64, copy=True)
+        crds[(crds <= 0) | (crds >= 2 ** 32)] = -1
+        return crds
+    if not isinstance(values, (pd.Series, np.ndarray, list, tuple)):
+        values = list(values)
+    numbers = pd.to_numeric(pd.Series(values).reset_index(drop=True), errors='coerce')
+    crds = numbers.fillna(-1).to_numpy(dtype=np.int64, copy=True)
+    crds[(crds <= 0) | (crds >= 2 ** 32)] = -1
+    return crds
+
+
+class CrdSet:
+    """
+    Immutable set of advisor CRDs: sorted unique uint32 array + per-CRD reason bits.
+
+    Bit i of a CRD's mask means reason codes[i] put it in the set.
+    """
+
+    __slots__ = ('crds', 'bits', 'codes', 'name', '_bitmap')
+
+    def __init__(self, crds: np.ndarray, bits: np.ndarray, codes: Tuple[str, ...], name: str = ''):
+        self.crds = crds
+        self.bits = bits
+        self.codes = codes
+        self.name = name
+        self._bitmap = None
+
+    @classmethod
+    def from_values(cls, values: Iterable, code: str) -> 'CrdSet':
+        """Build a single-reason set from any CRD iterable (invalid / null values dropped)."""
+        crds = _as_crds(values)
+        crds = np.unique(crds[crds > 0]).astype(np.uint32)
+        return cls(crds, np.ones(len(crds), dtype=np.uint32), (code,), code)
+
+    # --- membership -------------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self.crds)
+
+    def __contains__(self, crd) -> bool:
+        try:
+            crd = int(crd)
+        except (TypeError, ValueError):
+            return False
+        if not 0 < crd < 2 ** 32:
+            return False
+        i = self.crds.searchsorted(np.uint32(crd))   # a Python int would up-cast (copy) the array
+        return bool(i < len(self.crds) and self.crds[i] == crd)
+
+    def __iter__(self):
+        return iter(self.crds.tolist())
+
+    def __repr__(self) -> str:
+        return f"CrdSet({self.name or '+'.join(self.codes)}: {len(self):,} CRDs, {self.nbytes / 1024:.0f} KB)"
+
+    @property
+    def nbytes(self) -> int:
+        return self.crds.nbytes + self.bits.nbytes
+
+    def _hits(self, wanted: np.ndarray) -> np.ndarray:
+        """Membership of already-normalized CRDs via the packed bitmap."""
+        if self._bitmap is None:
+            dense = np.zeros(int(self.crds[-1]) + 1 if len(self.crds) else 1, dtype=bool)
+            dense[self.crds] = True
+            self._bitmap = np.packbits(dense, bitorder='little')
+        hits = np.zeros(len(wanted), dtype=bool)
+        valid = (wanted > 0) & (wanted < len(self._bitmap) * 8)
+        probe = wanted[valid]
+        hits[valid] = (self._bitmap[probe >> 3] >> (probe & 7)) & 1
+        return hits
+
+    def reason_bits(self, values: Iterable) -> np.ndarray:
+        """Reason mask for each value (0 when not in the set)."""
+        wanted = _as_crds(values)
+        hits = self._hits(wanted)
+        out = np.zeros(len(wanted), dtype=np.uint32)
+        if hits.any():
+            probe = wanted[hits].astype(np.uint32)
+            order = np.argsort(probe, kind='stable')   # sorted probes keep the search cache-friendly
+            pos = np.empty(len(probe), dtype=np.intp)
+            pos[order] = self.crds.searchsorted(probe[order])
+            out[hits] = self.bits[pos]
+        return out
+
+    def contains(self, values: Iterable) -> np.ndarray:
+        """Vectorized membership (boolean array in input order)."""
+        return self._hits(_as_crds(values))
+
+    def reasons(self, mask: int) -> List[str]:
+        return [code for i, code in enumerate(self.codes) if mask >> i & 1]
+
+    def explain(self, crd) -> List[str]:
+        """Reason codes that put one CRD in the set ([] when absent)."""
+        return self.reasons(int(self.reason_bits([crd])[0]))
+
+    # --- set algebra ------------------------------------------------------------
+    def _aligned(self, other: 'CrdSet') -> Tuple[Tuple[str, ...], np.ndarray, np.ndarray]:
+        """Merged code table and both bit arrays remapped onto it."""
+        codes = self.codes + tuple(c for c in other.codes if c not in self.codes)
+        if len(codes) > MAX_REASONS:
+            raise ValueError(f"At most {MAX_REASONS} reason codes per set")
+        other_bits = np.zeros(len(other.bits), dtype=np.uint32)
+        for i, code in enumerate(other.codes):
+            has_code = (other.bits >> np.uint32(i)) & np.uint32(1)
+            other_bits |= has_code << np.uint32(codes.index(code))
+        return codes, self.bits, other_bits
+
+    def __or__(self, other: 'CrdSet') -> 'CrdSet':
+        codes, bits, other_bits = self._aligned(other)
+        crds = np.concatenate([self.crds, other.crds])
+        order = np.argsort(crds, kind='stable')
+        crds, merged = crds[order], np.concatenate([bits, other_bits])[order]
+        starts = np.flatnonzero(np.r_[True, crds[1:] != crds[:-1]]) if len(crds) else np.array([], dtype=np.int64)
+        return CrdSet(crds[starts], np.bitwise_or.reduceat(merged, starts) if len(starts) else merged, codes)
+
+    def __and__(self, other: 'CrdSet') -> 'CrdSet':
+        codes, bits, other_bits = self._aligned(other)
+        crds, mine, theirs = np.intersect1d(self.crds, other.crds, assume_unique=True, return_indices=True)
+        return CrdSet(crds, bits[mine] | other_bits[theirs], codes)
+
+    def __sub__(self, other: 'CrdSet') -> 'CrdSet':
+        keep = ~np.isin(self.crds, other.crds, assume_unique=True)
+        return CrdSet(self.crds[keep], self.bits[keep], self.codes)
+
+    union, intersection, difference = __or__, __and__, __sub__
+
+
+# =============================================================================
+# EXCLUSION SETS
+# =============================================================================
+class ExclusionSets:
+    """
+    All exclusion rules as CrdSets, versioned by source-table refresh.
+
+    sets[name] is one rule's set; `excluded` is the union of every
+    exclude=True rule, with one reason bit per rule.
+    """
+
+    def __init__(self, cache: Optional[DatasetCache] = None, rules: Sequence[ExclusionRule] = EXCLUSION_RULES,
+                 as_of: Optional[date] = None):
+        """
+        Args:
+            cache: DatasetCache holding the set snapshots
+            rules: Exclusion rules (default EXCLUSION_RULES)
+            as_of: Date for date-dependent rules (default: today)
+        """
+        self.cache = cache or DatasetCache(project_id=PROJECT_ID)
+        self.rules = {rule.name: rule for rule in rules}
+        self.as_of = as_of or date.today()
+        self.sets: Dict[str, CrdSet] = {}
+        self.versions: Dict[str, dict] = {}
+        self._excluded: Optional[CrdSet] = None
+
+    def _sql(self, rule: ExclusionRule) -> str:
+        return rule.sql.format(as_of=self.as_of.isoformat()).strip() + "\nORDER BY crd"
+
+    def load(self, refresh: bool = False) -> 'ExclusionSets':
+        """Load every set from its snapshot (downloading only sets whose sources changed)."""
+        for name, rule in self.rules.items():
+            sql = self._sql(rule)
+            df = self.cache.query(sql, refresh=refresh)
+            self.sets[name] = CrdSet.from_values(df['crd'], name)
+            info = self.cache.snapshot_info(sql) or {}
+            self.versions[name] = info.get('source_versions', {})
+        self._excluded = None
+        return self
+
+    def __getitem__(self, name: str) -> CrdSet:
+        if not self.sets:
+            self.load()
+        return self.sets[name]
+
+    @property
+    def excluded(self) -> CrdSet:
+        """Union of every exclude=True set; reason bits name the rules that matched."""
+        if self._excluded is None:
+            if not self.sets:
+                self.load()
+            excluded = None
+            for name, rule in self.rules.items():
+                if rule.exclude:
+                    excluded = self.sets[name] if excluded is None else excluded | self.sets[name]
+            self._excluded = CrdSet(excluded.crds, excluded.bits, excluded.codes, 'excluded')
+        return self._excluded
+
+    def explain(self, crds: Sequence) -> pd.DataFrame:
+        """
+        Exclusion decision per CRD (request order).
+
+        Returns:
+            crd, excluded, exclusion_reasons ('; '-joined rule names),
+            in_salesforce and one boolean column per rule
+        """
+        excluded = self.excluded
+        bits = excluded.reason_bits(crds)
+        reasons = {int(mask): '; '.join(excluded.reasons(int(mask))) for mask in np.unique(bits)}
+        out = pd.DataFrame({
+            'crd': _as_crds(crds),
+            'excluded': bits != 0,
+            'exclusion_reasons': [reasons[int(mask)] for mask in bits],
+        })
+        for name, rule in self.rules.items():
+            column = 'in_salesforce' if name == 'salesforce_crds' else name
+            out[column] = self.sets[name].contains(crds)
+        return out
+
+    def filter(self, crds: Sequence) -> Tuple[np.ndarray, pd.DataFrame]:
+        """
+        Pre-filter a CRD list.
+
+        Returns:
+            (CRDs not excluded, in request order; explain() rows of the excluded ones)
+        """
+        decisions = self.explain(crds)
+        kept = decisions.loc[~decisions['excluded'] & (decisions['crd'] > 0), 'crd'].to_numpy()
+        return kept, decisions[decisions['excluded']].reset_index(drop=True)
+
+    def summary(self) -> pd.DataFrame:
+        """Size, memory and source version of every set."""
+        if not self.sets:
+            self.load()
+        rows = []
+        for name, rule in self.rules.items():
+            versions = self.versions.get(name, {})
+            rows.append({
+                'set': name,
+                'exclude': rule.exclude,
+                'crds': len(self.sets[name]),
+                'kb': round(self.sets[name].nbytes / 1024, 1),
+                'source_modified': max(versions.values()) if versions else None,
+                'description': rule.description,
+            })
+        rows.append({'set': 'excluded (union)', 'exclude': True, 'crds': len(self.excluded),
+                     'kb': round(self.excluded.nbytes / 1024, 1), 'source_modified': None,
+                     'description': 'Any exclude=True rule'})
+        return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Materialize and query the CRD exclusion sets')
+    parser.add_argument('--explain', nargs='+', type=int, metavar='CRD', help='Explain the decision for these CRDs')
+    parser.add_argument('--as-of', type=date.fromisoformat, default=None, help='As-of date for date-dependent rules')
+    parser.add_argument('--refresh', action='store_true', help='Re-download every set')
+    args = parser.parse_args()
+
+    exclusion_sets = ExclusionSets(as_of=args.as_of).load(refresh=args.refresh)
+    print(exclusion_sets.summary().to_string(index=False))
+    if args.explain:
+        print()
+        print(exclusion_sets.explain(args.explain).to_string(index=False))
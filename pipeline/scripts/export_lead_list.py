@@ -7,10 +7,13 @@ Run from repository root after Phase 6 and Phase 7:
 Output: pipeline/exports/January_2026_lead_list_YYYYMMDD.csv
 """
 
+import sys
 from pathlib import Path
-from google.cloud import bigquery
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from v3.utils.warehouse import get_client
+
 PROJECT_ID = "savvy-gtm-analytics"
 TABLE_ID = "savvy-gtm-analytics.ml_features.january_2026_lead_list"
 LOCATION = "northamerica-northeast2"
@@ -31,7 +34,7 @@ def main():
     print(f"Output: {out_file}")
     print()
 
-    client = bigquery.Client(project=PROJECT_ID, location=LOCATION)
+    client = get_client(PROJECT_ID, location=LOCATION)
     query = f"SELECT * FROM `{TABLE_ID}` ORDER BY list_rank, priority_rank, advisor_crd"
     df = client.query(query, location=LOCATION).to_dataframe()
     df.to_csv(out_file, index=False, date_format="%Y-%m-%d %H:%M:%S")
@@ -12,6 +12,9 @@ from google.cloud import bigquery
 from datetime import datetime
 import sys
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from v3.utils.job_manager import JobManager
+
 # ============================================================================
 # PATH CONFIGURATION
 # ============================================================================
@@ -75,24 +78,27 @@ def read_sql_file(sql_path):
     with open(sql_path, 'r', encoding='utf-8') as f:
         return f.read()
 
-def execute_query(client, query):
-    """Execute BigQuery query and return results."""
-    print(f"[INFO] Executing query to create {TABLE_NAME}...")
-    job = client.query(query)
-    job.result()  # Wait for job to complete
-    print(f"[INFO] Query completed successfully")
-    return job
-
-def fetch_results(client):
-    """Fetch results from BigQuery table."""
-    query = f"""
+def fetch_query():
+    """Query reading the generated list back in export order."""
+    return f"""
     SELECT *
     FROM `{PROJECT_ID}.{DATASET}.{TABLE_NAME}`
     ORDER BY score_tier, rank_within_tier
     """
+
+def execute_and_fetch(client, query):
+    """
+    Create the list table and fetch it back through the job manager.
     
-    print(f"[INFO] Fetching results from {TABLE_NAME}...")
-    df = client.query(query).to_dataframe()
+    The fetch depends on the created table, so the job manager starts it as
+    soon as the create finishes and reports bytes / slot-ms for both.
+    """
+    print(f"[INFO] Executing query to create {TABLE_NAME}, then fetching results...")
+    jobs = JobManager(client)
+    jobs.add_script(query, SQL_FILE.name)
+    jobs.submit('fetch_results', fetch_query(), fetch=True)
+    results = jobs.run()
+    df = results['fetch_results'].rows
     print(f"[INFO] Loaded {len(df):,} advisors")
     return df
 
@@ -281,10 +287,7 @@ def main():
     
     # Read and execute SQL query
     sql_query = read_sql_file(SQL_FILE)
-    execute_query(client, sql_query)
-    
-    # Fetch results
-    df = fetch_results(client)
+    df = execute_and_fetch(client, sql_query)
     
     # Validate
     validation_results = validate_results(df)
@@ -0,0 +1,289 @@
+"""
+Incremental V4 Prospect Scoring Helpers
+
+Shared by score_prospects_v43.py and score_prospects_monthly.py.
+
+Every stored score carries a per-CRD feature fingerprint
+(FARM_FINGERPRINT over the model's feature columns). An incremental run:
+
+1. Computes the same fingerprint over v4_prospect_features in BigQuery and
+   pulls only prospects that are new or whose fingerprint changed
+2. Scores just those rows and MERGEs them into the scores table
+3. Deletes scores for CRDs that left the features table, and stamps every
+   kept row with the run's prediction_date / model_version (unchanged rows
+   keep their score and scored_at, the time their score was last computed)
+4. Recomputes percentiles/flags in a final pass that reads only the score
+   column (plus whatever the caller needs to rebuild derived columns)
+
+A full re-score (WRITE_TRUNCATE) is still used when the scores table has no
+fingerprints yet or was written by a different model version.
+
+Note: tenure-style features are computed relative to prediction_date, so a
+new calendar month changes most fingerprints. The big savings come from
+re-runs within a FinTrx refresh cycle (re-runs after a partial feature fix,
+M&A/exclusion updates, etc.).
+
+Author: Lead Scoring Team
+Date: 2026-10-19
+"""
+
+from typing import Callable, List, Optional
+
+import pandas as pd
+from google.cloud import bigquery
+from google.api_core.exceptions import NotFound
+
+FINGERPRINT_COLUMN = 'feature_fingerprint'
+STAGING_SUFFIX = '_incremental_staging'
+
+
+def fingerprint_sql(feature_columns: List[str], alias: str = 'f') -> str:
+    """
+    BigQuery expression fingerprinting a prospect's feature values.
+
+    Args:
+        feature_columns: Model feature columns (in model order)
+        alias: Table alias the columns are qualified with
+
+    Returns:
+        SQL expression evaluating to an INT64 fingerprint
+    """
+    cols = ', '.join(f'{alias}.{col}' for col in feature_columns)
+    return f"FARM_FINGERPRINT(TO_JSON_STRING(STRUCT({cols})))"
+
+
+def can_score_incrementally(
+    client: bigquery.Client,
+    scores_table: str,
+    model_version: str
+) -> bool:
+    """
+    Check whether the existing scores table can be updated incrementally.
+
+    Requires the table to exist, carry fingerprints and model_version, and
+    every stored row to have been scored by the same model version.
+
+    Args:
+        client: BigQuery client
+        scores_table: Fully-qualified scores table
+        model_version: Version string written by the current model
+
+    Returns:
+        True if an incremental update is safe
+    """
+    try:
+        table = client.get_table(scores_table)
+    except NotFound:
+        print(f"[INFO] {scores_table} does not exist - full re-score required")
+        return False
+
+    columns = {field.name for field in table.schema}
+    if FINGERPRINT_COLUMN not in columns or 'model_version' not in columns:
+        print(f"[INFO] {scores_table} has no {FINGERPRINT_COLUMN}/model_version - full re-score required")
+        return False
+
+    query = f"""
+    SELECT
+        COUNT(*) AS total_rows,
+        COUNTIF(model_version = @model_version AND {FINGERPRINT_COLUMN} IS NOT NULL) AS reusable_rows
+    FROM `{scores_table}`
+    """
+    job_config = bigquery.QueryJobConfig(query_parameters=[
+        bigquery.ScalarQueryParameter('model_version', 'STRING', model_version),
+    ])
+    row = list(client.query(query, job_config=job_config).result())[0]
+
+    if row.total_rows == 0:
+        print(f"[INFO] {scores_table} is empty - full re-score required")
+        return False
+    if row.reusable_rows != row.total_rows:
+        print(f"[INFO] {row.total_rows - row.reusable_rows:,} stored scores are from another model version "
+              f"or lack fingerprints - full re-score required")
+        return False
+    return True
+
+
+def fetch_changed_features(
+    client: bigquery.Client,
+    features_table: str,
+    scores_table: str,
+    feature_columns: List[str],
+    select_columns: Optional[List[str]] = None
+) -> pd.DataFrame:
+    """
+    Fetch prospects that are new or whose feature fingerprint changed.
+
+    Args:
+        client: BigQuery client
+        features_table: Fully-qualified features table
+        scores_table: Fully-qualified scores table (holding stored fingerprints)
+        feature_columns: Columns covered by the fingerprint
+        select_columns: Columns to return (default: all feature table columns)
+
+    Returns:
+        DataFrame of changed prospects, including the feature_fingerprint column
+    """
+    selected = ', '.join(f'f.{col}' for col in select_columns) if select_columns else 'f.*'
+    query = f"""
+    WITH current_features AS (
+        SELECT
+            {selected},
+            {fingerprint_sql(feature_columns)} AS {FINGERPRINT_COLUMN}
+        FROM `{features_table}` f
+    )
+    SELECT c.*
+    FROM current_features c
+    LEFT JOIN `{scores_table}` s
+        ON c.crd = s.crd
+    WHERE s.crd IS NULL
+       OR s.{FINGERPRINT_COLUMN} != c.{FINGERPRINT_COLUMN}
+    """
+    df = client.query(query).to_dataframe()
+    print(f"[INFO] {len(df):,} new or changed prospects to score")
+    return df
+
+
+def merge_scores(
+    client: bigquery.Client,
+    df_scores: pd.DataFrame,
+    scores_table: str,
+    features_table: str,
+    schema: List[bigquery.SchemaField],
+    model_version: Optional[str] = None
+) -> dict:
+    """
+    Merge freshly scored rows into the scores table and drop removed CRDs.
+
+    Only new/changed prospects are in df_scores, so the MERGE alone would
+    leave unchanged rows with the previous run's prediction_date. After it,
+    every row still in the features table gets the current prediction_date
+    (when the schema has one) and model_version (when given); the score,
+    fingerprint and scored_at of unchanged rows are left as they were.
+
+    Args:
+        client: BigQuery client
+        df_scores: Scores for new/changed prospects (must match schema)
+        scores_table: Fully-qualified scores table
+        features_table: Fully-qualified features table (defines the live CRD set)
+        schema: Scores table schema
+        model_version: Version stamped on every row (default: leave as stored)
+
+    Returns:
+        Dictionary with upserted, removed and restamped row counts
+    """
+    upserted = 0
+    if len(df_scores) > 0:
+        staging_table = scores_table + STAGING_SUFFIX
+        job_config = bigquery.LoadJobConfig(
+            write_disposition=bigquery.WriteDisposition.WRITE_TRUNCATE,
+            schema=schema,
+        )
+        client.load_table_from_dataframe(df_scores, staging_table, job_config=job_config).result()
+
+        columns = [field.name for field in schema]
+        update_set = ',\n            '.join(f'{col} = s.{col}' for col in columns if col != 'crd')
+        insert_cols = ', '.join(columns)
+        insert_vals = ', '.join(f's.{col}' for col in columns)
+
+        merge_sql = f"""
+        MERGE `{scores_table}` t
+        USING `{staging_table}` s
+        ON t.crd = s.crd
+        WHEN MATCHED THEN UPDATE SET
+            {update_set}
+        WHEN NOT MATCHED THEN
+            INSERT ({insert_cols}) VALUES ({insert_vals})
+        """
+        job = client.query(merge_sql)
+        job.result()
+        upserted = job.num_dml_affected_rows or 0
+        client.delete_table(staging_table, not_found_ok=True)
+
+    delete_sql = f"""
+    DELETE FROM `{scores_table}` t
+    WHERE NOT EXISTS (
+        SELECT 1 FROM `{features_table}` f WHERE f.crd = t.crd
+    )
+    """
+    job = client.query(delete_sql)
+    job.result()
+    removed = job.num_dml_affected_rows or 0
+
+    # Unchanged prospects: same score, but scored as of this run
+    columns = {field.name for field in schema}
+    stamps, changed = [], []
+    if 'prediction_date' in columns:
+        stamps.append('prediction_date = f.prediction_date')
+        changed.append('t.prediction_date IS DISTINCT FROM f.prediction_date')
+    if model_version is not None and 'model_version' in columns:
+        stamps.append('model_version = @model_version')
+        changed.append('t.model_version IS DISTINCT FROM @model_version')
+    restamped = 0
+    if stamps:
+        job = client.query(f"""
+        UPDATE `{scores_table}` t
+        SET {', '.join(stamps)}
+        FROM `{features_table}` f
+        WHERE f.crd = t.crd
+          AND ({' OR '.join(changed)})
+        """, job_config=bigquery.QueryJobConfig(query_parameters=[
+            bigquery.ScalarQueryParameter('model_version', 'STRING', model_version),
+        ]))
+        job.result()
+        restamped = job.num_dml_affected_rows or 0
+
+    print(f"[INFO] Merged {upserted:,} scores, removed {removed:,} departed prospects, "
+          f"restamped {restamped:,} unchanged")
+    return {'upserted': upserted, 'removed': removed, 'restamped': restamped}
+
+
+def recompute_percentiles(
+    client: bigquery.Client,
+    scores_table: str,
+    derive_columns: Callable[[pd.DataFrame], pd.DataFrame],
+    schema: List[bigquery.SchemaField],
+    read_columns: Optional[List[str]] = None
+) -> pd.DataFrame:
+    """
+    Recompute population-relative columns after an incremental merge.
+
+    Reads only crd + v4_score (plus any extra read_columns), lets the caller
+    rebuild percentile-dependent columns with the same logic as a full run,
+    and writes them back with a single UPDATE ... FROM.
+
+    Args:
+        client: BigQuery client
+        scores_table: Fully-qualified scores table
+        derive_columns: Function mapping the read frame to a frame with crd
+            plus the recomputed columns
+        schema: Scores table schema (used to type the staging table)
+        read_columns: Extra columns the derive function needs
+
+    Returns:
+        The recomputed columns (one row per CRD)
+    """
+    columns = ['crd', 'v4_score'] + [c for c in (read_columns or []) if c not in ('crd', 'v4_score')]
+    df = client.query(f"SELECT {', '.join(columns)} FROM `{scores_table}`").to_dataframe()
+    updates = derive_columns(df)
+
+    updated_cols = [c for c in updates.columns if c != 'crd']
+    staging_table = scores_table + STAGING_SUFFIX
+    staging_schema = [field for field in schema if field.name in updates.columns]
+    job_config = bigquery.LoadJobConfig(
+        write_disposition=bigquery.WriteDisposition.WRITE_TRUNCATE,
+        schema=staging_schema,
+    )
+    client.load_table_from_dataframe(updates, staging_table, job_config=job_config).result()
+
+    set_clause = ', '.join(f'{col} = s.{col}' for col in updated_cols)
+    update_sql = f"""
+    UPDATE `{scores_table}` t
+    SET {set_clause}
+    FROM `{staging_table}` s
+    WHERE t.crd = s.crd
+    """
+    client.query(update_sql).result()
+    client.delete_table(staging_table, not_found_ok=True)
+
+    print(f"[INFO] Recomputed {', '.join(updated_cols)} for {len(updates):,} prospects")
+    return updates
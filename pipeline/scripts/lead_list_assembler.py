@@ -0,0 +1,529 @@
+"""
+In-Memory Lead-List Assembler (firm cap, tier quotas, dedup, SGA assignment)
+
+The tail of March_2026_Lead_List_V3_7_0.sql (ranked_prospects through
+final_lead_list) is a chain of window-function passes that BigQuery re-runs
+over the full scored pool every time a quota changes. This module loads the
+scored candidate pool ONCE (scored_prospects + source_priority, cached
+locally through DatasetCache) and re-implements that tail in memory:
+
+    ranked_prospects / diversity_filtered   <= firm_cap leads per firm
+    tier_limited                            tier exclusions, firm size limit,
+                                            final_tier / final_expected_rate,
+                                            tier_rank per score_tier
+    deduplicated_before_quotas              one row per CRD
+    linkedin_prioritized                    tier quotas, overall_rank,
+                                            no_linkedin_rank
+    leads_with_conv_bucket                  no-LinkedIn cap, conv buckets
+    leads_assigned .. leads_with_sga        round-robin SGA assignment,
+                                            partner/founder grouping,
+                                            leads_per_sga cap
+    final_lead_list                         nurture + V3/V4 disagreement filter
+
+Every ROW_NUMBER is computed with one stable lexsort plus group offsets
+(rank = sorted position - start of its partition), with SQL NULL ordering
+(NULLS FIRST ascending, NULLS LAST descending), so the list matches the SQL
+row for row and re-assembles in milliseconds.
+
+Quotas are read from the lead-list SQL's own quota filters (sql_quotas), so
+the SQL stays their single definition. They are per 12 SGAs and scaled like
+the SQL: CAST(quota * total_sgas / 12.0 AS INT64) (BigQuery rounds half away
+from zero).
+
+Usage:
+    from pipeline.scripts.lead_list_assembler import load_candidate_pool, assemble_lead_list
+
+    pool, sgas = load_candidate_pool()
+    leads = assemble_lead_list(pool, sgas, {'tier_quotas': {'TIER_2_PROVEN_MOVER': 1200}})
+
+CLI:
+    python pipeline/scripts/lead_list_assembler.py
+    python pipeline/scripts/lead_list_assembler.py --quotas alt_quotas.json --output alt.csv
+    python pipeline/scripts/lead_list_assembler.py --refresh   # re-download the pool
+
+Note: the pool query uses CURRENT_DATE() but the cache is keyed on source
+table modification times only - pass --refresh on a new day before
+producing a list for upload.
+
+Author: Lead Scoring Team
+Date: 2026-10-19
+"""
+
+import argparse
+import copy
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from v3.utils.dataset_cache import DatasetCache
+
+PROJECT_ID = "savvy-gtm-analytics"
+DEFAULT_SQL_PATH = Path(__file__).resolve().parent.parent / "sql" / "March_2026_Lead_List_V3_7_0.sql"
+TAIL_START_CTE = "ranked_prospects AS ("
+
+# CASE final_tier ordering used by dedup and overall ranking (unlisted tiers are NULL)
+TIER_ORDER = {
+    'TIER_0A_PRIME_MOVER_DUE': 1,
+    'TIER_0B_SMALL_FIRM_DUE': 2,
+    'TIER_0C_CLOCKWORK_DUE': 3,
+    'TIER_1B_PRIME_ZERO_FRICTION': 6,
+    'TIER_1A_PRIME_MOVER_CFP': 7,
+    'TIER_1G_ENHANCED_SWEET_SPOT': 8,
+    'TIER_1B_PRIME_MOVER_SERIES65': 9,
+    'TIER_1G_GROWTH_STAGE': 10,
+    'TIER_1_PRIME_MOVER': 11,
+    'TIER_1F_HV_WEALTH_BLEEDER': 12,
+    'TIER_2_PROVEN_MOVER': 13,
+    'TIER_3_MODERATE_BLEEDER': 14,
+    'STANDARD_HIGH_V4': 15,
+}
+
+# final_expected_rate overrides by score_tier (else expected_conversion_rate)
+FINAL_EXPECTED_RATES = {
+    'TIER_0A_PRIME_MOVER_DUE': 0.1613,
+    'TIER_0B_SMALL_FIRM_DUE': 0.1200,
+    'TIER_0C_CLOCKWORK_DUE': 0.1000,
+    'TIER_1B_PRIME_ZERO_FRICTION': 0.1364,
+    'TIER_1A_PRIME_MOVER_CFP': 0.1000,
+    'TIER_1G_ENHANCED_SWEET_SPOT': 0.0909,
+    'TIER_1B_PRIME_MOVER_SERIES65': 0.0549,
+    'TIER_1G_GROWTH_STAGE': 0.0508,
+    'TIER_1F_HV_WEALTH_BLEEDER': 0.0606,
+    'TIER_2_PROVEN_MOVER': 0.0591,
+    'TIER_1_PRIME_MOVER': 0.0476,
+    'STANDARD': 0.025,
+}
+
+# (minimum final_expected_rate, bucket) - first match wins
+CONV_RATE_BUCKETS = [
+    (0.10, 'HIGH_CONV'),
+    (0.06, 'MED_HIGH_CONV'),
+    (0.05, 'MED_CONV'),
+    (0.04, 'MED_LOW_CONV'),
+    (0.03, 'LOW_CONV'),
+]
+CONV_RATE_BUCKET_DEFAULT = 'VERY_LOW_CONV'
+
+# linkedin_prioritized / leads_with_conv_bucket quota filters of the lead-list SQL:
+#   final_tier = 'T' [AND v4_percentile >= P] AND tier_rank <= CAST(Q * sc.total_sgas / B AS INT64)
+#   no_linkedin_rank <= CAST(Q * sc.total_sgas / B AS INT64)
+TIER_QUOTA_PATTERN = re.compile(
+    r"final_tier\s*=\s*'(\w+)'(?:\s+AND\s+v4_percentile\s*>=\s*(\d+))?\s+AND\s+tier_rank\s*<=\s*"
+    r"CAST\(\s*(\d+)\s*\*\s*sc\.total_sgas\s*/\s*(\d+)(?:\.0*)?\s+AS\s+INT64\s*\)", re.I)
+NO_LINKEDIN_QUOTA_PATTERN = re.compile(
+    r"no_linkedin_rank\s*<=\s*CAST\(\s*(\d+)\s*\*\s*sc\.total_sgas\s*/\s*(\d+)(?:\.0*)?\s+AS\s+INT64\s*\)", re.I)
+
+
+def sql_quotas(sql_text: str) -> Dict:
+    """
+    Tier quotas as written in the lead-list SQL (the single definition).
+
+    Returns:
+        Config keys quota_sga_base, tier_quotas, tier_min_v4_percentile, no_linkedin_quota
+    """
+    code = re.sub(r"--[^\n]*", "", sql_text)
+    tiers = TIER_QUOTA_PATTERN.findall(code)
+    no_linkedin = NO_LINKEDIN_QUOTA_PATTERN.findall(code)
+    if not tiers or len(no_linkedin) != 1:
+        raise ValueError("Lead-list SQL: tier / no-LinkedIn quota filters not found")
+    bases = {int(base) for *_, base in tiers} | {int(no_linkedin[0][1])}
+    if len(bases) != 1:
+        raise ValueError(f"Lead-list SQL: quotas scaled by different SGA bases {sorted(bases)}")
+    return {
+        'quota_sga_base': bases.pop(),
+        'tier_quotas': {tier: int(quota) for tier, _, quota, _ in tiers},
+        'tier_min_v4_percentile': {tier: int(pct) for tier, pct, _, _ in tiers if pct},
+        'no_linkedin_quota': int(no_linkedin[0][0]),
+    }
+
+
+# March 2026 (V3.7.0) list parameters; quotas come from the SQL itself
+DEFAULT_ASSEMBLY_CONFIG = {
+    'firm_cap': 50,                    # Max leads per firm (diversity cap)
+    'max_firm_rep_count': 50,          # Firm size limit
+    'excluded_tiers': ['TIER_4_EXPERIENCED_MOVER', 'TIER_5_HEAVY_BLEEDER', 'TIER_NURTURE_TOO_EARLY'],
+    **sql_quotas(DEFAULT_SQL_PATH.read_text(encoding='utf-8')),
+    'leads_per_sga': 200,
+    'nurture_tier': 'TIER_NURTURE_TOO_EARLY',
+    'disagreement_tiers': [
+        'TIER_1A_PRIME_MOVER_CFP',
+        'TIER_1B_PRIME_ZERO_FRICTION',
+        'TIER_1B_PRIME_MOVER_SERIES65',
+        'TIER_1_PRIME_MOVER',
+        'TIER_1F_HV_WEALTH_BLEEDER',
+        'TIER_1G_ENHANCED_SWEET_SPOT',
+        'TIER_1G_GROWTH_STAGE',
+    ],
+    'disagreement_min_v4_percentile': 60,
+}
+
+
+def merge_config(overrides: Optional[Dict] = None, base: Optional[Dict] = None) -> Dict:
+    """Config (default: DEFAULT_ASSEMBLY_CONFIG) with overrides applied (dict values merged key by key)."""
+    config = copy.deepcopy(base or DEFAULT_ASSEMBLY_CONFIG)
+    for key, value in (overrides or {}).items():
+        if key not in config:
+            raise KeyError(f"Unknown assembly config key: '{key}'")
+        if isinstance(config[key], dict):
+            config[key].update(value)
+        else:
+            config[key] = value
+    return config
+
+
+def scaled_quota(quota: float, n_sgas: int, base: int = 12) -> int:
+    """CAST(quota * n_sgas / base AS INT64) - BigQuery rounds half away from zero."""
+    return int(np.floor(quota * n_sgas / float(base) + 0.5))
+
+
+# =============================================================================
+# SORT-ONCE WINDOW HELPERS
+# =============================================================================
+def _asc(values) -> np.ndarray:
+    """Ascending sort key with SQL NULLS FIRST."""
+    values = pd.Series(values).to_numpy(dtype='float64', na_value=np.nan)
+    return np.where(np.isnan(values), -np.inf, values)
+
+
+def _desc(values) -> np.ndarray:
+    """Descending sort key with SQL NULLS LAST."""
+    values = pd.Series(values).to_numpy(dtype='float64', na_value=np.nan)
+    return np.where(np.isnan(values), np.inf, -values)
+
+
+def _text_key(values) -> np.ndarray:
+    """Ascending sort key for a string column (code point order, like BigQuery)."""
+    codes, _ = pd.factorize(pd.Series(values), sort=True, use_na_sentinel=True)
+    return codes.astype('float64')
+
+
+def _partition_codes(values) -> np.ndarray:
+    """Integer partition id per row (NULLs form one partition, as in SQL)."""
+    codes, _ = pd.factorize(pd.Series(values), use_na_sentinel=False)
+    return codes
+
+
+def row_number(order_keys: Sequence[np.ndarray], partition: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    ROW_NUMBER() OVER (PARTITION BY partition ORDER BY order_keys...).
+
+    One stable lexsort on (partition, keys...); each row's number is its
+    sorted position minus the start offset of its partition.
+    """
+    n = len(order_keys[0])
+    keys = list(reversed(order_keys))
+    if partition is not None:
+        keys.append(partition)
+    order = np.lexsort(keys)
+    positions = np.arange(n)
+    if partition is None:
+        starts = np.zeros(n, dtype=np.int64)
+    else:
+        sorted_partition = partition[order]
+        is_start = np.ones(n, dtype=bool)
+        is_start[1:] = sorted_partition[1:] != sorted_partition[:-1]
+        starts = np.maximum.accumulate(np.where(is_start, positions, 0))
+    ranks = np.empty(n, dtype=np.int64)
+    ranks[order] = positions - starts + 1
+    return ranks
+
+
+def _conv_rate_bucket(rates: np.ndarray) -> np.ndarray:
+    conditions = [rates >= threshold for threshold, _ in CONV_RATE_BUCKETS]
+    return np.select(conditions, [name for _, name in CONV_RATE_BUCKETS], default=CONV_RATE_BUCKET_DEFAULT)
+
+
+# =============================================================================
+# ASSEMBLY
+# =============================================================================
+def _normalize_sgas(sgas: Union[int, pd.DataFrame]) -> pd.DataFrame:
+    if isinstance(sgas, (int, np.integer)):
+        return pd.DataFrame({
+            'sga_number': np.arange(1, sgas + 1),
+            'sga_id': [None] * sgas,
+            'sga_name': [None] * sgas,
+        })
+    sgas = sgas.copy()
+    if 'sga_number' not in sgas.columns:
+        sgas = sgas.sort_values('sga_name').reset_index(drop=True)
+        sgas['sga_number'] = np.arange(1, len(sgas) + 1)
+    return sgas
+
+
+def assemble_lead_list(
+    pool: pd.DataFrame,
+    sgas: Union[int, pd.DataFrame],
+    config: Optional[Dict] = None,
+    verbose: bool = False,
+) -> pd.DataFrame:
+    """
+    Build the final lead list from the scored candidate pool.
+
+    Args:
+        pool: scored_prospects rows with source_priority (see load_candidate_pool)
+        sgas: Active SGAs (sga_number, sga_id, sga_name) or just the SGA count
+        config: Overrides of DEFAULT_ASSEMBLY_CONFIG (e.g. {'tier_quotas': {...}})
+        verbose: Print row counts after each stage
+
+    Returns:
+        Final lead list ordered by overall_rank, with the SQL's derived columns
+        (final_tier, final_expected_rate, overall_rank, conv_rate_bucket,
+        assigned_sga_num, final_assigned_sga_num, sga_id, sga_owner, ...)
+    """
+    config = merge_config(config)
+    sgas = _normalize_sgas(sgas)
+    n_sgas = len(sgas)
+    base = config['quota_sga_base']
+
+    def log(stage: str, frame: pd.DataFrame):
+        if verbose:
+            print(f"  {stage:<28} {len(frame):>9,}")
+
+    df = pool.loc[pool['source_priority'] < 99].reset_index(drop=True)
+    log('candidate pool', df)
+
+    # ranked_prospects / diversity_filtered
+    is_new = (df['prospect_type'] == 'NEW_PROSPECT').to_numpy()
+    rank_within_firm = row_number(
+        [np.where(is_new, 0.0, 1.0), _asc(df['priority_rank']), _desc(df['v4_percentile']), _asc(df['crd'])],
+        _partition_codes(df['firm_crd']),
+    )
+    df = df.loc[rank_within_firm <= config['firm_cap']].reset_index(drop=True)
+    log('firm diversity cap', df)
+
+    # tier_limited (NULL score_tier fails the SQL's tier predicate)
+    keep = (df['score_tier'].notna() & ~df['score_tier'].isin(config['excluded_tiers'])
+            & (df['firm_rep_count'] <= config['max_firm_rep_count']))
+    df = df.loc[keep.to_numpy()].reset_index(drop=True)
+    df['is_high_v4_standard'] = (df['score_tier'] == 'STANDARD').astype(int)
+    df['final_tier'] = df['score_tier'].where(df['score_tier'] != 'STANDARD', 'STANDARD_HIGH_V4')
+    df['final_expected_rate'] = df['score_tier'].map(FINAL_EXPECTED_RATES).fillna(df['expected_conversion_rate'])
+    if 'v3_score_narrative' in df.columns:
+        df['score_narrative'] = df['v3_score_narrative']
+    net_change = df['firm_net_change_12mo'].to_numpy(dtype='float64', na_value=np.nan)
+    bleed = np.where(net_change < 0, np.abs(net_change), 0.0)
+    df['tier_rank'] = row_number(
+        [_asc(df['source_priority']), _desc(df['has_linkedin']), _desc(df['v4_percentile']),
+         _asc(df['priority_rank']), _desc(bleed), _asc(df['crd'])],
+        _partition_codes(df['score_tier']),
+    )
+    log('tier limited', df)
+
+    # deduplicated_before_quotas
+    tier_order = _asc(df['final_tier'].map(TIER_ORDER))
+    dedup_rank = row_number(
+        [tier_order, _asc(df['source_priority']), _desc(df['has_linkedin']), _desc(df['v4_percentile']),
+         _asc(df['crd'])],
+        _partition_codes(df['crd']),
+    )
+    df = df.loc[dedup_rank == 1].reset_index(drop=True)
+    log('dedup by CRD', df)
+
+    # linkedin_prioritized: quotas filter on the pre-dedup tier_rank (as in the SQL WHERE)
+    limits = df['final_tier'].map(
+        {tier: scaled_quota(q, n_sgas, base) for tier, q in config['tier_quotas'].items()}
+    )
+    keep = (df['tier_rank'] <= limits).to_numpy().copy()
+    v4 = df['v4_percentile'].to_numpy(dtype='float64', na_value=np.nan)
+    for tier, min_pct in config['tier_min_v4_percentile'].items():
+        keep &= ~((df['final_tier'] == tier).to_numpy() & ~(v4 >= min_pct))
+    df = df.loc[keep].reset_index(drop=True)
+    log('tier quotas', df)
+
+    tier_order = _asc(df['final_tier'].map(TIER_ORDER))
+    has_linkedin = df['has_linkedin'].to_numpy(dtype='float64', na_value=np.nan)
+    df['overall_rank'] = row_number(
+        [tier_order, _asc(df['source_priority']), _desc(has_linkedin), _desc(df['v4_percentile']),
+         _asc(df['crd'])]
+    )
+    no_linkedin = has_linkedin == 0
+    no_linkedin_rank = row_number(
+        [tier_order, _asc(df['source_priority']), _desc(df['v4_percentile']), _asc(df['crd'])],
+        no_linkedin.astype(np.int64),
+    )
+    df['no_linkedin_rank'] = pd.Series(no_linkedin_rank, dtype='Int64').mask(~no_linkedin)
+
+    # leads_with_conv_bucket
+    no_linkedin_limit = scaled_quota(config['no_linkedin_quota'], n_sgas, base)
+    keep = (has_linkedin == 1) | (no_linkedin & (no_linkedin_rank <= no_linkedin_limit))
+    df = df.loc[keep].reset_index(drop=True)
+    log('LinkedIn prioritization', df)
+
+    df['total_sgas'] = n_sgas
+    df['total_leads_needed'] = n_sgas * config['leads_per_sga']
+    df['conv_rate_bucket'] = _conv_rate_bucket(df['final_expected_rate'].to_numpy(dtype='float64', na_value=np.nan))
+    overall_rank = df['overall_rank'].to_numpy()
+    df['rank_within_bucket'] = row_number(
+        [overall_rank.astype('float64')],
+        _partition_codes(df['conv_rate_bucket'] + '|' + df['final_tier'].astype(str)),
+    )
+
+    # leads_assigned / partner_founder_groups
+    df['assigned_sga_num'] = (df['rank_within_bucket'] - 1) % n_sgas + 1
+    title = df['job_title'].fillna('').astype(str).str.upper()
+    df['is_partner_founder'] = (title.str.contains('PARTNER', regex=False)
+                                | title.str.contains('FOUNDER', regex=False)).astype(int)
+    partners = df.loc[(df['is_partner_founder'] == 1) & df['firm_crd'].notna(),
+                      ['firm_crd', 'overall_rank', 'assigned_sga_num']]
+    group_sga = (partners.sort_values('overall_rank', kind='stable')
+                 .drop_duplicates('firm_crd')
+                 .set_index('firm_crd')['assigned_sga_num'])
+    grouped = df['firm_crd'].map(group_sga)
+    df['final_assigned_sga_num'] = np.where(
+        (df['is_partner_founder'] == 1) & grouped.notna(), grouped, df['assigned_sga_num']
+    ).astype(np.int64)
+
+    # leads_with_sga: cap each SGA at leads_per_sga
+    sga_lead_rank = row_number(
+        [_text_key(df['conv_rate_bucket']), _text_key(df['final_tier']), overall_rank.astype('float64')],
+        df['final_assigned_sga_num'].to_numpy(),
+    )
+    df['sga_lead_rank'] = sga_lead_rank
+    df = df.loc[sga_lead_rank <= config['leads_per_sga']].reset_index(drop=True)
+    sga_lookup = sgas.set_index('sga_number')
+    df = df.loc[df['final_assigned_sga_num'].isin(sga_lookup.index)].reset_index(drop=True)
+    df['sga_id'] = df['final_assigned_sga_num'].map(sga_lookup['sga_id'])
+    df['sga_owner'] = df['final_assigned_sga_num'].map(sga_lookup['sga_name'])
+    log('SGA assignment', df)
+
+    # final_lead_list
+    v4 = df['v4_percentile'].to_numpy(dtype='float64', na_value=np.nan)
+    disagreement = (df['score_tier'].isin(config['disagreement_tiers']).to_numpy()
+                    & ~(v4 >= config['disagreement_min_v4_percentile']))
+    keep = (df['score_tier'] != config['nurture_tier']).to_numpy() & ~disagreement
+    df = df.loc[keep].sort_values('overall_rank', kind='stable').reset_index(drop=True)
+    log('final lead list', df)
+    return df
+
+
+def summarize_lead_list(leads: pd.DataFrame, n_sgas: int, config: Optional[Dict] = None) -> pd.DataFrame:
+    """Leads per final_tier against the scaled quota."""
+    config = merge_config(config)
+    counts = leads['final_tier'].value_counts()
+    rows = []
+    for tier in sorted(set(config['tier_quotas']) | set(counts.index), key=lambda t: TIER_ORDER.get(t, 99)):
+        quota = config['tier_quotas'].get(tier)
+        rows.append({
+            'final_tier': tier,
+            'leads': int(counts.get(tier, 0)),
+            'quota': scaled_quota(quota, n_sgas, config['quota_sga_base']) if quota is not None else None,
+        })
+    return pd.DataFrame(rows)
+
+
+# =============================================================================
+# CANDIDATE POOL
+# =============================================================================
+def split_lead_list_sql(sql_text: str) -> str:
+    """
+    Return the lead-list SQL's WITH clause up to (not including) ranked_prospects.
+
+    The result still ends with a list of CTEs; callers append a final SELECT.
+    """
+    start = sql_text.index("\nWITH") + 1
+    end = sql_text.index(TAIL_START_CTE, start)
+    head_lines = sql_text[start:end].rstrip().splitlines()
+    while head_lines and (not head_lines[-1].strip() or head_lines[-1].strip().startswith('--')):
+        head_lines.pop()
+    head = "\n".join(head_lines).rstrip()
+    if head.endswith(','):
+        head = head[:-1]
+    return head
+
+
+def candidate_pool_query(sql_text: str) -> str:
+    """Scored prospects eligible for the list, with source_priority (ranked_prospects input)."""
+    return split_lead_list_sql(sql_text) + """
+SELECT
+    sp.*,
+    CASE
+        WHEN sp.prospect_type = 'NEW_PROSPECT' THEN 1
+        WHEN sp.existing_lead_id IN (SELECT lead_id FROM recyclable_lead_ids) THEN 2
+        ELSE 99
+    END as source_priority
+FROM scored_prospects sp
+WHERE sp.prospect_type = 'NEW_PROSPECT'
+   OR sp.existing_lead_id IN (SELECT lead_id FROM recyclable_lead_ids)
+"""
+
+
+def active_sgas_query(sql_text: str) -> str:
+    return split_lead_list_sql(sql_text) + """
+SELECT sga_number, sga_id, sga_name
+FROM active_sgas
+ORDER BY sga_number
+"""
+
+
+def load_candidate_pool(
+    sql_path: Optional[str] = None,
+    cache: Optional[DatasetCache] = None,
+    refresh: bool = False,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Load the scored candidate pool and active SGAs (cached locally).
+
+    Args:
+        sql_path: Lead-list SQL providing the CTEs (default: March 2026 V3.7.0)
+        cache: DatasetCache to read through (default: a new one)
+        refresh: Re-download even if a snapshot exists
+
+    Returns:
+        (pool, sgas) DataFrames
+    """
+    sql_text = Path(sql_path or DEFAULT_SQL_PATH).read_text(encoding='utf-8')
+    cache = cache or DatasetCache(project_id=PROJECT_ID)
+    pool = cache.query(candidate_pool_query(sql_text), refresh=refresh)
+    sgas = cache.query(active_sgas_query(sql_text), refresh=refresh)
+    return pool, sgas
+
+
+def main(sql_path: Optional[str] = None, quotas_path: Optional[str] = None,
+         output_path: Optional[str] = None, n_sgas: Optional[int] = None, refresh: bool = False):
+    print("=" * 70)
+    print("LEAD LIST ASSEMBLER")
+    print("=" * 70)
+
+    # A non-default SQL brings its own quotas; --quotas overrides apply on top
+    config = merge_config(sql_quotas(Path(sql_path).read_text(encoding='utf-8'))) if sql_path else merge_config()
+    if quotas_path:
+        with open(quotas_path, 'r', encoding='utf-8') as f:
+            overrides = json.load(f)
+        config = merge_config(overrides, base=config)
+        print(f"[INFO] Config overrides from {quotas_path}: {sorted(overrides)}")
+
+    pool, sgas = load_candidate_pool(sql_path, refresh=refresh)
+    if n_sgas is not None:
+        sgas = n_sgas
+    n = sgas if isinstance(sgas, int) else len(sgas)
+    print(f"[INFO] Candidate pool: {len(pool):,} rows, {n} SGAs")
+
+    start = time.perf_counter()
+    leads = assemble_lead_list(pool, sgas, config, verbose=True)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print(f"[INFO] Assembled {len(leads):,} leads in {elapsed_ms:.0f} ms")
+
+    print(summarize_lead_list(leads, n, config).to_string(index=False))
+    if output_path:
+        leads.to_csv(output_path, index=False)
+        print(f"[INFO] Saved: {output_path}")
+    return leads
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Assemble the monthly lead list from the cached scored pool')
+    parser.add_argument('--sql', default=None, help='Lead-list SQL providing the pool CTEs')
+    parser.add_argument('--quotas', default=None,
+                        help='JSON overrides of DEFAULT_ASSEMBLY_CONFIG (e.g. {"tier_quotas": {...}})')
+    parser.add_argument('--output', default=None, help='Write the assembled list to CSV')
+    parser.add_argument('--n-sgas', type=int, default=None, help='Simulate a different SGA count')
+    parser.add_argument('--refresh', action='store_true', help='Re-download the candidate pool')
+    args = parser.parse_args()
+    main(args.sql, args.quotas, args.output, args.n_sgas, args.refresh)
@@ -0,0 +1,407 @@
+"""
+Dictionary-Encoded V4 Narratives
+
+score_prospects_v43.py and score_prospects_monthly.py used to store a full
+English v4_narrative plus shap_top{1,2,3}_feature strings on every prospect
+row. Every narrative is one of a handful of templates filled with feature
+descriptions, so the scores table was mostly repeated text. The scoring
+scripts now store a compact encoding instead:
+
+- narrative_template_id  INT64  -> v4_narrative_templates (template text)
+- shap_top{k}_feature_id INT64  -> v4_narrative_features (name + texts)
+- shap_top{k}_positive   BOOL   (gain narratives: description direction)
+- numeric parameters already on the row (v4_score, v4_percentile)
+
+Two small dimension tables hold the wording, and a view named after the
+old scores table (v4_prospect_scores) expands the encoding back to the
+original columns (shap_top{k}_feature, shap_top{k}_direction, v4_narrative),
+so lead-list SQL, Salesforce and CSV exports read it unchanged.
+render_narratives() does the same expansion in pandas for local exports,
+rendering each distinct (template, features, parameters) combination once.
+
+Changing narrative wording only needs the dimension tables republished
+(python narrative_encoding.py --template-set gain), not a re-score.
+
+Feature ids are CRC32 of the feature name, so they are stable across
+model versions and both scoring scripts.
+
+Template sets:
+- gain     score_prospects_v43.py: up to three feature descriptions joined
+           by '. ' (or "Standard lead profile")
+- upgrade  score_prospects_monthly.py: V4 upgrade narrative for leads at or
+           above the 80th percentile, keyed on the top-1 SHAP feature
+
+Usage:
+    import narrative_encoding
+
+    ids = narrative_encoding.feature_ids(['tenure_months', None])
+    narrative_encoding.publish(client, 'gain', FEATURE_DESCRIPTIONS, FEATURE_COLUMNS_V43,
+                               encoded_table, view_table, SCORES_SCHEMA_V43)
+
+CLI (republish wording without re-scoring):
+    python pipeline/scripts/narrative_encoding.py --template-set gain
+    python pipeline/scripts/narrative_encoding.py --template-set upgrade --print-sql
+
+    # One-off migration: the old physical v4_prospect_scores table blocks
+    # publishing until it is explicitly dropped
+    python pipeline/scripts/narrative_encoding.py --template-set gain --replace-table
+
+Author: Lead Scoring Team
+Date: 2026-10-19
+"""
+
+import sys
+import zlib
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from v3.utils.warehouse import get_client
+
+PROJECT_ID = "savvy-gtm-analytics"
+DATASET = "ml_features"
+TEMPLATES_TABLE = "v4_narrative_templates"
+FEATURES_TABLE = "v4_narrative_features"
+TOP_K = 3
+
+# ============================================================================
+# TEMPLATES
+# ============================================================================
+# Placeholders: {part1}..{part3} (gain: description of the k-th feature in
+# its direction), {score} (v4_score, 2 decimals), {percentile} (v4_percentile),
+# {top1_positive} (positive description of the top-1 feature)
+_UPGRADE_INTRO = ("V4 Model Upgrade: Identified as a high-potential lead "
+                  "(V4 score: {score}, {percentile}th percentile). ")
+_UPGRADE_TAIL = ("Historical conversion rate for similar leads: 4.60% (1.42x baseline). "
+                 "Promoted from STANDARD tier via V4 machine learning analysis.")
+
+GAIN_STANDARD_PROFILE = 100
+UPGRADE_KEY_FACTOR = 200
+UPGRADE_SHORT_TENURE_X_MOBILITY = 201
+UPGRADE_MOBILITY_X_BLEEDING = 202
+UPGRADE_GENERIC = 203
+
+NARRATIVE_TEMPLATES = {
+    # template_id: (template_set, template_text)
+    GAIN_STANDARD_PROFILE: ('gain', "Standard lead profile"),
+    101: ('gain', "{part1}"),
+    102: ('gain', "{part1}. {part2}"),
+    103: ('gain', "{part1}. {part2}. {part3}"),
+    UPGRADE_KEY_FACTOR: ('upgrade', _UPGRADE_INTRO + "Key factor: {top1_positive}. " + _UPGRADE_TAIL),
+    UPGRADE_SHORT_TENURE_X_MOBILITY: ('upgrade', _UPGRADE_INTRO + (
+        "Key factors: This advisor is relatively new at their current firm AND has a history of "
+        "changing firms - a strong signal they may move again. ") + _UPGRADE_TAIL),
+    UPGRADE_MOBILITY_X_BLEEDING: ('upgrade', _UPGRADE_INTRO + (
+        "Key factors: This advisor has demonstrated career mobility AND works at a firm losing "
+        "advisors - a powerful combination. ") + _UPGRADE_TAIL),
+    UPGRADE_GENERIC: ('upgrade', _UPGRADE_INTRO + "Key factors identified through ML analysis. " + _UPGRADE_TAIL),
+}
+
+# Interaction features with their own upgrade template
+UPGRADE_SPECIAL_TEMPLATES = {
+    'short_tenure_x_high_mobility': UPGRADE_SHORT_TENURE_X_MOBILITY,
+    'mobility_x_heavy_bleeding': UPGRADE_MOBILITY_X_BLEEDING,
+}
+UPGRADE_MIN_ABS_VALUE = 0.01
+
+
+# ============================================================================
+# ENCODING
+# ============================================================================
+def feature_id(name: Optional[str]) -> Optional[int]:
+    """Stable integer id of a feature name (CRC32); None stays None."""
+    if name is None or (isinstance(name, float) and np.isnan(name)):
+        return None
+    return zlib.crc32(name.encode('utf-8'))
+
+
+def feature_ids(names: Sequence[Optional[str]]) -> pd.Series:
+    """Vectorized feature_id as a nullable Int64 series."""
+    return pd.Series([feature_id(n) for n in names], dtype='Int64')
+
+
+def gain_template_id(n_parts: int) -> int:
+    """Gain template for a narrative with n_parts feature descriptions (0-3)."""
+    return GAIN_STANDARD_PROFILE + min(int(n_parts), TOP_K)
+
+
+def upgrade_template_id(top_feature: Optional[str], top_value: float, descriptions: Dict) -> int:
+    """Upgrade template selected by the top-1 SHAP feature (generate_narrative rules)."""
+    if top_feature is not None and abs(top_value or 0.0) > UPGRADE_MIN_ABS_VALUE and top_feature in descriptions:
+        return UPGRADE_SPECIAL_TEMPLATES.get(top_feature, UPGRADE_KEY_FACTOR)
+    return UPGRADE_GENERIC
+
+
+# ============================================================================
+# DIMENSION TABLES
+# ============================================================================
+def template_dimension() -> pd.DataFrame:
+    """Rows of v4_narrative_templates (every template set)."""
+    return pd.DataFrame(
+        [(tid, tset, text) for tid, (tset, text) in sorted(NARRATIVE_TEMPLATES.items())],
+        columns=['template_id', 'template_set', 'template_text'],
+    )
+
+
+def feature_dimension(template_set: str, descriptions: Dict, feature_names: Sequence[str]) -> pd.DataFrame:
+    """
+    Rows of v4_narrative_features for one template set.
+
+    Covers every model feature plus every described feature. Features
+    without a description get the gain fallback text
+    ("<feature words> increases/decreases likelihood").
+    """
+    names = list(dict.fromkeys(list(feature_names) + list(descriptions)))
+    rows = []
+    for name in names:
+        words = name.replace('_', ' ')
+        desc = descriptions.get(name, {})
+        rows.append({
+            'template_set': template_set,
+            'feature_id': feature_id(name),
+            'feature': name,
+            'positive_text': desc.get('positive', f"{words} increases likelihood"),
+            'negative_text': desc.get('negative', f"{words} decreases likelihood"),
+        })
+    df = pd.DataFrame(rows)
+    duplicated = df[df['feature_id'].duplicated(keep=False)]
+    if len(duplicated) > 0:
+        raise ValueError(f"Feature id collision: {sorted(duplicated['feature'])}")
+    return df
+
+
+# ============================================================================
+# RENDERING
+# ============================================================================
+def _fill(template: str, values: Dict[str, str]) -> str:
+    # Same sequence of literal replacements as the view's nested REPLACE()
+    for key, value in values.items():
+        template = template.replace('{' + key + '}', value)
+    return template
+
+
+def render_narratives(df: pd.DataFrame, features: pd.DataFrame) -> pd.Series:
+    """
+    Expand narrative_template_id (+ feature ids / parameters) to v4_narrative.
+
+    Each distinct combination of template, top-k feature ids, directions and
+    formatted parameters is rendered once and mapped back to the rows.
+
+    Args:
+        df: Encoded scores (narrative_template_id, shap_top{k}_feature_id,
+            optional shap_top{k}_positive, v4_score, v4_percentile)
+        features: feature_dimension() rows for the table's template set
+
+    Returns:
+        Narrative per row (None where narrative_template_id is null)
+    """
+    texts = features.set_index('feature_id')[['positive_text', 'negative_text']]
+    positive = texts['positive_text'].to_dict()
+    negative = texts['negative_text'].to_dict()
+
+    keys = pd.DataFrame({'template_id': df['narrative_template_id'].astype('Int64')}, index=df.index)
+    for k in range(1, TOP_K + 1):
+        keys[f'f{k}'] = df[f'shap_top{k}_feature_id'].astype('Int64') if f'shap_top{k}_feature_id' in df else pd.NA
+        keys[f'p{k}'] = df[f'shap_top{k}_positive'].astype('boolean') if f'shap_top{k}_positive' in df else pd.NA
+    keys['score'] = df['v4_score'].map(lambda v: f"{v:.2f}") if 'v4_score' in df else ''
+    keys['percentile'] = df['v4_percentile'].map(lambda v: f"{int(v)}") if 'v4_percentile' in df else ''
+
+    unique = keys[keys['template_id'].notna()].drop_duplicates()
+    rendered = {}
+    for row in unique.itertuples(index=False):
+        values = {}
+        for k in range(1, TOP_K + 1):
+            fid, pos = getattr(row, f'f{k}'), getattr(row, f'p{k}')
+            use_negative = not pd.isna(pos) and not bool(pos)
+            text = None if pd.isna(fid) else (negative if use_negative else positive).get(int(fid))
+            values[f'part{k}'] = text or ''
+        values['score'] = row.score
+        values['percentile'] = row.percentile
+        values['top1_positive'] = '' if pd.isna(row.f1) else positive.get(int(row.f1), '')
+        rendered[tuple(row)] = _fill(NARRATIVE_TEMPLATES[int(row.template_id)][1], values)
+
+    return pd.Series(
+        [rendered.get(tuple(row)) if pd.notna(row[0]) else None for row in keys.itertuples(index=False)],
+        index=df.index, dtype=object,
+    )
+
+
+def rendered_view_sql(
+    encoded_table: str,
+    view_table: str,
+    template_set: str,
+    encoded_columns: Sequence[str],
+    templates_table: str = f"{PROJECT_ID}.{DATASET}.{TEMPLATES_TABLE}",
+    features_table: str = f"{PROJECT_ID}.{DATASET}.{FEATURES_TABLE}",
+) -> str:
+    """
+    CREATE OR REPLACE VIEW expanding the encoded scores table.
+
+    The view exposes every stored column except the encoded ones, plus
+    shap_top{k}_feature, shap_top{k}_direction (when directions are stored)
+    and v4_narrative - the pre-encoding column names.
+    """
+    has_direction = 'shap_top1_positive' in encoded_columns
+    encoded = [f'shap_top{k}_feature_id' for k in range(1, TOP_K + 1)]
+    if has_direction:
+        encoded += [f'shap_top{k}_positive' for k in range(1, TOP_K + 1)]
+    encoded.append('narrative_template_id')
+
+    def text(k):
+        if has_direction:
+            return f"IF(s.shap_top{k}_positive, f{k}.positive_text, f{k}.negative_text)"
+        return f"f{k}.positive_text"
+
+    replacements = [(f'part{k}', text(k)) for k in range(1, TOP_K + 1)]
+    replacements += [
+        ('score', "FORMAT('%.2f', s.v4_score)"),
+        ('percentile', "CAST(s.v4_percentile AS STRING)"),
+        ('top1_positive', "f1.positive_text"),
+    ]
+    narrative = "t.template_text"
+    for key, expr in replacements:
+        narrative = f"REPLACE({narrative}, '{{{key}}}', IFNULL({expr}, ''))"
+
+    select = [f"s.* EXCEPT ({', '.join(encoded)})"]
+    for k in range(1, TOP_K + 1):
+        select.append(f"f{k}.feature AS shap_top{k}_feature")
+        if has_direction:
+            select.append(
+                f"CASE WHEN f{k}.feature IS NULL THEN NULL "
+                f"WHEN s.shap_top{k}_positive THEN 'positive' ELSE 'negative' END AS shap_top{k}_direction"
+            )
+    select.append(f"{narrative} AS v4_narrative")
+    joins = [f"LEFT JOIN `{templates_table}` t ON t.template_id = s.narrative_template_id"]
+    joins += [
+        f"LEFT JOIN `{features_table}` f{k}\n"
+        f"    ON f{k}.template_set = '{template_set}' AND f{k}.feature_id = s.shap_top{k}_feature_id"
+        for k in range(1, TOP_K + 1)
+    ]
+    select_sql = ',\n    '.join(select)
+    join_sql = '\n'.join(joins)
+    return f"""CREATE OR REPLACE VIEW `{view_table}` AS
+SELECT
+    {select_sql}
+FROM `{encoded_table}` s
+{join_sql}
+"""
+
+
+# ============================================================================
+# PUBLISHING
+# ============================================================================
+def publish(
+    client,
+    template_set: str,
+    descriptions: Dict,
+    feature_names: Sequence[str],
+    encoded_table: str,
+    view_table: str,
+    schema: Sequence,
+    templates_table: str = f"{PROJECT_ID}.{DATASET}.{TEMPLATES_TABLE}",
+    features_table: str = f"{PROJECT_ID}.{DATASET}.{FEATURES_TABLE}",
+    replace_table: bool = False,
+):
+    """
+    Publish the dimension tables and (re)create the rendering view.
+
+    Templates are rewritten whole (they are constants of this module);
+    feature rows are replaced for template_set only.
+
+    If view_table still exists as a physical table (the pre-encoding scores
+    table), nothing is published and a RuntimeError is raised. Only the
+    one-off migration (replace_table=True, CLI --replace-table) drops that
+    table.
+    """
+    from google.cloud import bigquery
+    from google.api_core.exceptions import NotFound
+
+    try:
+        is_table = client.get_table(view_table).table_type == 'TABLE'
+    except NotFound:
+        is_table = False
+    if is_table and not replace_table:
+        raise RuntimeError(
+            f"{view_table} is a physical table (pre-encoding scores), not the narrative view. "
+            f"Back it up if needed, then migrate once with: "
+            f"python pipeline/scripts/narrative_encoding.py --template-set {template_set} --replace-table"
+        )
+
+    client.load_table_from_dataframe(
+        template_dimension(), templates_table,
+        job_config=bigquery.LoadJobConfig(
+            write_disposition=bigquery.WriteDisposition.WRITE_TRUNCATE,
+            schema=[
+                bigquery.SchemaField('template_id', 'INT64'),
+                bigquery.SchemaField('template_set', 'STRING'),
+                bigquery.SchemaField('template_text', 'STRING'),
+            ],
+        ),
+    ).result()
+
+    features = feature_dimension(template_set, descriptions, feature_names)
+    try:
+        client.query(f"DELETE FROM `{features_table}` WHERE template_set = '{template_set}'").result()
+    except NotFound:
+        pass
+    client.load_table_from_dataframe(
+        features, features_table,
+        job_config=bigquery.LoadJobConfig(
+            write_disposition=bigquery.WriteDisposition.WRITE_APPEND,
+            schema=[
+                bigquery.SchemaField('template_set', 'STRING'),
+                bigquery.SchemaField('feature_id', 'INT64'),
+                bigquery.SchemaField('feature', 'STRING'),
+                bigquery.SchemaField('positive_text', 'STRING'),
+                bigquery.SchemaField('negative_text', 'STRING'),
+            ],
+        ),
+    ).result()
+    print(f"[INFO] Published {len(NARRATIVE_TEMPLATES)} templates and {len(features)} '{template_set}' features")
+
+    if is_table:
+        print(f"[WARNING] Dropping physical table {view_table} (--replace-table) - replacing it with the view")
+        client.delete_table(view_table)
+
+    columns = [field.name for field in schema]
+    client.query(rendered_view_sql(encoded_table, view_table, template_set, columns,
+                                   templates_table, features_table)).result()
+    print(f"[INFO] Narrative view: {view_table} -> {encoded_table}")
+
+
+def main(template_set: str, print_sql: bool = False, replace_table: bool = False):
+    if template_set == 'gain':
+        from score_prospects_v43 import (FEATURE_DESCRIPTIONS, FEATURE_COLUMNS_V43 as feature_names,
+                                         SCORES_SCHEMA_V43 as schema, OUTPUT_TABLE as encoded_table,
+                                         VIEW_TABLE as view_table)
+    else:
+        import score_prospects_monthly as monthly
+        FEATURE_DESCRIPTIONS = monthly.FEATURE_DESCRIPTIONS
+        feature_names = monthly.load_features_list()
+        schema = monthly.SCORES_SCHEMA
+        encoded_table = f"{monthly.PROJECT_ID}.{monthly.DATASET}.{monthly.SCORES_TABLE}"
+        view_table = f"{monthly.PROJECT_ID}.{monthly.DATASET}.{monthly.VIEW_TABLE}"
+
+    if print_sql:
+        print(rendered_view_sql(encoded_table, view_table, template_set, [f.name for f in schema]))
+        return
+
+    client = get_client(PROJECT_ID)
+    publish(client, template_set, FEATURE_DESCRIPTIONS, feature_names, encoded_table, view_table, schema,
+            replace_table=replace_table)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Publish V4 narrative dimension tables and rendering view')
+    parser.add_argument('--template-set', choices=['gain', 'upgrade'], default='gain',
+                        help='gain: score_prospects_v43.py, upgrade: score_prospects_monthly.py')
+    parser.add_argument('--print-sql', action='store_true', help='Print the view SQL instead of publishing')
+    parser.add_argument('--replace-table', action='store_true',
+                        help='One-off migration: drop the physical pre-encoding scores table the view replaces')
+    args = parser.parse_args()
+    main(args.template_set, args.print_sql, args.replace_table)
@@ -0,0 +1,277 @@
+"""
+Hybrid V3/V4 List Policy Sweep
+
+v41_backtest_simulation.py evaluates one hybrid policy per pandas pass:
+drop the bottom V4 percentiles, drop Tier 1 leads whose V4 percentile is
+below a disagreement cutoff, promote high-V4 STANDARD leads to
+STANDARD_HIGH_V4, sort by (tier priority, V4 percentile desc) and take the
+first N. This engine evaluates a whole grid of those policies at once.
+
+How:
+- Historical scored leads are sorted ONCE into segments in list order
+  (each Tier 1 tier, Tier 2, Tier 3, STANDARD, non-STANDARD priority-7 tiers,
+  and all priority-7 leads), each by V4 percentile descending.
+- Every threshold keeps a prefix (or, for the priority-7 remainder, a
+  contiguous slice) of a segment, found with searchsorted. A policy's list is
+  the segment pieces in priority order, truncated at list_size.
+- Conversions are differences of cumulative sums over the sorted order, so a
+  policy costs a handful of array lookups, and the grid is one vectorized
+  pass.
+- Bootstrap CIs use Poisson(1) weights per lead (the conversion rate of each
+  policy's selected leads under resampled outcomes). The weights are drawn in
+  row order from (seed, block), so two sweeps over the same leads (e.g.
+  V4.0 vs V4.1 percentiles) share replicates and can be compared paired.
+
+Ties in V4 percentile keep input row order, matching the stable multi-column
+sort_values in simulate_v3_v4_hybrid, so single policies reproduce it exactly.
+
+Usage:
+    from pipeline.scripts.policy_sweep import PolicySweep
+
+    sweep = PolicySweep(df, percentile_col='v4_1_percentile')
+    grid = sweep.sweep(
+        upgrade=[70, 75, 80, 85, 90],
+        deprioritize=[0, 10, 20, 30],
+        disagreement=[0, 50, 60, 70],
+        list_size=[2400, 2800],
+        reference={'upgrade': 80, 'deprioritize': 20, 'disagreement': 60, 'list_size': 2800},
+    )
+    print(grid.sort_values('ci_low', ascending=False).head(10))
+"""
+
+import time
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+BASELINE_CONVERSION_RATE = 0.0274  # 2.74% (historical "Provided Lead List")
+
+# Hybrid list priority (v41_backtest_simulation.simulate_v3_v4_hybrid)
+TIER_PRIORITY = {
+    'TIER_1A_PRIME_MOVER_CFP': 1,
+    'TIER_1B_PRIME_MOVER_SERIES65': 2,
+    'TIER_1_PRIME_MOVER': 3,
+    'TIER_1F_HV_WEALTH_BLEEDER': 4,
+    'TIER_2_PROVEN_MOVER': 5,
+    'TIER_3_MODERATE_BLEEDER': 6,
+    'STANDARD': 7,
+}
+T1_TIERS = ['TIER_1A_PRIME_MOVER_CFP', 'TIER_1B_PRIME_MOVER_SERIES65',
+            'TIER_1_PRIME_MOVER', 'TIER_1F_HV_WEALTH_BLEEDER']
+UPGRADE_TIER = 'STANDARD'          # Promoted to STANDARD_HIGH_V4 (priority 6.5)
+DEFAULT_PRIORITY = 7               # Unknown tiers
+MISSING_PERCENTILE = 50            # Leads without a V4 score
+
+POLICY_COLUMNS = ['upgrade', 'deprioritize', 'disagreement', 'list_size']
+
+
+class PolicySweep:
+    """Pre-sorted historical leads for evaluating hybrid list policies in bulk."""
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        percentile_col: str = 'v4_percentile',
+        tier_col: str = 'v3_tier',
+        outcome_col: str = 'converted',
+        n_bootstrap: int = 1000,
+        bootstrap_block: int = 100,
+        seed: int = 42,
+        baseline_rate: float = BASELINE_CONVERSION_RATE,
+    ):
+        self.n_rows = len(df)
+        self.n_bootstrap = n_bootstrap
+        self.bootstrap_block = bootstrap_block
+        self.seed = seed
+        self.baseline_rate = baseline_rate
+
+        pct = df[percentile_col].astype(float).fillna(MISSING_PERCENTILE).to_numpy()
+        tiers = df[tier_col].fillna(UPGRADE_TIER).astype(str).to_numpy()
+        self.outcome = df[outcome_col].astype(float).to_numpy()
+        priority = pd.Series(tiers).map(TIER_PRIORITY).fillna(DEFAULT_PRIORITY).to_numpy()
+
+        # Segment name -> row mask; list order is T1 tiers, T2, T3, upgraded STANDARD, priority 7
+        masks = {tier: tiers == tier for tier in T1_TIERS}
+        masks['TIER_2_PROVEN_MOVER'] = tiers == 'TIER_2_PROVEN_MOVER'
+        masks['TIER_3_MODERATE_BLEEDER'] = tiers == 'TIER_3_MODERATE_BLEEDER'
+        masks['standard'] = tiers == UPGRADE_TIER
+        masks['other_p7'] = (priority == DEFAULT_PRIORITY) & (tiers != UPGRADE_TIER)
+        masks['all_p7'] = priority == DEFAULT_PRIORITY
+
+        rows, self.offsets, self.neg_pct = [], {}, {}
+        position = 0
+        for name, mask in masks.items():
+            idx = np.flatnonzero(mask)
+            idx = idx[np.argsort(-pct[idx], kind='stable')]
+            self.offsets[name] = position
+            self.neg_pct[name] = -pct[idx]
+            rows.append(idx)
+            position += len(idx) + 1    # +1: leading zero of each segment's cumsum
+        self.segment_rows = rows
+        self.order = np.concatenate(rows) if rows else np.array([], dtype=np.int64)
+
+        self.cum_conv = self._segment_cumsum(self.outcome[None, :])[0]
+
+    # -------------------------------------------------------------------------
+    # Segment helpers
+    # -------------------------------------------------------------------------
+    def _segment_cumsum(self, values: np.ndarray) -> np.ndarray:
+        """Per-segment cumulative sums with a leading zero, for (k, n_rows) row-ordered values."""
+        parts = []
+        for idx in self.segment_rows:
+            seg = np.zeros((values.shape[0], len(idx) + 1), dtype=np.float64)
+            np.cumsum(values[:, idx], axis=1, out=seg[:, 1:])
+            parts.append(seg)
+        return np.concatenate(parts, axis=1)
+
+    def _count_above(self, segment: str, threshold: np.ndarray) -> np.ndarray:
+        """Rows in segment with percentile > threshold."""
+        return np.searchsorted(self.neg_pct[segment], -threshold, side='left')
+
+    def _count_at_least(self, segment: str, threshold: np.ndarray) -> np.ndarray:
+        """Rows in segment with percentile >= threshold."""
+        return np.searchsorted(self.neg_pct[segment], -threshold, side='right')
+
+    def _pieces(self, upgrade, deprioritize, disagreement) -> List[tuple]:
+        """(segment, start, available) per list position group, in list order."""
+        pieces = []
+        for tier in T1_TIERS:
+            available = np.minimum(self._count_above(tier, deprioritize),
+                                   self._count_at_least(tier, disagreement))
+            pieces.append((tier, np.zeros_like(available), available))
+        for tier in ['TIER_2_PROVEN_MOVER', 'TIER_3_MODERATE_BLEEDER']:
+            available = self._count_above(tier, deprioritize)
+            pieces.append((tier, np.zeros_like(available), available))
+
+        # STANDARD_HIGH_V4: STANDARD leads at or above the upgrade threshold
+        upgraded = np.minimum(self._count_at_least('standard', upgrade), self._count_above('standard', deprioritize))
+        pieces.append(('standard', np.zeros_like(upgraded), upgraded))
+
+        # Priority 7 by V4 desc: non-STANDARD leads >= upgrade come first (the
+        # STANDARD ones were promoted), then every priority-7 lead below upgrade
+        other_top = np.minimum(self._count_at_least('other_p7', upgrade), self._count_above('other_p7', deprioritize))
+        pieces.append(('other_p7', np.zeros_like(other_top), other_top))
+        start = self._count_at_least('all_p7', upgrade)
+        end = self._count_above('all_p7', deprioritize)
+        pieces.append(('all_p7', start, np.maximum(end - start, 0)))
+        return pieces
+
+    def _selection(self, policies: pd.DataFrame) -> List[tuple]:
+        """(from_index, to_index) into the segment cumsums per piece, plus selected counts."""
+        upgrade = policies['upgrade'].to_numpy(dtype=float)
+        deprioritize = policies['deprioritize'].to_numpy(dtype=float)
+        disagreement = policies['disagreement'].to_numpy(dtype=float)
+        remaining = policies['list_size'].to_numpy(dtype=np.int64).copy()
+
+        spans = []
+        for segment, start, available in self._pieces(upgrade, deprioritize, disagreement):
+            take = np.clip(remaining, 0, available)
+            remaining -= take
+            begin = self.offsets[segment] + start
+            spans.append((begin, begin + take))
+        selected = policies['list_size'].to_numpy(dtype=np.int64) - np.maximum(remaining, 0)
+        return spans, selected
+
+    # -------------------------------------------------------------------------
+    # Evaluation
+    # -------------------------------------------------------------------------
+    def bootstrap_weights(self, block: int) -> np.ndarray:
+        """Poisson(1) weights (replicates x rows) for one block, in input row order."""
+        size = min(self.bootstrap_block, self.n_bootstrap - block * self.bootstrap_block)
+        rng = np.random.default_rng([self.seed, block])
+        return rng.poisson(1.0, size=(size, self.n_rows)).astype(np.float64)
+
+    def bootstrap_rates(self, policies: pd.DataFrame) -> np.ndarray:
+        """Conversion rate of every policy under every bootstrap replicate (replicates x policies)."""
+        spans, _ = self._selection(policies)
+        rates = np.empty((self.n_bootstrap, len(policies)), dtype=np.float32)
+        n_blocks = -(-self.n_bootstrap // self.bootstrap_block)
+        for block in range(n_blocks):
+            weights = self.bootstrap_weights(block)
+            cum_w = self._segment_cumsum(weights)
+            cum_wy = self._segment_cumsum(weights * self.outcome[None, :])
+            conv = np.zeros((len(weights), len(policies)))
+            leads = np.zeros((len(weights), len(policies)))
+            for begin, end in spans:
+                conv += cum_wy[:, end] - cum_wy[:, begin]
+                leads += cum_w[:, end] - cum_w[:, begin]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                lo = block * self.bootstrap_block
+                rates[lo:lo + len(weights)] = conv / leads
+        return rates
+
+    def evaluate(self, policies: pd.DataFrame, reference: Optional[Dict] = None,
+                 confidence: float = 0.95) -> pd.DataFrame:
+        """
+        Metrics for each policy row (columns: upgrade, deprioritize, disagreement, list_size).
+
+        Returns:
+            policies plus selected, conversions, conversion_rate, lift_vs_baseline,
+            ci_low/ci_high (bootstrap) and, with a reference policy,
+            prob_beats_reference (paired over the same replicates)
+        """
+        policies = policies[POLICY_COLUMNS].reset_index(drop=True)
+        spans, selected = self._selection(policies)
+        conversions = np.zeros(len(policies))
+        for begin, end in spans:
+            conversions += self.cum_conv[end] - self.cum_conv[begin]
+
+        result = policies.copy()
+        result['selected'] = selected
+        result['conversions'] = conversions.astype(np.int64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result['conversion_rate'] = conversions / selected
+        result['lift_vs_baseline'] = result['conversion_rate'] / self.baseline_rate
+        result['expected_mqls'] = result['conversion_rate'] * result['list_size']
+
+        if self.n_bootstrap:
+            to_score = policies
+            if reference is not None:
+                to_score = pd.concat([policies, pd.DataFrame([reference])[POLICY_COLUMNS]], ignore_index=True)
+            rates = self.bootstrap_rates(to_score)
+            alpha = (1 - confidence) / 2
+            low, high = np.nanquantile(rates[:, :len(policies)], [alpha, 1 - alpha], axis=0)
+            result['ci_low'] = low
+            result['ci_high'] = high
+            if reference is not None:
+                result['prob_beats_reference'] = (rates[:, :len(policies)] > rates[:, [-1]]).mean(axis=0)
+        return result
+
+    def sweep(
+        self,
+        upgrade: Iterable[float],
+        deprioritize: Iterable[float],
+        disagreement: Iterable[float],
+        list_size: Iterable[int],
+        reference: Optional[Dict] = None,
+        confidence: float = 0.95,
+    ) -> pd.DataFrame:
+        """Evaluate the full grid upgrade x deprioritize x disagreement x list_size."""
+        mesh = np.meshgrid(*[np.asarray(list(v)) for v in (upgrade, deprioritize, disagreement, list_size)],
+                           indexing='ij')
+        policies = pd.DataFrame({col: m.ravel() for col, m in zip(POLICY_COLUMNS, mesh)})
+
+        start = time.perf_counter()
+        result = self.evaluate(policies, reference=reference, confidence=confidence)
+        elapsed = time.perf_counter() - start
+        print(f"[INFO] Evaluated {len(policies):,} policies x {self.n_bootstrap} bootstrap replicates "
+              f"in {elapsed:.2f}s ({len(policies) / max(elapsed, 1e-9):,.0f} policies/s)")
+        return result
+
+
+def select_leads(df: pd.DataFrame, upgrade: float, deprioritize: float, disagreement: float,
+                 list_size: int, percentile_col: str = 'v4_percentile', tier_col: str = 'v3_tier') -> pd.DataFrame:
+    """Row-level list for one policy (same ordering as PolicySweep), for inspecting a grid cell."""
+    pct = df[percentile_col].astype(float).fillna(MISSING_PERCENTILE)
+    tiers = df[tier_col].fillna(UPGRADE_TIER)
+    keep = (pct > deprioritize) & ~(tiers.isin(T1_TIERS) & (pct < disagreement))
+    out = df.loc[keep].copy()
+    out['final_tier'] = np.where((tiers[keep] == UPGRADE_TIER) & (pct[keep] >= upgrade),
+                                 'STANDARD_HIGH_V4', tiers[keep])
+    out['tier_priority'] = tiers[keep].map(TIER_PRIORITY).fillna(DEFAULT_PRIORITY)
+    out.loc[out['final_tier'] == 'STANDARD_HIGH_V4', 'tier_priority'] = 6.5
+    out['_pct'] = -pct[keep]
+    out['_row'] = np.arange(len(df))[keep.to_numpy()]
+    out = out.sort_values(['tier_priority', '_pct', '_row'], kind='stable').head(list_size)
+    return out.drop(columns=['_pct', '_row'])
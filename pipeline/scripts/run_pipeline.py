@@ -0,0 +1,571 @@
+"""
+Cached DAG Orchestrator for the FinTrx Re-Score Pipeline
+
+RUN_FULL_PIPELINE_NOW.md describes eight phases that used to be run by hand,
+and every phase was rerun after any failure:
+
+    pit_features  v3/sql/lead_scoring_features_pit.sql           -> lead_scoring_features_pit
+    v3_tiers      v3/sql/phase_4_v3_tiered_scoring.sql           -> lead_scores_v3_6
+    ma_eligible   pipeline/sql/create_ma_eligible_advisors.sql   -> ma_eligible_advisors
+    v4_features   pipeline/sql/v4_prospect_features.sql          -> v4_prospect_features
+    v4_scores     score_prospects_v43.score_prospects_v43()      -> v4_prospect_scores(_encoded)
+    base_list     pipeline/sql/January_2026_Lead_List_V3_V4_Hybrid.sql -> january_2026_lead_list
+    ma_insert     pipeline/sql/Insert_MA_Leads.sql               -> january_2026_lead_list (INSERT)
+    export        export_lead_list.main()                        -> pipeline/exports/*.csv
+
+plus the incremental Salesforce extraction the list SQL reads and the V3
+fold-in the CRD-list lookups read:
+
+    salesforce_activity  salesforce_activity.refresh_activity()  -> salesforce_lead_activity, crd_salesforce_activity
+    v3_latest            score_history.refresh_v3_latest()       -> crd_score_latest (V3 tier columns)
+
+This module declares them as a DAG and runs it with caching.
+
+- Edges: the tables each SQL file reads and writes (v3.utils.job_manager), the
+  tables declared for the Python phases, and the documented V3-before-list
+  order. Phases with no path between them run concurrently, e.g. the PIT/V3
+  branch, M&A eligibility and the V4 features/scores branch.
+- Cache key: sha256 of the phase's code (SQL file, or the scripts and model
+  artifacts behind an entry point) plus a fingerprint of every input table.
+  - A table produced by an upstream phase is fingerprinted by its content
+    hash (row count plus the SUM of FARM_FINGERPRINT over each row, leaving
+    out run timestamps such as scored_at), recorded after that phase ran.
+    A sum keeps row multiplicity, so duplicated rows change the hash (an
+    XOR would cancel them in pairs).
+  - An external FinTrx / Salesforce table is fingerprinted by its
+    last-modified time and row count, which is a metadata call only.
+    --hash-sources hashes its content instead.
+  - A SQL phase that uses CURRENT_DATE() also includes today's date.
+- Skip: a phase is up to date when its key matches the last successful run,
+  every table it writes last is unmodified since then and every file it
+  produced (declared as artifacts, e.g. the export CSV) still exists with
+  the recorded content. If a rebuilt
+  table has the same content, downstream phases keep their keys and are
+  skipped too (early cutoff). A refresh after a one-table change therefore
+  reruns only the phases that change actually reaches.
+- Resume: state is saved after every phase (.cache/pipeline/state.json). A
+  rerun after a failure skips everything that already succeeded and starts
+  at the failed phase.
+- Timings: per-phase start, end and elapsed time are kept in the state file.
+  Each run is appended to .cache/pipeline/runs.jsonl.
+
+Usage:
+    from pipeline.scripts.run_pipeline import PipelineRunner
+
+    runner = PipelineRunner(client)
+    runner.run()                          # everything that is stale
+    runner.run(force=['v4_scores'])       # rerun one phase (+ whatever changes)
+    print(runner.summary())
+
+CLI:
+    python pipeline/scripts/run_pipeline.py                    # run / resume
+    python pipeline/scripts/run_pipeline.py --plan             # DAG only, no BigQuery
+    python pipeline/scripts/run_pipeline.py --dry-run          # which phases are stale
+    python pipeline/scripts/run_pipeline.py --force v4_scores  # rerun a phase
+    python pipeline/scripts/run_pipeline.py --from base_list   # rerun a phase and all downstream
+    python pipeline/scripts/run_pipeline.py --status           # last recorded state and timings
+
+Author: Lead Scoring Team
+Date: 2026-10-19
+"""
+
+import argparse
+import hashlib
+import importlib
+import json
+import re
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parent.parent.parent
+SCRIPTS_DIR = REPO_ROOT / "pipeline" / "scripts"
+sys.path.insert(0, str(REPO_ROOT))
+from v3.utils.dataset_cache import extract_source_tables
+from v3.utils.job_manager import JobManager, _table_key, strip_comments, table_references
+
+PROJECT_ID = "savvy-gtm-analytics"
+STATE_DIR = REPO_ROOT / ".cache" / "pipeline"
+DEFAULT_MAX_CONCURRENT = 4
+
+# Columns stamped with the run time; they are left out of content hashes so an
+# identical rebuild keeps its fingerprint
+VOLATILE_COLUMNS = ('scored_at', 'created_at', 'generated_at')
+
+DATE_PATTERN = re.compile(r"\bCURRENT_(?:DATE|DATETIME)\b", re.IGNORECASE)
+
+
+# =============================================================================
+# PHASES
+# =============================================================================
+@dataclass
+class Phase:
+    """
+    One pipeline phase: a SQL file, or a Python entry point in pipeline/scripts.
+
+    SQL phases get reads/writes from the file; Python phases declare them.
+    """
+    name: str
+    sql: Optional[str] = None                 # repo-relative SQL file
+    entry: Optional[str] = None               # 'module:function' in pipeline/scripts
+    kwargs: Dict = field(default_factory=dict)
+    code: List[str] = field(default_factory=list)    # extra repo-relative files in the key
+    reads: List[str] = field(default_factory=list)   # fully-qualified tables
+    writes: List[str] = field(default_factory=list)
+    artifacts: List[str] = field(default_factory=list)  # repo-relative globs of files written
+    after: List[str] = field(default_factory=list)   # explicit extra dependencies
+    date_sensitive: bool = False
+
+    def __post_init__(self):
+        if self.sql:
+            text = (REPO_ROOT / self.sql).read_text(encoding='utf-8')
+            code = strip_comments(text)
+            write_keys, _ = table_references(code)
+            tables = extract_source_tables(code)
+            self.writes = self.writes or [t for t in tables if _table_key(t) in write_keys]
+            self.reads = self.reads or [t for t in tables if _table_key(t) not in write_keys]
+            self.date_sensitive = self.date_sensitive or bool(DATE_PATTERN.search(code))
+
+    @property
+    def files(self) -> List[str]:
+        return ([self.sql] if self.sql else []) + list(self.code)
+
+
+PHASES = [
+    Phase('pit_features', sql='v3/sql/lead_scoring_features_pit.sql'),
+    Phase('v3_tiers', sql='v3/sql/phase_4_v3_tiered_scoring.sql'),
+    Phase('ma_eligible', sql='pipeline/sql/create_ma_eligible_advisors.sql'),
+    Phase('v4_features', sql='pipeline/sql/v4_prospect_features.sql'),
+    Phase('v4_scores', entry='score_prospects_v43:score_prospects_v43',
+          kwargs={'model_dir': str(REPO_ROOT / 'v4' / 'models' / 'v4.3.1')},
+          code=['pipeline/scripts/score_prospects_v43.py',
+                'pipeline/scripts/narrative_encoding.py',
+                'pipeline/scripts/incremental_scoring.py',
+                'pipeline/scripts/score_history.py',
+                'pipeline/scripts/contribution_store.py',
+                'v4/models/v4.3.1/v4.3.1_model.json',
+                'v4/models/v4.3.1/v4.3.1_feature_importance.csv'],
+          reads=['savvy-gtm-analytics.ml_features.v4_prospect_features'],
+          writes=['savvy-gtm-analytics.ml_features.v4_prospect_scores_encoded',
+                  'savvy-gtm-analytics.ml_features.v4_prospect_scores',
+                  'savvy-gtm-analytics.ml_features.v4_score_history',
+                  'savvy-gtm-analytics.ml_features.crd_score_latest']),
+    # CRD-list lookups read V3 tiers only from crd_score_latest, so every V3
+    # rebuild is folded in (after v4_scores, which MERGEs the same table)
+    Phase('v3_latest', entry='score_history:refresh_v3_latest',
+          code=['pipeline/scripts/score_history.py'],
+          reads=['savvy-gtm-analytics.ml_features.lead_scores_v3_6'],
+          writes=['savvy-gtm-analytics.ml_features.crd_score_latest']),
+    # Folds Lead / Task / Opportunity changes since the last watermark into the
+    # compact activity tables the list SQL reads
+    Phase('salesforce_activity', entry='salesforce_activity:refresh_activity',
+          code=['pipeline/scripts/salesforce_activity.py'],
+          reads=['savvy-gtm-analytics.SavvyGTMData.Lead',
+                 'savvy-gtm-analytics.SavvyGTMData.Task',
+                 'savvy-gtm-analytics.SavvyGTMData.Opportunity'],
+          writes=['savvy-gtm-analytics.ml_features.salesforce_lead_activity',
+                  'savvy-gtm-analytics.ml_features.salesforce_opportunity_activity',
+                  'savvy-gtm-analytics.ml_features.crd_salesforce_activity',
+                  'savvy-gtm-analytics.ml_features.salesforce_activity_watermarks'],
+          date_sensitive=True),
+    # The list SQL does not read lead_scores_v3_6, but the runbook orders V3 tiers first
+    Phase('base_list', sql='pipeline/sql/January_2026_Lead_List_V3_V4_Hybrid.sql', after=['v3_tiers']),
+    Phase('ma_insert', sql='pipeline/sql/Insert_MA_Leads.sql'),
+    Phase('export', entry='export_lead_list:main',
+          code=['pipeline/scripts/export_lead_list.py'],
+          reads=['savvy-gtm-analytics.ml_features.january_2026_lead_list'],
+          artifacts=['pipeline/exports/January_2026_lead_list_*.csv']),
+]
+
+
+def build_dag(phases: Sequence[Phase]) -> Dict[str, List[str]]:
+    """
+    Dependencies per phase, using JobManager's hazard rule: a phase waits for
+    every earlier phase that writes a table it reads or writes, or reads a
+    table it writes. Phase order decides who goes first.
+    """
+    deps = {}
+    for i, phase in enumerate(phases):
+        reads = {_table_key(t) for t in phase.reads}
+        writes = {_table_key(t) for t in phase.writes}
+        found = list(phase.after)
+        for other in phases[:i]:
+            o_reads = {_table_key(t) for t in other.reads}
+            o_writes = {_table_key(t) for t in other.writes}
+            if o_writes & (reads | writes) or writes & o_reads:
+                found.append(other.name)
+        deps[phase.name] = list(dict.fromkeys(found))
+    return deps
+
+
+def producers(phases: Sequence[Phase]) -> Dict[str, Dict[str, str]]:
+    """Per phase: input table key -> the last earlier phase that writes it."""
+    result = {}
+    for i, phase in enumerate(phases):
+        result[phase.name] = {}
+        for table in phase.reads + phase.writes:
+            key = _table_key(table)
+            for other in phases[:i]:
+                if key in {_table_key(t) for t in other.writes}:
+                    result[phase.name][key] = other.name
+    return result
+
+
+def downstream(phases: Sequence[Phase], names: Sequence[str]) -> List[str]:
+    """The given phases plus everything that depends on them."""
+    deps = build_dag(phases)
+    selected = set(names)
+    for phase in phases:
+        if any(d in selected for d in deps[phase.name]):
+            selected.add(phase.name)
+    return [p.name for p in phases if p.name in selected]
+
+
+def file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# =============================================================================
+# RUNNER
+# =============================================================================
+class PipelineRunner:
+    """Runs the phase DAG, skipping phases whose cache key is unchanged."""
+
+    def __init__(self, client=None, phases: Sequence[Phase] = PHASES, project_id: str = PROJECT_ID,
+                 state_dir: Path = STATE_DIR, max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+                 hash_sources: bool = False):
+        self._client = client
+        self.phases = list(phases)
+        self.by_name = {p.name: p for p in self.phases}
+        self.deps = build_dag(self.phases)
+        self.producers = producers(self.phases)
+        self.last_writer = {}
+        for phase in self.phases:
+            for table in phase.writes:
+                self.last_writer[_table_key(table)] = phase.name
+        self.project_id = project_id
+        self.state_dir = Path(state_dir)
+        self.state_path = self.state_dir / "state.json"
+        self.max_concurrent = max_concurrent
+        self.hash_sources = hash_sources
+        self.state = self._load_state()
+        self.results: Dict[str, dict] = {}
+        self._source_cache: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        """Warehouse client (BigQuery or local, see v3/utils/warehouse.py), created on first use."""
+        if self._client is None:
+            from v3.utils.warehouse import get_client
+            self._client = get_client(self.project_id)
+        return self._client
+
+    # -------------------------------------------------------------------------
+    # State
+    # -------------------------------------------------------------------------
+    def _load_state(self) -> dict:
+        if self.state_path.exists():
+            return json.loads(self.state_path.read_text(encoding='utf-8'))
+        return {}
+
+    def _save_state(self):
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_suffix('.tmp')
+        tmp.write_text(json.dumps(self.state, indent=2, sort_keys=True, default=str), encoding='utf-8')
+        tmp.replace(self.state_path)
+
+    # -------------------------------------------------------------------------
+    # Fingerprints
+    # -------------------------------------------------------------------------
+    def _table_metadata(self, table_id: str) -> Optional[dict]:
+        """Last-modified time, row count and columns, or None if the table is missing."""
+        try:
+            table = self.client.get_table(table_id)
+        except Exception:
+            return None
+        return {
+            'modified': table.modified.isoformat() if table.modified else None,
+            'rows': table.num_rows,
+            'columns': [f.name for f in (table.schema or [])],
+        }
+
+    def content_hash(self, table_id: str) -> dict:
+        """Row count and order-independent content hash of a table or view."""
+        meta = self._table_metadata(table_id)
+        if meta is None:
+            return {'hash': 'missing', 'rows': 0, 'modified': None}
+        skip = [c for c in meta['columns'] if c.lower() in VOLATILE_COLUMNS]
+        source = f"(SELECT * EXCEPT({', '.join(skip)}) FROM `{table_id}`)" if skip else f"`{table_id}`"
+        query = f"""
+        SELECT COUNT(*) AS row_count,
+               CAST(SUM(CAST(FARM_FINGERPRINT(TO_JSON_STRING(t)) AS BIGNUMERIC)) AS STRING) AS content_hash
+        FROM {source} AS t
+        """
+        row = list(self.client.query(query).result())[0]
+        return {'hash': str(row['content_hash']), 'rows': row['row_count'], 'modified': meta['modified']}
+
+    @staticmethod
+    def artifact_hashes(phase: Phase, since: Optional[float] = None) -> Dict[str, str]:
+        """sha256 of the files matching the phase's artifact globs (written at/after `since`)."""
+        hashes = {}
+        for pattern in phase.artifacts:
+            for path in sorted(REPO_ROOT.glob(pattern)):
+                if since is None or path.stat().st_mtime >= since:
+                    hashes[str(path.relative_to(REPO_ROOT))] = file_hash(path)
+        return hashes
+
+    def source_fingerprint(self, table_id: str) -> str:
+        """Fingerprint of a table no phase produces (cached for the run)."""
+        with self._lock:
+            if table_id in self._source_cache:
+                return self._source_cache[table_id]
+        if self.hash_sources:
+            content = self.content_hash(table_id)
+            fingerprint = f"{content['hash']}:{content['rows']}"
+        else:
+            meta = self._table_metadata(table_id)
+            fingerprint = 'missing' if meta is None else f"{meta['modified']}:{meta['rows']}"
+        with self._lock:
+            self._source_cache[table_id] = fingerprint
+        return fingerprint
+
+    def cache_key(self, phase: Phase) -> str:
+        """sha256 over the phase's code, its input fingerprints and (if needed) the date."""
+        inputs = {}
+        writes = {_table_key(t) for t in phase.writes}
+        for table in phase.reads + phase.writes:
+            key = _table_key(table)
+            producer = self.producers[phase.name].get(key)
+            if producer is None:
+                if key not in writes:
+                    inputs[key] = self.source_fingerprint(table)
+                continue
+            record = self.state.get(producer, {})
+            if key in writes:
+                # Modified in place (INSERT into an upstream table): any rebuild
+                # upstream discards this phase's rows, so key on the upstream run
+                inputs[key] = record.get('run_id')
+            else:
+                inputs[key] = record.get('outputs', {}).get(key, {}).get('hash')
+        payload = {
+            'code': {f: file_hash(REPO_ROOT / f) for f in phase.files},
+            'entry': phase.entry,
+            'kwargs': phase.kwargs,
+            'inputs': inputs,
+            'date': date.today().isoformat() if phase.date_sensitive else None,
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:24]
+
+    def is_current(self, phase: Phase, key: str) -> bool:
+        """Key matches the last success and the tables it writes last are untouched."""
+        record = self.state.get(phase.name, {})
+        if record.get('status') != 'DONE' or record.get('key') != key:
+            return False
+        for table in phase.writes:
+            table_key = _table_key(table)
+            if self.last_writer.get(table_key) != phase.name:
+                continue
+            meta = self._table_metadata(table)
+            recorded = record.get('outputs', {}).get(table_key, {})
+            if meta is None or meta['modified'] != recorded.get('modified'):
+                return False
+        if phase.artifacts:
+            recorded = record.get('artifacts') or {}
+            if not recorded:
+                return False
+            for path, digest in recorded.items():
+                if not (REPO_ROOT / path).exists() or file_hash(REPO_ROOT / path) != digest:
+                    return False
+        return True
+
+    # -------------------------------------------------------------------------
+    # Execution
+    # -------------------------------------------------------------------------
+    def _execute(self, phase: Phase):
+        if phase.sql:
+            jobs = JobManager(self.client, project_id=self.project_id)
+            jobs.add_sql_file(REPO_ROOT / phase.sql)
+            jobs.run()
+        else:
+            if str(SCRIPTS_DIR) not in sys.path:
+                sys.path.insert(0, str(SCRIPTS_DIR))
+            module_name, function_name = phase.entry.split(':')
+            function = getattr(importlib.import_module(module_name), function_name)
+            function(**phase.kwargs)
+
+    def _process(self, phase: Phase, forced: bool) -> str:
+        key = self.cache_key(phase)
+        if not forced and self.is_current(phase, key):
+            return 'CACHED'
+        print(f"[INFO] Phase {phase.name}: running")
+        started = datetime.now()
+        start = time.perf_counter()
+        record = {'status': 'RUNNING', 'key': key, 'started_at': started.isoformat()}
+        with self._lock:
+            self.state[phase.name] = record
+            self._save_state()
+        try:
+            self._execute(phase)
+            record['outputs'] = {_table_key(t): self.content_hash(t) for t in phase.writes}
+            if phase.artifacts:
+                record['artifacts'] = self.artifact_hashes(phase, since=started.timestamp())
+                if not record['artifacts']:
+                    raise RuntimeError(f"Phase {phase.name} wrote none of its artifacts {phase.artifacts}")
+            record['status'] = 'DONE'
+            record['run_id'] = uuid.uuid4().hex[:12]
+            record.pop('error', None)
+        except Exception as e:
+            record['status'] = 'FAILED'
+            record['error'] = str(e)[:2000]
+            raise
+        finally:
+            record['finished_at'] = datetime.now().isoformat()
+            record['elapsed_seconds'] = round(time.perf_counter() - start, 1)
+            with self._lock:
+                self._save_state()
+        return 'DONE'
+
+    def run(self, force: Sequence[str] = (), from_phase: Optional[str] = None,
+            raise_on_error: bool = True) -> Dict[str, dict]:
+        """
+        Run every stale phase, independent phases concurrently.
+
+        Args:
+            force: Phases to rerun even if up to date
+            from_phase: Rerun this phase and everything downstream of it
+            raise_on_error: Raise after the run if a phase failed
+
+        Returns:
+            Per-phase {'status': DONE/CACHED/FAILED/SKIPPED, 'elapsed_seconds', 'error'}
+        """
+        unknown = [n for n in list(force) + ([from_phase] if from_phase else []) if n not in self.by_name]
+        if unknown:
+            raise ValueError(f"Unknown phase(s) {unknown} (known: {list(self.by_name)})")
+        forced = set(force) | set(downstream(self.phases, [from_phase]) if from_phase else [])
+
+        run_start = datetime.now()
+        wall_start = time.perf_counter()
+        print(f"[INFO] Pipeline: {len(self.phases)} phases, up to {self.max_concurrent} at a time")
+        self.results = {}
+        pending = [p.name for p in self.phases]
+        running = {}
+        started = {}
+        with ThreadPoolExecutor(max_workers=self.max_concurrent) as pool:
+            while pending or running:
+                for name in list(pending):
+                    states = [self.results.get(d, {}).get('status') for d in self.deps[name]]
+                    if any(s in ('FAILED', 'SKIPPED') for s in states):
+                        self.results[name] = {'status': 'SKIPPED', 'elapsed_seconds': 0.0}
+                        pending.remove(name)
+                        print(f"[WARNING] Phase {name}: skipped (dependency failed)")
+                    elif all(s in ('DONE', 'CACHED') for s in states) and len(running) < self.max_concurrent:
+                        running[pool.submit(self._process, self.by_name[name], name in forced)] = name
+                        started[name] = time.perf_counter()
+                        pending.remove(name)
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    elapsed = round(time.perf_counter() - started[name], 1)
+                    try:
+                        status = future.result()
+                        self.results[name] = {'status': status, 'elapsed_seconds': elapsed}
+                        print(f"[INFO] Phase {name}: {'up to date' if status == 'CACHED' else f'done in {elapsed:.1f}s'}")
+                    except Exception as e:
+                        self.results[name] = {'status': 'FAILED', 'elapsed_seconds': elapsed, 'error': str(e)}
+                        print(f"[ERROR] Phase {name} failed: {str(e)[:500]}")
+
+        wall = time.perf_counter() - wall_start
+        print(f"[INFO] Pipeline finished in {wall:.1f}s wall")
+        self._log_run(run_start, wall)
+        failed = [n for n, r in self.results.items() if r['status'] == 'FAILED']
+        if failed and raise_on_error:
+            raise RuntimeError(f"Phase {failed[0]} failed: {self.results[failed[0]]['error']} "
+                               f"(rerun to resume from it)")
+        return self.results
+
+    def _log_run(self, run_start: datetime, wall_seconds: float):
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        entry = {'started_at': run_start.isoformat(), 'wall_seconds': round(wall_seconds, 1),
+                 'phases': self.results}
+        with open(self.state_dir / "runs.jsonl", 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, default=str) + "\n")
+
+    def stale_phases(self, force: Sequence[str] = (), from_phase: Optional[str] = None) -> List[str]:
+        """
+        Phases a run would execute given current sources (metadata calls only).
+        A phase downstream of a stale one counts as stale, since its inputs
+        are unknown until the upstream phase has run.
+        """
+        stale = set(force) | set(downstream(self.phases, [from_phase]) if from_phase else [])
+        for phase in self.phases:
+            if phase.name in stale or any(d in stale for d in self.deps[phase.name]):
+                stale.add(phase.name)
+            elif not self.is_current(phase, self.cache_key(phase)):
+                stale.add(phase.name)
+        return [p.name for p in self.phases if p.name in stale]
+
+    # -------------------------------------------------------------------------
+    # Reporting
+    # -------------------------------------------------------------------------
+    def plan(self) -> pd.DataFrame:
+        """Phases with their dependencies and tables."""
+        return pd.DataFrame([{
+            'phase': p.name,
+            'runs': p.sql or p.entry,
+            'depends_on': ', '.join(self.deps[p.name]),
+            'writes': ', '.join([_table_key(t) for t in p.writes] + p.artifacts),
+            'reads': len(p.reads),
+        } for p in self.phases])
+
+    def summary(self) -> pd.DataFrame:
+        """Last recorded state and timing of each phase, plus this run's outcome."""
+        return pd.DataFrame([{
+            'phase': p.name,
+            'this_run': self.results.get(p.name, {}).get('status'),
+            'last_status': self.state.get(p.name, {}).get('status'),
+            'last_run_at': self.state.get(p.name, {}).get('started_at'),
+            'last_elapsed_seconds': self.state.get(p.name, {}).get('elapsed_seconds'),
+        } for p in self.phases])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Run the FinTrx re-score pipeline as a cached DAG')
+    parser.add_argument('--plan', action='store_true', help='Print the phase DAG and exit')
+    parser.add_argument('--dry-run', action='store_true', help='List stale phases without running them')
+    parser.add_argument('--status', action='store_true', help='Print the last recorded state and timings')
+    parser.add_argument('--force', nargs='+', default=[], metavar='PHASE', help='Rerun these phases')
+    parser.add_argument('--from', dest='from_phase', default=None, metavar='PHASE',
+                        help='Rerun this phase and everything downstream')
+    parser.add_argument('--max-concurrent', type=int, default=DEFAULT_MAX_CONCURRENT)
+    parser.add_argument('--hash-sources', action='store_true',
+                        help='Fingerprint external source tables by content instead of modified time')
+    parser.add_argument('--project', default=PROJECT_ID)
+    args = parser.parse_args()
+
+    runner = PipelineRunner(project_id=args.project, max_concurrent=args.max_concurrent,
+                            hash_sources=args.hash_sources)
+    if args.plan:
+        print(runner.plan().to_string(index=False))
+    elif args.status:
+        print(runner.summary().to_string(index=False))
+    elif args.dry_run:
+        stale = runner.stale_phases(args.force, args.from_phase)
+        print(f"[INFO] Stale phases: {', '.join(stale) if stale else 'none'}")
+    else:
+        runner.run(force=args.force, from_phase=args.from_phase)
+        print(runner.summary().to_string(index=False))
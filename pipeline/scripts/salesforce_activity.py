@@ -0,0 +1,470 @@
+"""
+Incremental Salesforce Activity Extraction (LastModifiedDate Watermarks)
+
+The lead-list SQL (lead_salesforce_info, lead_task_activity,
+recyclable_lead_ids) and enrich_list_playbook.py (latest lead / opportunity
+per CRD) re-aggregate the full SavvyGTMData Lead, Task and Opportunity tables
+on every run, mostly to find each lead's last call / SMS date. This module
+keeps that state in compact ml_features tables and folds in only the records
+modified since the last extraction:
+
+1. salesforce_lead_activity - one row per lead: CRD, status, disposition,
+   owner, DoNotCall, closed date and last_activity_date (last call / SMS
+   touch, same Task filter as the list SQL). Deleted leads are removed.
+2. salesforce_opportunity_activity - one row per opportunity: CRD and the
+   closed-lost fields.
+3. crd_salesforce_activity - per-CRD summary rebuilt from (1) and (2) after
+   every extraction: latest lead (prospect id, status, disposition, closed
+   date), last touch over all the CRD's leads, recyclable flag (V3.7.0 rule,
+   as of the extraction date) and latest opportunity.
+4. salesforce_activity_watermarks - append-only log, one row per source per
+   run. A run pulls LastModifiedDate in (watermark - lookback, high], where
+   high is the newest LastModifiedDate present when the run starts. The
+   lookback re-reads records the Salesforce sync lands late; folding is
+   idempotent, so re-reading is harmless.
+
+Task deltas fold as GREATEST(stored, new) per lead. A task that is deleted or
+moved to an earlier date cannot lower a stored date, so run with --full
+periodically. A full run folds all records into empty *_rebuild staging
+tables and only then swaps them over the state tables, before logging the
+new watermarks: a run that fails part-way leaves the previous state and
+watermarks in place (at worst a newer state with older watermarks, which the
+next run re-reads harmlessly).
+
+Works against the local warehouse (LEAD_SCORING_WAREHOUSE=local) with mock
+Lead / Task / Opportunity fixtures; every table name is a parameter.
+
+Usage:
+    import salesforce_activity
+
+    salesforce_activity.refresh_activity(client)              # incremental
+    salesforce_activity.refresh_activity(client, full=True)   # rebuild
+
+CLI:
+    python pipeline/scripts/salesforce_activity.py                  # incremental extraction
+    python pipeline/scripts/salesforce_activity.py --full           # rebuild from all records
+    python pipeline/scripts/salesforce_activity.py --watermarks     # show current watermarks
+    python pipeline/scripts/salesforce_activity.py --crd 123456 234567
+
+Author: Lead Scoring Team
+Date: 2026-10-19
+"""
+
+import sys
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+PROJECT_ID = "savvy-gtm-analytics"
+DATASET = "ml_features"
+LEAD_TABLE = f"{PROJECT_ID}.SavvyGTMData.Lead"
+TASK_TABLE = f"{PROJECT_ID}.SavvyGTMData.Task"
+OPPORTUNITY_TABLE = f"{PROJECT_ID}.SavvyGTMData.Opportunity"
+LEAD_ACTIVITY_TABLE = f"{PROJECT_ID}.{DATASET}.salesforce_lead_activity"
+OPPORTUNITY_ACTIVITY_TABLE = f"{PROJECT_ID}.{DATASET}.salesforce_opportunity_activity"
+SUMMARY_TABLE = f"{PROJECT_ID}.{DATASET}.crd_salesforce_activity"
+WATERMARK_TABLE = f"{PROJECT_ID}.{DATASET}.salesforce_activity_watermarks"
+
+DEFAULT_LOOKBACK_HOURS = 24
+
+# Same CRD parsing as salesforce_crds in the lead-list SQL
+CRD_EXPR = "SAFE_CAST(REGEXP_REPLACE(CAST({col} AS STRING), r'[^0-9]', '') AS INT64)"
+
+# Call / SMS tasks, as in lead_task_activity
+TOUCH_FILTER = """(t.Type IN ('Outgoing SMS', 'Incoming SMS')
+           OR UPPER(t.Subject) LIKE '%SMS%' OR UPPER(t.Subject) LIKE '%TEXT%'
+           OR t.TaskSubtype = 'Call' OR t.Type = 'Call'
+           OR UPPER(t.Subject) LIKE '%CALL%' OR t.CallType IS NOT NULL)"""
+
+RECYCLABLE_DISPOSITIONS = ('Bad Lead Provided', 'Bad Contact Info - Uncontacted',
+                           'Wrong Phone Number - Contacted', 'No Show/Ghosted')
+
+LEAD_ACTIVITY_DDL = """
+CREATE TABLE IF NOT EXISTS `{table}` (
+    lead_id STRING,
+    crd INT64,
+    prospect_id STRING,
+    status STRING,
+    disposition STRING,
+    sga_owner_name STRING,
+    owner_id STRING,
+    do_not_call BOOL,
+    closed_date DATE,
+    lead_modified TIMESTAMP,
+    last_activity_date DATE
+)
+CLUSTER BY lead_id
+"""
+
+OPPORTUNITY_ACTIVITY_DDL = """
+CREATE TABLE IF NOT EXISTS `{table}` (
+    opportunity_id STRING,
+    crd INT64,
+    full_opportunity_id STRING,
+    closed_lost_reason STRING,
+    closed_lost_details STRING,
+    opportunity_modified TIMESTAMP
+)
+CLUSTER BY opportunity_id
+"""
+
+WATERMARK_DDL = """
+CREATE TABLE IF NOT EXISTS `{table}` (
+    source STRING,
+    watermark TIMESTAMP,
+    rows_extracted INT64,
+    full_refresh BOOL,
+    extracted_at TIMESTAMP
+)
+"""
+
+
+@dataclass(frozen=True)
+class ActivityTables:
+    """Source and target tables of one extraction (override for tests / mock sources)."""
+    lead: str = LEAD_TABLE
+    task: str = TASK_TABLE
+    opportunity: str = OPPORTUNITY_TABLE
+    lead_activity: str = LEAD_ACTIVITY_TABLE
+    opportunity_activity: str = OPPORTUNITY_ACTIVITY_TABLE
+    summary: str = SUMMARY_TABLE
+    watermarks: str = WATERMARK_TABLE
+
+    @property
+    def sources(self) -> Dict[str, str]:
+        return {'lead': self.lead, 'task': self.task, 'opportunity': self.opportunity}
+
+
+@dataclass
+class ExtractionWindow:
+    """LastModifiedDate bounds per source: (low, high]; low None means all records."""
+    low: Dict[str, Optional[datetime]] = field(default_factory=dict)
+    high: Dict[str, Optional[datetime]] = field(default_factory=dict)
+    rows: Dict[str, int] = field(default_factory=dict)
+
+
+def _ts(value: datetime) -> str:
+    """TIMESTAMP literal (UTC)."""
+    value = pd.Timestamp(value)
+    if value.tzinfo is not None:
+        value = value.tz_convert('UTC').tz_localize(None)
+    return f"TIMESTAMP '{value:%Y-%m-%d %H:%M:%S.%f}'"
+
+
+def _window_filter(source: str, window: ExtractionWindow, column: str = 'LastModifiedDate') -> str:
+    conditions = []
+    if window.low.get(source) is not None:
+        conditions.append(f"{column} > {_ts(window.low[source])}")
+    if window.high.get(source) is not None:
+        conditions.append(f"{column} <= {_ts(window.high[source])}")
+    return " AND ".join(conditions) or "TRUE"
+
+
+def ensure_tables(client, tables: ActivityTables = ActivityTables()):
+    """Create the state and watermark tables if they don't exist yet."""
+    client.query(LEAD_ACTIVITY_DDL.format(table=tables.lead_activity)).result()
+    client.query(OPPORTUNITY_ACTIVITY_DDL.format(table=tables.opportunity_activity)).result()
+    client.query(WATERMARK_DDL.format(table=tables.watermarks)).result()
+
+
+def current_watermarks(client, tables: ActivityTables = ActivityTables()) -> Dict[str, datetime]:
+    """Newest extracted LastModifiedDate per source ({} before the first run)."""
+    df = client.query(f"""
+SELECT source, MAX(watermark) AS watermark
+FROM `{tables.watermarks}`
+GROUP BY source
+""").to_dataframe()
+    return {row.source: row.watermark for row in df.itertuples() if pd.notna(row.watermark)}
+
+
+def plan_window(client, tables: ActivityTables = ActivityTables(), full: bool = False,
+                lookback_hours: float = DEFAULT_LOOKBACK_HOURS) -> ExtractionWindow:
+    """
+    Fix the extraction bounds: low = watermark - lookback (None when full or
+    on the first run), high = newest LastModifiedDate now in the source.
+    Reads only the LastModifiedDate column of each source.
+    """
+    marks = {} if full else current_watermarks(client, tables)
+    window = ExtractionWindow()
+    for source in tables.sources:
+        mark = marks.get(source)
+        window.low[source] = mark - timedelta(hours=lookback_hours) if mark is not None else None
+
+    df = client.query("\nUNION ALL\n".join(
+        f"SELECT '{source}' AS source, MAX(LastModifiedDate) AS high, COUNT(*) AS n\n"
+        f"FROM `{table}`\nWHERE {_window_filter(source, window)}"
+        for source, table in tables.sources.items()
+    )).to_dataframe()
+    for row in df.itertuples():
+        window.rows[row.source] = int(row.n)
+        # No new records: keep the old watermark so the next window starts there
+        window.high[row.source] = row.high if pd.notna(row.high) else marks.get(row.source)
+    return window
+
+
+def extraction_sql(window: ExtractionWindow, as_of: str, full: bool = False,
+                   tables: ActivityTables = ActivityTables()) -> str:
+    """
+    Script folding the window's Lead / Task / Opportunity records into the
+    state tables, rebuilding the per-CRD summary and logging the watermarks.
+    """
+    lead_crd = CRD_EXPR.format(col='FA_CRD__c')
+    recyclable = ", ".join(f"'{d}'" for d in RECYCLABLE_DISPOSITIONS)
+    # Full runs fold into empty staging tables and swap them in afterwards,
+    # so the live state is never empty while the old watermarks are current
+    state = {'lead': tables.lead_activity, 'opportunity': tables.opportunity_activity}
+    reset = swap = ""
+    if full:
+        live, state = state, {source: f"{table}_rebuild" for source, table in state.items()}
+        reset = "".join(f"""
+DROP TABLE IF EXISTS `{state[source]}`;
+{ddl.format(table=state[source]).strip()};
+""" for source, ddl in (('lead', LEAD_ACTIVITY_DDL), ('opportunity', OPPORTUNITY_ACTIVITY_DDL)))
+        swap = "".join(f"""
+CREATE OR REPLACE TABLE `{live[source]}`
+CLUSTER BY {key}
+AS SELECT * FROM `{state[source]}`;
+
+DROP TABLE `{state[source]}`;
+""" for source, key in (('lead', 'lead_id'), ('opportunity', 'opportunity_id')))
+
+    marks = []
+    for source in tables.sources:
+        high = window.high.get(source)
+        if high is not None:
+            marks.append(f"SELECT '{source}', {_ts(high)}, {window.rows.get(source, 0)}, "
+                         f"{str(full).upper()}, CURRENT_TIMESTAMP()")
+    union = "\nUNION ALL\n".join(marks)
+    log_marks = f"""
+INSERT INTO `{tables.watermarks}` (source, watermark, rows_extracted, full_refresh, extracted_at)
+{union};
+""" if marks else ""
+
+    return f"""{reset}
+MERGE `{state['lead']}` t
+USING (
+    SELECT
+        Id AS lead_id,
+        {lead_crd} AS crd,
+        Full_Prospect_ID__c AS prospect_id,
+        Status AS status,
+        Disposition__c AS disposition,
+        SGA_Owner_Name__c AS sga_owner_name,
+        OwnerId AS owner_id,
+        DoNotCall AS do_not_call,
+        DATE(COALESCE(Stage_Entered_Closed__c, LastModifiedDate)) AS closed_date,
+        LastModifiedDate AS lead_modified,
+        IsDeleted AS is_deleted
+    FROM `{tables.lead}`
+    WHERE {_window_filter('lead', window)}
+) s
+ON t.lead_id = s.lead_id
+WHEN MATCHED AND s.is_deleted THEN DELETE
+WHEN MATCHED THEN UPDATE SET
+    crd = s.crd,
+    prospect_id = s.prospect_id,
+    status = s.status,
+    disposition = s.disposition,
+    sga_owner_name = s.sga_owner_name,
+    owner_id = s.owner_id,
+    do_not_call = s.do_not_call,
+    closed_date = s.closed_date,
+    lead_modified = s.lead_modified
+WHEN NOT MATCHED AND NOT s.is_deleted THEN
+    INSERT (lead_id, crd, prospect_id, status, disposition, sga_owner_name, owner_id,
+            do_not_call, closed_date, lead_modified)
+    VALUES (s.lead_id, s.crd, s.prospect_id, s.status, s.disposition, s.sga_owner_name, s.owner_id,
+            s.do_not_call, s.closed_date, s.lead_modified);
+
+-- Touches on leads not extracted yet (sync lag) are kept on a stub row
+-- (lead_modified NULL) until the lead arrives
+MERGE `{state['lead']}` t
+USING (
+    SELECT
+        t.WhoId AS lead_id,
+        MAX(GREATEST(
+            COALESCE(DATE(t.ActivityDate), DATE('1900-01-01')),
+            COALESCE(DATE(t.CompletedDateTime), DATE('1900-01-01')),
+            COALESCE(DATE(t.CreatedDate), DATE('1900-01-01'))
+        )) AS last_activity_date
+    FROM `{tables.task}` t
+    WHERE {_window_filter('task', window, 't.LastModifiedDate')}
+      AND t.IsDeleted = false AND t.WhoId LIKE '00Q%'
+      AND {TOUCH_FILTER}
+    GROUP BY t.WhoId
+) s
+ON t.lead_id = s.lead_id
+WHEN MATCHED THEN UPDATE SET
+    last_activity_date = GREATEST(COALESCE(t.last_activity_date, s.last_activity_date), s.last_activity_date)
+WHEN NOT MATCHED THEN
+    INSERT (lead_id, last_activity_date) VALUES (s.lead_id, s.last_activity_date);
+
+MERGE `{state['opportunity']}` t
+USING (
+    SELECT
+        Id AS opportunity_id,
+        {lead_crd} AS crd,
+        Full_Opportunity_ID__c AS full_opportunity_id,
+        Closed_Lost_Reason__c AS closed_lost_reason,
+        Closed_Lost_Details__c AS closed_lost_details,
+        LastModifiedDate AS opportunity_modified,
+        IsDeleted AS is_deleted
+    FROM `{tables.opportunity}`
+    WHERE {_window_filter('opportunity', window)}
+) s
+ON t.opportunity_id = s.opportunity_id
+WHEN MATCHED AND s.is_deleted THEN DELETE
+WHEN MATCHED THEN UPDATE SET
+    crd = s.crd,
+    full_opportunity_id = s.full_opportunity_id,
+    closed_lost_reason = s.closed_lost_reason,
+    closed_lost_details = s.closed_lost_details,
+    opportunity_modified = s.opportunity_modified
+WHEN NOT MATCHED AND NOT s.is_deleted THEN
+    INSERT (opportunity_id, crd, full_opportunity_id, closed_lost_reason, closed_lost_details,
+            opportunity_modified)
+    VALUES (s.opportunity_id, s.crd, s.full_opportunity_id, s.closed_lost_reason, s.closed_lost_details,
+            s.opportunity_modified);
+{swap}
+CREATE OR REPLACE TABLE `{tables.summary}`
+CLUSTER BY crd
+AS
+WITH leads AS (
+    SELECT
+        *,
+        -- V3.7.0 recyclable rule (March_2026_Lead_List_V3_7_0.sql recyclable_lead_ids)
+        COALESCE(do_not_call, false) = false AND (
+            (status = 'Nurture' AND (last_activity_date IS NULL
+                                     OR DATE_DIFF(DATE '{as_of}', last_activity_date, DAY) >= 300))
+            OR (status = 'Closed' AND (
+                (disposition IN ({recyclable})
+                 AND closed_date >= DATE_SUB(DATE '{as_of}', INTERVAL 180 DAY))
+                OR last_activity_date IS NULL
+                OR DATE_DIFF(DATE '{as_of}', last_activity_date, DAY) >= 180))
+        ) AS is_recyclable
+    FROM `{tables.lead_activity}`
+    WHERE lead_modified IS NOT NULL AND crd IS NOT NULL
+),
+lead_rollup AS (
+    SELECT
+        crd,
+        COUNT(*) AS lead_count,
+        MAX(last_activity_date) AS last_touch_date,
+        COUNTIF(is_recyclable) > 0 AS is_recyclable
+    FROM leads
+    GROUP BY crd
+),
+lead_one AS (
+    SELECT *
+    FROM leads
+    QUALIFY ROW_NUMBER() OVER (PARTITION BY crd ORDER BY lead_modified DESC, lead_id) = 1
+),
+opp_one AS (
+    SELECT *
+    FROM `{tables.opportunity_activity}`
+    WHERE crd IS NOT NULL
+    QUALIFY ROW_NUMBER() OVER (PARTITION BY crd ORDER BY opportunity_modified DESC, opportunity_id) = 1
+)
+SELECT
+    COALESCE(l.crd, o.crd) AS crd,
+    l.lead_id,
+    l.prospect_id,
+    l.status AS lead_status,
+    l.disposition,
+    l.sga_owner_name,
+    l.owner_id,
+    l.closed_date,
+    r.lead_count,
+    r.last_touch_date,
+    COALESCE(r.is_recyclable, false) AS is_recyclable,
+    o.opportunity_id,
+    o.full_opportunity_id,
+    o.closed_lost_reason,
+    o.closed_lost_details,
+    DATE '{as_of}' AS as_of_date
+FROM lead_one l
+JOIN lead_rollup r ON l.crd = r.crd
+FULL OUTER JOIN opp_one o ON l.crd = o.crd;
+{log_marks}"""
+
+
+def refresh_activity(client=None, full: bool = False, lookback_hours: float = DEFAULT_LOOKBACK_HOURS,
+                     as_of: Optional[str] = None, tables: ActivityTables = ActivityTables(),
+                     project_id: str = PROJECT_ID) -> ExtractionWindow:
+    """
+    Fold Lead / Task / Opportunity records modified since the last run into
+    the activity tables and rebuild the per-CRD summary.
+
+    Args:
+        client: BigQuery (or local warehouse) client (default: get_client(project_id))
+        full: Rebuild the state tables from every record (staged, then swapped in)
+        lookback_hours: Overlap re-read before each watermark
+        as_of: Date the recyclable flag is evaluated at (default: today)
+
+    Returns:
+        The extraction window (bounds and record counts per source)
+    """
+    if client is None:
+        from v3.utils.warehouse import get_client
+        client = get_client(project_id)
+    as_of = as_of or date.today().isoformat()
+
+    ensure_tables(client, tables)
+    window = plan_window(client, tables, full=full, lookback_hours=lookback_hours)
+    for source in tables.sources:
+        low = window.low.get(source)
+        print(f"[INFO] {source:<12} {window.rows.get(source, 0):>9,} record(s) "
+              f"since {low if low is not None else 'the beginning'}")
+
+    client.query(extraction_sql(window, as_of, full=full, tables=tables)).result()
+    summary = client.query(f"SELECT COUNT(*) AS n FROM `{tables.summary}`").to_dataframe()
+    print(f"[INFO] {'Rebuilt' if full else 'Updated'} Salesforce activity: "
+          f"{int(summary['n'].iloc[0]):,} CRDs in {tables.summary}")
+    return window
+
+
+def summary_query(crds: Sequence[int], tables: ActivityTables = ActivityTables()) -> str:
+    """Activity summary rows of the given CRDs."""
+    crd_list = ",".join(str(int(c)) for c in crds)
+    return f"""
+SELECT *
+FROM `{tables.summary}`
+WHERE crd IN UNNEST([{crd_list}])
+ORDER BY crd
+"""
+
+
+def main():
+    import argparse
+    from v3.utils.warehouse import get_client
+
+    parser = argparse.ArgumentParser(description='Incremental Salesforce activity extraction')
+    parser.add_argument('--full', action='store_true', help='Rebuild the activity tables from all records')
+    parser.add_argument('--lookback-hours', type=float, default=DEFAULT_LOOKBACK_HOURS,
+                        help=f'Re-read window before each watermark (default: {DEFAULT_LOOKBACK_HOURS})')
+    parser.add_argument('--as-of', default=None, help='Date for the recyclable flag (YYYY-MM-DD, default: today)')
+    parser.add_argument('--watermarks', action='store_true', help='Print the current watermarks and exit')
+    parser.add_argument('--crd', nargs='+', type=int, default=None, metavar='CRD',
+                        help='Print the activity summary of these CRDs and exit')
+    args = parser.parse_args()
+
+    client = get_client(PROJECT_ID)
+    if args.watermarks:
+        ensure_tables(client)
+        for source, mark in sorted(current_watermarks(client).items()):
+            print(f"  {source:<12} {mark}")
+        return
+    if args.crd:
+        df = client.query(summary_query(args.crd)).to_dataframe()
+        print(df.to_string(index=False))
+        return
+    refresh_activity(client, full=args.full, lookback_hours=args.lookback_hours, as_of=args.as_of)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,24 +2,40 @@
 Score a list of advisor CRDs from a CSV using BigQuery lookup.
 
 Reads a CSV with a 'crd' column, looks up V3 score_tier and V4 score/percentile
-from ml_features.lead_scores_v3_6 and ml_features.v4_prospect_scores,
-writes a new CSV with scores appended.
+from ml_features.crd_score_latest (one row per CRD, maintained by
+score_history.py), writes a new CSV with scores appended.
+
+With --local the lookup is a binary search over a cached local copy of
+crd_score_latest (re-downloaded only when the table changes) instead of
+a BigQuery query.
+
+With --exclusions, CRDs in the lead-list exclusion sets (exclusion_sets.py)
+are dropped before the lookup and the output gets `excluded` /
+`exclusion_reasons` columns, so every skipped advisor says why.
 
 Usage:
   python pipeline/scripts/score_crd_list.py input.csv [output.csv]
+  python pipeline/scripts/score_crd_list.py input.csv --local
+  python pipeline/scripts/score_crd_list.py input.csv --local --exclusions
   python pipeline/scripts/score_crd_list.py --help
 
-Requires: google-cloud-bigquery, pandas. Auth via gcloud auth application-default login.
+Requires: pandas, plus google-cloud-bigquery (auth via gcloud auth application-default login)
+unless run against the local warehouse (LEAD_SCORING_WAREHOUSE=local).
 """
 
 import argparse
 import csv
+import sys
 from pathlib import Path
 
-from google.cloud import bigquery
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from v3.utils.warehouse import get_client
 
 PROJECT_ID = "savvy-gtm-analytics"
 DATASET = "ml_features"
+LATEST_TABLE = "crd_score_latest"
 CRD_COLUMN = "crd"  # expected column name in input CSV
 
 
@@ -47,36 +63,49 @@ def build_lookup_query(crds: list[int]) -> str:
     if not crds:
         raise ValueError("No valid CRDs to look up")
     crd_list = ",".join(str(c) for c in crds)
+    # crd_score_latest is clustered by crd: only the blocks holding these CRDs are read
     return f"""
 WITH your_crd_list AS (
   SELECT crd FROM UNNEST([{crd_list}]) AS crd
-),
-v3_latest AS (
-  SELECT
-    advisor_crd AS crd,
-    score_tier,
-    expected_conversion_rate,
-    ROW_NUMBER() OVER (PARTITION BY advisor_crd ORDER BY contacted_date DESC) AS rn
-  FROM `{PROJECT_ID}.{DATASET}.lead_scores_v3_6`
-),
-v3_one AS (
-  SELECT crd, score_tier, expected_conversion_rate
-  FROM v3_latest
-  WHERE rn = 1
 )
 SELECT
   l.crd,
-  v3.score_tier,
-  v3.expected_conversion_rate AS v3_expected_rate_pct,
-  v4.v4_score,
-  v4.v4_percentile
+  s.v3_score_tier AS score_tier,
+  s.v3_expected_conversion_rate AS v3_expected_rate_pct,
+  s.v4_score,
+  s.v4_percentile
 FROM your_crd_list l
-LEFT JOIN v3_one v3 ON l.crd = v3.crd
-LEFT JOIN `{PROJECT_ID}.{DATASET}.v4_prospect_scores` v4 ON l.crd = v4.crd
-ORDER BY v4.v4_percentile DESC, v3.score_tier
+LEFT JOIN `{PROJECT_ID}.{DATASET}.{LATEST_TABLE}` s
+  ON l.crd = s.crd AND s.crd IN UNNEST([{crd_list}])
+ORDER BY s.v4_percentile DESC, s.v3_score_tier
 """
 
 
+def lookup_local(crds: list[int], refresh: bool = False):
+    """Look up CRDs in the local crd_score_latest mirror (binary search)."""
+    import score_history
+
+    mirror = score_history.LatestScoreMirror(
+        latest_table=f"{PROJECT_ID}.{DATASET}.{LATEST_TABLE}"
+    ).load(refresh=refresh)
+    df = mirror.lookup(crds).rename(columns={
+        "v3_score_tier": "score_tier",
+        "v3_expected_conversion_rate": "v3_expected_rate_pct",
+    })
+    return df[["crd", "score_tier", "v3_expected_rate_pct", "v4_score", "v4_percentile"]]
+
+
+def explain_exclusions(crds: list[int], refresh: bool = False):
+    """Split CRDs by the lead-list exclusion sets: (kept CRDs, {crd: reasons} for excluded)."""
+    from exclusion_sets import ExclusionSets
+
+    sets = ExclusionSets().load(refresh=refresh)
+    kept, dropped = sets.filter(crds)
+    reasons = dict(zip(dropped["crd"].tolist(), dropped["exclusion_reasons"].tolist()))
+    print(f"Exclusions: {len(dropped)} of {len(crds)} CRDs excluded, {len(kept)} to look up")
+    return [int(c) for c in kept], reasons
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Score advisor CRDs from CSV via BigQuery lookup."
@@ -98,6 +127,21 @@ def main():
         default=CRD_COLUMN,
         help=f"Name of CRD column in input CSV (default: {CRD_COLUMN}).",
     )
+    parser.add_argument(
+        "--local",
+        action="store_true",
+        help="Look up in the cached local copy of crd_score_latest instead of querying BigQuery.",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="With --local / --exclusions: re-download the local copy even if the table is unchanged.",
+    )
+    parser.add_argument(
+        "--exclusions",
+        action="store_true",
+        help="Skip CRDs in the lead-list exclusion sets and add excluded / exclusion_reasons columns.",
+    )
     args = parser.parse_args()
 
     input_path = args.input_csv.resolve()
@@ -115,12 +159,19 @@ def main():
         raise SystemExit("No valid CRD values found in input CSV.")
 
     print(f"Loaded {len(crds)} CRDs from {input_path}")
-    if len(crds) > 10000:
-        print("Warning: >10k CRDs may hit query limits; consider using BQ staging table instead.")
-
-    client = bigquery.Client(project=PROJECT_ID)
-    query = build_lookup_query(crds)
-    df_scores = client.query(query).to_dataframe()
+    excluded = {}
+    if args.exclusions:
+        crds, excluded = explain_exclusions(crds, refresh=args.refresh)
+    if not crds:
+        df_scores = pd.DataFrame(columns=["crd"])
+    elif args.local:
+        df_scores = lookup_local(crds, refresh=args.refresh)
+    else:
+        if len(crds) > 10000:
+            print("Warning: >10k CRDs may hit query limits; consider --local or a BQ staging table instead.")
+        client = get_client(PROJECT_ID)
+        query = build_lookup_query(crds)
+        df_scores = client.query(query).to_dataframe()
 
     # Merge back with original CSV so we keep other columns and row order
     with open(input_path, newline="", encoding="utf-8") as f:
@@ -129,6 +180,8 @@ def main():
         rows_orig = list(reader)
 
     score_cols = ["score_tier", "v3_expected_rate_pct", "v4_score", "v4_percentile"]
+    if args.exclusions:
+        score_cols += ["excluded", "exclusion_reasons"]
     for c in score_cols:
         if c not in fieldnames:
             fieldnames.append(c)
@@ -151,6 +204,9 @@ def main():
             else:
                 for k in score_cols:
                     out.setdefault(k, "")
+            if args.exclusions and c is not None:
+                out["excluded"] = c in excluded
+                out["exclusion_reasons"] = excluded.get(c, "")
             writer.writerow(out)
 
     print(f"Wrote {len(rows_orig)} rows to {output_path}")
@@ -0,0 +1,307 @@
+"""
+Append-Only Score History with a Latest-Score-per-CRD Table
+
+The scoring scripts WRITE_TRUNCATE (or MERGE into) the current V4 scores
+table, so last month's scores are gone after every run, and CRD-list
+lookups found the current V3 tier with a ROW_NUMBER() window over all of
+lead_scores_v3_6. This module keeps:
+
+1. v4_score_history - one snapshot of the scores table per scoring run,
+   appended (never rewritten), PARTITION BY run_date, CLUSTER BY crd, with
+   run_id and model_version. Looking back at a prior month prunes to its
+   partition.
+2. crd_score_latest - one row per CRD (CLUSTER BY crd) with the current
+   V4 score and V3 tier. It is maintained at write time:
+   - record_run() MERGEs the run just appended (V4 columns; CRDs that left
+     the scored population lose their V4 columns)
+   - refresh_v3_latest() MERGEs the latest lead_scores_v3_6 row per CRD
+     after that table is rebuilt (the window runs once per rebuild, not
+     once per lookup; run_pipeline.py's v3_latest phase follows v3_tiers)
+3. LatestScoreMirror - a local, crd-sorted columnar (Parquet via
+   DatasetCache) copy of crd_score_latest. Bulk CRD lookups are a binary
+   search over the sorted CRD index: O(k log n) for k CRDs, no query.
+
+score_prospects_v43.py and score_prospects_monthly.py call record_run()
+after every full or incremental run.
+
+Usage:
+    import score_history
+
+    run_id = score_history.record_run(client, scores_table)
+    scores = score_history.LatestScoreMirror().lookup([123456, 234567])
+
+CLI:
+    python pipeline/scripts/score_history.py --record-run    # snapshot current V4 scores
+    python pipeline/scripts/score_history.py --refresh-v3    # after rebuilding lead_scores_v3_6
+    python pipeline/scripts/score_history.py --history 123456 --since 2026-01-01
+
+Author: Lead Scoring Team
+Date: 2026-10-19
+"""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from v3.utils.dataset_cache import DatasetCache
+
+PROJECT_ID = "savvy-gtm-analytics"
+DATASET = "ml_features"
+SCORES_TABLE = f"{PROJECT_ID}.{DATASET}.v4_prospect_scores_encoded"
+HISTORY_TABLE = f"{PROJECT_ID}.{DATASET}.v4_score_history"
+LATEST_TABLE = f"{PROJECT_ID}.{DATASET}.crd_score_latest"
+V3_SCORES_TABLE = f"{PROJECT_ID}.{DATASET}.lead_scores_v3_6"
+
+# Scores-table columns snapshotted into the history on every run
+V4_COLUMNS = ['v4_score', 'v4_percentile', 'v4_deprioritize', 'v4_upgrade_candidate', 'model_version', 'scored_at']
+V3_COLUMNS = ['v3_score_tier', 'v3_expected_conversion_rate', 'v3_contacted_date']
+LATEST_COLUMNS = (['crd', 'v4_score', 'v4_percentile', 'v4_deprioritize', 'v4_upgrade_candidate',
+                   'v4_model_version', 'v4_run_id', 'v4_run_date'] + V3_COLUMNS)
+
+HISTORY_DDL = """
+CREATE TABLE IF NOT EXISTS `{history}` (
+    run_id STRING,
+    run_date DATE,
+    crd INT64,
+    v4_score FLOAT64,
+    v4_percentile INT64,
+    v4_deprioritize BOOL,
+    v4_upgrade_candidate BOOL,
+    model_version STRING,
+    scored_at TIMESTAMP
+)
+PARTITION BY run_date
+CLUSTER BY crd
+"""
+
+LATEST_DDL = """
+CREATE TABLE IF NOT EXISTS `{latest}` (
+    crd INT64,
+    v4_score FLOAT64,
+    v4_percentile INT64,
+    v4_deprioritize BOOL,
+    v4_upgrade_candidate BOOL,
+    v4_model_version STRING,
+    v4_run_id STRING,
+    v4_run_date DATE,
+    v3_score_tier STRING,
+    v3_expected_conversion_rate FLOAT64,
+    v3_contacted_date DATE
+)
+CLUSTER BY crd
+"""
+
+
+def new_run_id(now: Optional[datetime] = None) -> str:
+    """Sortable run id, e.g. run_20261019T093000."""
+    return f"run_{(now or datetime.now()):%Y%m%dT%H%M%S}"
+
+
+def ensure_tables(client, history_table: str = HISTORY_TABLE, latest_table: str = LATEST_TABLE):
+    """Create the history and latest tables if they don't exist yet."""
+    client.query(HISTORY_DDL.format(history=history_table)).result()
+    client.query(LATEST_DDL.format(latest=latest_table)).result()
+
+
+def record_run_sql(run_id: str, run_date: str, scores_table: str = SCORES_TABLE,
+                   history_table: str = HISTORY_TABLE, latest_table: str = LATEST_TABLE) -> str:
+    """
+    Script appending the current scores table as run run_id and folding it
+    into the latest table (reads only the new history partition).
+    """
+    v4_cols = ', '.join(V4_COLUMNS)
+    return f"""
+INSERT INTO `{history_table}` (run_id, run_date, crd, {v4_cols})
+SELECT '{run_id}', DATE '{run_date}', crd, {v4_cols}
+FROM `{scores_table}`;
+
+MERGE `{latest_table}` t
+USING (
+    SELECT *
+    FROM `{history_table}`
+    WHERE run_date = DATE '{run_date}' AND run_id = '{run_id}'
+) s
+ON t.crd = s.crd
+WHEN MATCHED THEN UPDATE SET
+    v4_score = s.v4_score,
+    v4_percentile = s.v4_percentile,
+    v4_deprioritize = s.v4_deprioritize,
+    v4_upgrade_candidate = s.v4_upgrade_candidate,
+    v4_model_version = s.model_version,
+    v4_run_id = s.run_id,
+    v4_run_date = s.run_date
+WHEN NOT MATCHED BY TARGET THEN
+    INSERT (crd, v4_score, v4_percentile, v4_deprioritize, v4_upgrade_candidate,
+            v4_model_version, v4_run_id, v4_run_date)
+    VALUES (s.crd, s.v4_score, s.v4_percentile, s.v4_deprioritize, s.v4_upgrade_candidate,
+            s.model_version, s.run_id, s.run_date)
+WHEN NOT MATCHED BY SOURCE AND t.v3_score_tier IS NULL THEN DELETE
+WHEN NOT MATCHED BY SOURCE AND t.v4_run_id IS NOT NULL THEN UPDATE SET
+    v4_score = NULL,
+    v4_percentile = NULL,
+    v4_deprioritize = NULL,
+    v4_upgrade_candidate = NULL,
+    v4_model_version = NULL,
+    v4_run_id = NULL,
+    v4_run_date = NULL;
+"""
+
+
+def record_run(client, scores_table: str = SCORES_TABLE, run_id: Optional[str] = None,
+               history_table: str = HISTORY_TABLE, latest_table: str = LATEST_TABLE) -> str:
+    """
+    Append the current V4 scores as one history run and update the latest table.
+
+    Args:
+        client: BigQuery client
+        scores_table: Current scores table (after the run's upload / merge)
+        run_id: Run identifier (default: new_run_id())
+
+    Returns:
+        The run id
+    """
+    now = datetime.now()
+    run_id = run_id or new_run_id(now)
+    ensure_tables(client, history_table, latest_table)
+    client.query(record_run_sql(run_id, now.strftime('%Y-%m-%d'), scores_table,
+                                history_table, latest_table)).result()
+    print(f"[INFO] Recorded score history run {run_id} -> {history_table}")
+    return run_id
+
+
+def refresh_v3_sql(v3_table: str = V3_SCORES_TABLE, latest_table: str = LATEST_TABLE) -> str:
+    """MERGE the most recent lead_scores_v3_6 row per CRD into the latest table."""
+    return f"""
+MERGE `{latest_table}` t
+USING (
+    SELECT
+        advisor_crd AS crd,
+        score_tier,
+        expected_conversion_rate,
+        contacted_date
+    FROM `{v3_table}`
+    WHERE advisor_crd IS NOT NULL
+    QUALIFY ROW_NUMBER() OVER (PARTITION BY advisor_crd ORDER BY contacted_date DESC) = 1
+) s
+ON t.crd = s.crd
+WHEN MATCHED THEN UPDATE SET
+    v3_score_tier = s.score_tier,
+    v3_expected_conversion_rate = s.expected_conversion_rate,
+    v3_contacted_date = s.contacted_date
+WHEN NOT MATCHED BY TARGET THEN
+    INSERT (crd, v3_score_tier, v3_expected_conversion_rate, v3_contacted_date)
+    VALUES (s.crd, s.score_tier, s.expected_conversion_rate, s.contacted_date)
+WHEN NOT MATCHED BY SOURCE AND t.v4_run_id IS NULL THEN DELETE
+WHEN NOT MATCHED BY SOURCE AND t.v3_score_tier IS NOT NULL THEN UPDATE SET
+    v3_score_tier = NULL,
+    v3_expected_conversion_rate = NULL,
+    v3_contacted_date = NULL
+"""
+
+
+def refresh_v3_latest(client=None, v3_table: str = V3_SCORES_TABLE, latest_table: str = LATEST_TABLE):
+    """
+    Fold a rebuilt lead_scores_v3_6 into the latest table.
+
+    run_pipeline.py runs this as the v3_latest phase after every V3 tier rebuild.
+    """
+    if client is None:
+        from v3.utils.warehouse import get_client
+        client = get_client(PROJECT_ID)
+    ensure_tables(client, latest_table=latest_table)
+    client.query(refresh_v3_sql(v3_table, latest_table)).result()
+    print(f"[INFO] Refreshed V3 tiers in {latest_table}")
+
+
+def history_query(crds: Sequence[int], since: Optional[str] = None, history_table: str = HISTORY_TABLE) -> str:
+    """Score history of the given CRDs (optionally from a run date on)."""
+    crd_list = ",".join(str(int(c)) for c in crds)
+    since_filter = f"\n  AND run_date >= DATE '{since}'" if since else ""
+    return f"""
+SELECT run_date, run_id, model_version, crd, v4_score, v4_percentile
+FROM `{history_table}`
+WHERE crd IN UNNEST([{crd_list}]){since_filter}
+ORDER BY crd, run_date, run_id
+"""
+
+
+class LatestScoreMirror:
+    """
+    Local crd-sorted copy of crd_score_latest for bulk CRD lookups.
+
+    The snapshot is a DatasetCache Parquet file, re-downloaded only when
+    the latest table's modification time changes.
+    """
+
+    def __init__(self, cache: Optional[DatasetCache] = None, latest_table: str = LATEST_TABLE):
+        self.cache = cache or DatasetCache(project_id=PROJECT_ID)
+        self.latest_table = latest_table
+        self.table = None
+        self.crds = None
+
+    def load(self, refresh: bool = False) -> 'LatestScoreMirror':
+        """Load (or reuse) the local snapshot and its sorted CRD index."""
+        sql = f"SELECT {', '.join(LATEST_COLUMNS)} FROM `{self.latest_table}` ORDER BY crd"
+        return self.from_frame(self.cache.query(sql, refresh=refresh), into=self)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, into: Optional['LatestScoreMirror'] = None) -> 'LatestScoreMirror':
+        """Build the index from a latest-table frame (sorted by crd if needed)."""
+        mirror = into if into is not None else cls.__new__(cls)
+        crds = df['crd'].to_numpy(dtype=np.int64)
+        if len(crds) > 1 and not (np.diff(crds) >= 0).all():
+            order = np.argsort(crds, kind='stable')
+            df, crds = df.iloc[order], crds[order]
+        mirror.table = df.reset_index(drop=True)
+        mirror.crds = crds
+        return mirror
+
+    def lookup(self, crds: Sequence[int]) -> pd.DataFrame:
+        """
+        Latest scores for the given CRDs by binary search.
+
+        Returns:
+            One row per requested CRD (request order) with the latest-table
+            columns; CRDs not in the table get nulls
+        """
+        if self.crds is None:
+            self.load()
+        wanted = np.asarray(crds, dtype=np.int64)
+        pos = np.searchsorted(self.crds, wanted)
+        found = pos < len(self.crds)
+        found[found] = self.crds[pos[found]] == wanted[found]
+
+        matches = self.table.iloc[pos[found]].drop_duplicates('crd')
+        return pd.DataFrame({'crd': wanted}).merge(matches, on='crd', how='left')
+
+
+def main():
+    import argparse
+    from v3.utils.warehouse import get_client
+
+    parser = argparse.ArgumentParser(description='Maintain V4 score history and the latest-score-per-CRD table')
+    parser.add_argument('--record-run', action='store_true', help='Append the current V4 scores as a history run')
+    parser.add_argument('--scores-table', default=SCORES_TABLE)
+    parser.add_argument('--refresh-v3', action='store_true', help='Fold lead_scores_v3_6 into the latest table')
+    parser.add_argument('--history', nargs='+', type=int, default=None, metavar='CRD',
+                        help='Print the score history of these CRDs')
+    parser.add_argument('--since', default=None, help='History start date (YYYY-MM-DD)')
+    args = parser.parse_args()
+
+    client = get_client(PROJECT_ID)
+    if args.record_run:
+        record_run(client, args.scores_table)
+    if args.refresh_v3:
+        refresh_v3_latest(client)
+    if args.history:
+        df = client.query(history_query(args.history, args.since)).to_dataframe()
+        print(df.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
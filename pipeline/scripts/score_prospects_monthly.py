@@ -12,12 +12,18 @@ CHANGES FROM V4.1.0 R3:
 - Improved deprioritization of "too early" leads
 - Better timing-aware scoring
 
+Narratives are dictionary-encoded (see narrative_encoding.py): scores go to
+v4_prospect_scores_encoded with template / feature ids, and the
+v4_prospect_scores view renders shap_top*_feature and v4_narrative on read.
+Every run is also appended to the v4_score_history table (see score_history.py).
+
 Working Directory: pipeline
 Usage: python scripts/score_prospects_monthly.py
 """
 
 import pandas as pd
 import numpy as np
+import sys
 from pathlib import Path
 from google.cloud import bigquery
 import pickle
@@ -26,6 +32,13 @@ from datetime import datetime
 import xgboost as xgb
 import shap
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from v3.utils.warehouse import get_client
+
+import incremental_scoring
+import narrative_encoding
+import score_history
+
 # ============================================================================
 # PATH CONFIGURATION
 # ============================================================================
@@ -50,12 +63,33 @@ LOGS_DIR.mkdir(parents=True, exist_ok=True)
 PROJECT_ID = "savvy-gtm-analytics"
 DATASET = "ml_features"
 FEATURES_TABLE = "v4_prospect_features"
-SCORES_TABLE = "v4_prospect_scores"
+SCORES_TABLE = "v4_prospect_scores_encoded"
+VIEW_TABLE = "v4_prospect_scores"          # renders narratives from SCORES_TABLE
+
+MODEL_VERSION = "V4.2.0"
 
 # Thresholds
 DEPRIORITIZE_PERCENTILE = 20
 V4_UPGRADE_PERCENTILE = 80
 
+SCORES_SCHEMA = [
+    bigquery.SchemaField("crd", "INT64"),
+    bigquery.SchemaField("v4_score", "FLOAT64"),
+    bigquery.SchemaField("v4_percentile", "INT64"),
+    bigquery.SchemaField("v4_deprioritize", "BOOLEAN"),
+    bigquery.SchemaField("v4_upgrade_candidate", "BOOLEAN"),
+    bigquery.SchemaField("shap_top1_feature_id", "INT64"),
+    bigquery.SchemaField("shap_top1_value", "FLOAT64"),
+    bigquery.SchemaField("shap_top2_feature_id", "INT64"),
+    bigquery.SchemaField("shap_top2_value", "FLOAT64"),
+    bigquery.SchemaField("shap_top3_feature_id", "INT64"),
+    bigquery.SchemaField("shap_top3_value", "FLOAT64"),
+    bigquery.SchemaField("narrative_template_id", "INT64"),
+    bigquery.SchemaField("scored_at", "TIMESTAMP"),
+    bigquery.SchemaField("model_version", "STRING"),
+    bigquery.SchemaField(incremental_scoring.FINGERPRINT_COLUMN, "INT64"),
+]
+
 # ============================================================================
 # SHAP FEATURE DESCRIPTIONS (Human-readable explanations)
 # ============================================================================
@@ -287,11 +321,33 @@ def load_features_list():
     return features
 
 
-def fetch_prospect_features(client):
-    """Fetch prospect features from BigQuery."""
+def fetch_prospect_features(client, feature_list, incremental=False):
+    """
+    Fetch prospect features from BigQuery.
+    
+    Each row carries a feature_fingerprint over the model features so later
+    runs can detect unchanged prospects. With incremental=True only new or
+    changed prospects (vs. the stored fingerprints) are returned.
+    """
+    features_table = f"{PROJECT_ID}.{DATASET}.{FEATURES_TABLE}"
+    scores_table = f"{PROJECT_ID}.{DATASET}.{SCORES_TABLE}"
+    
+    # Features missing from the table are zero-filled in prepare_features,
+    # so only fingerprint the columns that actually exist
+    available = {field.name for field in client.get_table(features_table).schema}
+    fingerprint_cols = [f for f in feature_list if f in available]
+    
+    if incremental:
+        print(f"[INFO] Fetching new/changed prospects from {FEATURES_TABLE}...")
+        return incremental_scoring.fetch_changed_features(
+            client, features_table, scores_table, fingerprint_cols
+        )
+    
     query = f"""
-    SELECT *
-    FROM `{PROJECT_ID}.{DATASET}.{FEATURES_TABLE}`
+    SELECT
+        f.*,
+        {incremental_scoring.fingerprint_sql(fingerprint_cols)} AS {incremental_scoring.FINGERPRINT_COLUMN}
+    FROM `{features_table}` f
     """
     print(f"[INFO] Fetching features from {FEATURES_TABLE}...")
     df = client.query(query).to_dataframe()
@@ -680,53 +736,28 @@ def calculate_shap_values(model, X):
     return shap_values, explainer.expected_value if hasattr(explainer, 'expected_value') else 0.0
 
 
-def generate_narrative(v4_score, v4_percentile, top_features, top_values, feature_names):
-    """Generate a human-readable narrative for a V4 upgrade candidate."""
-    
-    # Build narrative with specific feature explanations
-    narrative_parts = [
-        f"V4 Model Upgrade: Identified as a high-potential lead ",
-        f"(V4 score: {v4_score:.2f}, {v4_percentile}th percentile). "
-    ]
-    
-    # Get the top feature and its description
-    if top_features and len(top_features) > 0:
-        top_feat = top_features[0]
-        top_val = top_values[0] if len(top_values) > 0 else 0.0
-        
-        # Use absolute value to check significance
-        if abs(top_val) > 0.01 and top_feat in FEATURE_DESCRIPTIONS:
-            desc = FEATURE_DESCRIPTIONS[top_feat]
-            
-            # Special handling for interaction features
-            if top_feat == 'short_tenure_x_high_mobility':
-                narrative_parts.append(
-                    "Key factors: This advisor is relatively new at their current firm AND has a history of changing firms - a strong signal they may move again. "
-                )
-            elif top_feat == 'mobility_x_heavy_bleeding':
-                narrative_parts.append(
-                    "Key factors: This advisor has demonstrated career mobility AND works at a firm losing advisors - a powerful combination. "
-                )
-            else:
-                # Use the positive description for other features
-                narrative_parts.append(f"Key factor: {desc['positive']}. ")
-        else:
-            narrative_parts.append("Key factors identified through ML analysis. ")
-    else:
-        narrative_parts.append("Key factors identified through ML analysis. ")
-    
-    narrative_parts.append(
-        f"Historical conversion rate for similar leads: 4.60% (1.42x baseline). "
-        f"Promoted from STANDARD tier via V4 machine learning analysis."
-    )
+def narrative_template_id(v4_percentile, top_feature, top_value):
+    """
+    Narrative template for a prospect (None below the upgrade threshold).
     
-    return ''.join(narrative_parts)
+    The V4 upgrade narrative text lives in narrative_encoding.NARRATIVE_TEMPLATES
+    and is rendered by the v4_prospect_scores view from the template id,
+    v4_score, v4_percentile and the top-1 SHAP feature.
+    """
+    if v4_percentile < V4_UPGRADE_PERCENTILE:
+        return None
+    return narrative_encoding.upgrade_template_id(top_feature, top_value, FEATURE_DESCRIPTIONS)
 
 
-def extract_top_shap_features(shap_values, feature_list, scores, percentiles):
-    """Extract top 3 SHAP features for each prospect and generate narratives."""
+def extract_top_shap_features(shap_values, feature_list, scores, percentiles, validate_diversity=True):
+    """
+    Extract top 3 SHAP features for each prospect and pick narrative templates.
     
-    print("[INFO] Extracting top SHAP features and generating narratives...")
+    validate_diversity=False skips the homogeneity gate, which is only
+    meaningful over the full prospect population (not an incremental subset).
+    """
+    
+    print("[INFO] Extracting top SHAP features and narrative templates...")
     
     # Validate input shape
     if len(shap_values.shape) != 2:
@@ -751,7 +782,7 @@ def extract_top_shap_features(shap_values, feature_list, scores, percentiles):
         'shap_top2_value': [],
         'shap_top3_feature': [],
         'shap_top3_value': [],
-        'v4_narrative': []
+        'narrative_template_id': []
     }
     
     for i in range(n_prospects):
@@ -770,19 +801,10 @@ def extract_top_shap_features(shap_values, feature_list, scores, percentiles):
         results['shap_top3_feature'].append(top_features[2] if len(top_features) > 2 else None)
         results['shap_top3_value'].append(top_values[2] if len(top_values) > 2 else 0.0)
         
-        # Generate narrative only for V4 upgrade candidates (>=80th percentile)
-        if percentiles[i] >= V4_UPGRADE_PERCENTILE:
-            narrative = generate_narrative(
-                v4_score=scores[i],
-                v4_percentile=percentiles[i],
-                top_features=top_features,
-                top_values=top_values,
-                feature_names=feature_list
-            )
-        else:
-            narrative = None
-        
-        results['v4_narrative'].append(narrative)
+        # Narrative only for V4 upgrade candidates (>=80th percentile)
+        results['narrative_template_id'].append(
+            narrative_template_id(percentiles[i], top_features[0], top_values[0])
+        )
         
         # Progress indicator
         if (i + 1) % 50000 == 0:
@@ -799,7 +821,7 @@ def extract_top_shap_features(shap_values, feature_list, scores, percentiles):
     print(f"  Unique top-3 features: {unique_top3}")
     
     # Raise error if homogeneity detected
-    if unique_top1 < 3:
+    if validate_diversity and unique_top1 < 3:
         raise ValueError(
             f"SHAP HOMOGENEITY BUG DETECTED! Only {unique_top1} unique top-1 features "
             f"across {n_prospects:,} leads. This indicates per-lead SHAP extraction failed. "
@@ -807,12 +829,12 @@ def extract_top_shap_features(shap_values, feature_list, scores, percentiles):
             f"personalized narratives. Check SHAP calculation and extraction logic."
         )
     
-    if unique_top1 < 10:
+    if validate_diversity and unique_top1 < 10:
         print(f"[WARNING] Low SHAP diversity: Only {unique_top1} unique top-1 features. "
               f"Expected at least 10+ for meaningful personalization.")
     
     # Count narratives generated
-    narrative_count = sum(1 for n in results['v4_narrative'] if n is not None)
+    narrative_count = sum(1 for n in results['narrative_template_id'] if n is not None)
     print(f"[INFO] Generated {narrative_count:,} V4 upgrade narratives")
     
     return results
@@ -824,21 +846,7 @@ def upload_scores(client, df_scores):
     
     job_config = bigquery.LoadJobConfig(
         write_disposition=bigquery.WriteDisposition.WRITE_TRUNCATE,
-        schema=[
-            bigquery.SchemaField("crd", "INT64"),
-            bigquery.SchemaField("v4_score", "FLOAT64"),
-            bigquery.SchemaField("v4_percentile", "INT64"),
-            bigquery.SchemaField("v4_deprioritize", "BOOLEAN"),
-            bigquery.SchemaField("v4_upgrade_candidate", "BOOLEAN"),
-            bigquery.SchemaField("shap_top1_feature", "STRING"),
-            bigquery.SchemaField("shap_top1_value", "FLOAT64"),
-            bigquery.SchemaField("shap_top2_feature", "STRING"),
-            bigquery.SchemaField("shap_top2_value", "FLOAT64"),
-            bigquery.SchemaField("shap_top3_feature", "STRING"),
-            bigquery.SchemaField("shap_top3_value", "FLOAT64"),
-            bigquery.SchemaField("v4_narrative", "STRING"),
-            bigquery.SchemaField("scored_at", "TIMESTAMP"),
-        ]
+        schema=SCORES_SCHEMA
     )
     
     job = client.load_table_from_dataframe(df_scores, table_id, job_config=job_config)
@@ -846,7 +854,55 @@ def upload_scores(client, df_scores):
     print(f"[INFO] Uploaded {len(df_scores):,} scores to {table_id}")
 
 
-def main():
+def publish_narratives(client, feature_list):
+    """Publish narrative dimension tables and the v4_prospect_scores rendering view."""
+    narrative_encoding.publish(
+        client, 'upgrade', FEATURE_DESCRIPTIONS, feature_list,
+        f"{PROJECT_ID}.{DATASET}.{SCORES_TABLE}",
+        f"{PROJECT_ID}.{DATASET}.{VIEW_TABLE}",
+        SCORES_SCHEMA
+    )
+
+
+def derive_percentile_columns(df):
+    """
+    Recompute percentile-dependent columns from the stored score table.
+    
+    Used after an incremental merge. Percentiles and flags are rebuilt from
+    the full score column; the upgrade narrative template only depends on
+    the percentile and top-1 SHAP feature, so it is re-selected from the
+    stored shap_top1_* columns without recomputing SHAP (the view renders
+    the new score / percentile into the text).
+    """
+    scores = df['v4_score'].values
+    percentiles = calculate_percentiles(scores)
+    
+    names = narrative_encoding.feature_dimension('upgrade', FEATURE_DESCRIPTIONS, [])
+    name_by_id = dict(zip(names['feature_id'], names['feature']))
+    top_features = [None if pd.isna(fid) else name_by_id.get(int(fid)) for fid in df['shap_top1_feature_id']]
+    template_ids = [
+        narrative_template_id(percentiles[i], top_features[i], df['shap_top1_value'].iat[i])
+        for i in range(len(df))
+    ]
+    
+    return pd.DataFrame({
+        'crd': df['crd'].values,
+        'v4_percentile': percentiles,
+        'v4_deprioritize': percentiles <= DEPRIORITIZE_PERCENTILE,
+        'v4_upgrade_candidate': percentiles >= V4_UPGRADE_PERCENTILE,
+        'narrative_template_id': pd.array(template_ids, dtype='Int64'),
+    })
+
+
+def main(incremental=False):
+    """
+    Run monthly scoring.
+    
+    Args:
+        incremental: Score only new/changed prospects (by feature fingerprint)
+            and merge them into the scores table. Falls back to a full
+            re-score when stored scores come from another model version.
+    """
     print("=" * 70)
     print("V4 MONTHLY PROSPECT SCORING WITH SHAP NARRATIVES")
     print(f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -854,12 +910,30 @@ def main():
     print("=" * 70)
     
     # Initialize
-    client = bigquery.Client(project=PROJECT_ID)
+    client = get_client(PROJECT_ID)
     model = load_model()
     feature_list = load_features_list()
     
+    features_table = f"{PROJECT_ID}.{DATASET}.{FEATURES_TABLE}"
+    scores_table = f"{PROJECT_ID}.{DATASET}.{SCORES_TABLE}"
+    if incremental:
+        incremental = incremental_scoring.can_score_incrementally(client, scores_table, MODEL_VERSION)
+    print(f"[INFO] Mode: {'INCREMENTAL' if incremental else 'FULL re-score'}")
+    
     # Fetch features
-    df_raw = fetch_prospect_features(client)
+    df_raw = fetch_prospect_features(client, feature_list, incremental=incremental)
+    
+    if incremental and len(df_raw) == 0:
+        print("[INFO] No new or changed prospects - refreshing removals and percentiles only")
+        incremental_scoring.merge_scores(client, df_raw.iloc[0:0], scores_table, features_table, SCORES_SCHEMA,
+                                         model_version=MODEL_VERSION)
+        incremental_scoring.recompute_percentiles(
+            client, scores_table, derive_percentile_columns, SCORES_SCHEMA,
+            read_columns=['shap_top1_feature_id', 'shap_top1_value']
+        )
+        publish_narratives(client, feature_list)
+        score_history.record_run(client, scores_table)
+        return None
     
     # Prepare features
     X = prepare_features(df_raw, feature_list)
@@ -921,7 +995,10 @@ def main():
         raise
     
     # Extract top features and generate narratives
-    shap_results = extract_top_shap_features(shap_values, feature_list, scores, percentiles)
+    shap_results = extract_top_shap_features(
+        shap_values, feature_list, scores, percentiles,
+        validate_diversity=not incremental
+    )
     
     # Build output DataFrame
     df_scores = pd.DataFrame({
@@ -930,18 +1007,35 @@ def main():
         'v4_percentile': percentiles,
         'v4_deprioritize': percentiles <= DEPRIORITIZE_PERCENTILE,
         'v4_upgrade_candidate': percentiles >= V4_UPGRADE_PERCENTILE,
-        'shap_top1_feature': shap_results['shap_top1_feature'],
+        'shap_top1_feature_id': narrative_encoding.feature_ids(shap_results['shap_top1_feature']).values,
         'shap_top1_value': shap_results['shap_top1_value'],
-        'shap_top2_feature': shap_results['shap_top2_feature'],
+        'shap_top2_feature_id': narrative_encoding.feature_ids(shap_results['shap_top2_feature']).values,
         'shap_top2_value': shap_results['shap_top2_value'],
-        'shap_top3_feature': shap_results['shap_top3_feature'],
+        'shap_top3_feature_id': narrative_encoding.feature_ids(shap_results['shap_top3_feature']).values,
         'shap_top3_value': shap_results['shap_top3_value'],
-        'v4_narrative': shap_results['v4_narrative'],
-        'scored_at': datetime.now()
+        'narrative_template_id': pd.array(shap_results['narrative_template_id'], dtype='Int64'),
+        'scored_at': datetime.now(),
+        'model_version': MODEL_VERSION,
+        incremental_scoring.FINGERPRINT_COLUMN: df_raw[incremental_scoring.FINGERPRINT_COLUMN].values,
     })
     
-    # Upload to BigQuery
-    upload_scores(client, df_scores)
+    if incremental:
+        # Percentile-dependent columns above are relative to the changed subset;
+        # rebuild them over the full score column once the merge lands
+        incremental_scoring.merge_scores(client, df_scores, scores_table, features_table, SCORES_SCHEMA,
+                                         model_version=MODEL_VERSION)
+        recomputed = incremental_scoring.recompute_percentiles(
+            client, scores_table, derive_percentile_columns, SCORES_SCHEMA,
+            read_columns=['shap_top1_feature_id', 'shap_top1_value']
+        )
+        df_scores = df_scores.drop(columns=['v4_percentile', 'v4_deprioritize', 'v4_upgrade_candidate', 'narrative_template_id'])
+        df_scores = df_scores.merge(recomputed, on='crd', how='left')
+        shap_results['narrative_template_id'] = df_scores['narrative_template_id'].tolist()
+    else:
+        # Upload to BigQuery
+        upload_scores(client, df_scores)
+    publish_narratives(client, feature_list)
+    score_history.record_run(client, scores_table)
     
     # Summary
     print("\n" + "=" * 70)
@@ -949,7 +1043,7 @@ def main():
     print("=" * 70)
     print(f"Total prospects scored: {len(df_scores):,}")
     print(f"V4 Upgrade candidates (>={V4_UPGRADE_PERCENTILE}%): {df_scores['v4_upgrade_candidate'].sum():,}")
-    print(f"V4 narratives generated: {sum(1 for n in shap_results['v4_narrative'] if n is not None):,}")
+    print(f"V4 narratives generated: {sum(1 for n in shap_results['narrative_template_id'] if pd.notna(n)):,}")
     print(f"Score range: {df_scores['v4_score'].min():.4f} - {df_scores['v4_score'].max():.4f}")
     print(f"Mean score: {df_scores['v4_score'].mean():.4f}")
     
@@ -964,13 +1058,15 @@ def main():
     print(f"Unique top-1 features: {unique_top1}")
     print(f"Total leads: {len(df_scores):,}")
     
-    if unique_top1 < 3:
+    if incremental:
+        print("[INFO] Incremental run - diversity gate applies to full re-scores only")
+    elif unique_top1 < 3:
         print(f"\n[ERROR] SHAP HOMOGENEITY BUG DETECTED!")
         print(f"Only {unique_top1} unique top-1 features across all leads.")
         print(f"This indicates per-lead SHAP extraction failed.")
         raise ValueError("SHAP homogeneity bug: All leads have identical top features!")
     
-    if unique_top1 < 10:
+    if not incremental and unique_top1 < 10:
         print(f"\n[WARNING] Low SHAP diversity: Only {unique_top1} unique top-1 features.")
         print(f"Expected at least 10+ for meaningful personalization.")
     
@@ -998,13 +1094,13 @@ def main():
         f.write(f"**Results:**\n")
         f.write(f"- Total scored: {len(df_scores):,}\n")
         f.write(f"- V4 upgrade candidates: {df_scores['v4_upgrade_candidate'].sum():,}\n")
-        f.write(f"- V4 narratives generated: {sum(1 for n in shap_results['v4_narrative'] if n is not None):,}\n")
+        f.write(f"- V4 narratives generated: {sum(1 for n in shap_results['narrative_template_id'] if pd.notna(n)):,}\n")
         f.write(f"- Score range: {df_scores['v4_score'].min():.4f} - {df_scores['v4_score'].max():.4f}\n")
         f.write(f"\n**New Columns:**\n")
-        f.write(f"- `shap_top1/2/3_feature`: Top 3 SHAP features\n")
+        f.write(f"- `shap_top1/2/3_feature_id`: Top 3 SHAP features (rendered as `shap_top1/2/3_feature` by the view)\n")
         f.write(f"- `shap_top1/2/3_value`: SHAP values for those features\n")
-        f.write(f"- `v4_narrative`: Human-readable narrative for V4 upgrades\n")
-        f.write(f"\n**Table Updated**: `{PROJECT_ID}.{DATASET}.{SCORES_TABLE}`\n\n")
+        f.write(f"- `narrative_template_id`: V4 upgrade narrative template (rendered as `v4_narrative` by the view)\n")
+        f.write(f"\n**Table Updated**: `{PROJECT_ID}.{DATASET}.{SCORES_TABLE}` (view: `{VIEW_TABLE}`)\n\n")
         f.write("---\n\n")
     
     print(f"[INFO] Logged to {log_file}")
@@ -1014,4 +1110,11 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Score prospects with V4.2.0 model')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Score only new/changed prospects and merge into the scores table')
+    args = parser.parse_args()
+    
+    main(incremental=args.incremental)
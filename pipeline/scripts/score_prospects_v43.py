@@ -10,6 +10,16 @@ Changes from V4.2.0:
 - Uses gain-based feature importance for narratives (same as V4.2.0)
 - Note: SHAP base_score parsing bug deferred to V4.4.0 (XGBoost/SHAP compatibility issue)
 
+Narratives are dictionary-encoded (see narrative_encoding.py): scores are
+written to v4_prospect_scores_encoded with template / feature ids, and the
+v4_prospect_scores view renders shap_top*_feature, shap_top*_direction and
+v4_narrative on read. Every run is also appended to the v4_score_history
+table (see score_history.py).
+
+The full per-feature contributions (TreeSHAP, log-odds) of every prospect
+are written to the local contribution store (see contribution_store.py),
+so full explanations and top-k for any k need no re-score.
+
 Author: Lead Scoring Team
 Date: 2026-01-08
 """
@@ -18,10 +28,23 @@ import pandas as pd
 import numpy as np
 import xgboost as xgb
 import json
+import sys
 from pathlib import Path
 from google.cloud import bigquery
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from v3.utils.warehouse import get_client
+
+import contribution_store
+import incremental_scoring
+import narrative_encoding
+import score_history
+
+MODEL_VERSION = 'V4.3.1'
+OUTPUT_TABLE = 'savvy-gtm-analytics.ml_features.v4_prospect_scores_encoded'
+VIEW_TABLE = 'savvy-gtm-analytics.ml_features.v4_prospect_scores'
+
 # Feature columns (must match training - same order as train_model_v43.py)
 FEATURE_COLUMNS_V43 = [
     # Original V4 features (12)
@@ -136,6 +159,55 @@ FEATURE_DESCRIPTIONS = {
 }
 
 
+# Output schema for v4_prospect_scores_encoded (rendered by the v4_prospect_scores view)
+SCORES_SCHEMA_V43 = [
+    bigquery.SchemaField('crd', 'INTEGER'),
+    bigquery.SchemaField('prediction_date', 'DATE'),
+    bigquery.SchemaField('v4_score', 'FLOAT'),
+    bigquery.SchemaField('v4_percentile', 'INTEGER'),
+    bigquery.SchemaField('cc_is_in_move_window', 'INTEGER'),
+    bigquery.SchemaField('cc_is_too_early', 'INTEGER'),
+    bigquery.SchemaField('v4_deprioritize', 'BOOLEAN'),
+    bigquery.SchemaField('v4_upgrade_candidate', 'BOOLEAN'),
+    bigquery.SchemaField('shap_top1_feature_id', 'INTEGER'),
+    bigquery.SchemaField('shap_top1_value', 'FLOAT'),
+    bigquery.SchemaField('shap_top1_positive', 'BOOLEAN'),
+    bigquery.SchemaField('shap_top2_feature_id', 'INTEGER'),
+    bigquery.SchemaField('shap_top2_value', 'FLOAT'),
+    bigquery.SchemaField('shap_top2_positive', 'BOOLEAN'),
+    bigquery.SchemaField('shap_top3_feature_id', 'INTEGER'),
+    bigquery.SchemaField('shap_top3_value', 'FLOAT'),
+    bigquery.SchemaField('shap_top3_positive', 'BOOLEAN'),
+    bigquery.SchemaField('narrative_template_id', 'INTEGER'),
+    bigquery.SchemaField('model_version', 'STRING'),
+    bigquery.SchemaField('narrative_method', 'STRING'),
+    bigquery.SchemaField('scored_at', 'TIMESTAMP'),
+    bigquery.SchemaField(incremental_scoring.FINGERPRINT_COLUMN, 'INTEGER'),
+]
+
+
+def derive_percentile_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compute population-relative columns from the full score column.
+    
+    Used by both the full run and the incremental final pass so the two
+    produce identical percentiles and flags.
+    
+    Args:
+        df: DataFrame with crd and v4_score for every scored prospect
+    
+    Returns:
+        DataFrame with crd, v4_percentile, v4_deprioritize, v4_upgrade_candidate
+    """
+    predictions = df['v4_score'].values
+    return pd.DataFrame({
+        'crd': df['crd'].values,
+        'v4_percentile': pd.qcut(predictions, 100, labels=False, duplicates='drop') + 1,
+        'v4_deprioritize': predictions < np.percentile(predictions, 20),
+        'v4_upgrade_candidate': predictions >= np.percentile(predictions, 80),
+    })
+
+
 def generate_gain_narrative(
     feature_values: pd.Series,
     feature_importance: dict,
@@ -152,7 +224,7 @@ def generate_gain_narrative(
         top_n: Number of top features to include
     
     Returns:
-        Dictionary with narrative and top features
+        Dictionary with narrative, its narrative_template_id and top features
     """
     # Create feature-contribution pairs
     contributions = []
@@ -257,6 +329,7 @@ def generate_gain_narrative(
     
     return {
         'narrative': ". ".join(narrative_parts) if narrative_parts else "Standard lead profile",
+        'template_id': narrative_encoding.gain_template_id(len(narrative_parts)),
         'top1_feature': top_contributions[0]['feature'] if len(top_contributions) > 0 else None,
         'top1_importance': round(top_contributions[0]['importance'], 4) if len(top_contributions) > 0 else None,
         'top1_direction': top_contributions[0]['direction'] if len(top_contributions) > 0 else None,
@@ -269,12 +342,48 @@ def generate_gain_narrative(
     }
 
 
+def update_contribution_store(
+    client,
+    model,
+    df: pd.DataFrame,
+    contributions: np.ndarray,
+    features_table: str,
+    output_table: str,
+    incremental: bool,
+    directory: str = None
+) -> contribution_store.ContributionStore:
+    """
+    Persist the run's contributions. Incremental runs carry unchanged
+    prospects over from the existing store and drop departed ones; without
+    a store for this model version, contributions are computed for all
+    prospects.
+    """
+    previous, current_crds = None, None
+    if incremental and contribution_store.ContributionStore.exists(directory):
+        previous = contribution_store.ContributionStore(directory)
+        if previous.model_version != MODEL_VERSION or previous.features != FEATURE_COLUMNS_V43:
+            previous.close()
+            previous = None
+    if incremental and previous is None:
+        print("  [WARNING] No contribution store for this model version - computing it for all prospects")
+        df = client.query(f"SELECT crd, {', '.join(FEATURE_COLUMNS_V43)} FROM `{features_table}`").to_dataframe()
+        contributions = contribution_store.compute_contributions(model, df[FEATURE_COLUMNS_V43])
+    elif incremental:
+        current_crds = client.query(f"SELECT crd FROM `{output_table}`").to_dataframe()['crd']
+    return contribution_store.write_store(
+        df['crd'], contributions, FEATURE_COLUMNS_V43, MODEL_VERSION, directory, previous, current_crds
+    )
+
+
 def score_prospects_v43(
     model_dir: str = "v4/models/v4.3.1",
     features_table: str = "savvy-gtm-analytics.ml_features.v4_prospect_features",
-    output_table: str = "savvy-gtm-analytics.ml_features.v4_prospect_scores",
+    output_table: str = OUTPUT_TABLE,
+    view_table: str = VIEW_TABLE,
     project_id: str = "savvy-gtm-analytics",
-    batch_size: int = 10000
+    batch_size: int = 10000,
+    incremental: bool = False,
+    contributions_dir: str = None
 ):
     """
     Score all prospects with V4.3.1 model and generate gain-based narratives.
@@ -285,9 +394,16 @@ def score_prospects_v43(
     Args:
         model_dir: Directory containing V4.3.0 model artifacts
         features_table: BigQuery table with prospect features
-        output_table: BigQuery table for scores output
+        output_table: BigQuery table for the (narrative-encoded) scores
+        view_table: View rendering output_table with the original
+            shap_top*_feature / shap_top*_direction / v4_narrative columns
         project_id: GCP project ID
         batch_size: Number of prospects to score per batch
+        incremental: Only score new/changed prospects and merge them into
+            output_table (falls back to a full re-score when the stored
+            scores come from another model version)
+        contributions_dir: Contribution store directory (default:
+            $LEAD_SCORING_CONTRIBUTIONS_DIR or .cache/contributions)
     """
     
     print("=" * 70)
@@ -309,17 +425,31 @@ def score_prospects_v43(
     
     # Load prospect features
     print("\n[3/5] Loading prospect features...")
-    client = bigquery.Client(project=project_id)
-    
-    query = f"""
-    SELECT 
-        crd,
-        prediction_date,
-        {', '.join(FEATURE_COLUMNS_V43)}
-    FROM `{features_table}`
-    """
+    client = get_client(project_id)
+    
+    if incremental:
+        incremental = incremental_scoring.can_score_incrementally(client, output_table, MODEL_VERSION)
     
-    df = client.query(query).to_dataframe()
+    if incremental:
+        print("  Mode: INCREMENTAL (new/changed prospects only)")
+        df = incremental_scoring.fetch_changed_features(
+            client,
+            features_table,
+            output_table,
+            FEATURE_COLUMNS_V43,
+            select_columns=['crd', 'prediction_date'] + FEATURE_COLUMNS_V43
+        )
+    else:
+        print("  Mode: FULL re-score")
+        query = f"""
+        SELECT 
+            f.crd,
+            f.prediction_date,
+            {', '.join(f'f.{col}' for col in FEATURE_COLUMNS_V43)},
+            {incremental_scoring.fingerprint_sql(FEATURE_COLUMNS_V43)} AS {incremental_scoring.FINGERPRINT_COLUMN}
+        FROM `{features_table}` f
+        """
+        df = client.query(query).to_dataframe()
     print(f"  Loaded {len(df):,} prospects")
     
     # Score prospects
@@ -328,9 +458,12 @@ def score_prospects_v43(
     X = df[FEATURE_COLUMNS_V43]
     
     # Get predictions
-    predictions = model.predict_proba(X)[:, 1]
+    predictions = model.predict_proba(X)[:, 1] if len(df) > 0 else np.array([])
     print(f"  Scored {len(predictions):,} prospects")
     
+    print("  Computing per-feature contributions...")
+    contributions = contribution_store.compute_contributions(model, X)
+    
     # Generate narratives using gain-based importance
     print("  Generating gain-based narratives...")
     narratives = []
@@ -350,73 +483,84 @@ def score_prospects_v43(
         'crd': df['crd'],
         'prediction_date': df['prediction_date'],
         'v4_score': predictions,
-        'v4_percentile': pd.qcut(predictions, 100, labels=False, duplicates='drop') + 1,
         
         # Career Clock features for transparency
         'cc_is_in_move_window': df['cc_is_in_move_window'],
         'cc_is_too_early': df['cc_is_too_early'],
         
-        # Flags
-        'v4_deprioritize': predictions < np.percentile(predictions, 20),
-        'v4_upgrade_candidate': predictions >= np.percentile(predictions, 80),
-        
-        # Gain-based narratives (V4.3.0 uses gain-based, SHAP deferred to V4.4.0)
-        'shap_top1_feature': [n['top1_feature'] for n in narratives],
+        # Gain-based narratives (V4.3.0 uses gain-based, SHAP deferred to V4.4.0),
+        # stored as template / feature ids and rendered by the view
+        'shap_top1_feature_id': narrative_encoding.feature_ids([n['top1_feature'] for n in narratives]).values,
         'shap_top1_value': [n['top1_importance'] for n in narratives],  # Using importance for gain-based
-        'shap_top1_direction': [n['top1_direction'] for n in narratives],
-        'shap_top2_feature': [n['top2_feature'] for n in narratives],
+        'shap_top1_positive': pd.array([None if n['top1_direction'] is None else n['top1_direction'] == 'positive'
+                                          for n in narratives], dtype='boolean'),
+        'shap_top2_feature_id': narrative_encoding.feature_ids([n['top2_feature'] for n in narratives]).values,
         'shap_top2_value': [n['top2_importance'] for n in narratives],  # Using importance for gain-based
-        'shap_top2_direction': [n['top2_direction'] for n in narratives],
-        'shap_top3_feature': [n['top3_feature'] for n in narratives],
+        'shap_top2_positive': pd.array([None if n['top2_direction'] is None else n['top2_direction'] == 'positive'
+                                          for n in narratives], dtype='boolean'),
+        'shap_top3_feature_id': narrative_encoding.feature_ids([n['top3_feature'] for n in narratives]).values,
         'shap_top3_value': [n['top3_importance'] for n in narratives],  # Using importance for gain-based
-        'shap_top3_direction': [n['top3_direction'] for n in narratives],
-        'v4_narrative': [n['narrative'] for n in narratives],
+        'shap_top3_positive': pd.array([None if n['top3_direction'] is None else n['top3_direction'] == 'positive'
+                                          for n in narratives], dtype='boolean'),
+        'narrative_template_id': pd.array([n['template_id'] for n in narratives], dtype='Int64'),
         
         # Metadata
-        'model_version': 'V4.3.1',
+        'model_version': MODEL_VERSION,
         'narrative_method': 'gain-based',  # Note: SHAP deferred to V4.4.0
         'scored_at': datetime.now(),
+        incremental_scoring.FINGERPRINT_COLUMN: df[incremental_scoring.FINGERPRINT_COLUMN],
     })
     
-    # Upload to BigQuery
-    print(f"  Uploading {len(output_df):,} scores to BigQuery...")
-    
-    job_config = bigquery.LoadJobConfig(
-        write_disposition='WRITE_TRUNCATE',
-        schema=[
-            bigquery.SchemaField('crd', 'INTEGER'),
-            bigquery.SchemaField('prediction_date', 'DATE'),
-            bigquery.SchemaField('v4_score', 'FLOAT'),
-            bigquery.SchemaField('v4_percentile', 'INTEGER'),
-            bigquery.SchemaField('cc_is_in_move_window', 'INTEGER'),
-            bigquery.SchemaField('cc_is_too_early', 'INTEGER'),
-            bigquery.SchemaField('v4_deprioritize', 'BOOLEAN'),
-            bigquery.SchemaField('v4_upgrade_candidate', 'BOOLEAN'),
-            bigquery.SchemaField('shap_top1_feature', 'STRING'),
-            bigquery.SchemaField('shap_top1_value', 'FLOAT'),
-            bigquery.SchemaField('shap_top1_direction', 'STRING'),
-            bigquery.SchemaField('shap_top2_feature', 'STRING'),
-            bigquery.SchemaField('shap_top2_value', 'FLOAT'),
-            bigquery.SchemaField('shap_top2_direction', 'STRING'),
-            bigquery.SchemaField('shap_top3_feature', 'STRING'),
-            bigquery.SchemaField('shap_top3_value', 'FLOAT'),
-            bigquery.SchemaField('shap_top3_direction', 'STRING'),
-            bigquery.SchemaField('v4_narrative', 'STRING'),
-            bigquery.SchemaField('model_version', 'STRING'),
-            bigquery.SchemaField('narrative_method', 'STRING'),
-            bigquery.SchemaField('scored_at', 'TIMESTAMP'),
-        ]
-    )
+    # Percentiles/flags are population-relative: in incremental mode these are
+    # provisional and get recomputed over the whole score column after the merge
+    if len(output_df) > 0:
+        derived = derive_percentile_columns(output_df)
+        for col in ['v4_percentile', 'v4_deprioritize', 'v4_upgrade_candidate']:
+            output_df[col] = derived[col].values
+    output_df = output_df[[field.name for field in SCORES_SCHEMA_V43]]
+    
+    if incremental:
+        print(f"  Merging {len(output_df):,} scores into BigQuery...")
+        incremental_scoring.merge_scores(client, output_df, output_table, features_table, SCORES_SCHEMA_V43,
+                                         model_version=MODEL_VERSION)
+        print("  Recomputing percentiles over the full score column...")
+        incremental_scoring.recompute_percentiles(
+            client, output_table, derive_percentile_columns, SCORES_SCHEMA_V43
+        )
+    else:
+        # Upload to BigQuery
+        print(f"  Uploading {len(output_df):,} scores to BigQuery...")
+        
+        job_config = bigquery.LoadJobConfig(
+            write_disposition='WRITE_TRUNCATE',
+            schema=SCORES_SCHEMA_V43
+        )
+        
+        job = client.load_table_from_dataframe(output_df, output_table, job_config=job_config)
+        job.result()
     
-    job = client.load_table_from_dataframe(output_df, output_table, job_config=job_config)
-    job.result()
+    narrative_encoding.publish(
+        client, 'gain', FEATURE_DESCRIPTIONS, FEATURE_COLUMNS_V43,
+        output_table, view_table, SCORES_SCHEMA_V43
+    )
+    run_id = score_history.record_run(client, output_table)
+    store = update_contribution_store(
+        client, model, df, contributions, features_table, output_table, incremental, contributions_dir
+    )
     
     print(f"\n  [OK] Scoring complete!")
     print(f"  Output table: {output_table}")
+    print(f"  Narrative view: {view_table}")
+    print(f"  History run: {run_id}")
+    print(f"  Contribution store: {store.directory} ({len(store):,} prospects)")
     print(f"  Total prospects scored: {len(output_df):,}")
     
+    if len(predictions) == 0:
+        return
+    
     # Summary stats
-    print(f"\n  Score Distribution:")
+    label = "Changed-prospect" if incremental else "Score"
+    print(f"\n  {label} Distribution:")
     print(f"    Mean score: {predictions.mean():.4f}")
     print(f"    Median score: {np.median(predictions):.4f}")
     print(f"    Top 10% threshold: {np.percentile(predictions, 90):.4f}")
@@ -438,8 +582,14 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Score prospects with V4.3.1 model')
     parser.add_argument('--model-dir', default=str(default_model_dir))
     parser.add_argument('--features-table', default='savvy-gtm-analytics.ml_features.v4_prospect_features')
-    parser.add_argument('--output-table', default='savvy-gtm-analytics.ml_features.v4_prospect_scores')
+    parser.add_argument('--output-table', default=OUTPUT_TABLE)
+    parser.add_argument('--view-table', default=VIEW_TABLE,
+                        help='View rendering narratives from the encoded output table')
     parser.add_argument('--project', default='savvy-gtm-analytics')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Score only new/changed prospects and merge into the output table')
+    parser.add_argument('--contributions-dir', default=None,
+                        help='Contribution store directory (default: $LEAD_SCORING_CONTRIBUTIONS_DIR or .cache/contributions)')
     
     args = parser.parse_args()
     
@@ -447,5 +597,8 @@ if __name__ == "__main__":
         model_dir=args.model_dir,
         features_table=args.features_table,
         output_table=args.output_table,
-        project_id=args.project
+        view_table=args.view_table,
+        project_id=args.project,
+        incremental=args.incremental,
+        contributions_dir=args.contributions_dir
     )
@@ -0,0 +1,275 @@
+"""
+Multi-Horizon V4.3.1 Score Trajectories
+
+score_prospects_v43.py scores every prospect as of today. Nurture advisors
+(TIER_NURTURE_TOO_EARLY, cc_is_too_early) are parked, but ops cannot see
+when one will become a top-decile prospect. This module scores the same
+feature frame at +1..+H months in one batch:
+
+1. The frame is broadcast into an (H+1, n, f) float32 tensor (horizon 0 is
+   today, identical to score_prospects_v43.py).
+2. The time-dependent features are advanced for every horizon at once,
+   mirroring pipeline/sql/v4_prospect_features.sql:
+       tenure_months, tenure_bucket_encoded, is_recent_mover,
+       days_since_last_move, short_tenure_x_high_mobility
+                                 only when the current-firm tenure is known
+                                 (days_since_last_move != 9999)
+       experience_years,         prior experience (industry minus current-firm
+       is_likely_recent_promotee tenure): constant while the current-firm tenure
+                                 is known; otherwise it is the whole industry
+                                 tenure, so + h/12 (when > 0) and the promotee
+                                 flag clears once it reaches 60 months
+       cc_is_in_move_window /    recomputed from cc_avg_prior_tenure_months and
+       cc_is_too_early           cc_tenure_cv when the frame has them
+       age_bucket_encoded        re-bucketed from age_range (age assumed at
+                                 age_position through the 5-year band)
+   Everything else (firm, mobility, contact data) is held at today's value.
+3. The tensor is flattened to ((H+1) * n, f) and scored with a single
+   predict_proba call per advisor batch.
+
+Cost: the features are fetched once and no narratives are generated, so a
+12-month trajectory for ~300k advisors costs about one scoring run. The
+tree traversal itself is (H+1) times that of one run, a few seconds.
+
+Usage:
+    from score_trajectory import score_trajectories, summarize_trajectories
+
+    traj = score_trajectories(model, features_df, months=12)     # crd, v4_score_m0..v4_score_m12
+    summary = summarize_trajectories(traj, threshold)            # + peak / first top-decile month
+
+CLI:
+    python pipeline/scripts/score_trajectory.py                          # all prospects, 12 months
+    python pipeline/scripts/score_trajectory.py --months 6 --crds-csv nurture.csv
+    python pipeline/scripts/score_trajectory.py --output pipeline/exports/trajectories.csv
+
+Author: Lead Scoring Team
+Date: 2026-10-19
+"""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from score_prospects_v43 import FEATURE_COLUMNS_V43, MODEL_VERSION
+
+PROJECT_ID = "savvy-gtm-analytics"
+FEATURES_TABLE = f"{PROJECT_ID}.ml_features.v4_prospect_features"
+DEFAULT_MODEL_DIR = Path(__file__).resolve().parent.parent.parent / "v4" / "models" / "v4.3.1"
+DEFAULT_MONTHS = 12
+DEFAULT_BATCH_SIZE = 50000      # advisors per predict call (x (H+1) rows)
+
+UNKNOWN_DAYS = 9999             # days_since_last_move when the current-firm start is unknown
+DAYS_PER_MONTH = 365.25 / 12
+PROMOTEE_MONTHS = 60            # is_likely_recent_promotee: prior experience < 5 years
+TOP_DECILE = 90                 # population percentile of the top-decile threshold
+
+# Non-model columns of v4_prospect_features used to advance features
+CONTEXT_COLUMNS = ['cc_avg_prior_tenure_months', 'cc_tenure_cv', 'age_range']
+
+# age_bucket_encoded: lower bound of each bucket's age range (v4_prospect_features.sql)
+AGE_BUCKET_EDGES = np.array([35, 50, 65, 70])
+
+
+def _tenure_bucket(tenure: np.ndarray) -> np.ndarray:
+    """tenure_bucket_encoded for known tenures (5 = zero months)."""
+    bucket = np.digitize(tenure, [12, 24, 48, 120]).astype(np.float32)
+    return np.where(tenure == 0, 5, bucket)
+
+
+def _age_range_start(age_range: pd.Series) -> np.ndarray:
+    """Lower bound of AGE_RANGE ('35-39' -> 35), NaN when unknown."""
+    codes, ranges = pd.factorize(age_range)                         # ~16 distinct ranges: parse each once
+    starts = pd.to_numeric(pd.Series(ranges, dtype='string').str.extract(r'^(\d+)')[0], errors='coerce')
+    starts = np.append(starts.to_numpy(dtype=float), np.nan)
+    return starts[codes]                                            # code -1 (missing) -> NaN
+
+
+def advance_features(frame: pd.DataFrame, months: Sequence[int],
+                     feature_columns: Sequence[str] = FEATURE_COLUMNS_V43,
+                     age_position: float = 0.5) -> np.ndarray:
+    """
+    Feature tensor of the frame advanced by each horizon.
+
+    Args:
+        frame: Rows of v4_prospect_features (model features, optionally CONTEXT_COLUMNS)
+        months: Horizons in months (0 = today)
+        feature_columns: Model feature order
+        age_position: Assumed position within the 5-year AGE_RANGE band (0 = youngest)
+
+    Returns:
+        float32 array of shape (len(months), len(frame), len(feature_columns))
+    """
+    col = {name: i for i, name in enumerate(feature_columns)}
+    base = frame[list(feature_columns)].to_numpy(dtype=np.float32)
+    h = np.asarray(months, dtype=np.float32)[:, None]                       # (H, 1)
+    X = np.repeat(base[None, :, :], len(h), axis=0)                          # (H, n, f)
+
+    days = base[:, col['days_since_last_move']]
+    known = days != UNKNOWN_DAYS
+    tenure = np.where(known, base[:, col['tenure_months']] + h, base[:, col['tenure_months']])
+    X[:, :, col['tenure_months']] = tenure
+    X[:, :, col['tenure_bucket_encoded']] = np.where(known, _tenure_bucket(tenure),
+                                                     base[:, col['tenure_bucket_encoded']])
+    X[:, :, col['days_since_last_move']] = np.where(known, days + np.round(h * DAYS_PER_MONTH), days)
+    X[:, :, col['is_recent_mover']] = known & (tenure <= 12)
+    X[:, :, col['short_tenure_x_high_mobility']] = known & (tenure < 24) & (base[:, col['mobility_3yr']] >= 2)
+
+    # experience_years = GREATEST(INDUSTRY_TENURE_MONTHS - tenure_months, 0) / 12: both grow
+    # together while tenure is known; with no tenure it is the industry tenure itself
+    experience = base[:, col['experience_years']]
+    grows = ~known & (experience > 0)
+    X[:, :, col['experience_years']] = np.where(grows, experience + h / 12, experience)
+    promotee = base[:, col['is_likely_recent_promotee']] == 1
+    X[:, :, col['is_likely_recent_promotee']] = np.where(
+        grows, promotee & (experience * 12 + h < PROMOTEE_MONTHS), promotee)
+
+    if {'cc_avg_prior_tenure_months', 'cc_tenure_cv'} <= set(frame.columns):
+        avg = frame['cc_avg_prior_tenure_months'].to_numpy(dtype=float)
+        cv = frame['cc_tenure_cv'].to_numpy(dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pct = np.where(known & (avg > 0), tenure / avg, np.nan)
+        pattern = cv < 0.5                                                   # NaN compares False
+        X[:, :, col['cc_is_in_move_window']] = pattern & (pct >= 0.7) & (pct <= 1.3)
+        X[:, :, col['cc_is_too_early']] = pattern & (pct < 0.7)
+    else:
+        print("[WARNING] No cc_avg_prior_tenure_months / cc_tenure_cv in frame - Career Clock flags held constant")
+
+    if 'age_range' in frame.columns:
+        start = _age_range_start(frame['age_range'])
+        age = start + 5 * age_position + h / 12
+        advanced = np.digitize(age, AGE_BUCKET_EDGES).astype(np.float32)
+        # Unknown / unmatched ranges keep their encoded default (2)
+        X[:, :, col['age_bucket_encoded']] = np.where(np.isnan(start), base[:, col['age_bucket_encoded']], advanced)
+    else:
+        print("[WARNING] No age_range in frame - age_bucket_encoded held constant")
+    # Today is scored exactly as score_prospects_v43.py does
+    X[h[:, 0] == 0] = base
+    return X
+
+
+def score_trajectories(model, frame: pd.DataFrame, months: int = DEFAULT_MONTHS,
+                       batch_size: int = DEFAULT_BATCH_SIZE, age_position: float = 0.5) -> pd.DataFrame:
+    """
+    Score every advisor in the frame today and at +1..+months months.
+
+    Args:
+        model: Loaded V4.3.1 XGBClassifier
+        frame: v4_prospect_features rows (crd + model features, optionally CONTEXT_COLUMNS)
+        months: Last horizon
+        batch_size: Advisors per predict call (memory: batch_size x (months+1) x 26 x 4 bytes)
+        age_position: See advance_features()
+
+    Returns:
+        DataFrame with crd and v4_score_m0 .. v4_score_m{months}
+    """
+    horizons = list(range(months + 1))
+    scores = np.empty((len(frame), len(horizons)), dtype=np.float64)
+    for start in range(0, len(frame), batch_size):
+        chunk = frame.iloc[start:start + batch_size]
+        X = advance_features(chunk, horizons, FEATURE_COLUMNS_V43, age_position)
+        flat = X.reshape(-1, X.shape[-1])                                    # horizon-major rows
+        proba = model.predict_proba(flat)[:, 1] if len(flat) else np.array([])
+        scores[start:start + len(chunk)] = proba.reshape(len(horizons), len(chunk)).T
+    out = pd.DataFrame(scores, columns=[f"v4_score_m{h}" for h in horizons])
+    out.insert(0, 'crd', frame['crd'].to_numpy())
+    return out
+
+
+def summarize_trajectories(trajectories: pd.DataFrame, threshold: float) -> pd.DataFrame:
+    """
+    Add peak and first-crossing columns to score_trajectories() output.
+
+    Args:
+        trajectories: crd + v4_score_m* columns
+        threshold: Score a prospect must reach (e.g. today's top-decile cut-off)
+
+    Returns:
+        The trajectories plus peak_score, peak_month and first_top_decile_month
+        (0 = already there, <NA> = not within the horizon)
+    """
+    score_cols = [c for c in trajectories.columns if c.startswith('v4_score_m')]
+    scores = trajectories[score_cols].to_numpy()
+    reached = scores >= threshold
+    out = trajectories.copy()
+    out['peak_score'] = scores.max(axis=1)
+    out['peak_month'] = scores.argmax(axis=1)
+    out['first_top_decile_month'] = pd.Series(reached.argmax(axis=1), dtype='Int64').where(reached.any(axis=1))
+    return out
+
+
+def fetch_features(client, features_table: str = FEATURES_TABLE,
+                   crds: Optional[Iterable[int]] = None) -> pd.DataFrame:
+    """Model features plus whichever CONTEXT_COLUMNS the features table has."""
+    available = {f.name for f in client.get_table(features_table).schema}
+    columns = ['crd'] + list(FEATURE_COLUMNS_V43) + [c for c in CONTEXT_COLUMNS if c in available]
+    where = ""
+    if crds is not None:
+        where = f"\nWHERE crd IN UNNEST([{','.join(str(int(c)) for c in crds)}])"
+    return client.query(f"SELECT {', '.join(columns)}\nFROM `{features_table}`{where}").to_dataframe()
+
+
+def _read_crds(path: Path) -> List[int]:
+    df = pd.read_csv(path, dtype=str)
+    column = next((c for c in df.columns if c.lower() == 'crd'), None)
+    if column is None:
+        raise SystemExit(f"CSV must have a 'crd' column. Found: {list(df.columns)}")
+    return pd.to_numeric(df[column], errors='coerce').dropna().astype('int64').unique().tolist()
+
+
+def main():
+    import argparse
+    import time
+    import xgboost as xgb
+    from v3.utils.warehouse import get_client
+
+    parser = argparse.ArgumentParser(description='Score V4.3.1 trajectories over the next N months')
+    parser.add_argument('--model-dir', default=str(DEFAULT_MODEL_DIR))
+    parser.add_argument('--features-table', default=FEATURES_TABLE)
+    parser.add_argument('--months', type=int, default=DEFAULT_MONTHS, help=f'Horizon (default: {DEFAULT_MONTHS})')
+    parser.add_argument('--crds-csv', type=Path, default=None,
+                        help='Only output these CRDs (the top-decile threshold still uses all prospects)')
+    parser.add_argument('--age-position', type=float, default=0.5,
+                        help='Assumed position within the 5-year age band, 0-1 (default: 0.5)')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--output', type=Path, default=None,
+                        help='Output CSV (default: pipeline/exports/v4_trajectories_YYYYMMDD.csv)')
+    parser.add_argument('--project', default=PROJECT_ID)
+    args = parser.parse_args()
+
+    model = xgb.XGBClassifier()
+    model.load_model(str(Path(args.model_dir) / "v4.3.1_model.json"))
+    client = get_client(args.project)
+
+    print(f"[INFO] Loading features from {args.features_table}...")
+    features = fetch_features(client, args.features_table)
+    print(f"[INFO] Loaded {len(features):,} prospects")
+
+    start = time.perf_counter()
+    trajectories = score_trajectories(model, features, args.months, args.batch_size, args.age_position)
+    print(f"[INFO] Scored {len(trajectories):,} prospects x {args.months + 1} horizons "
+          f"in {time.perf_counter() - start:.1f}s ({MODEL_VERSION})")
+
+    threshold = float(np.percentile(trajectories['v4_score_m0'], TOP_DECILE))
+    summary = summarize_trajectories(trajectories, threshold)
+    if args.crds_csv:
+        summary = summary[summary['crd'].isin(_read_crds(args.crds_csv))]
+
+    became = summary['first_top_decile_month'].fillna(0) > 0
+    print(f"[INFO] Top-decile threshold (today): {threshold:.4f}")
+    print(f"[INFO] Reach the top decile within {args.months} months: {int(became.sum()):,} of {len(summary):,}")
+
+    output = args.output or (Path(__file__).resolve().parent.parent / "exports" /
+                             f"v4_trajectories_{datetime.now():%Y%m%d}.csv")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    summary.to_csv(output, index=False)
+    print(f"[INFO] Wrote {len(summary):,} rows to {output}")
+
+
+if __name__ == "__main__":
+    main()
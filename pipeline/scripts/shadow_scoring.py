@@ -0,0 +1,260 @@
+"""
+Shadow / Champion-Challenger Scoring of Registered V4 Models in One Pass
+
+Comparing V4 versions used to mean running each version's scoring script,
+and each one re-read the prospect feature table. This module:
+
+1. Loads N registered models (v4/models/<version>/) and reads each model's
+   feature list from its saved booster (v4.1.0_r3: 22, v4.2.0: 23,
+   v4.3.0: 25, v4.3.1: 26 features).
+2. Reads the feature table ONCE (cached locally through DatasetCache) for
+   the UNION of their columns, into one float32 matrix. Union columns are
+   ordered so each model's features form a contiguous block where possible
+   (the V4 lists are nested prefixes), so every model scores from a column
+   VIEW of the same matrix with Booster.inplace_predict - no per-model copy.
+3. Emits per-model scores and percentiles side by side, plus rank-agreement
+   statistics of every challenger against the champion.
+
+A challenger in shadow therefore costs one extra predict call.
+
+Each model is scored the way its production script scores it:
+- v4.3.x (score_prospects_v43.py, XGBClassifier.predict_proba): trees up to
+  best_iteration, missing values passed through as missing
+- v4.2.0 / v4.1.0_r3 (score_prospects_monthly.py, Booster.predict): all
+  trees, missing values filled with 0
+
+Percentiles match derive_percentile_columns in score_prospects_v43.py:
+qcut(score, 100) + 1 over the scored population.
+
+Usage:
+    from pipeline.scripts.shadow_scoring import load_shadow_models, score_models
+
+    models = load_shadow_models(['v4.3.1', 'v4.3.0'])
+    scores = score_models(features_df, models)
+    agreement = rank_agreement(scores, champion='v4.3.1')
+
+CLI:
+    python pipeline/scripts/shadow_scoring.py                                  # all V4 versions
+    python pipeline/scripts/shadow_scoring.py --models v4.3.1 v4.2.0 --output shadow.csv
+    python pipeline/scripts/shadow_scoring.py --input-csv features.csv --champion v4.3.0
+
+Author: Lead Scoring Team
+Date: 2026-10-19
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from scipy import stats
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from v3.utils.dataset_cache import DatasetCache
+
+PROJECT_ID = "savvy-gtm-analytics"
+FEATURES_TABLE = "savvy-gtm-analytics.ml_features.v4_prospect_features"
+MODELS_DIR = Path(__file__).resolve().parent.parent.parent / "v4" / "models"
+
+# Scoring setup per registered version (first entry is the default champion).
+# model: artifact paths tried in order; best_iteration: honour early stopping
+# like XGBClassifier; fill_missing: fillna(0) like score_prospects_monthly.py
+SHADOW_MODELS = {
+    'v4.3.1': {'model': ['v4.3.1/v4.3.1_model.json'], 'best_iteration': True, 'fill_missing': False},
+    'v4.3.0': {'model': ['v4.3.0/v4.3.0_model.json'], 'best_iteration': True, 'fill_missing': False},
+    'v4.2.0': {'model': ['v4.2.0/model.json'], 'best_iteration': False, 'fill_missing': True},
+    'v4.1.0_r3': {'model': ['v4.1.0_r3/model_fixed.json', 'v4.1.0_r3/model.json'],
+                  'best_iteration': False, 'fill_missing': True},
+}
+
+TOP_PERCENTILE = 90          # top decile: v4_percentile > 90
+DEPRIORITIZE_PERCENTILE = 20  # bottom 20%: v4_percentile <= 20
+
+
+class ShadowModel:
+    """A registered model with its feature list and production scoring settings."""
+
+    def __init__(self, version: str, models_dir: Path = MODELS_DIR):
+        if version not in SHADOW_MODELS:
+            raise ValueError(f"Unknown model version '{version}' (known: {list(SHADOW_MODELS)})")
+        spec = SHADOW_MODELS[version]
+        paths = [Path(models_dir) / p for p in spec['model']]
+        path = next((p for p in paths if p.exists()), None)
+        if path is None:
+            raise FileNotFoundError(f"No model artifact for {version}: tried {[str(p) for p in paths]}")
+
+        self.version = version
+        self.path = path
+        self.booster = xgb.Booster()
+        self.booster.load_model(str(path))
+        self.features = list(self.booster.feature_names)
+        self.fill_missing = spec['fill_missing']
+        best = self.booster.attr('best_iteration')
+        self.iteration_range = (0, int(best) + 1) if spec['best_iteration'] and best is not None else (0, 0)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Probabilities for a (rows x self.features) matrix or column view."""
+        if self.fill_missing and np.isnan(X).any():
+            X = np.nan_to_num(X, nan=0.0)
+        return self.booster.inplace_predict(X, iteration_range=self.iteration_range, validate_features=False)
+
+
+def load_shadow_models(versions: Optional[Sequence[str]] = None, models_dir: Path = MODELS_DIR) -> List[ShadowModel]:
+    """Load the given versions (default: every entry of SHADOW_MODELS)."""
+    return [ShadowModel(v, models_dir) for v in (versions or list(SHADOW_MODELS))]
+
+
+def union_columns(models: Sequence[ShadowModel]) -> List[str]:
+    """
+    Union of the models' features, longest list first, then new columns in
+    first-seen order. Nested feature lists become prefixes of the union.
+    """
+    columns = []
+    for model in sorted(models, key=lambda m: -len(m.features)):
+        columns += [f for f in model.features if f not in columns]
+    return columns
+
+
+def _column_view(X: np.ndarray, positions: List[int]) -> np.ndarray:
+    """Contiguous column range -> view; otherwise a gathered copy."""
+    start = positions[0]
+    if positions == list(range(start, start + len(positions))):
+        return X[:, start:start + len(positions)]
+    return X[:, positions]
+
+
+def build_feature_matrix(df: pd.DataFrame, columns: Sequence[str]) -> np.ndarray:
+    """One float32 matrix of the union columns (NaN for NULL)."""
+    missing = [c for c in columns if c not in df.columns]
+    if missing:
+        raise KeyError(f"Feature table is missing columns: {missing}")
+    return df[list(columns)].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float32, na_value=np.nan)
+
+
+def percentiles(scores: np.ndarray) -> np.ndarray:
+    """1-100 population percentile (same as derive_percentile_columns)."""
+    return pd.qcut(scores, 100, labels=False, duplicates='drop') + 1
+
+
+def score_models(df: pd.DataFrame, models: Sequence[ShadowModel], id_column: str = 'crd') -> pd.DataFrame:
+    """
+    Score every model from one shared feature matrix.
+
+    Returns:
+        DataFrame with id_column plus <version>_score and <version>_percentile
+        per model (models in the given order)
+    """
+    columns = union_columns(models)
+    X = build_feature_matrix(df, columns)
+    position = {c: i for i, c in enumerate(columns)}
+
+    out = pd.DataFrame({id_column: df[id_column].values}) if id_column in df.columns else pd.DataFrame(index=df.index)
+    for model in models:
+        scores = model.predict(_column_view(X, [position[f] for f in model.features]))
+        out[f'{model.version}_score'] = scores
+        out[f'{model.version}_percentile'] = percentiles(scores) if len(scores) else []
+    return out
+
+
+def rank_agreement(scores: pd.DataFrame, champion: str) -> pd.DataFrame:
+    """
+    Agreement of every challenger with the champion.
+
+    Returns:
+        One row per challenger: spearman, kendall_tau, top_decile_overlap
+        (share of the champion's top decile also in the challenger's),
+        bottom_20_overlap, mean_abs_percentile_shift, share_shift_gt_20
+        (leads moving more than 20 percentiles), mean_score
+    """
+    versions = [c[:-len('_score')] for c in scores.columns if c.endswith('_score')]
+    if champion not in versions:
+        raise ValueError(f"Champion '{champion}' was not scored (scored: {versions})")
+
+    champ_score = scores[f'{champion}_score'].to_numpy()
+    champ_pct = scores[f'{champion}_percentile'].to_numpy()
+    champ_top = champ_pct > TOP_PERCENTILE
+    champ_bottom = champ_pct <= DEPRIORITIZE_PERCENTILE
+    champ_rank = stats.rankdata(champ_score)
+
+    rows = []
+    for version in versions:
+        score = scores[f'{version}_score'].to_numpy()
+        pct = scores[f'{version}_percentile'].to_numpy()
+        shift = np.abs(pct - champ_pct)
+        rows.append({
+            'model': version,
+            'role': 'champion' if version == champion else 'challenger',
+            'spearman': float(np.corrcoef(champ_rank, stats.rankdata(score))[0, 1]),
+            'kendall_tau': float(stats.kendalltau(champ_score, score)[0]),
+            'top_decile_overlap': float((champ_top & (pct > TOP_PERCENTILE)).sum() / max(champ_top.sum(), 1)),
+            'bottom_20_overlap': float((champ_bottom & (pct <= DEPRIORITIZE_PERCENTILE)).sum() / max(champ_bottom.sum(), 1)),
+            'mean_abs_percentile_shift': float(shift.mean()),
+            'share_shift_gt_20': float((shift > 20).mean()),
+            'mean_score': float(score.mean()),
+        })
+    return pd.DataFrame(rows)
+
+
+def features_query(columns: Sequence[str], features_table: str = FEATURES_TABLE) -> str:
+    """Single read of the union columns from the prospect feature table."""
+    return f"""
+SELECT
+    f.crd,
+    {', '.join(f'f.{col}' for col in columns)}
+FROM `{features_table}` f
+"""
+
+
+def main(versions: Optional[Sequence[str]] = None, champion: Optional[str] = None,
+         features_table: str = FEATURES_TABLE, input_csv: Optional[str] = None,
+         output_path: Optional[str] = None, refresh: bool = False):
+    print("=" * 70)
+    print("SHADOW SCORING (CHAMPION / CHALLENGER)")
+    print("=" * 70)
+
+    models = load_shadow_models(versions)
+    champion = champion or models[0].version
+    columns = union_columns(models)
+    for model in models:
+        print(f"[INFO] {model.version}: {len(model.features)} features from {model.path.name}"
+              f"{' (champion)' if model.version == champion else ''}")
+    print(f"[INFO] Union feature matrix: {len(columns)} columns")
+
+    if input_csv:
+        df = pd.read_csv(input_csv)
+    else:
+        df = DatasetCache(project_id=PROJECT_ID).query(features_query(columns, features_table), refresh=refresh)
+    print(f"[INFO] Loaded {len(df):,} prospects")
+
+    start = time.perf_counter()
+    scores = score_models(df, models)
+    print(f"[INFO] Scored {len(models)} models in {time.perf_counter() - start:.2f}s")
+
+    agreement = rank_agreement(scores, champion)
+    print("\nRank agreement vs champion:")
+    print(agreement.to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+
+    if output_path:
+        scores.to_csv(output_path, index=False)
+        agreement_path = Path(output_path).with_name(Path(output_path).stem + '_agreement.csv')
+        agreement.to_csv(agreement_path, index=False)
+        print(f"\n[INFO] Saved: {output_path}")
+        print(f"[INFO] Saved: {agreement_path}")
+    return scores, agreement
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Score several registered V4 models from one feature read')
+    parser.add_argument('--models', nargs='+', default=None, choices=list(SHADOW_MODELS),
+                        help='Versions to score (default: all; first is the champion)')
+    parser.add_argument('--champion', default=None, help='Champion version (default: first of --models)')
+    parser.add_argument('--features-table', default=FEATURES_TABLE)
+    parser.add_argument('--input-csv', default=None, help='Score a local feature CSV instead of BigQuery')
+    parser.add_argument('--output', default=None, help='Per-lead scores CSV (agreement saved alongside)')
+    parser.add_argument('--refresh', action='store_true', help='Re-download the feature table')
+    args = parser.parse_args()
+    main(args.models, args.champion, args.features_table, args.input_csv, args.output, args.refresh)
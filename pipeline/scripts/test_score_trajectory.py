@@ -0,0 +1,60 @@
+"""
+Checks for score_trajectory.advance_features().
+
+experience_years and is_likely_recent_promotee are prior experience
+(industry minus current-firm tenure) in v4_prospect_features.sql, so they
+must not move for advisors whose current-firm tenure is known.
+
+Run: python pipeline/scripts/test_score_trajectory.py   (or pytest)
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from score_trajectory import FEATURE_COLUMNS_V43, UNKNOWN_DAYS, advance_features
+
+MONTHS = list(range(13))
+
+
+def _frame() -> pd.DataFrame:
+    """Two known-tenure advisors (one promotee) and two unknown-tenure advisors."""
+    df = pd.DataFrame(0.0, index=range(4), columns=FEATURE_COLUMNS_V43)
+    df['tenure_months'] = [30, 6, 0, 0]
+    df['days_since_last_move'] = [913, 183, UNKNOWN_DAYS, UNKNOWN_DAYS]
+    df['experience_years'] = [4.5, 3.0, 4.5, 0.0]
+    df['is_likely_recent_promotee'] = [1, 1, 1, 0]
+    df['crd'] = [1, 2, 3, 4]
+    return df
+
+
+def test_prior_experience_constant_when_tenure_known():
+    df = _frame()
+    X = advance_features(df, MONTHS)
+    col = {name: i for i, name in enumerate(FEATURE_COLUMNS_V43)}
+    known = (df['days_since_last_move'] != UNKNOWN_DAYS).to_numpy()
+
+    for feature in ['experience_years', 'is_likely_recent_promotee']:
+        values = X[:, known, col[feature]]
+        assert (values == df.loc[known, feature].to_numpy()).all(), f"{feature} moved for known tenure"
+
+    # Tenure itself still advances for the same advisors
+    assert (X[12, known, col['tenure_months']] == df.loc[known, 'tenure_months'].to_numpy() + 12).all()
+
+
+def test_experience_advances_when_tenure_unknown():
+    X = advance_features(_frame(), MONTHS)
+    col = {name: i for i, name in enumerate(FEATURE_COLUMNS_V43)}
+
+    assert np.isclose(X[12, 2, col['experience_years']], 5.5)
+    assert X[5, 2, col['is_likely_recent_promotee']] == 1     # 59 months
+    assert X[6, 2, col['is_likely_recent_promotee']] == 0     # 60 months
+    assert (X[:, 3, col['experience_years']] == 0).all()      # missing experience stays missing
+
+
+if __name__ == "__main__":
+    test_prior_experience_constant_when_tenure_known()
+    test_experience_advances_when_tenure_unknown()
+    print("[OK] score_trajectory tests PASSED")
@@ -0,0 +1,404 @@
+"""
+Single-Scan Lead List Validation
+
+Validating a list used to mean running the pipeline/sql/_validation_*.sql
+files one by one (tier counts, totals, M&A tier counts, ...), plus ad hoc
+checks such as generate_top_10_percentile_list.validate_results. Each of
+them scanned the lead list table again.
+
+Here every check is declared as an aggregate expression, and all of them are
+compiled into ONE grouped scan:
+
+    SELECT GROUPING(sga_id) AS _g_sga_id, ..., sga_id, firm_crd, score_tier,
+           COUNT(*) AS m0, COUNT(*) - COUNT(DISTINCT advisor_crd) AS m1, ...
+    FROM `<list table>`
+    GROUP BY GROUPING SETS ((), (sga_id), (firm_crd), (score_tier))
+
+- The () row holds the list-wide values: totals, duplicate CRDs, V4 bottom
+  20%, LinkedIn coverage, and so on.
+- The per-key rows hold the per-SGA and per-firm counts. A check combines
+  them with min/max, e.g. every SGA has exactly 200 leads and no firm has
+  more than 50.
+- The score_tier rows give the tier distribution.
+
+The same SQL runs locally over an exported CSV through DuckDB, so a list can
+be validated in one pass without BigQuery. Checks whose columns are missing
+from the source are reported as SKIPPED.
+
+--upstream also validates the phase tables checked by _validation_v1..v5
+(PIT features, V3 scores, V4 features, V4 scores). That is one scan per
+table, and the scans run concurrently through v3.utils.job_manager.
+
+Usage:
+    from pipeline.scripts.validate_lead_list import lead_list_checks, validate_table, validate_frame
+
+    report = validate_table(client, 'savvy-gtm-analytics.ml_features.january_2026_lead_list')
+    report = validate_frame(pd.read_csv('pipeline/exports/January_2026_lead_list_20260101.csv'))
+    report.print()
+    assert report.passed
+
+CLI:
+    python pipeline/scripts/validate_lead_list.py                               # January list
+    python pipeline/scripts/validate_lead_list.py --table savvy-gtm-analytics.ml_features.march_2026_lead_list
+    python pipeline/scripts/validate_lead_list.py --csv pipeline/exports/January_2026_lead_list_20260101.csv
+    python pipeline/scripts/validate_lead_list.py --upstream                    # + phase tables
+    python pipeline/scripts/validate_lead_list.py --print-sql
+
+Author: Lead Scoring Team
+Date: 2026-10-19
+"""
+
+import argparse
+import json
+import operator
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from v3.utils.job_manager import JobManager
+from v3.utils.warehouse import get_client
+
+PROJECT_ID = "savvy-gtm-analytics"
+LEAD_LIST_TABLE = "savvy-gtm-analytics.ml_features.january_2026_lead_list"
+
+LEADS_PER_SGA = 200
+FIRM_CAP = 50                   # rank_within_firm <= 50 (diversity cap)
+MIN_V4_PERCENTILE = 20          # bottom 20% of V4 excluded
+DISAGREEMENT_V4_PERCENTILE = 60  # Tier 1 leads below this V4 percentile are dropped
+MIN_LINKEDIN_SHARE = 0.95
+
+TIER_1_TIERS = (
+    'TIER_1A_PRIME_MOVER_CFP', 'TIER_1B_PRIME_ZERO_FRICTION', 'TIER_1B_PRIME_MOVER_SERIES65',
+    'TIER_1_PRIME_MOVER', 'TIER_1F_HV_WEALTH_BLEEDER', 'TIER_1G_ENHANCED_SWEET_SPOT', 'TIER_1G_GROWTH_STAGE',
+)
+
+OPERATORS = {'==': operator.eq, '<=': operator.le, '>=': operator.ge, '<': operator.lt, '>': operator.gt}
+ACROSS = {'min': min, 'max': max}
+
+
+@dataclass
+class Check:
+    """
+    One validation check.
+
+    metric is a SQL aggregate (BigQuery and DuckDB both accept it). With per
+    set, the metric is evaluated per non-NULL value of that column and the
+    per-group values are combined with across ('min' / 'max').
+    """
+    name: str
+    metric: str
+    op: str
+    expected: float
+    columns: Tuple[str, ...] = ()
+    per: Optional[str] = None
+    across: str = 'max'
+    severity: str = 'ERROR'          # ERROR fails the report, WARNING does not
+    description: str = ''
+
+
+def lead_list_checks(leads_per_sga: Optional[int] = LEADS_PER_SGA, firm_cap: Optional[int] = FIRM_CAP,
+                     expected_total: Optional[int] = None, min_v4_percentile: float = MIN_V4_PERCENTILE,
+                     expected_tiers: Sequence[str] = (), expect_ma: bool = False,
+                     min_linkedin_share: float = MIN_LINKEDIN_SHARE) -> List[Check]:
+    """Checks for a monthly lead list (base list rules plus the M&A insert)."""
+    checks = [
+        Check('row_count', 'COUNT(*)', '>', 0, description='List is not empty'),
+        Check('duplicate_crds', 'COUNT(*) - COUNT(DISTINCT advisor_crd)', '==', 0, ('advisor_crd',),
+              description='No advisor appears twice'),
+        Check('null_crds', 'COUNTIF(advisor_crd IS NULL)', '==', 0, ('advisor_crd',)),
+        Check('v4_bottom_excluded', f'COUNTIF(v4_percentile < {min_v4_percentile})', '==', 0, ('v4_percentile',),
+              description=f'No lead below V4 percentile {min_v4_percentile}'),
+        Check('v4_percentile_range', 'COUNTIF(v4_percentile < 1 OR v4_percentile > 100)', '==', 0,
+              ('v4_percentile',)),
+        Check('tier1_v4_disagreement',
+              f"COUNTIF(score_tier IN ({', '.join(repr(t) for t in TIER_1_TIERS)}) "
+              f"AND v4_percentile < {DISAGREEMENT_V4_PERCENTILE})", '==', 0, ('score_tier', 'v4_percentile'),
+              description=f'Tier 1 leads with V4 < {DISAGREEMENT_V4_PERCENTILE} are filtered'),
+        Check('no_nurture_leads', "COUNTIF(score_tier = 'TIER_NURTURE_TOO_EARLY')", '==', 0, ('score_tier',)),
+        Check('sga_assigned', "COUNTIF(sga_id IS NULL AND score_tier NOT LIKE 'TIER_MA%')", '==', 0,
+              ('sga_id', 'score_tier'), description='Every non-M&A lead has an SGA'),
+        Check('linkedin_coverage',
+              "AVG(CASE WHEN linkedin_url IS NOT NULL AND TRIM(linkedin_url) != '' THEN 1.0 ELSE 0.0 END)",
+              '>=', min_linkedin_share, ('linkedin_url',), severity='WARNING'),
+    ]
+    if leads_per_sga is not None:
+        checks += [
+            Check('leads_per_sga_min', 'COUNT(*)', '==', leads_per_sga, ('sga_id',), per='sga_id', across='min',
+                  description=f'Every SGA has {leads_per_sga} leads'),
+            Check('leads_per_sga_max', 'COUNT(*)', '==', leads_per_sga, ('sga_id',), per='sga_id', across='max'),
+        ]
+    if firm_cap is not None:
+        checks.append(Check('firm_cap', 'COUNT(*)', '<=', firm_cap, ('firm_crd',), per='firm_crd', across='max',
+                            description=f'At most {firm_cap} leads per firm'))
+    if expected_total is not None:
+        checks.append(Check('expected_total', 'COUNT(*)', '==', expected_total))
+    for tier in expected_tiers:
+        checks.append(Check(f'tier_present:{tier}', f"COUNTIF(score_tier = '{tier}')", '>', 0, ('score_tier',),
+                            severity='WARNING'))
+    if expect_ma:
+        checks.append(Check('ma_leads_inserted', "COUNTIF(score_tier LIKE 'TIER_MA%')", '>', 0, ('score_tier',),
+                            description='Insert_MA_Leads.sql has run'))
+    return checks
+
+
+# Phase tables previously checked by _validation_v1 / v2a / v2b / v4 / v5
+UPSTREAM_CHECKS = {
+    'savvy-gtm-analytics.ml_features.lead_scoring_features_pit': [
+        Check('pit_row_count', 'COUNT(*)', '>', 0),
+    ],
+    'savvy-gtm-analytics.ml_features.lead_scores_v3_6': [
+        Check('v3_row_count', 'COUNT(*)', '>', 0),
+    ],
+    'savvy-gtm-analytics.ml_features.v4_prospect_features': [
+        Check('prospect_count', 'COUNT(*)', '>', 0),
+        Check('prospect_duplicate_crds', 'COUNT(*) - COUNT(DISTINCT crd)', '==', 0, ('crd',)),
+    ],
+    'savvy-gtm-analytics.ml_features.v4_prospect_scores': [
+        Check('v4_score_count', 'COUNT(*)', '>', 0),
+        Check('v4_missing_scores', 'COUNT(*) - COUNT(v4_score)', '==', 0, ('v4_score',)),
+        Check('v4_min_percentile', 'MIN(v4_percentile)', '>=', 1, ('v4_percentile',)),
+        Check('v4_max_percentile', 'MAX(v4_percentile)', '<=', 100, ('v4_percentile',)),
+    ],
+}
+
+
+# =============================================================================
+# COMPILATION
+# =============================================================================
+@dataclass
+class CompiledChecks:
+    """One grouped-scan query and how to read each check from its result."""
+    sql: str
+    checks: List[Check]
+    skipped: List[Check]
+    aliases: Dict[str, str]          # metric expression -> output column
+    keys: List[str]                  # grouping-set columns
+    distribution_key: Optional[str]
+
+
+def compile_checks(checks: Sequence[Check], source: str, columns: Optional[Sequence[str]] = None,
+                   distribution_key: str = 'score_tier') -> CompiledChecks:
+    """
+    Compile checks into a single GROUP BY GROUPING SETS query over source.
+
+    Args:
+        checks: Checks to evaluate
+        source: Table reference placed after FROM (backticked table, or a
+            DuckDB relation name)
+        columns: Columns available in source; checks needing others are skipped
+        distribution_key: Column whose value counts are reported (if present)
+    """
+    available = {c.lower() for c in columns} if columns is not None else None
+    runnable, skipped = [], []
+    for check in checks:
+        if available is not None and any(c.lower() not in available for c in check.columns):
+            skipped.append(check)
+        else:
+            runnable.append(check)
+
+    aliases = {}
+    for check in runnable:
+        aliases.setdefault(check.metric, f"m{len(aliases)}")
+    aliases.setdefault('COUNT(*)', f"m{len(aliases)}")
+    keys = list(dict.fromkeys(c.per for c in runnable if c.per))
+    if distribution_key and available is not None and distribution_key.lower() not in available:
+        distribution_key = None
+    if distribution_key and distribution_key not in keys:
+        keys.append(distribution_key)
+
+    select = [f"GROUPING({k}) AS _g_{k}" for k in keys] + keys
+    select += [f"{expr} AS {alias}" for expr, alias in aliases.items()]
+    group_by = f"GROUP BY GROUPING SETS ((){''.join(f', ({k})' for k in keys)})" if keys else ""
+    sql = "SELECT\n    " + ",\n    ".join(select) + f"\nFROM {source}\n{group_by}"
+    return CompiledChecks(sql=sql, checks=runnable, skipped=skipped, aliases=aliases, keys=keys,
+                          distribution_key=distribution_key)
+
+
+# =============================================================================
+# EVALUATION
+# =============================================================================
+@dataclass
+class ValidationReport:
+    """Per-check results plus the tier distribution."""
+    source: str
+    checks: pd.DataFrame
+    distribution: Dict[str, int] = field(default_factory=dict)
+    elapsed_seconds: float = 0.0
+
+    @property
+    def passed(self) -> bool:
+        return not (self.checks['status'] == 'FAIL').any()
+
+    def to_dict(self) -> dict:
+        return {
+            'source': self.source,
+            'passed': self.passed,
+            'elapsed_seconds': self.elapsed_seconds,
+            'checks': self.checks.to_dict(orient='records'),
+            'distribution': self.distribution,
+        }
+
+    def print(self):
+        print("=" * 70)
+        print(f"VALIDATION: {self.source}")
+        print("=" * 70)
+        for row in self.checks.itertuples():
+            value = '-' if row.value is None else (f"{row.value:.4f}" if isinstance(row.value, float)
+                                                   and not float(row.value).is_integer() else f"{row.value:,.0f}")
+            print(f"  [{row.status:<7}] {row.check:<32} {value:>10} {row.op} {row.expected:g}"
+                  + (f"  ({row.description})" if row.description else ""))
+        if self.distribution:
+            total = sum(self.distribution.values())
+            print("\n  Tier distribution:")
+            for tier, count in self.distribution.items():
+                print(f"    {tier}: {count:,} ({count / max(total, 1) * 100:.1f}%)")
+        failed = int((self.checks['status'] == 'FAIL').sum())
+        warned = int((self.checks['status'] == 'WARN').sum())
+        print(f"\n  {'[OK] PASSED' if self.passed else '[ERROR] FAILED'}: {failed} failed, {warned} warning(s)"
+              f" in {self.elapsed_seconds:.1f}s")
+        print("=" * 70)
+
+
+def _value(raw):
+    if raw is None or pd.isna(raw):
+        return None
+    return float(raw)
+
+
+def evaluate(compiled: CompiledChecks, result: pd.DataFrame, source: str,
+             elapsed_seconds: float = 0.0) -> ValidationReport:
+    """Read every check from the grouped-scan result."""
+    def grouped(key=None):
+        # GROUPING(k) is 0 on the rows grouped by k and 1 elsewhere
+        mask = pd.Series(True, index=result.index)
+        for k in compiled.keys:
+            mask &= result[f"_g_{k}"].astype(int) == (0 if k == key else 1)
+        rows = result[mask]
+        return rows[rows[key].notna()] if key else rows
+
+    overall = grouped()
+
+    records = []
+    for check in compiled.checks:
+        alias = compiled.aliases[check.metric]
+        if check.per:
+            values = [_value(v) for v in grouped(check.per)[alias]]
+            values = [v for v in values if v is not None]
+            value = ACROSS[check.across](values) if values else None
+        else:
+            value = _value(overall[alias].iloc[0]) if len(overall) else None
+        ok = value is not None and OPERATORS[check.op](value, check.expected)
+        records.append({
+            'check': check.name,
+            'value': value,
+            'op': check.op,
+            'expected': check.expected,
+            'status': 'PASS' if ok else ('FAIL' if check.severity == 'ERROR' else 'WARN'),
+            'severity': check.severity,
+            'description': check.description,
+        })
+    for check in compiled.skipped:
+        records.append({'check': check.name, 'value': None, 'op': check.op, 'expected': check.expected,
+                        'status': 'SKIPPED', 'severity': check.severity,
+                        'description': f"missing column(s): {', '.join(check.columns)}"})
+
+    distribution = {}
+    if compiled.distribution_key:
+        rows = grouped(compiled.distribution_key)
+        count_alias = compiled.aliases['COUNT(*)']
+        distribution = {str(k): int(v) for k, v in
+                        rows.sort_values(count_alias, ascending=False)[[compiled.distribution_key, count_alias]].values}
+    return ValidationReport(source=source, checks=pd.DataFrame(records), distribution=distribution,
+                            elapsed_seconds=round(elapsed_seconds, 2))
+
+
+def validate_table(client, table_id: str = LEAD_LIST_TABLE, checks: Optional[Sequence[Check]] = None,
+                   distribution_key: str = 'score_tier') -> ValidationReport:
+    """Validate a BigQuery table with one query."""
+    start = time.perf_counter()
+    columns = [f.name for f in client.get_table(table_id).schema]
+    compiled = compile_checks(checks if checks is not None else lead_list_checks(), f"`{table_id}`",
+                              columns, distribution_key)
+    result = client.query(compiled.sql).to_dataframe()
+    return evaluate(compiled, result, table_id, time.perf_counter() - start)
+
+
+def validate_frame(df: pd.DataFrame, checks: Optional[Sequence[Check]] = None, source: str = 'dataframe',
+                   distribution_key: str = 'score_tier') -> ValidationReport:
+    """Validate a local DataFrame (e.g. an exported CSV) in one DuckDB pass."""
+    import duckdb
+    start = time.perf_counter()
+    compiled = compile_checks(checks if checks is not None else lead_list_checks(), "lead_list",
+                              list(df.columns), distribution_key)
+    con = duckdb.connect()
+    con.register('lead_list', df)
+    result = con.execute(compiled.sql).df()
+    con.close()
+    return evaluate(compiled, result, source, time.perf_counter() - start)
+
+
+def validate_upstream(client, tables: Optional[Dict[str, List[Check]]] = None) -> List[ValidationReport]:
+    """Validate the phase tables (one scan each, run concurrently)."""
+    tables = tables or UPSTREAM_CHECKS
+    start = time.perf_counter()
+    jobs = JobManager(client)
+    compiled = {}
+    for table_id, checks in tables.items():
+        compiled[table_id] = compile_checks(checks, f"`{table_id}`",
+                                            [f.name for f in client.get_table(table_id).schema])
+        jobs.submit(table_id, compiled[table_id].sql, fetch=True)
+    results = jobs.run(raise_on_error=True)
+    elapsed = time.perf_counter() - start
+    return [evaluate(compiled[t], results[t].rows, t, elapsed) for t in tables]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Validate a lead list with a single grouped scan')
+    parser.add_argument('--table', default=LEAD_LIST_TABLE)
+    parser.add_argument('--csv', default=None, help='Validate an exported CSV locally instead of BigQuery')
+    parser.add_argument('--leads-per-sga', type=int, default=LEADS_PER_SGA, help='0 disables the check')
+    parser.add_argument('--firm-cap', type=int, default=FIRM_CAP, help='0 disables the check')
+    parser.add_argument('--expected-total', type=int, default=None)
+    parser.add_argument('--min-v4-percentile', type=float, default=MIN_V4_PERCENTILE)
+    parser.add_argument('--expected-tiers', nargs='+', default=[])
+    parser.add_argument('--expect-ma', action='store_true', help='Require M&A tiers (after Insert_MA_Leads.sql)')
+    parser.add_argument('--upstream', action='store_true', help='Also validate the phase tables')
+    parser.add_argument('--print-sql', action='store_true', help='Print the compiled query and exit')
+    parser.add_argument('--output', default=None, help='Write the report as JSON')
+    args = parser.parse_args()
+
+    list_checks = lead_list_checks(
+        leads_per_sga=args.leads_per_sga or None,
+        firm_cap=args.firm_cap or None,
+        expected_total=args.expected_total,
+        min_v4_percentile=args.min_v4_percentile,
+        expected_tiers=args.expected_tiers,
+        expect_ma=args.expect_ma,
+    )
+    if args.print_sql:
+        print(compile_checks(list_checks, f"`{args.table}`").sql)
+        sys.exit(0)
+
+    client = None
+    if args.csv:
+        reports = [validate_frame(pd.read_csv(args.csv), list_checks, source=args.csv)]
+    else:
+        client = get_client(PROJECT_ID)
+        reports = [validate_table(client, args.table, list_checks)]
+    if args.upstream:
+        if client is None:
+            client = get_client(PROJECT_ID)
+        reports += validate_upstream(client)
+
+    for report in reports:
+        report.print()
+    if args.output:
+        Path(args.output).write_text(json.dumps([r.to_dict() for r in reports], indent=2, default=str),
+                                     encoding='utf-8')
+        print(f"[INFO] Saved: {args.output}")
+    sys.exit(0 if all(r.passed for r in reports) else 1)
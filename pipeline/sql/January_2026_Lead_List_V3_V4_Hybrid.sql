@@ -126,32 +126,16 @@ salesforce_crds AS (
 -- ============================================================================
 -- D. RECYCLABLE LEADS (180+ days no contact)
 -- ============================================================================
-lead_task_activity AS (
-    SELECT 
-        t.WhoId as lead_id,
-        MAX(GREATEST(
-            COALESCE(DATE(t.ActivityDate), DATE('1900-01-01')),
-            COALESCE(DATE(t.CompletedDateTime), DATE('1900-01-01')),
-            COALESCE(DATE(t.CreatedDate), DATE('1900-01-01'))
-        )) as last_activity_date
-    FROM `savvy-gtm-analytics.SavvyGTMData.Task` t
-    WHERE t.IsDeleted = false AND t.WhoId IS NOT NULL
-      AND (t.Type IN ('Outgoing SMS', 'Incoming SMS')
-           OR UPPER(t.Subject) LIKE '%SMS%' OR UPPER(t.Subject) LIKE '%TEXT%'
-           OR t.TaskSubtype = 'Call' OR t.Type = 'Call'
-           OR UPPER(t.Subject) LIKE '%CALL%' OR t.CallType IS NOT NULL)
-    GROUP BY t.WhoId
-),
-
+-- last_activity_date: last call / SMS per lead, folded incrementally from Task
+-- by pipeline/scripts/salesforce_activity.py
 recyclable_lead_ids AS (
-    SELECT l.Id as lead_id,
-        SAFE_CAST(REGEXP_REPLACE(CAST(l.FA_CRD__c AS STRING), r'[^0-9]', '') AS INT64) as crd
-    FROM `savvy-gtm-analytics.SavvyGTMData.Lead` l
-    LEFT JOIN lead_task_activity la ON l.Id = la.lead_id
-    WHERE l.IsDeleted = false AND l.FA_CRD__c IS NOT NULL
-      AND (la.last_activity_date IS NULL OR DATE_DIFF(CURRENT_DATE(), la.last_activity_date, DAY) > 180)
-      AND (l.DoNotCall IS NULL OR l.DoNotCall = false)
-      AND l.Status NOT IN ('Closed', 'Converted', 'Dead', 'Unqualified', 'Disqualified', 
+    SELECT l.lead_id,
+        l.crd
+    FROM `savvy-gtm-analytics.ml_features.salesforce_lead_activity` l
+    WHERE l.lead_modified IS NOT NULL AND l.crd IS NOT NULL
+      AND (l.last_activity_date IS NULL OR DATE_DIFF(CURRENT_DATE(), l.last_activity_date, DAY) > 180)
+      AND (l.do_not_call IS NULL OR l.do_not_call = false)
+      AND l.status NOT IN ('Closed', 'Converted', 'Dead', 'Unqualified', 'Disqualified', 
                            'Do Not Contact', 'Not Qualified', 'Bad Data', 'Duplicate')
 ),
 
@@ -143,15 +143,16 @@ salesforce_crds AS (
 ),
 
 -- Lead fields for nurture flag, original SGA owner, and bad contact info
+-- (compact per-lead table kept current by pipeline/scripts/salesforce_activity.py)
 lead_salesforce_info AS (
     SELECT 
-        Id as lead_id,
-        Status,
-        SGA_Owner_Name__c,
-        OwnerId,
-        Disposition__c
-    FROM `savvy-gtm-analytics.SavvyGTMData.Lead`
-    WHERE IsDeleted = false
+        lead_id,
+        status as Status,
+        sga_owner_name as SGA_Owner_Name__c,
+        owner_id as OwnerId,
+        disposition as Disposition__c
+    FROM `savvy-gtm-analytics.ml_features.salesforce_lead_activity`
+    WHERE lead_modified IS NOT NULL
 ),
 
 -- ============================================================================
@@ -163,37 +164,21 @@ lead_salesforce_info AS (
 --   (2) Any other Closed lead — recycle only if 180+ days no contact.
 -- Do NOT recycle: New, Contacting, Qualified, Replied, etc.
 -- ============================================================================
-lead_task_activity AS (
-    SELECT 
-        t.WhoId as lead_id,
-        MAX(GREATEST(
-            COALESCE(DATE(t.ActivityDate), DATE('1900-01-01')),
-            COALESCE(DATE(t.CompletedDateTime), DATE('1900-01-01')),
-            COALESCE(DATE(t.CreatedDate), DATE('1900-01-01'))
-        )) as last_activity_date
-    FROM `savvy-gtm-analytics.SavvyGTMData.Task` t
-    WHERE t.IsDeleted = false AND t.WhoId IS NOT NULL
-      AND (t.Type IN ('Outgoing SMS', 'Incoming SMS')
-           OR UPPER(t.Subject) LIKE '%SMS%' OR UPPER(t.Subject) LIKE '%TEXT%'
-           OR t.TaskSubtype = 'Call' OR t.Type = 'Call'
-           OR UPPER(t.Subject) LIKE '%CALL%' OR t.CallType IS NOT NULL)
-    GROUP BY t.WhoId
-),
-
+-- last_activity_date: last call / SMS per lead, folded incrementally from Task
+-- by pipeline/scripts/salesforce_activity.py
 recyclable_lead_ids AS (
-    SELECT l.Id as lead_id,
-        SAFE_CAST(REGEXP_REPLACE(CAST(l.FA_CRD__c AS STRING), r'[^0-9]', '') AS INT64) as crd
-    FROM `savvy-gtm-analytics.SavvyGTMData.Lead` l
-    LEFT JOIN lead_task_activity la ON l.Id = la.lead_id
-    WHERE l.IsDeleted = false AND l.FA_CRD__c IS NOT NULL
-      AND (l.DoNotCall IS NULL OR l.DoNotCall = false)
+    SELECT l.lead_id,
+        l.crd
+    FROM `savvy-gtm-analytics.ml_features.salesforce_lead_activity` l
+    WHERE l.lead_modified IS NOT NULL AND l.crd IS NOT NULL
+      AND (l.do_not_call IS NULL OR l.do_not_call = false)
       AND (
-          (l.Status = 'Nurture' AND (la.last_activity_date IS NULL OR DATE_DIFF(CURRENT_DATE(), la.last_activity_date, DAY) >= 300))
-          OR (l.Status = 'Closed' AND (
+          (l.status = 'Nurture' AND (l.last_activity_date IS NULL OR DATE_DIFF(CURRENT_DATE(), l.last_activity_date, DAY) >= 300))
+          OR (l.status = 'Closed' AND (
               -- Recyclable dispositions: can recycle within 180 days of closure
-              (l.Disposition__c IN ('Bad Lead Provided', 'Bad Contact Info - Uncontacted', 'Wrong Phone Number - Contacted', 'No Show/Ghosted')
-               AND DATE(COALESCE(l.Stage_Entered_Closed__c, l.LastModifiedDate)) >= DATE_SUB(CURRENT_DATE(), INTERVAL 180 DAY))
-              OR (la.last_activity_date IS NULL OR DATE_DIFF(CURRENT_DATE(), la.last_activity_date, DAY) >= 180)
+              (l.disposition IN ('Bad Lead Provided', 'Bad Contact Info - Uncontacted', 'Wrong Phone Number - Contacted', 'No Show/Ghosted')
+               AND l.closed_date >= DATE_SUB(CURRENT_DATE(), INTERVAL 180 DAY))
+              OR (l.last_activity_date IS NULL OR DATE_DIFF(CURRENT_DATE(), l.last_activity_date, DAY) >= 180)
           ))
       )
 ),
@@ -25,31 +25,18 @@ WITH your_crd_list AS (
   SELECT DISTINCT SAFE_CAST(crd AS INT64) AS crd
   FROM `savvy-gtm-analytics.ml_features.crd_list_staging`
   WHERE crd IS NOT NULL AND SAFE_CAST(crd AS INT64) IS NOT NULL
-),
-
--- Latest V3 tier per advisor (lead_scores_v3_6 has historical rows; take most recent)
-v3_latest AS (
-  SELECT
-    advisor_crd AS crd,
-    score_tier,
-    expected_conversion_rate,
-    ROW_NUMBER() OVER (PARTITION BY advisor_crd ORDER BY contacted_date DESC) AS rn
-  FROM `savvy-gtm-analytics.ml_features.lead_scores_v3_6`
-),
-
-v3_one AS (
-  SELECT crd, score_tier, expected_conversion_rate
-  FROM v3_latest
-  WHERE rn = 1
 )
 
+-- Latest V3 tier + V4 score per advisor: crd_score_latest holds one row per CRD
+-- (maintained at scoring time by pipeline/scripts/score_history.py, clustered by crd),
+-- so no window over the lead_scores_v3_6 history is needed here.
+-- Prior months' V4 scores: ml_features.v4_score_history (partitioned by run_date).
 SELECT
   l.crd,
-  v3.score_tier          AS score_tier,
-  v3.expected_conversion_rate AS v3_expected_rate_pct,
-  v4.v4_score            AS v4_score,
-  v4.v4_percentile       AS v4_percentile
+  s.v3_score_tier        AS score_tier,
+  s.v3_expected_conversion_rate AS v3_expected_rate_pct,
+  s.v4_score             AS v4_score,
+  s.v4_percentile        AS v4_percentile
 FROM your_crd_list l
-LEFT JOIN v3_one v3       ON l.crd = v3.crd
-LEFT JOIN `savvy-gtm-analytics.ml_features.v4_prospect_scores` v4 ON l.crd = v4.crd
-ORDER BY v4.v4_percentile DESC, v3.score_tier;
+LEFT JOIN `savvy-gtm-analytics.ml_features.crd_score_latest` s ON l.crd = s.crd
+ORDER BY s.v4_percentile DESC, s.v3_score_tier;
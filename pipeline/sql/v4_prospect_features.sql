@@ -733,6 +733,12 @@ all_features AS (
         -- ================================================================
         COALESCE(rp.is_likely_recent_promotee, 0) as is_likely_recent_promotee,
 
+        -- Not model features: inputs score_trajectory.py needs to advance
+        -- the Career Clock flags and age bucket over future months
+        ccf.cc_avg_prior_tenure_months,
+        ccf.cc_tenure_cv,
+        ad.age_range,
+
         -- Metadata
         CURRENT_TIMESTAMP() as created_at,
         'v4.3.2' as feature_version
@@ -761,7 +767,8 @@ all_features AS (
                 WHEN AGE_RANGE IN ('65-69') THEN 3
                 WHEN AGE_RANGE IN ('70-74', '75-79', '80-84', '85-89', '90-94', '95-99') THEN 4
                 ELSE 2
-            END as age_bucket_encoded
+            END as age_bucket_encoded,
+            AGE_RANGE as age_range
         FROM `savvy-gtm-analytics.FinTrx_data_CA.ria_contacts_current`
     ) ad ON bp.crd = ad.crd
     LEFT JOIN career_clock_features ccf ON bp.crd = ccf.crd AND bp.prediction_date = ccf.prediction_date
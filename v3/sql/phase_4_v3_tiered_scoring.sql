@@ -55,6 +55,10 @@
 --   - TIER_1F_HV_WEALTH_BLEEDER - 3.35x lift
 --   - PRODUCING_ADVISOR filter
 --   - Insurance exclusions
+--
+-- AFTER REBUILDING: fold the latest tier per CRD into ml_features.crd_score_latest
+-- (used by CRD-list lookups):
+--   python pipeline/scripts/score_history.py --refresh-v3
 -- =============================================================================
 
 CREATE OR REPLACE TABLE `savvy-gtm-analytics.ml_features.lead_scores_v3_6` AS
@@ -0,0 +1,219 @@
+# =============================================================================
+# DATASET CACHE MODULE
+# =============================================================================
+"""
+Local Parquet Snapshot Cache for Training and Experiment Datasets
+
+Training scripts and V5 experiments re-run the same BigQuery query many times
+a day while iterating. This module caches query results on disk so repeat
+runs read a local snapshot instead of re-downloading the table.
+
+Cache key:
+    (SHA-256 of the normalized query text, last-modified time of every source
+    table referenced in the query). When a source table is rebuilt its
+    modification time changes, the key changes, and the next run re-downloads.
+
+Storage:
+    zstd-compressed Parquet written through pyarrow (keeps typed schemas:
+    Int64, dates, timestamps, strings), read back memory-mapped.
+
+Offline mode:
+    Set LEAD_SCORING_OFFLINE=1 (or pass offline=True) to skip BigQuery
+    entirely and serve the most recent snapshot for the query. Useful on a
+    laptop without GCP credentials.
+
+Usage:
+    from v3.utils.dataset_cache import DatasetCache
+
+    cache = DatasetCache(project_id="savvy-gtm-analytics")
+    df = cache.query(sql)                 # cached read
+    df = cache.query(sql, refresh=True)   # force re-download
+
+Note: source detection uses the backticked `project.dataset.table` names in
+the SQL. For views, the view's own modification time is used, so rebuilt
+underlying tables are not detected - pass refresh=True after such rebuilds.
+"""
+
+import hashlib
+import json
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent.parent / ".cache" / "datasets"
+OFFLINE_ENV_VAR = "LEAD_SCORING_OFFLINE"
+CACHE_DIR_ENV_VAR = "LEAD_SCORING_CACHE_DIR"
+
+# `project.dataset.table` references inside backticks
+TABLE_REF_PATTERN = re.compile(r"`([\w-]+\.[\w-]+\.[\w$-]+)`")
+
+
+def normalize_query(sql: str) -> str:
+    """Collapse whitespace so formatting-only edits don't bust the cache."""
+    return " ".join(sql.split())
+
+
+def extract_source_tables(sql: str) -> List[str]:
+    """Return sorted, de-duplicated fully-qualified table references in a query."""
+    return sorted(set(TABLE_REF_PATTERN.findall(sql)))
+
+
+class DatasetCache:
+    """
+    Parquet-backed cache for BigQuery query results.
+
+    Layout:
+        <cache_dir>/<query_hash>/<source_hash>.parquet
+        <cache_dir>/<query_hash>/<source_hash>.json   (metadata)
+
+    Only the newest snapshot per query is kept; stale snapshots are removed
+    when a fresh one is written.
+    """
+
+    def __init__(self,
+                 client=None,
+                 project_id: str = "savvy-gtm-analytics",
+                 cache_dir: Optional[str] = None,
+                 offline: Optional[bool] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            client: Existing bigquery.Client (created lazily if omitted)
+            project_id: GCP project for a lazily-created client
+            cache_dir: Cache directory (default: $LEAD_SCORING_CACHE_DIR or <repo>/.cache/datasets)
+            offline: Serve cached snapshots without contacting BigQuery
+                (default: $LEAD_SCORING_OFFLINE == "1")
+        """
+        self._client = client
+        self.project_id = project_id
+        self.cache_dir = Path(cache_dir or os.environ.get(CACHE_DIR_ENV_VAR) or DEFAULT_CACHE_DIR)
+        if offline is None:
+            offline = os.environ.get(OFFLINE_ENV_VAR, "").lower() in ("1", "true", "yes")
+        self.offline = offline
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def client(self):
+        """BigQuery client, created on first use (never in offline mode)."""
+        if self.offline:
+            raise RuntimeError("DatasetCache is offline - BigQuery client unavailable")
+        if self._client is None:
+            from v3.utils.warehouse import get_client
+            self._client = get_client(self.project_id)
+        return self._client
+
+    # -------------------------------------------------------------------------
+    # Keys
+    # -------------------------------------------------------------------------
+    def _query_hash(self, sql: str) -> str:
+        return hashlib.sha256(normalize_query(sql).encode("utf-8")).hexdigest()[:24]
+
+    def _source_versions(self, tables: List[str]) -> Dict[str, str]:
+        """Last-modified timestamp for each source table (metadata call only)."""
+        versions = {}
+        for table_id in tables:
+            table = self.client.get_table(table_id)
+            versions[table_id] = table.modified.isoformat() if table.modified else ""
+        return versions
+
+    @staticmethod
+    def _source_hash(versions: Dict[str, str]) -> str:
+        payload = json.dumps(versions, sort_keys=True).encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()[:16]
+
+    # -------------------------------------------------------------------------
+    # Storage
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def _read_snapshot(path: Path) -> pd.DataFrame:
+        import pyarrow.parquet as pq
+        return pq.read_table(path, memory_map=True).to_pandas()
+
+    @staticmethod
+    def _write_snapshot(df: pd.DataFrame, path: Path, metadata: dict):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        tmp_path = path.with_suffix(".parquet.tmp")
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        pq.write_table(table, tmp_path, compression="zstd")
+        os.replace(tmp_path, path)
+        path.with_suffix(".json").write_text(json.dumps(metadata, indent=2))
+
+    def _latest_snapshot(self, query_dir: Path) -> Optional[Path]:
+        snapshots = sorted(query_dir.glob("*.parquet"), key=lambda p: p.stat().st_mtime)
+        return snapshots[-1] if snapshots else None
+
+    # -------------------------------------------------------------------------
+    # Public API
+    # -------------------------------------------------------------------------
+    def query(self, sql: str, source_tables: Optional[List[str]] = None, refresh: bool = False) -> pd.DataFrame:
+        """
+        Run a query through the cache.
+
+        Args:
+            sql: BigQuery SQL
+            source_tables: Tables whose modification time keys the cache
+                (default: every backticked table referenced in sql)
+            refresh: Ignore any cached snapshot and re-download
+
+        Returns:
+            Query result as a DataFrame
+        """
+        query_dir = self.cache_dir / self._query_hash(sql)
+        query_dir.mkdir(parents=True, exist_ok=True)
+
+        if self.offline:
+            snapshot = self._latest_snapshot(query_dir)
+            if snapshot is None:
+                raise FileNotFoundError(
+                    f"Offline mode: no cached snapshot for this query in {query_dir}. "
+                    f"Run once online to populate the cache."
+                )
+            print(f"[CACHE] Offline - serving {snapshot.name}")
+            return self._read_snapshot(snapshot)
+
+        tables = source_tables if source_tables is not None else extract_source_tables(sql)
+        versions = self._source_versions(tables)
+        snapshot = query_dir / f"{self._source_hash(versions)}.parquet"
+
+        if snapshot.exists() and not refresh:
+            print(f"[CACHE] Hit - {snapshot.parent.name}/{snapshot.name}")
+            return self._read_snapshot(snapshot)
+
+        print(f"[CACHE] Miss - downloading from BigQuery ({len(tables)} source table(s))")
+        df = self.client.query(sql).to_dataframe()
+
+        self._write_snapshot(df, snapshot, {
+            "query": normalize_query(sql),
+            "source_versions": versions,
+            "rows": len(df),
+            "cached_at": datetime.now().isoformat(),
+        })
+        for stale in query_dir.glob("*.parquet"):
+            if stale != snapshot:
+                stale.unlink()
+                stale.with_suffix(".json").unlink(missing_ok=True)
+
+        print(f"[CACHE] Stored {len(df):,} rows -> {snapshot.parent.name}/{snapshot.name}")
+        return df
+
+    def snapshot_info(self, sql: str) -> Optional[dict]:
+        """Metadata of the newest snapshot for a query (source_versions, rows, cached_at), if any."""
+        snapshot = self._latest_snapshot(self.cache_dir / self._query_hash(sql))
+        if snapshot is None or not snapshot.with_suffix(".json").exists():
+            return None
+        return json.loads(snapshot.with_suffix(".json").read_text())
+
+    def clear(self):
+        """Remove every cached snapshot."""
+        for path in self.cache_dir.glob("*/*"):
+            path.unlink()
+        for query_dir in self.cache_dir.glob("*"):
+            if query_dir.is_dir():
+                query_dir.rmdir()
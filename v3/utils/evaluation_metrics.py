@@ -0,0 +1,301 @@
+# =============================================================================
+# EVALUATION METRICS MODULE
+# =============================================================================
+"""
+Shared Evaluation Metrics (sort once per prediction vector)
+
+Training, ablation and backtest scripts each re-implemented top-decile lift
+and lift-by-decile with a pandas qcut + groupby per metric. This module sorts
+a prediction vector ONCE and derives every metric from the sorted order with
+cumulative sums:
+
+- ROC AUC (tied scores count 1/2, identical to sklearn's roc_auc_score)
+- Decile lift table and top-decile lift (pd.qcut(q=10, duplicates='drop')
+  bins: linear-interpolated edges, (lo, hi] intervals, duplicate edges dropped)
+- Top-k / top-fraction conversion, bottom 20% conversion
+- Calibration bins (equal-count bins of predicted vs observed rate) and ECE
+- Brier score
+
+Optional sample weights: rates become weighted rates and decile edges come
+from the weighted CDF (first score reaching each weight share).
+
+Grouped evaluation (per tier, per period, ...) sorts once per grouping by
+(group, score); each group is then a contiguous slice of that order.
+
+Usage:
+    from v3.utils.evaluation_metrics import evaluate, calculate_top_decile_lift
+
+    lift = calculate_top_decile_lift(y_test, y_pred)
+    report = evaluate(y_test, y_pred, groups={'tier': test_df['score_tier'],
+                                             'period': test_df['contacted_month']})
+"""
+
+import math
+from typing import Dict, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_BINS = 10
+TOP_FRACTIONS = (0.05, 0.10)
+
+
+class SortedPredictions:
+    """One prediction vector sorted by score (ascending); all metrics reuse that order."""
+
+    def __init__(self, y_true, y_pred, sample_weight=None):
+        y_pred = np.asarray(y_pred, dtype=np.float64)
+        order = np.argsort(y_pred, kind='stable')
+        y = np.asarray(y_true, dtype=np.float64)[order]
+        w = None if sample_weight is None else np.asarray(sample_weight, dtype=np.float64)[order]
+        self._init_sorted(y, y_pred[order], w)
+
+    @classmethod
+    def from_sorted(cls, y_sorted: np.ndarray, scores_sorted: np.ndarray,
+                    w_sorted: Optional[np.ndarray] = None) -> 'SortedPredictions':
+        """Wrap arrays that are already sorted by ascending score (no copy, no sort)."""
+        obj = cls.__new__(cls)
+        obj._init_sorted(y_sorted, scores_sorted, w_sorted)
+        return obj
+
+    def _init_sorted(self, y, scores, w):
+        self.y = y
+        self.scores = scores
+        self.weighted = w is not None
+        self.w = np.ones(len(y)) if w is None else w
+        self.n = len(y)
+        self.cum_w = np.cumsum(self.w)
+        self.cum_wy = np.cumsum(self.w * y)
+        self.total_w = float(self.cum_w[-1]) if self.n else 0.0
+        self.total_wy = float(self.cum_wy[-1]) if self.n else 0.0
+        self.base_rate = self.total_wy / self.total_w if self.total_w > 0 else np.nan
+
+    # -------------------------------------------------------------------------
+    # Helpers over the sorted order
+    # -------------------------------------------------------------------------
+    def _segment_sums(self, bounds: np.ndarray):
+        """Weight and positive-weight sums of sorted segments [bounds[i], bounds[i+1])."""
+        cum_w = np.concatenate([[0.0], self.cum_w])
+        cum_wy = np.concatenate([[0.0], self.cum_wy])
+        return np.diff(cum_w[bounds]), np.diff(cum_wy[bounds])
+
+    def _rate(self, start: int, stop: int) -> float:
+        weight, positives = self._segment_sums(np.array([start, stop]))
+        return float(positives[0] / weight[0]) if weight[0] > 0 else np.nan
+
+    def decile_edges(self, n_bins: int = DEFAULT_BINS) -> np.ndarray:
+        """Quantile edges as pd.qcut computes them (weighted: inverted weighted CDF)."""
+        levels = np.linspace(0.0, 1.0, n_bins + 1)
+        # pd.qcut rounds levels that are not exact in base 2 up by one ulp
+        np.putmask(levels, n_bins * levels != np.arange(n_bins + 1), np.nextafter(levels, 1))
+        if self.weighted:
+            idx = np.searchsorted(self.cum_w, levels * self.total_w, side='left')
+            return self.scores[np.clip(idx, 0, self.n - 1)]
+        return np.quantile(self.scores, levels)
+
+    def bin_bounds(self, n_bins: int = DEFAULT_BINS) -> np.ndarray:
+        """Sorted-order boundaries of the qcut bins (duplicate edges dropped)."""
+        edges = np.unique(self.decile_edges(n_bins))
+        inner = np.searchsorted(self.scores, edges[1:-1], side='right')
+        return np.concatenate([[0], inner, [self.n]]).astype(np.int64)
+
+    # -------------------------------------------------------------------------
+    # Metrics
+    # -------------------------------------------------------------------------
+    def auc(self) -> float:
+        """ROC AUC (Mann-Whitney over tie groups)."""
+        if self.n == 0:
+            return np.nan
+        change = np.ones(self.n, dtype=bool)
+        change[1:] = self.scores[1:] != self.scores[:-1]
+        starts = np.flatnonzero(change)
+        pos = np.add.reduceat(self.w * self.y, starts)
+        neg = np.add.reduceat(self.w, starts) - pos
+        total_pos, total_neg = pos.sum(), neg.sum()
+        if total_pos == 0 or total_neg == 0:
+            return np.nan
+        neg_below = np.cumsum(neg) - neg
+        return float((pos * (neg_below + 0.5 * neg)).sum() / (total_pos * total_neg))
+
+    def brier(self) -> float:
+        """Brier score (weighted mean squared error of the probabilities)."""
+        if self.total_w == 0:
+            return np.nan
+        return float(np.sum(self.w * (self.scores - self.y) ** 2) / self.total_w)
+
+    def decile_table(self, n_bins: int = DEFAULT_BINS) -> pd.DataFrame:
+        """
+        Lift by qcut bin: decile (0 = lowest scores), count, conversions, conv_rate, lift.
+
+        Bins left empty by repeated interpolated edges are omitted (deciles keep
+        their qcut codes), as a groupby over the qcut labels would.
+        """
+        bounds = self.bin_bounds(n_bins)
+        weight, positives = self._segment_sums(bounds)
+        decile = np.flatnonzero(weight > 0)
+        weight, positives = weight[decile], positives[decile]
+        starts, stops = bounds[:-1][decile], bounds[1:][decile]
+        rate = positives / weight
+        table = pd.DataFrame({
+            'decile': decile,
+            'count': weight if self.weighted else weight.astype(np.int64),
+            'conversions': positives if self.weighted else positives.astype(np.int64),
+            'conv_rate': rate,
+            'lift': rate / self.base_rate if self.base_rate > 0 else np.full(len(rate), np.nan),
+            'min_score': self.scores[starts],
+            'max_score': self.scores[stops - 1],
+        })
+        return table
+
+    def top_decile_lift(self, n_bins: int = DEFAULT_BINS) -> float:
+        """Conversion in the highest qcut bin / overall conversion (0 if no conversions)."""
+        if not self.base_rate > 0:
+            return 0.0
+        bounds = self.bin_bounds(n_bins)
+        top_start = bounds[bounds < self.n].max()         # highest non-empty bin
+        return self._rate(top_start, self.n) / self.base_rate
+
+    def bottom_rate(self, n_deciles: int = 2, n_bins: int = DEFAULT_BINS) -> float:
+        """Conversion rate in the lowest n qcut bins (default: bottom 20%)."""
+        bounds = self.bin_bounds(n_bins)
+        return self._rate(0, bounds[min(n_deciles, len(bounds) - 1)])
+
+    def top_k_rate(self, k: Optional[int] = None, fraction: Optional[float] = None) -> float:
+        """
+        Conversion rate of the top k leads by score (or the top fraction of weight).
+
+        Unweighted fraction rounds up, as in hyperparameter_search.top_decile_lift.
+        """
+        if k is None:
+            if self.weighted:
+                start = int(np.searchsorted(self.cum_w, self.total_w * (1 - fraction), side='right'))
+                return self._rate(min(start, self.n - 1), self.n)
+            k = max(1, int(math.ceil(self.n * fraction)))
+        return self._rate(max(self.n - k, 0), self.n)
+
+    def calibration_bins(self, n_bins: int = DEFAULT_BINS) -> pd.DataFrame:
+        """Equal-weight bins over the sorted scores: mean predicted vs observed rate."""
+        cuts = np.searchsorted(self.cum_w, self.total_w * np.arange(1, n_bins) / n_bins, side='left') + 1
+        bounds = np.unique(np.concatenate([[0], cuts, [self.n]]))
+        weight, positives = self._segment_sums(bounds)
+        cum_wp = np.concatenate([[0.0], np.cumsum(self.w * self.scores)])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return pd.DataFrame({
+                'bin': np.arange(len(weight)),
+                'count': weight if self.weighted else weight.astype(np.int64),
+                'mean_predicted': np.diff(cum_wp[bounds]) / weight,
+                'observed_rate': positives / weight,
+            })
+
+    def expected_calibration_error(self, n_bins: int = DEFAULT_BINS) -> float:
+        """Weight-averaged |mean predicted - observed rate| over calibration bins."""
+        bins = self.calibration_bins(n_bins)
+        gap = (bins['mean_predicted'] - bins['observed_rate']).abs()
+        return float((gap * bins['count']).sum() / bins['count'].sum()) if len(bins) else np.nan
+
+    def summary(self, n_bins: int = DEFAULT_BINS, top_fractions: Sequence[float] = TOP_FRACTIONS) -> Dict:
+        """All scalar metrics in one dict."""
+        row = {
+            'n': self.n,
+            'conversions': self.total_wy,
+            'conv_rate': self.base_rate,
+            'auc': self.auc(),
+            'brier': self.brier(),
+            'top_decile_lift': self.top_decile_lift(n_bins),
+            'bottom_20_rate': self.bottom_rate(2, n_bins),
+            'ece': self.expected_calibration_error(n_bins),
+        }
+        for fraction in top_fractions:
+            rate = self.top_k_rate(fraction=fraction)
+            label = f'top_{fraction * 100:g}pct'
+            row[f'{label}_rate'] = rate
+            row[f'{label}_lift'] = rate / self.base_rate if self.base_rate > 0 else np.nan
+        return row
+
+
+# =============================================================================
+# PUBLIC API
+# =============================================================================
+def _grouped(y: np.ndarray, scores: np.ndarray, w: Optional[np.ndarray], groups) -> Dict:
+    """Sort once by (group, score) and wrap each group's contiguous slice."""
+    codes, labels = pd.factorize(pd.Series(groups), sort=True)
+    order = np.lexsort((scores, codes))
+    codes, y, scores = codes[order], y[order], scores[order]
+    w = None if w is None else w[order]
+    starts = np.searchsorted(codes, np.arange(len(labels) + 1))    # null groups (code -1) sort first; skipped
+    out = {}
+    for i, label in enumerate(labels):
+        lo, hi = starts[i], starts[i + 1]
+        if hi > lo:
+            out[label] = SortedPredictions.from_sorted(y[lo:hi], scores[lo:hi], None if w is None else w[lo:hi])
+    return out
+
+
+def evaluate(
+    y_true,
+    y_pred,
+    sample_weight=None,
+    groups: Union[None, Sequence, Dict[str, Sequence]] = None,
+    n_bins: int = DEFAULT_BINS,
+    top_fractions: Sequence[float] = TOP_FRACTIONS,
+) -> pd.DataFrame:
+    """
+    Scalar metrics overall and per group in one call.
+
+    Args:
+        y_true: Binary outcomes
+        y_pred: Scores / probabilities
+        sample_weight: Optional per-row weights
+        groups: One grouping array, or {dimension: array} for several
+            (e.g. {'tier': tiers, 'period': months})
+
+    Returns:
+        One row per slice: slice ('ALL' or dimension), group, n, conversions,
+        conv_rate, auc, brier, top_decile_lift, bottom_20_rate, ece,
+        top_<f>pct_rate / _lift
+    """
+    y = np.asarray(y_true, dtype=np.float64)
+    scores = np.asarray(y_pred, dtype=np.float64)
+    w = None if sample_weight is None else np.asarray(sample_weight, dtype=np.float64)
+
+    rows = [{'slice': 'ALL', 'group': 'ALL', **SortedPredictions(y, scores, w).summary(n_bins, top_fractions)}]
+    if groups is not None:
+        dimensions = groups if isinstance(groups, dict) else {'group': groups}
+        for dimension, values in dimensions.items():
+            for label, sp in _grouped(y, scores, w, np.asarray(values)).items():
+                rows.append({'slice': dimension, 'group': label, **sp.summary(n_bins, top_fractions)})
+    return pd.DataFrame(rows)
+
+
+def evaluate_models(
+    y_true,
+    predictions: Dict[str, Sequence],
+    sample_weight=None,
+    groups: Union[None, Sequence, Dict[str, Sequence]] = None,
+    n_bins: int = DEFAULT_BINS,
+    top_fractions: Sequence[float] = TOP_FRACTIONS,
+) -> pd.DataFrame:
+    """evaluate() for several models on the same rows; adds a leading 'model' column."""
+    frames = []
+    for name, y_pred in predictions.items():
+        frame = evaluate(y_true, y_pred, sample_weight, groups, n_bins, top_fractions)
+        frame.insert(0, 'model', name)
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+
+def roc_auc(y_true, y_pred, sample_weight=None) -> float:
+    """ROC AUC from one sort."""
+    return SortedPredictions(y_true, y_pred, sample_weight).auc()
+
+
+def calculate_top_decile_lift(y_true, y_pred) -> float:
+    """Conversion lift in the top qcut decile (drop-in for the per-script copies)."""
+    return SortedPredictions(y_true, y_pred).top_decile_lift()
+
+
+def calculate_lift_by_decile(y_true, y_pred):
+    """Lift table by decile and top-decile lift (drop-in for the per-script copies)."""
+    sp = SortedPredictions(y_true, y_pred)
+    lift_df = sp.decile_table()[['decile', 'count', 'conversions', 'conv_rate', 'lift']]
+    return lift_df, float(lift_df['lift'].iloc[-1])
@@ -0,0 +1,376 @@
+# =============================================================================
+# BIGQUERY JOB MANAGER MODULE
+# =============================================================================
+"""
+Concurrent BigQuery Job Manager
+
+Scripts used to run independent queries and SQL files one after another,
+blocking on .result() each time. This module submits query jobs with
+bounded concurrency, collects results as they complete and records
+per-job statistics (bytes processed/billed, slot-ms, cache hit, elapsed).
+
+Dependencies are inferred from the SQL itself:
+- writes: CREATE [OR REPLACE] TABLE/VIEW, INSERT INTO, MERGE, UPDATE,
+  DELETE FROM, DROP, TRUNCATE, ALTER targets
+- reads:  FROM / JOIN / USING targets and every backticked table name
+A job waits for every earlier job that writes a table it reads or writes,
+or reads a table it writes (submission order decides who goes first).
+Everything else overlaps, so a batch takes about as long as its slowest
+dependency chain instead of the sum of all jobs.
+
+SQL files are split into statements at top-level semicolons (strings,
+quoted identifiers and comments are respected). Scripts using procedural
+statements or TEMP tables (DECLARE, BEGIN, IF, CREATE TEMP ...) are kept
+as one job, since their statements share script state. Statements with
+no recognizable table reference act as barriers.
+
+Usage:
+    from v3.utils.job_manager import JobManager
+
+    jobs = JobManager(client, max_concurrent=8)
+    jobs.submit('scores', scoring_sql, fetch=True)
+    jobs.submit('grouping', grouping_sql, fetch=True)
+    results = jobs.run()                  # both run at once
+    scores_df = results['scores'].rows
+    print(jobs.summary())
+
+    # Whole SQL files: independent statements overlap
+    results = run_sql_files(client, ['a.sql', 'b.sql'])
+
+CLI:
+    python v3/utils/job_manager.py a.sql b.sql --max-concurrent 4
+    python v3/utils/job_manager.py a.sql --plan          # show inferred dependencies only
+"""
+
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Set
+
+import pandas as pd
+
+DEFAULT_MAX_CONCURRENT = 8
+
+_NAME = r"(`[^`]+`|[\w$-]+(?:\.[\w$-]+)+)"
+WRITE_PATTERN = re.compile(
+    r"\b(?:CREATE\s+(?:OR\s+REPLACE\s+)?(?:(?:TABLE|VIEW|MATERIALIZED\s+VIEW)\s+(?:IF\s+NOT\s+EXISTS\s+)?)"
+    r"|INSERT\s+(?:INTO\s+)?|MERGE\s+(?:INTO\s+)?|UPDATE\s+|DELETE\s+(?:FROM\s+)?"
+    r"|DROP\s+(?:TABLE|VIEW)\s+(?:IF\s+EXISTS\s+)?|TRUNCATE\s+TABLE\s+|ALTER\s+TABLE\s+(?:IF\s+EXISTS\s+)?)"
+    + _NAME,
+    re.IGNORECASE,
+)
+READ_PATTERN = re.compile(r"\b(?:FROM|JOIN|USING)\s+" + _NAME, re.IGNORECASE)
+BACKTICK_PATTERN = re.compile(r"`([^`]+\.[^`]+)`")
+SCRIPT_PATTERN = re.compile(
+    r"^\s*(?:DECLARE|BEGIN|IF|LOOP|WHILE|REPEAT|CALL|EXECUTE\s+IMMEDIATE)\b(?!\s*\()"
+    r"|^\s*FOR\s+\w+\s+IN\b"
+    r"|\bCREATE\s+(?:OR\s+REPLACE\s+)?TEMP(?:ORARY)?\s+(?:TABLE|FUNCTION)\b",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+
+# =============================================================================
+# SQL PARSING
+# =============================================================================
+def _scan(sql: str):
+    """Yield (index, char, in_code) for every character of a SQL script."""
+    i, n = 0, len(sql)
+    while i < n:
+        ch = sql[i]
+        if ch == '-' and sql.startswith('--', i) or ch == '#':
+            end = sql.find('\n', i)
+            end = n if end == -1 else end
+            for j in range(i, end):
+                yield j, sql[j], False
+            i = end
+        elif ch == '/' and sql.startswith('/*', i):
+            end = sql.find('*/', i + 2)
+            end = n if end == -1 else end + 2
+            for j in range(i, end):
+                yield j, sql[j], False
+            i = end
+        elif ch in ('"', "'", '`'):
+            quote = sql[i:i + 3] if ch != '`' and sql.startswith(ch * 3, i) else ch
+            j = i + len(quote)
+            while j < n and not sql.startswith(quote, j):
+                j += 2 if sql[j] == '\\' else 1
+            end = min(j + len(quote), n)
+            for k in range(i, end):
+                yield k, sql[k], ch == '`'     # identifiers stay visible to the reference patterns
+            i = end
+        else:
+            yield i, ch, True
+            i += 1
+
+
+def strip_comments(sql: str) -> str:
+    """SQL with comments and string literals blanked out (quoted identifiers kept)."""
+    return ''.join(ch if in_code or ch == '\n' else ' ' for _, ch, in_code in _scan(sql))
+
+
+def split_statements(sql: str) -> List[str]:
+    """
+    Split a SQL script at top-level semicolons.
+
+    Procedural scripts and scripts using TEMP tables are returned whole.
+    Comment-only fragments are dropped.
+    """
+    code = strip_comments(sql)
+    if SCRIPT_PATTERN.search(code):
+        return [sql.strip()]
+    statements, start = [], 0
+    for i, ch, in_code in _scan(sql):
+        if in_code and ch == ';':
+            statements.append((sql[start:i], code[start:i]))
+            start = i + 1
+    statements.append((sql[start:], code[start:]))
+    return [text.strip() for text, stripped in statements if stripped.strip()]
+
+
+def _table_key(name: str) -> str:
+    """Normalize a table reference to dataset.table (lower case, no project)."""
+    parts = name.strip('`').lower().split('.')
+    return '.'.join(parts[-2:])
+
+
+def table_references(sql: str):
+    """
+    Tables written and read by a statement.
+
+    Returns:
+        (writes, reads) sets of dataset.table keys
+    """
+    code = strip_comments(sql)
+    writes = {_table_key(m) for m in WRITE_PATTERN.findall(code) if '.' in m}
+    reads = {_table_key(m) for m in READ_PATTERN.findall(code) if '.' in m}
+    # Backticked names outside FROM/JOIN (e.g. MERGE / UPDATE targets) count as reads;
+    # write targets are tracked through writes, which the hazard check covers
+    reads |= {_table_key(m) for m in BACKTICK_PATTERN.findall(code)}
+    return writes, reads - writes
+
+
+# =============================================================================
+# JOB MANAGER
+# =============================================================================
+@dataclass
+class JobResult:
+    """Outcome and statistics of one managed job."""
+    name: str
+    sql: str
+    depends_on: List[str] = field(default_factory=list)
+    state: str = 'PENDING'                     # PENDING / DONE / FAILED / SKIPPED
+    job_id: Optional[str] = None
+    error: Optional[str] = None
+    rows: Optional[pd.DataFrame] = None
+    total_bytes_processed: Optional[int] = None
+    total_bytes_billed: Optional[int] = None
+    slot_millis: Optional[int] = None
+    cache_hit: Optional[bool] = None
+    num_dml_affected_rows: Optional[int] = None
+    destination: Optional[str] = None
+    elapsed_seconds: Optional[float] = None
+
+
+class JobManager:
+    """
+    Runs BigQuery query jobs concurrently in dependency order.
+
+    Jobs are registered with submit() / add_script() and executed by run().
+    """
+
+    def __init__(self, client=None, project_id: str = "savvy-gtm-analytics",
+                 max_concurrent: int = DEFAULT_MAX_CONCURRENT):
+        self._client = client
+        self.project_id = project_id
+        self.max_concurrent = max_concurrent
+        self.jobs: Dict[str, JobResult] = {}
+        self._refs: Dict[str, tuple] = {}
+        self._fetch: Set[str] = set()
+        self._configs: Dict[str, object] = {}
+        self._barrier: Optional[str] = None
+
+    @property
+    def client(self):
+        """Warehouse client (BigQuery or local, see warehouse.py), created on first use."""
+        if self._client is None:
+            from v3.utils.warehouse import get_client
+            self._client = get_client(self.project_id)
+        return self._client
+
+    def submit(self, name: str, sql: str, fetch: bool = False, depends_on: Sequence[str] = (),
+               job_config=None) -> str:
+        """
+        Register a query job.
+
+        Args:
+            name: Unique job name
+            sql: Query / statement text
+            fetch: Download the result rows as a DataFrame (JobResult.rows)
+            depends_on: Extra explicit dependencies (inferred ones are added)
+            job_config: Optional bigquery.QueryJobConfig
+
+        Returns:
+            The job name
+        """
+        if name in self.jobs:
+            raise ValueError(f"Duplicate job name: {name}")
+        writes, reads = table_references(sql)
+        deps = list(depends_on)
+        if not writes and not reads:
+            # Unknown effects: run after everything registered so far, and before everything after
+            deps += list(self.jobs)
+        else:
+            for other, (o_writes, o_reads) in self._refs.items():
+                if o_writes & (reads | writes) or writes & o_reads:
+                    deps.append(other)
+            if self._barrier:
+                deps.append(self._barrier)
+        self.jobs[name] = JobResult(name=name, sql=sql, depends_on=list(dict.fromkeys(deps)))
+        self._refs[name] = (writes, reads)
+        if not writes and not reads:
+            self._barrier = name
+        if fetch:
+            self._fetch.add(name)
+        if job_config is not None:
+            self._configs[name] = job_config
+        return name
+
+    def add_script(self, sql: str, name: str, fetch_last: bool = False) -> List[str]:
+        """Register every statement of a SQL script as its own job (name, name#2, ...)."""
+        statements = split_statements(sql)
+        names = []
+        for i, statement in enumerate(statements):
+            job_name = name if len(statements) == 1 else f"{name}#{i + 1}"
+            names.append(self.submit(job_name, statement, fetch=fetch_last and i == len(statements) - 1))
+        return names
+
+    def add_sql_file(self, path, fetch_last: bool = False) -> List[str]:
+        """Register the statements of a SQL file (job names from the file name)."""
+        path = Path(path)
+        return self.add_script(path.read_text(encoding='utf-8'), path.name, fetch_last=fetch_last)
+
+    def plan(self) -> pd.DataFrame:
+        """Registered jobs with their inferred dependencies and table references."""
+        return pd.DataFrame([{
+            'job': name,
+            'depends_on': ', '.join(job.depends_on),
+            'writes': ', '.join(sorted(self._refs[name][0])),
+            'reads': ', '.join(sorted(self._refs[name][1])),
+        } for name, job in self.jobs.items()])
+
+    def _execute(self, name: str) -> JobResult:
+        result = self.jobs[name]
+        start = time.perf_counter()
+        job = self.client.query(result.sql, job_config=self._configs.get(name))
+        result.job_id = job.job_id
+        rows = job.result()
+        if name in self._fetch:
+            result.rows = rows.to_dataframe()
+        result.total_bytes_processed = getattr(job, 'total_bytes_processed', None)
+        result.total_bytes_billed = getattr(job, 'total_bytes_billed', None)
+        result.slot_millis = getattr(job, 'slot_millis', None)
+        result.cache_hit = getattr(job, 'cache_hit', None)
+        result.num_dml_affected_rows = getattr(job, 'num_dml_affected_rows', None)
+        # DDL (CREATE TABLE AS) jobs report their table as ddl_target_table
+        destination = getattr(job, 'ddl_target_table', None) or getattr(job, 'destination', None)
+        result.destination = str(destination) if destination is not None else None
+        started, ended = getattr(job, 'started', None), getattr(job, 'ended', None)
+        result.elapsed_seconds = ((ended - started).total_seconds() if started and ended
+                                  else time.perf_counter() - start)
+        return result
+
+    def run(self, raise_on_error: bool = True) -> Dict[str, JobResult]:
+        """
+        Execute all pending jobs, at most max_concurrent at a time.
+
+        A failed job's dependents are SKIPPED. With raise_on_error the first
+        failure is raised after every runnable job has finished.
+        """
+        pending = [name for name, job in self.jobs.items() if job.state == 'PENDING']
+        print(f"[INFO] Running {len(pending)} BigQuery job(s), up to {self.max_concurrent} at a time")
+        wall_start = time.perf_counter()
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.max_concurrent) as pool:
+            while pending or running:
+                for name in list(pending):
+                    deps = [self.jobs[d].state for d in self.jobs[name].depends_on]
+                    if any(state in ('FAILED', 'SKIPPED') for state in deps):
+                        self.jobs[name].state = 'SKIPPED'
+                        pending.remove(name)
+                        print(f"[WARNING] Skipped {name} (dependency failed)")
+                    elif all(state == 'DONE' for state in deps) and len(running) < self.max_concurrent:
+                        running[pool.submit(self._execute, name)] = name
+                        pending.remove(name)
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    job = self.jobs[name]
+                    try:
+                        future.result()
+                        job.state = 'DONE'
+                        print(f"[INFO] Done {name}: {job.elapsed_seconds:.1f}s, "
+                              f"{(job.total_bytes_processed or 0) / 1e9:.2f} GB processed, "
+                              f"{(job.slot_millis or 0):,} slot-ms"
+                              + (f", {len(job.rows):,} rows" if job.rows is not None else ""))
+                    except Exception as e:
+                        job.state = 'FAILED'
+                        job.error = str(e)
+                        print(f"[ERROR] {name} failed: {str(e)[:500]}")
+
+        total = sum(job.elapsed_seconds or 0 for job in self.jobs.values())
+        print(f"[INFO] Jobs finished in {time.perf_counter() - wall_start:.1f}s wall "
+              f"({total:.1f}s of job time)")
+        failed = [job for job in self.jobs.values() if job.state == 'FAILED']
+        if failed and raise_on_error:
+            raise RuntimeError(f"BigQuery job {failed[0].name} failed: {failed[0].error}")
+        return self.jobs
+
+    def summary(self) -> pd.DataFrame:
+        """Per-job state and statistics."""
+        return pd.DataFrame([{
+            'job': job.name,
+            'state': job.state,
+            'job_id': job.job_id,
+            'elapsed_seconds': job.elapsed_seconds,
+            'gb_processed': (job.total_bytes_processed or 0) / 1e9,
+            'gb_billed': (job.total_bytes_billed or 0) / 1e9,
+            'slot_millis': job.slot_millis,
+            'cache_hit': job.cache_hit,
+            'rows_affected': job.num_dml_affected_rows,
+            'destination': job.destination,
+        } for job in self.jobs.values()])
+
+
+def run_sql_files(client, paths: Sequence, max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+                  raise_on_error: bool = True) -> Dict[str, JobResult]:
+    """Run SQL files with independent statements (within and across files) in parallel."""
+    manager = JobManager(client, max_concurrent=max_concurrent)
+    for path in paths:
+        manager.add_sql_file(path)
+    results = manager.run(raise_on_error=raise_on_error)
+    print(manager.summary().to_string(index=False))
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Run SQL files as concurrent BigQuery jobs')
+    parser.add_argument('sql_files', nargs='+', type=Path)
+    parser.add_argument('--max-concurrent', type=int, default=DEFAULT_MAX_CONCURRENT)
+    parser.add_argument('--plan', action='store_true', help='Print the inferred job graph without running')
+    parser.add_argument('--project', default='savvy-gtm-analytics')
+    args = parser.parse_args()
+
+    manager = JobManager(project_id=args.project, max_concurrent=args.max_concurrent)
+    for sql_file in args.sql_files:
+        manager.add_sql_file(sql_file)
+    if args.plan:
+        print(manager.plan().to_string(index=False))
+    else:
+        manager.run(raise_on_error=False)
+        print(manager.summary().to_string(index=False))
@@ -0,0 +1,165 @@
+# =============================================================================
+# MULTICOLLINEARITY MODULE
+# =============================================================================
+"""
+Streaming Correlation Matrix and Closed-Form VIF
+
+The per-feature statsmodels VIF fits one OLS regression per feature over the
+full matrix, and the correlation matrix is a second full pass. This module
+accumulates sufficient statistics in ONE streaming pass over chunks, then
+derives everything from them:
+
+- Pairwise-complete Pearson correlation (same values as DataFrame.corr()),
+  from per-pair counts, sums, sums of squares and cross products.
+- Every VIF at once from the diagonal of the inverse correlation matrix
+  (VIF_j = [R^-1]_jj), computed on the zero-filled matrix like the old
+  phase 5 script.
+- High-correlation pairs from the same matrix.
+
+Memory is O(p^2) regardless of row count, so the gates can run on the full
+prospect universe instead of a sample.
+
+Usage:
+    from v3.utils.multicollinearity import CorrelationAccumulator, stream_query_chunks
+
+    acc = CorrelationAccumulator(features)
+    for chunk in stream_query_chunks(client, sql):
+        acc.update(chunk)
+    corr = acc.correlation()
+    vif_df = acc.vif()
+    pairs = acc.high_correlation_pairs(threshold=0.7, critical=0.85)
+"""
+
+from typing import Iterator, List
+
+import numpy as np
+import pandas as pd
+
+VIF_CAP = 999.0           # Reported for perfectly collinear features
+VIF_CRITICAL = 10.0
+VIF_WARNING = 5.0
+
+
+def stream_query_chunks(client, sql: str, page_size: int = 500_000) -> Iterator[pd.DataFrame]:
+    """Yield a BigQuery query result as DataFrame chunks (one page at a time)."""
+    rows = client.query(sql).result(page_size=page_size)
+    yield from rows.to_dataframe_iterable()
+
+
+class CorrelationAccumulator:
+    """
+    One-pass accumulator for correlation and VIF over chunked data.
+
+    Pairwise statistics (NaN-aware) feed the correlation matrix; full-matrix
+    statistics on the zero-filled data feed the VIF.
+    """
+
+    def __init__(self, columns: List[str]):
+        self.columns = list(columns)
+        p = len(self.columns)
+        self.n_rows = 0
+        # Pairwise-complete statistics: entry [i, j] is over rows where i and j are both present
+        self.pair_count = np.zeros((p, p))
+        self.pair_sum = np.zeros((p, p))      # sum of x_i
+        self.pair_sumsq = np.zeros((p, p))    # sum of x_i^2
+        # Zero-filled statistics (cross products double as pairwise cross products)
+        self.sum = np.zeros(p)
+        self.cross = np.zeros((p, p))
+
+    def update(self, chunk: pd.DataFrame):
+        """Add a chunk of rows."""
+        values = chunk[self.columns].astype(float).to_numpy()
+        present = ~np.isnan(values)
+        filled = np.where(present, values, 0.0)
+        mask = present.astype(float)
+
+        self.n_rows += len(values)
+        self.pair_count += mask.T @ mask
+        self.pair_sum += filled.T @ mask
+        self.pair_sumsq += (filled * filled).T @ mask
+        self.sum += filled.sum(axis=0)
+        self.cross += filled.T @ filled
+
+    # -------------------------------------------------------------------------
+    # Correlation
+    # -------------------------------------------------------------------------
+    def correlation(self, min_periods: int = 2) -> pd.DataFrame:
+        """Pairwise-complete Pearson correlation matrix (matches DataFrame.corr())."""
+        n = self.pair_count
+        sx, sy = self.pair_sum, self.pair_sum.T
+        sxx, syy = self.pair_sumsq, self.pair_sumsq.T
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cov = n * self.cross - sx * sy
+            var = (n * sxx - sx ** 2) * (n * syy - sy ** 2)
+            corr = cov / np.sqrt(var)
+        corr[n < min_periods] = np.nan
+        corr = np.clip(corr, -1.0, 1.0)
+        diag = np.diag(var) > 0
+        corr[np.diag_indices_from(corr)] = np.where(diag, 1.0, np.nan)
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+
+    def high_correlation_pairs(self, threshold: float = 0.7, critical: float = 0.85) -> List[dict]:
+        """Upper-triangle feature pairs with |r| > threshold."""
+        corr = self.correlation().to_numpy()
+        i_idx, j_idx = np.triu_indices(len(self.columns), k=1)
+        values = corr[i_idx, j_idx]
+        hits = np.abs(np.nan_to_num(values)) > threshold
+        return [
+            {
+                'feature_1': self.columns[i],
+                'feature_2': self.columns[j],
+                'correlation': round(float(r), 4),
+                'status': 'CRITICAL' if abs(r) > critical else 'WARNING'
+            }
+            for i, j, r in zip(i_idx[hits], j_idx[hits], values[hits])
+        ]
+
+    # -------------------------------------------------------------------------
+    # VIF
+    # -------------------------------------------------------------------------
+    def vif(self, centered: bool = True, rcond: float = 1e-10) -> pd.DataFrame:
+        """
+        VIF for every non-constant feature from one matrix inverse.
+
+        Args:
+            centered: True = textbook VIF (regression with intercept, diagonal
+                of the inverse correlation matrix). False = no-intercept VIF,
+                identical to statsmodels variance_inflation_factor on the
+                zero-filled matrix without a constant column.
+            rcond: Relative eigenvalue cutoff for treating the matrix as singular
+
+        Returns:
+            DataFrame with feature, vif, status sorted by vif descending
+        """
+        n = self.n_rows
+        if centered:
+            scatter = self.cross - np.outer(self.sum, self.sum) / n
+        else:
+            scatter = self.cross.copy()
+        keep = np.diag(scatter) > 0
+        features = [c for c, k in zip(self.columns, keep) if k]
+        scatter = scatter[np.ix_(keep, keep)]
+
+        # Scale to unit diagonal (the correlation matrix when centered)
+        scale = np.sqrt(np.diag(scatter))
+        corr = scatter / np.outer(scale, scale)
+
+        eigvals, eigvecs = np.linalg.eigh(corr)
+        singular = eigvals < rcond * eigvals.max()
+        if singular.any():
+            # Pseudo-inverse fallback: features loading on the null space are
+            # perfectly explained by the others (infinite VIF)
+            inv_diag = np.diag(np.linalg.pinv(corr, rcond=rcond, hermitian=True))
+            null_loading = np.abs(eigvecs[:, singular]).max(axis=1) > 1e-8
+            vifs = np.where(null_loading, VIF_CAP, inv_diag)
+        else:
+            vifs = (eigvecs / eigvals) @ eigvecs.T
+            vifs = np.diag(vifs)
+
+        vifs = np.where(np.isfinite(vifs), np.minimum(vifs, VIF_CAP), VIF_CAP)
+        vif_df = pd.DataFrame({
+            'feature': features,
+            'vif': np.round(vifs, 2),
+            'status': np.where(vifs > VIF_CRITICAL, 'CRITICAL', np.where(vifs > VIF_WARNING, 'WARNING', 'OK'))
+        })
+        return vif_df.sort_values('vif', ascending=False).reset_index(drop=True)
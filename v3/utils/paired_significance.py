@@ -0,0 +1,293 @@
+# =============================================================================
+# PAIRED SIGNIFICANCE MODULE
+# =============================================================================
+"""
+Paired Bootstrap and Permutation Tests for Model Comparisons
+
+Compares a baseline and a candidate model on the SAME leads from their
+persisted per-lead predictions (see save_predictions / load_predictions).
+
+Rank once, reweight many times:
+- Each model's scores are sorted once. A resample is just a weight vector
+  over the sorted leads, so AUC and top-decile lift cost O(n) per resample
+  (cumulative sums; tied scores are grouped, so ties count 1/2 exactly like
+  roc_auc_score) and the data is never re-sorted.
+- Bootstrap: multinomial resample counts per lead, applied to both models
+  (paired). Gives CIs for each model and for the difference.
+- Permutation: under H0 the two models are exchangeable per lead, so each
+  permutation swaps the baseline/candidate score of a random half of the
+  leads. Both models' scores are pooled and sorted once; a permutation is a
+  0/1 weight mask over the pooled copies, so it is O(n) as well.
+- Top-decile lift follows calculate_top_decile_lift: qcut(q=10,
+  duplicates='drop') edges (linear interpolation over the resampled scores),
+  conversion in the top bin / overall conversion.
+- Resamples run in batches (vectorized over the batch) on a thread pool.
+  Each batch has its own seeded generator, so results do not depend on the
+  number of workers.
+
+Usage:
+    from v3.utils.paired_significance import compare_models, load_predictions
+
+    preds = load_predictions(REPORTS_DIR / "ablation_predictions.parquet")
+    result = compare_models(preds['target'], preds['BASELINE (V4.1 features)'],
+                            preds['+ has_accolade'], n_resamples=10000)
+    print(result['auc']['p_value'], result['auc']['diff_ci_95'])
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+TARGET_COLUMN = 'target'
+METRICS = ('auc', 'top_decile_lift')
+DECILE_LEVELS = np.linspace(0.0, 1.0, 11)
+
+
+# =============================================================================
+# PREDICTION PERSISTENCE
+# =============================================================================
+def save_predictions(path, y_true, predictions: Dict[str, np.ndarray], ids=None) -> Path:
+    """Persist per-lead predictions of several models on one evaluation set (Parquet)."""
+    frame = pd.DataFrame({TARGET_COLUMN: np.asarray(y_true)})
+    if ids is not None:
+        frame.insert(0, 'id', np.asarray(ids))
+    for name, scores in predictions.items():
+        frame[name] = np.asarray(scores, dtype=np.float64)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    frame.to_parquet(path, index=False, compression='zstd')
+    return path
+
+
+def load_predictions(path) -> pd.DataFrame:
+    """Load predictions saved by save_predictions (columns: [id], target, <model>...)."""
+    return pd.read_parquet(path)
+
+
+# =============================================================================
+# RANK-ONCE WEIGHTED METRICS
+# =============================================================================
+class RankedScores:
+    """Scores sorted once; metrics are evaluated for batches of per-lead weights."""
+
+    def __init__(self, scores, y_true):
+        scores = np.asarray(scores, dtype=np.float64)
+        self.order = np.argsort(scores, kind='stable')
+        self.scores = scores[self.order]
+        self.y = np.asarray(y_true, dtype=np.float64)[self.order]
+        change = np.ones(len(self.scores), dtype=bool)
+        change[1:] = self.scores[1:] != self.scores[:-1]
+        self.group_starts = np.flatnonzero(change)
+
+    def auc(self, w: np.ndarray) -> np.ndarray:
+        """Weighted ROC AUC per weight row (w: batch x n, in sorted order)."""
+        pos = np.add.reduceat(w * self.y, self.group_starts, axis=1)
+        neg = np.add.reduceat(w, self.group_starts, axis=1) - pos
+        neg_below = np.cumsum(neg, axis=1) - neg
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return (pos * (neg_below + 0.5 * neg)).sum(axis=1) / (pos.sum(axis=1) * neg.sum(axis=1))
+
+    def _weighted_quantiles(self, cum_w: np.ndarray, total: np.ndarray, levels: np.ndarray) -> np.ndarray:
+        """Linear-interpolated quantiles of the resampled scores (each score repeated w times)."""
+        batch, n = cum_w.shape
+        virtual = levels[None, :] * (total[:, None] - 1)
+        lo = np.floor(virtual)
+        hi = np.minimum(lo + 1, total[:, None] - 1)
+        t = virtual - lo
+
+        # Value at sorted-sample position k = first lead whose cumulative weight exceeds k.
+        # Rows are offset so a single searchsorted serves the whole batch.
+        offsets = np.arange(batch)[:, None] * (total.max() + 1)
+        flat = (cum_w + offsets).ravel()
+        row_start = np.arange(batch)[:, None] * n
+
+        def value_at(position):
+            idx = np.searchsorted(flat, position + offsets, side='right') - row_start
+            return self.scores[np.minimum(idx, n - 1)]
+
+        a, b = value_at(lo), value_at(hi)
+        diff = b - a
+        out = a + diff * t
+        upper = t >= 0.5
+        out[upper] = (b - diff * (1 - t))[upper]
+        return out
+
+    def top_decile_lift(self, w: np.ndarray) -> np.ndarray:
+        """Weighted top-decile lift per weight row (qcut(q=10, duplicates='drop') top bin)."""
+        cum_w = np.cumsum(w, axis=1)
+        cum_wy = np.cumsum(w * self.y, axis=1)
+        total, total_y = cum_w[:, -1], cum_wy[:, -1]
+        edges = self._weighted_quantiles(cum_w, total, DECILE_LEVELS)
+
+        # Top bin starts above the largest edge that is below the maximum
+        lower = np.where(edges[:, :-1] < edges[:, -1:], edges[:, :-1], -np.inf).max(axis=1)
+        below = np.searchsorted(self.scores, lower, side='right') - 1
+        rows = np.arange(len(w))
+        w_below = np.where(below >= 0, cum_w[rows, np.maximum(below, 0)], 0.0)
+        wy_below = np.where(below >= 0, cum_wy[rows, np.maximum(below, 0)], 0.0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            top_rate = (total_y - wy_below) / (total - w_below)
+            base_rate = total_y / total
+            return np.where(base_rate > 0, top_rate / base_rate, 0.0)
+
+    def metric(self, name: str, w: np.ndarray) -> np.ndarray:
+        if name == 'auc':
+            return self.auc(w)
+        if name == 'top_decile_lift':
+            return self.top_decile_lift(w)
+        raise ValueError(f"Unknown metric '{name}' (expected one of {METRICS})")
+
+
+def bottom_fraction_rate(y_true, scores, fraction: float = 0.2) -> float:
+    """Conversion rate among leads at or below the `fraction` score quantile."""
+    scores = np.asarray(scores, dtype=np.float64)
+    cutoff = np.quantile(scores, fraction)
+    return float(np.asarray(y_true, dtype=np.float64)[scores <= cutoff].mean())
+
+
+# =============================================================================
+# BATCH RUNNER
+# =============================================================================
+def _run_batches(batch_fn: Callable, n_total: int, batch_size: int, seed: int,
+                 n_workers: Optional[int]) -> Dict[str, np.ndarray]:
+    """Run batch_fn(rng, size) over ceil(n_total / batch_size) batches and concatenate outputs."""
+    sizes = [min(batch_size, n_total - start) for start in range(0, n_total, batch_size)]
+    with ThreadPoolExecutor(max_workers=n_workers) as pool:
+        futures = [pool.submit(batch_fn, np.random.default_rng([seed, i]), size) for i, size in enumerate(sizes)]
+        parts = [f.result() for f in futures]
+    return {key: np.concatenate([p[key] for p in parts]) for key in parts[0]}
+
+
+def _one_sided_p(null: np.ndarray, observed: float) -> float:
+    """P(null >= observed) with the +1 correction."""
+    return float((1 + np.sum(null >= observed)) / (1 + len(null)))
+
+
+# =============================================================================
+# PUBLIC API
+# =============================================================================
+def paired_bootstrap(
+    y_true,
+    baseline,
+    candidate,
+    n_resamples: int = 10000,
+    metrics: Sequence[str] = METRICS,
+    batch_size: int = 100,
+    seed: int = 42,
+    n_workers: Optional[int] = None,
+) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Paired bootstrap over leads: both models are scored on the same resample.
+
+    Returns:
+        {metric: {'baseline': array, 'candidate': array, 'diff': array}} of
+        length n_resamples
+    """
+    base = RankedScores(baseline, y_true)
+    cand = RankedScores(candidate, y_true)
+    n = len(base.scores)
+
+    def batch(rng, size):
+        draws = rng.integers(0, n, size=(size, n)) + np.arange(size)[:, None] * n
+        counts = np.bincount(draws.ravel(), minlength=size * n).reshape(size, n).astype(np.float64)
+        out = {}
+        for name in metrics:
+            b = base.metric(name, counts[:, base.order])
+            c = cand.metric(name, counts[:, cand.order])
+            out[f'{name}/baseline'], out[f'{name}/candidate'], out[f'{name}/diff'] = b, c, c - b
+        return out
+
+    flat = _run_batches(batch, n_resamples, batch_size, seed, n_workers)
+    return {name: {k: flat[f'{name}/{k}'] for k in ('baseline', 'candidate', 'diff')} for name in metrics}
+
+
+def paired_permutation_test(
+    y_true,
+    baseline,
+    candidate,
+    n_permutations: int = 10000,
+    metrics: Sequence[str] = METRICS,
+    batch_size: int = 100,
+    seed: int = 42,
+    n_workers: Optional[int] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Null distribution of (candidate - baseline) under per-lead score swapping.
+
+    Returns:
+        {metric: array of permuted differences, length n_permutations}
+    """
+    baseline = np.asarray(baseline, dtype=np.float64)
+    candidate = np.asarray(candidate, dtype=np.float64)
+    y = np.asarray(y_true, dtype=np.float64)
+    n = len(y)
+    pooled = RankedScores(np.concatenate([baseline, candidate]), np.concatenate([y, y]))
+
+    def batch(rng, size):
+        swap = rng.random((size, n)) < 0.5
+        # Permuted candidate takes the baseline copy where swapped, the candidate copy otherwise
+        cand_w = np.concatenate([swap, ~swap], axis=1).astype(np.float64)[:, pooled.order]
+        base_w = 1.0 - cand_w
+        return {name: pooled.metric(name, cand_w) - pooled.metric(name, base_w) for name in metrics}
+
+    return _run_batches(batch, n_permutations, batch_size, seed, n_workers)
+
+
+def compare_models(
+    y_true,
+    baseline,
+    candidate,
+    n_resamples: int = 10000,
+    n_permutations: Optional[int] = None,
+    metrics: Sequence[str] = METRICS,
+    min_improvement: Optional[Dict[str, float]] = None,
+    confidence: float = 0.95,
+    seed: int = 42,
+    n_workers: Optional[int] = None,
+) -> Dict[str, Dict]:
+    """
+    Observed metrics, paired bootstrap CIs and permutation p-values.
+
+    Args:
+        min_improvement: Per-metric gate thresholds (e.g. {'auc': 0.005}); adds
+            the bootstrap probability that the improvement is below the gate
+
+    Returns:
+        {metric: {baseline, candidate, diff, baseline_ci_95, candidate_ci_95,
+                  diff_ci_95, p_value (one-sided, candidate better),
+                  p_value_two_sided, prob_below_min_improvement}}
+    """
+    n_permutations = n_permutations or n_resamples
+    ones = np.ones((1, len(np.asarray(y_true))))
+    base = RankedScores(baseline, y_true)
+    cand = RankedScores(candidate, y_true)
+
+    boot = paired_bootstrap(y_true, baseline, candidate, n_resamples, metrics, seed=seed, n_workers=n_workers)
+    null = paired_permutation_test(y_true, baseline, candidate, n_permutations, metrics,
+                                   seed=seed + 1, n_workers=n_workers)
+
+    alpha = (1 - confidence) / 2
+    results = {}
+    for name in metrics:
+        observed_base = float(base.metric(name, ones)[0])
+        observed_cand = float(cand.metric(name, ones)[0])
+        diff = observed_cand - observed_base
+        ci = {k: np.nanquantile(boot[name][k], [alpha, 1 - alpha]).tolist() for k in ('baseline', 'candidate', 'diff')}
+        results[name] = {
+            'baseline': observed_base,
+            'candidate': observed_cand,
+            'diff': diff,
+            'baseline_ci_95': ci['baseline'],
+            'candidate_ci_95': ci['candidate'],
+            'diff_ci_95': ci['diff'],
+            'p_value': _one_sided_p(null[name], diff),
+            'p_value_two_sided': _one_sided_p(np.abs(null[name]), abs(diff)),
+            'n_resamples': n_resamples,
+            'n_permutations': n_permutations,
+        }
+        if min_improvement and name in min_improvement:
+            results[name]['prob_below_min_improvement'] = float(np.mean(boot[name]['diff'] < min_improvement[name]))
+    return results
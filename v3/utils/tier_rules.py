@@ -0,0 +1,295 @@
+# =============================================================================
+# TIER RULES ENGINE
+# =============================================================================
+"""
+Declarative V3 Tier Rules
+
+The V3 tier ladder is a first-match CASE statement that was copied (and has
+drifted) across the phase 4 SQL and the monthly lead-list SQLs. This module
+loads the ladder as data (v3/config/tier_rules.yaml) and uses that one
+definition two ways:
+
+- Locally: every condition compiles to a NumPy boolean mask over a feature
+  frame; tiers are assigned first-match in a single np.select pass.
+  Re-tiering 500k prospects takes well under a second.
+- Warehouse: the same definition renders the SQL CASE expressions
+  (score_tier, tier_display, expected_conversion_rate, expected_lift,
+  priority_rank) to paste into or generate a lead-list query.
+
+NULL handling matches SQL: a NULL field fails every comparison (NaN compares
+False), so a WHEN with a NULL input falls through to the next tier.
+
+Usage:
+    from v3.utils.tier_rules import load_tier_rules
+
+    rules = load_tier_rules()
+    df['score_tier'] = rules.assign(df)
+    print(rules.to_sql_case())
+
+    # Evaluate a proposed tier without touching any SQL
+    rules = rules.with_tier({...}, before='TIER_1A_PRIME_MOVER_CFP')
+
+CLI:
+    python v3/utils/tier_rules.py --sql            # print score_tier CASE
+    python v3/utils/tier_rules.py --sql --metadata # plus display/rate/lift/rank CASEs
+"""
+
+import copy
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import yaml
+
+DEFAULT_RULES_PATH = Path(__file__).resolve().parent.parent / "config" / "tier_rules.yaml"
+
+METADATA_COLUMNS = ['display', 'expected_conversion_rate', 'expected_lift', 'priority_rank']
+
+COMPARISON_OPS = {
+    '=': np.equal,
+    '!=': np.not_equal,
+    '<': np.less,
+    '<=': np.less_equal,
+    '>': np.greater,
+    '>=': np.greater_equal,
+}
+
+_NUMBER = r"-?\d+(?:\.\d+)?"
+_FIELD = r"[A-Za-z_]\w*"
+BETWEEN_PATTERN = re.compile(rf"^({_FIELD})\s+between\s+({_NUMBER})\s+and\s+({_NUMBER})$", re.IGNORECASE)
+IS_TRUE_PATTERN = re.compile(rf"^({_FIELD})\s+is\s+true$", re.IGNORECASE)
+COMPARE_PATTERN = re.compile(
+    rf"^(?:coalesce\(\s*({_FIELD})\s*,\s*({_NUMBER})\s*\)|({_FIELD}))\s*(=|!=|<=|>=|<|>)\s*({_NUMBER})$",
+    re.IGNORECASE,
+)
+
+
+def _number(text: str):
+    value = float(text)
+    return int(value) if value.is_integer() and '.' not in text else value
+
+
+@dataclass(frozen=True)
+class Condition:
+    """One parsed atom of a tier rule."""
+    kind: str                     # 'between' | 'is_true' | 'compare'
+    field: str
+    op: Optional[str] = None
+    value: Optional[float] = None
+    high: Optional[float] = None
+    default: Optional[float] = None
+
+    @classmethod
+    def parse(cls, text: str) -> 'Condition':
+        text = " ".join(str(text).split())
+        m = BETWEEN_PATTERN.match(text)
+        if m:
+            return cls('between', m.group(1), value=_number(m.group(2)), high=_number(m.group(3)))
+        m = IS_TRUE_PATTERN.match(text)
+        if m:
+            return cls('is_true', m.group(1))
+        m = COMPARE_PATTERN.match(text)
+        if m:
+            field = m.group(1) or m.group(3)
+            default = _number(m.group(2)) if m.group(2) is not None else None
+            return cls('compare', field, op=m.group(4), value=_number(m.group(5)), default=default)
+        raise ValueError(f"Unparseable tier condition: '{text}'")
+
+    def mask(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        values = columns[self.field]
+        if self.kind == 'is_true':
+            return values == 1
+        if self.default is not None:
+            values = np.where(np.isnan(values), self.default, values)
+        if self.kind == 'between':
+            return (values >= self.value) & (values <= self.high)
+        return COMPARISON_OPS[self.op](values, self.value)
+
+    def to_sql(self) -> str:
+        if self.kind == 'is_true':
+            return f"COALESCE({self.field}, FALSE) = TRUE"
+        if self.kind == 'between':
+            return f"{self.field} BETWEEN {self.value} AND {self.high}"
+        lhs = f"COALESCE({self.field}, {self.default})" if self.default is not None else self.field
+        return f"{lhs} {self.op} {self.value}"
+
+
+def _parse_clause(clause):
+    """A clause is a condition string or {any_of: [[...], ...]}."""
+    if isinstance(clause, dict):
+        if set(clause) != {'any_of'}:
+            raise ValueError(f"Unknown tier clause keys: {sorted(clause)}")
+        return ('any_of', [[_parse_clause(c) for c in group] for group in clause['any_of']])
+    return Condition.parse(clause)
+
+
+def _clause_fields(clause) -> List[str]:
+    if isinstance(clause, Condition):
+        return [clause.field]
+    return [f for group in clause[1] for c in group for f in _clause_fields(c)]
+
+
+def _clause_mask(clause, columns: Dict[str, np.ndarray], n: int) -> np.ndarray:
+    if isinstance(clause, Condition):
+        return clause.mask(columns)
+    result = np.zeros(n, dtype=bool)
+    for group in clause[1]:
+        result |= _all_mask(group, columns, n)
+    return result
+
+
+def _all_mask(clauses, columns: Dict[str, np.ndarray], n: int) -> np.ndarray:
+    result = np.ones(n, dtype=bool)
+    for clause in clauses:
+        result &= _clause_mask(clause, columns, n)
+    return result
+
+
+def _clause_sql(clause) -> str:
+    if isinstance(clause, Condition):
+        return clause.to_sql()
+    groups = [" AND ".join(_clause_sql(c) for c in group) for group in clause[1]]
+    return "(" + " OR ".join(f"({g})" for g in groups) + ")"
+
+
+def _to_float(series: pd.Series) -> np.ndarray:
+    """Column as float64 with NULLs as NaN (handles nullable bool/Int64 dtypes)."""
+    if series.dtype == object:
+        series = pd.to_numeric(series.map(lambda v: float(v) if isinstance(v, bool) else v), errors='coerce')
+    return series.to_numpy(dtype='float64', na_value=np.nan)
+
+
+class TierRules:
+    """Ordered, first-match tier ladder loaded from a rules definition."""
+
+    def __init__(self, definition: dict):
+        self.definition = definition
+        self.version = definition.get('version', 'unknown')
+        self.tier_column = definition.get('tier_column', 'score_tier')
+        self.default = definition['default']
+        self.tiers = definition['tiers']
+        self._compiled = [[_parse_clause(c) for c in tier['when']] for tier in self.tiers]
+
+        names = [t['tier'] for t in self.tiers]
+        duplicates = {n for n in names if names.count(n) > 1}
+        if duplicates:
+            raise ValueError(f"Duplicate tier names in rules: {sorted(duplicates)}")
+
+    @property
+    def tier_names(self) -> List[str]:
+        return [t['tier'] for t in self.tiers]
+
+    @property
+    def fields(self) -> List[str]:
+        """Every feature column referenced by any tier."""
+        fields = []
+        for clauses in self._compiled:
+            for clause in clauses:
+                for f in _clause_fields(clause):
+                    if f not in fields:
+                        fields.append(f)
+        return fields
+
+    # -------------------------------------------------------------------------
+    # Local evaluation
+    # -------------------------------------------------------------------------
+    def masks(self, df: pd.DataFrame) -> List[np.ndarray]:
+        """One boolean mask per tier (before first-match resolution)."""
+        missing = [f for f in self.fields if f not in df.columns]
+        if missing:
+            raise KeyError(f"Feature frame is missing tier rule columns: {missing}")
+        columns = {f: _to_float(df[f]) for f in self.fields}
+        n = len(df)
+        return [_all_mask(clauses, columns, n) for clauses in self._compiled]
+
+    def assign_index(self, df: pd.DataFrame) -> np.ndarray:
+        """Index into tier_names per row (len(tiers) = default tier), first match wins."""
+        return np.select(self.masks(df), np.arange(len(self.tiers)), default=len(self.tiers))
+
+    def assign(self, df: pd.DataFrame) -> pd.Series:
+        """Tier name per row."""
+        names = np.array(self.tier_names + [self.default['tier']], dtype=object)
+        return pd.Series(names[self.assign_index(df)], index=df.index, name=self.tier_column)
+
+    def assign_with_metadata(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Tier plus display name, expected conversion, expected lift and priority rank."""
+        idx = self.assign_index(df)
+        rows = self.tiers + [self.default]
+        out = pd.DataFrame(index=df.index)
+        out[self.tier_column] = np.array([r['tier'] for r in rows], dtype=object)[idx]
+        out['tier_display'] = np.array([r['display'] for r in rows], dtype=object)[idx]
+        for col in METADATA_COLUMNS[1:]:
+            out[col] = np.array([r[col] for r in rows])[idx]
+        return out
+
+    def with_tier(self, tier: dict, before: Optional[str] = None) -> 'TierRules':
+        """Copy of these rules with a proposed tier inserted (default: just before the default)."""
+        definition = copy.deepcopy(self.definition)
+        position = len(definition['tiers'])
+        if before is not None:
+            position = self.tier_names.index(before)
+        definition['tiers'].insert(position, tier)
+        return TierRules(definition)
+
+    # -------------------------------------------------------------------------
+    # SQL emission
+    # -------------------------------------------------------------------------
+    def to_sql_case(self, indent: int = 8) -> str:
+        """First-match CASE expression producing the tier column."""
+        pad = " " * indent
+        lines = [f"{pad}CASE"]
+        for tier, clauses in zip(self.tiers, self._compiled):
+            conditions = [_clause_sql(c) for c in clauses]
+            lines.append(f"{pad}    WHEN {conditions[0]}")
+            for cond in conditions[1:]:
+                lines.append(f"{pad}         AND {cond}")
+            lines.append(f"{pad}    THEN '{tier['tier']}'")
+        lines.append(f"{pad}    ELSE '{self.default['tier']}'")
+        lines.append(f"{pad}END as {self.tier_column}")
+        return "\n".join(lines)
+
+    def to_sql_metadata(self, indent: int = 8) -> str:
+        """CASE expressions mapping the tier column to display/rate/lift/rank."""
+        pad = " " * indent
+        blocks = []
+        for key in METADATA_COLUMNS:
+            alias = 'tier_display' if key == 'display' else key
+            lines = [f"{pad}CASE {self.tier_column}"]
+            for tier in self.tiers:
+                lines.append(f"{pad}    WHEN '{tier['tier']}' THEN {_sql_literal(tier[key])}")
+            lines.append(f"{pad}    ELSE {_sql_literal(self.default[key])}")
+            lines.append(f"{pad}END as {alias}")
+            blocks.append("\n".join(lines))
+        return ",\n\n".join(blocks)
+
+
+def _sql_literal(value) -> str:
+    if isinstance(value, str):
+        return "'" + value.replace("'", "\\'") + "'"
+    return str(value)
+
+
+def load_tier_rules(path: Optional[str] = None) -> TierRules:
+    """Load tier rules from YAML (default: v3/config/tier_rules.yaml)."""
+    with open(path or DEFAULT_RULES_PATH, 'r', encoding='utf-8') as f:
+        return TierRules(yaml.safe_load(f))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Render V3 tier rules as SQL')
+    parser.add_argument('--rules', default=None, help='Rules YAML (default: v3/config/tier_rules.yaml)')
+    parser.add_argument('--sql', action='store_true', help='Print the score_tier CASE expression')
+    parser.add_argument('--metadata', action='store_true', help='Also print display/rate/lift/rank CASEs')
+    args = parser.parse_args()
+
+    rules = load_tier_rules(args.rules)
+    print(f"-- Generated from tier rules {rules.version} ({len(rules.tiers)} tiers)")
+    if args.sql or not args.metadata:
+        print(rules.to_sql_case())
+    if args.metadata:
+        print(rules.to_sql_metadata())
@@ -0,0 +1,266 @@
+# =============================================================================
+# UNIVARIATE SCREENING MODULE
+# =============================================================================
+"""
+Columnar Univariate Feature Screening
+
+The V5 univariate analysis scanned the data several times per feature
+(notna, pointbiserialr, qcut, groupby, Mann-Whitney / chi-square). This
+module screens every candidate column in one columnar pass and returns the
+same statistics and recommendations:
+
+Numeric columns (float64 / int64), processed in column blocks:
+- +/-inf (e.g. a ratio over a zero denominator) is counted per column
+  (infinite_values) and then treated as missing, so it cannot inflate the
+  distinct count or turn quartile edges into NaN.
+- Coverage, point-biserial correlation and its p-value from centered
+  matrix products over the non-null rows of every column at once.
+- ONE sort per column yields the distinct-value count and the qcut quartile
+  edges (same linear interpolation as pandas/numpy). Quartile membership and
+  per-quartile conversion are then mask sums over the block.
+- Q4-vs-Q1 Mann-Whitney U in closed form: the target is binary, so ranks
+  reduce to counts of ones and zeros in each quartile (tie-corrected normal
+  approximation with continuity correction, as scipy uses at these sizes).
+- Blocks run on a thread pool (NumPy releases the GIL in sort/matmul).
+
+Other columns (categorical): one factorize + bincount per column gives the
+contingency table for chi-square and the per-category conversion rates.
+
+Rules (unchanged from the V5 analysis):
+- coverage < 10%                       -> SKIP - Coverage < 10%
+- p < 0.05 and lift > 1.2              -> PROMISING - Significant signal
+- p < 0.05                             -> WEAK - Significant but small effect
+- otherwise                            -> SKIP - Not significant
+
+Usage:
+    from v3.utils.univariate_screening import screen_features
+
+    results_df = screen_features(df, candidate_features, target='target_mql_43d')
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+MIN_COVERAGE = 0.10
+SIGNIFICANCE_LEVEL = 0.05
+MIN_LIFT = 1.2
+MIN_QUARTILE_ROWS = 10            # Q1 and Q4 must each have more rows than this
+NUMERIC_DTYPES = ['float64', 'int64']
+QUARTILE_LEVELS = np.array([0.0, 0.25, 0.5, 0.75, 1.0])
+
+
+def recommend(p_value: float, lift: float) -> str:
+    """Pass/fail recommendation from a significance p-value and effect lift."""
+    if pd.notna(p_value) and p_value < SIGNIFICANCE_LEVEL:
+        if pd.notna(lift) and lift > MIN_LIFT:
+            return 'PROMISING - Significant signal'
+        return 'WEAK - Significant but small effect'
+    return 'SKIP - Not significant'
+
+
+# =============================================================================
+# NUMERIC BLOCKS
+# =============================================================================
+def _sorted_quantiles(sorted_block: np.ndarray, n_valid: np.ndarray) -> np.ndarray:
+    """Linear-interpolated quantiles (numpy's method) from column-sorted data with NaNs last."""
+    virtual = QUARTILE_LEVELS[:, None] * (n_valid[None, :] - 1)
+    lo = np.floor(virtual).astype(np.int64)
+    hi = np.minimum(lo + 1, np.maximum(n_valid - 1, 0)[None, :])
+    t = virtual - lo
+    cols = np.arange(sorted_block.shape[1])[None, :]
+    a = sorted_block[np.clip(lo, 0, None), cols]
+    b = sorted_block[np.clip(hi, 0, None), cols]
+    diff = b - a
+    out = a + diff * t
+    upper = t >= 0.5
+    out[upper] = (b - diff * (1 - t))[upper]
+    return out
+
+
+def _mann_whitney_binary(n1, ones1, n2, ones2) -> np.ndarray:
+    """Two-sided Mann-Whitney U p-value for two binary samples (vectorized)."""
+    n = n1 + n2
+    ones = ones1 + ones2
+    zeros = n - ones
+    # Average ranks: zeros occupy 1..zeros, ones occupy zeros+1..n
+    rank_sum1 = (n1 - ones1) * (zeros + 1) / 2 + ones1 * (zeros + (ones + 1) / 2)
+    u1 = rank_sum1 - n1 * (n1 + 1) / 2
+    u = np.maximum(u1, n1 * n2 - u1)
+    tie_term = (zeros ** 3 - zeros) + (ones ** 3 - ones)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sigma = np.sqrt(n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1))))
+        z = (u - n1 * n2 / 2 - 0.5) / sigma
+    return np.clip(2 * stats.norm.sf(z), 0, 1)
+
+
+def _screen_numeric_block(block: pd.DataFrame, y: np.ndarray) -> List[Dict]:
+    values = block.to_numpy(dtype=np.float64, na_value=np.nan)
+    infinite = np.isinf(values)
+    n_infinite = infinite.sum(axis=0)
+    values = np.where(infinite, np.nan, values)    # reported separately, screened as missing
+    valid = ~np.isnan(values)
+    n_rows = len(values)
+    n_valid = valid.sum(axis=0)
+    coverage = n_valid / n_rows if n_rows else np.zeros(values.shape[1])
+
+    # Single sort per column: distinct count + quartile edges
+    sorted_block = np.sort(values, axis=0)
+    distinct = np.zeros(values.shape[1], dtype=np.int64)
+    if n_rows > 1:
+        changes = (np.diff(sorted_block, axis=0) != 0) & ~np.isnan(sorted_block[1:])
+        distinct = changes.sum(axis=0) + (n_valid > 0)
+    elif n_rows == 1:
+        distinct = n_valid.astype(np.int64)
+    edges = _sorted_quantiles(sorted_block, n_valid)
+
+    # Point-biserial correlation on each column's non-null rows (centered)
+    filled = np.where(valid, values, 0.0)
+    yf = y.astype(np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_x = filled.sum(axis=0) / n_valid
+        centered = np.where(valid, values - mean_x, 0.0)
+        ones = valid.T.astype(np.float64) @ yf
+        sxx = (centered * centered).sum(axis=0)
+        sxy = centered.T @ yf
+        syy = ones - ones ** 2 / n_valid
+        r = np.clip(sxy / np.sqrt(sxx * syy), -1.0, 1.0)
+        dof = n_valid - 2
+        t_stat = r * np.sqrt(dof / ((1 - r) * (1 + r)))
+    p_corr = np.where(np.abs(r) == 1.0, 0.0, 2 * stats.t.sf(np.abs(t_stat), np.maximum(dof, 1)))
+    p_corr = np.where(np.isnan(r), np.nan, p_corr)
+
+    # Quartiles exactly as qcut(q=4, duplicates='drop'): (e0, e1] incl. lowest, ..., (e3, e4]
+    quartile = (values > edges[1]).astype(np.int8) + (values > edges[2]) + (values > edges[3])
+    q_counts = np.empty((4, values.shape[1]))
+    q_ones = np.empty((4, values.shape[1]))
+    for q in range(4):
+        member = (valid & (quartile == q)).astype(np.float64)
+        q_counts[q] = member.sum(axis=0)
+        q_ones[q] = member.T @ yf
+    with np.errstate(invalid='ignore', divide='ignore'):
+        q_rates = q_ones / q_counts
+    has_quartiles = (np.diff(edges, axis=0) > 0).all(axis=0)
+    q_pvalue = _mann_whitney_binary(q_counts[0], q_ones[0], q_counts[3], q_ones[3])
+    enough = (q_counts[0] > MIN_QUARTILE_ROWS) & (q_counts[3] > MIN_QUARTILE_ROWS)
+
+    results = []
+    for j, feature in enumerate(block.columns):
+        row = {'feature': feature, 'coverage': coverage[j], 'unique_values': int(distinct[j]),
+               'infinite_values': int(n_infinite[j])}
+        if coverage[j] < MIN_COVERAGE:
+            row['recommendation'] = 'SKIP - Coverage < 10%'
+            results.append(row)
+            continue
+        row['correlation'] = r[j]
+        row['correlation_pvalue'] = p_corr[j]
+        if has_quartiles[j]:
+            q1, q4 = q_rates[0, j], q_rates[3, j]
+            row['q1_rate'] = q1
+            row['q4_rate'] = q4
+            row['q4_q1_lift'] = q4 / q1 if q1 > 0 else np.nan
+            row['quartile_pvalue'] = q_pvalue[j] if enough[j] else np.nan
+        else:
+            # qcut with 4 labels fails when duplicate edges are dropped
+            row.update({'q1_rate': np.nan, 'q4_rate': np.nan, 'q4_q1_lift': np.nan, 'quartile_pvalue': np.nan})
+        row['recommendation'] = recommend(row['correlation_pvalue'], row['q4_q1_lift'])
+        results.append(row)
+    return results
+
+
+# =============================================================================
+# CATEGORICAL COLUMNS
+# =============================================================================
+def _screen_categorical(column: pd.Series, y: np.ndarray) -> Dict:
+    row = {'feature': column.name, 'coverage': column.notna().mean(), 'unique_values': column.nunique()}
+    if row['coverage'] < MIN_COVERAGE:
+        row['recommendation'] = 'SKIP - Coverage < 10%'
+        return row
+
+    # Chi-square on (category incl. 'Unknown' for nulls) x target
+    try:
+        codes, _ = pd.factorize(column.fillna('Unknown'))
+        target_codes, _ = pd.factorize(y, sort=True)
+        n_targets = target_codes.max() + 1
+        table = np.bincount(codes * n_targets + target_codes,
+                            minlength=(codes.max() + 1) * n_targets).reshape(-1, n_targets)
+        if table.shape[0] > 1 and table.shape[1] > 1:
+            chi2, p_value, _, _ = stats.chi2_contingency(table)
+            row['chi2'] = chi2
+            row['chi2_pvalue'] = p_value
+        else:
+            row['chi2'] = np.nan
+            row['chi2_pvalue'] = 1.0
+    except Exception:
+        row['chi2'] = np.nan
+        row['chi2_pvalue'] = 1.0
+
+    # Conversion rate by (non-null) category
+    try:
+        codes, categories = pd.factorize(column, sort=True)    # groupby order for ties
+    except TypeError:
+        codes, categories = pd.factorize(column)
+    present = codes >= 0
+    if present.any():
+        counts = np.bincount(codes[present], minlength=len(categories))
+        ones = np.bincount(codes[present], weights=y[present], minlength=len(categories))
+        rates = ones / counts
+        row['best_category'] = categories[int(np.argmax(rates))]
+        row['best_category_rate'] = rates.max()
+        row['worst_category_rate'] = rates.min()
+        row['category_lift'] = (row['best_category_rate'] / row['worst_category_rate']
+                                if row['worst_category_rate'] > 0 else np.nan)
+    else:
+        row.update({'best_category': np.nan, 'best_category_rate': np.nan,
+                    'worst_category_rate': np.nan, 'category_lift': np.nan})
+
+    row['recommendation'] = recommend(row['chi2_pvalue'], row['category_lift'])
+    return row
+
+
+# =============================================================================
+# PUBLIC API
+# =============================================================================
+def screen_features(
+    df: pd.DataFrame,
+    features: Optional[List[str]] = None,
+    target: str = 'target_mql_43d',
+    block_size: int = 64,
+    n_workers: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Screen candidate features against a binary target in one columnar pass.
+
+    Args:
+        df: Data with the candidate features and the target
+        features: Columns to screen (default: every column except the target)
+        target: Binary target column
+        block_size: Numeric columns per block (bounds peak memory)
+        n_workers: Threads across blocks / categorical columns (default: executor default)
+
+    Returns:
+        One row per feature (input order) with coverage, unique_values,
+        infinite_values (numeric; excluded from the other stats),
+        correlation / quartile stats (numeric) or chi2 / category stats
+        (categorical) and recommendation
+    """
+    if features is None:
+        features = [c for c in df.columns if c != target]
+    features = [f for f in features if f in df.columns]
+    y = df[target].to_numpy(dtype=np.float64)
+
+    numeric = [f for f in features if df[f].dtype in NUMERIC_DTYPES]
+    categorical = [f for f in features if f not in numeric]
+    blocks = [numeric[i:i + block_size] for i in range(0, len(numeric), block_size)]
+
+    with ThreadPoolExecutor(max_workers=n_workers) as pool:
+        numeric_futures = [pool.submit(_screen_numeric_block, df[block], y) for block in blocks]
+        categorical_futures = [pool.submit(_screen_categorical, df[f], y) for f in categorical]
+        rows = [row for fut in numeric_futures for row in fut.result()]
+        rows += [fut.result() for fut in categorical_futures]
+
+    by_feature = {row['feature']: row for row in rows}
+    return pd.DataFrame([by_feature[f] for f in features])
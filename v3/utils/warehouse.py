@@ -0,0 +1,1158 @@
+# =============================================================================
+# WAREHOUSE BACKEND MODULE
+# =============================================================================
+"""
+Pluggable Warehouse Backend: BigQuery or a Local DuckDB Stand-In
+
+Every pipeline script talks to BigQuery through the same small client
+surface: client.query(sql).result() / .to_dataframe(), load_table_from_dataframe,
+get_table and delete_table. get_client() returns either a real
+bigquery.Client or a LocalClient exposing that surface on DuckDB over
+Parquet fixtures, so the scoring, enrichment and list-build paths can run,
+be profiled and be benchmarked on a dev box without GCP access.
+
+Backend selection:
+    LEAD_SCORING_WAREHOUSE=bigquery   (default) google.cloud.bigquery.Client
+    LEAD_SCORING_WAREHOUSE=local      LocalClient over LEAD_SCORING_WAREHOUSE_DIR
+                                      (default <repo>/.cache/warehouse)
+
+Local storage:
+    <warehouse_dir>/<dataset>/<table>.parquet    one file per table
+    <warehouse_dir>/<dataset>/<table>.view.sql   view definitions
+    The project part of `project.dataset.table` is ignored, so every script's
+    fully-qualified names resolve unchanged. Tables are read lazily as views
+    over the Parquet files; tables written by a query (CREATE TABLE AS,
+    INSERT, UPDATE, DELETE, MERGE, loads) are written back to Parquet after
+    the statement, so separate scripts and processes see each other's output.
+
+Dialect:
+    BigQuery SQL is translated statement by statement (translate_sql): table
+    names, raw / double-quoted strings, INT64 / FLOAT64 / STRING / BOOL / NUMERIC,
+    SAFE_CAST, SAFE_DIVIDE, DATE_DIFF (WEEK parts keep BigQuery's Sunday /
+    WEEK(<WEEKDAY>) / ISOWEEK boundaries), DATE_SUB / DATE_ADD / DATE_TRUNC,
+    TIMESTAMP_* variants, REGEXP_REPLACE / REGEXP_CONTAINS / REGEXP_EXTRACT,
+    SPLIT, [OFFSET(n)] / [ORDINAL(n)], STRUCT, UNNEST (including arrays of
+    STRUCTs), SELECT * EXCEPT, FARM_FINGERPRINT, TO_JSON_STRING, FORMAT_DATE,
+    PARSE_DATE, LOGICAL_OR / LOGICAL_AND, @query_parameters and the
+    PARTITION BY / CLUSTER BY / OPTIONS clauses of CREATE TABLE (dropped).
+    QUALIFY, COUNTIF, IF, IFNULL, ANY_VALUE and window functions run natively.
+    Procedural scripts (DECLARE, BEGIN, IF ... END IF, loops) and MERGE ...
+    INSERT ROW are not supported (translate_sql raises NotImplementedError).
+
+Job statistics:
+    Query jobs report the same attributes as BigQuery QueryJob objects:
+    job_id, state, statement_type, started / ended, total_bytes_processed
+    (uncompressed Parquet bytes of the columns the query mentions, like
+    BigQuery's columnar billing), total_bytes_billed (10 MB minimum, rounded
+    up to the MB), slot_millis (local execution milliseconds), cache_hit,
+    num_dml_affected_rows, ddl_target_table and destination, so JobManager
+    summaries and run_pipeline timings work unchanged.
+
+    Statements run one at a time per client (DuckDB parallelizes each query
+    internally), so JobManager concurrency does not overlap local jobs.
+
+Usage:
+    from v3.utils.warehouse import get_client
+
+    client = get_client("savvy-gtm-analytics")       # honours LEAD_SCORING_WAREHOUSE
+    df = client.query(sql).to_dataframe()
+
+    # Offline run of the list build on fixtures
+    LEAD_SCORING_WAREHOUSE=local python pipeline/scripts/run_pipeline.py --force
+
+CLI:
+    # Snapshot every source table a SQL file reads into local fixtures (needs GCP once)
+    python v3/utils/warehouse.py snapshot --from-sql pipeline/sql/January_2026_Lead_List_V3_V4_Hybrid.sql --sample-percent 10
+    python v3/utils/warehouse.py snapshot savvy-gtm-analytics.ml_features.v4_prospect_scores
+    # Import a CSV / Parquet file as a fixture table
+    python v3/utils/warehouse.py import ml_features.excluded_firms excluded.csv
+    python v3/utils/warehouse.py tables                 # list local tables
+    python v3/utils/warehouse.py translate pipeline/sql/Insert_MA_Leads.sql
+    python v3/utils/warehouse.py run pipeline/sql/create_ma_eligible_advisors.sql   # local run with job stats
+"""
+
+import math
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from v3.utils.job_manager import _scan, _table_key, strip_comments, table_references
+
+DEFAULT_PROJECT_ID = "savvy-gtm-analytics"
+DEFAULT_WAREHOUSE_DIR = Path(__file__).resolve().parent.parent.parent / ".cache" / "warehouse"
+BACKEND_ENV_VAR = "LEAD_SCORING_WAREHOUSE"
+WAREHOUSE_DIR_ENV_VAR = "LEAD_SCORING_WAREHOUSE_DIR"
+
+MIN_BILLED_BYTES = 10 * 1024 ** 2
+
+TYPE_MAP = {
+    'INT64': 'BIGINT',
+    'FLOAT64': 'DOUBLE',
+    'STRING': 'VARCHAR',
+    'BOOL': 'BOOLEAN',
+    'BYTES': 'BLOB',
+    'NUMERIC': 'DECIMAL(38, 9)',
+    'BIGNUMERIC': 'DECIMAL(38, 9)',
+}
+TYPE_PATTERN = re.compile(r"\b(" + "|".join(TYPE_MAP) + r")\b", re.IGNORECASE)
+
+# Load-job schema types (legacy and standard names) -> DuckDB types
+SCHEMA_TYPE_MAP = {
+    'STRING': 'VARCHAR', 'INTEGER': 'BIGINT', 'INT64': 'BIGINT', 'FLOAT': 'DOUBLE',
+    'FLOAT64': 'DOUBLE', 'NUMERIC': 'DECIMAL(38, 9)', 'BOOLEAN': 'BOOLEAN', 'BOOL': 'BOOLEAN',
+    'DATE': 'DATE', 'DATETIME': 'TIMESTAMP', 'TIMESTAMP': 'TIMESTAMPTZ', 'BYTES': 'BLOB',
+}
+
+STATEMENT_TYPES = [
+    (re.compile(r"^\s*CREATE\s+(?:OR\s+REPLACE\s+)?(?:TEMP(?:ORARY)?\s+)?TABLE\b.*?\bAS\b", re.I | re.S),
+     'CREATE_TABLE_AS_SELECT'),
+    (re.compile(r"^\s*CREATE\s+(?:OR\s+REPLACE\s+)?(?:TEMP(?:ORARY)?\s+)?TABLE\b", re.I), 'CREATE_TABLE'),
+    (re.compile(r"^\s*CREATE\s+(?:OR\s+REPLACE\s+)?(?:MATERIALIZED\s+)?VIEW\b", re.I), 'CREATE_VIEW'),
+    (re.compile(r"^\s*CREATE\s+(?:OR\s+REPLACE\s+)?SCHEMA\b", re.I), 'CREATE_SCHEMA'),
+    (re.compile(r"^\s*DROP\s+TABLE\b", re.I), 'DROP_TABLE'),
+    (re.compile(r"^\s*DROP\s+VIEW\b", re.I), 'DROP_VIEW'),
+    (re.compile(r"^\s*INSERT\b", re.I), 'INSERT'),
+    (re.compile(r"^\s*UPDATE\b", re.I), 'UPDATE'),
+    (re.compile(r"^\s*DELETE\b", re.I), 'DELETE'),
+    (re.compile(r"^\s*MERGE\b", re.I), 'MERGE'),
+    (re.compile(r"^\s*TRUNCATE\b", re.I), 'TRUNCATE_TABLE'),
+    (re.compile(r"^\s*ALTER\s+TABLE\b", re.I), 'ALTER_TABLE'),
+]
+DML_TYPES = {'INSERT', 'UPDATE', 'DELETE', 'MERGE', 'TRUNCATE_TABLE', 'ALTER_TABLE'}
+PROCEDURAL_PATTERN = re.compile(
+    r"^\s*(?:DECLARE|BEGIN|IF|LOOP|WHILE|REPEAT|CALL|EXECUTE\s+IMMEDIATE)\b(?!\s*\()|^\s*FOR\s+\w+\s+IN\b",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+
+try:
+    from google.api_core.exceptions import NotFound
+except ImportError:     # local-only environment
+    class NotFound(Exception):
+        """Table or view does not exist (google.api_core.exceptions.NotFound stand-in)."""
+
+
+def get_client(project_id: str = DEFAULT_PROJECT_ID, location: Optional[str] = None,
+               backend: Optional[str] = None):
+    """
+    Warehouse client for the configured backend.
+
+    Args:
+        project_id: GCP project (also the default project of local table names)
+        location: BigQuery location (ignored locally)
+        backend: 'bigquery' or 'local' (default: $LEAD_SCORING_WAREHOUSE or 'bigquery')
+
+    Returns:
+        bigquery.Client or LocalClient
+    """
+    backend = (backend or os.environ.get(BACKEND_ENV_VAR) or 'bigquery').lower()
+    if backend == 'local':
+        return LocalClient(project=project_id)
+    if backend != 'bigquery':
+        raise ValueError(f"Unknown warehouse backend '{backend}' (expected 'bigquery' or 'local')")
+    from google.cloud import bigquery
+    if location:
+        return bigquery.Client(project=project_id, location=location)
+    return bigquery.Client(project=project_id)
+
+
+# =============================================================================
+# DIALECT TRANSLATION
+# =============================================================================
+_PLACEHOLDER = re.compile(r"\x00(\d+)\x00")
+_CALL_PATTERN = re.compile(r"(?<![\w.])(?:SAFE\.)?([A-Za-z_]\w*)\s*\(")
+
+
+def _sql_string(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _unescape(body: str) -> str:
+    """Resolve BigQuery backslash escapes in a non-raw string literal."""
+    escapes = {'n': '\n', 't': '\t', 'r': '\r', '\\': '\\', "'": "'", '"': '"', '`': '`', '0': '\0'}
+    return re.sub(r"\\(.)", lambda m: escapes.get(m.group(1), '\\' + m.group(1)), body, flags=re.S)
+
+
+def _identifier(name: str) -> str:
+    """Backticked BigQuery name -> DuckDB reference (dataset.table for table paths)."""
+    parts = name.split('.')
+    if len(parts) >= 3 and 'INFORMATION_SCHEMA' not in (p.upper() for p in parts):
+        parts = parts[-2:]
+    return '.'.join('"' + p.replace('"', '""') + '"' for p in parts)
+
+
+def _lex(sql: str) -> Tuple[str, List[str]]:
+    """
+    Replace string literals and quoted identifiers with placeholders.
+
+    Returns:
+        (code with \\x00n\\x00 placeholders and comments removed,
+         DuckDB string literals / identifiers by placeholder number)
+    """
+    code, literals = [], []
+    i, n = 0, len(sql)
+    while i < n:
+        ch = sql[i]
+        if ch == '-' and sql.startswith('--', i) or ch == '#':
+            end = sql.find('\n', i)
+            i = n if end == -1 else end
+        elif ch == '/' and sql.startswith('/*', i):
+            end = sql.find('*/', i + 2)
+            i = n if end == -1 else end + 2
+            code.append(' ')
+        elif ch in ('"', "'", '`'):
+            prefix = code[-1][-1:].lower() if code and code[-1] else ''
+            raw = prefix in ('r', 'b') and (len(code[-1]) < 2 or not (code[-1][-2].isalnum() or code[-1][-2] == '_'))
+            quote = sql[i:i + 3] if ch != '`' and sql.startswith(ch * 3, i) else ch
+            j = i + len(quote)
+            while j < n and not sql.startswith(quote, j):
+                j += 2 if sql[j] == '\\' and not raw else 1
+            body = sql[i + len(quote):j]
+            i = min(j + len(quote), n)
+            if ch == '`':
+                literals.append(_identifier(body))
+            else:
+                if raw:
+                    code[-1] = code[-1][:-1]
+                literals.append(_sql_string(body if raw else _unescape(body)))
+            code.append(f"\x00{len(literals) - 1}\x00")
+        else:
+            j = i
+            while j < n and sql[j] not in '"\'`#-/':
+                j += 1
+            j = max(j, i + 1)
+            code.append(sql[i:j])
+            i = j
+    return ''.join(code), literals
+
+
+def _split_args(text: str) -> List[str]:
+    args, depth, start = [], 0, 0
+    for i, ch in enumerate(text):
+        if ch in '([':
+            depth += 1
+        elif ch in ')]':
+            depth -= 1
+        elif ch == ',' and depth == 0:
+            args.append(text[start:i].strip())
+            start = i + 1
+    if text.strip():
+        args.append(text[start:].strip())
+    return args
+
+
+def _close_paren(text: str, open_index: int) -> int:
+    depth = 0
+    for i in range(open_index, len(text)):
+        if text[i] in '([':
+            depth += 1
+        elif text[i] in ')]':
+            depth -= 1
+            if depth == 0:
+                return i
+    raise ValueError("Unbalanced parentheses in SQL")
+
+
+WEEKDAYS = ['MONDAY', 'TUESDAY', 'WEDNESDAY', 'THURSDAY', 'FRIDAY', 'SATURDAY', 'SUNDAY']
+WEEK_PART_PATTERN = re.compile(r"(ISOWEEK|WEEK)(?:\s*\(\s*(\w+)\s*\))?", re.I)
+
+
+def _week_shift(part: str) -> Optional[int]:
+    """
+    Days to add so a BigQuery week part lines up with DuckDB's Monday weeks
+    (None if the part is not a week). WEEK starts on Sunday, WEEK(<WEEKDAY>)
+    on that day and ISOWEEK on Monday.
+    """
+    match = WEEK_PART_PATTERN.fullmatch(part.strip())
+    if not match:
+        return None
+    if match.group(1).upper() == 'ISOWEEK':
+        return 0
+    day = (match.group(2) or 'SUNDAY').upper()
+    if day not in WEEKDAYS:
+        raise ValueError(f"Unsupported week part: {part}")
+    return (7 - WEEKDAYS.index(day)) % 7
+
+
+def _interval(arg: str, sign: str) -> str:
+    match = re.match(r"INTERVAL\s+(.+?)\s+(\w+)\s*$", arg, re.I | re.S)
+    if not match:
+        raise ValueError(f"Unsupported interval argument: {arg}")
+    return f"{sign} INTERVAL ({match.group(1)}) {match.group(2).upper()}"
+
+
+class _Translator:
+    """Rewrites BigQuery function calls into DuckDB equivalents (one statement)."""
+
+    def __init__(self, literals: List[str]):
+        self.literals = literals
+        self.struct_names: Dict[int, List[str]] = {}
+
+    def literal(self, arg: str) -> Optional[str]:
+        """Value of a string-literal argument (None for expressions)."""
+        match = _PLACEHOLDER.fullmatch(arg.strip())
+        text = self.literals[int(match.group(1))] if match else ''
+        return text[1:-1].replace("''", "'") if text.startswith("'") else None
+
+    def rewrite(self, code: str) -> str:
+        out, pos = [], 0
+        while True:
+            match = _CALL_PATTERN.search(code, pos)
+            if not match:
+                out.append(code[pos:])
+                return ''.join(out)
+            name = match.group(1).upper()
+            handler = getattr(self, '_fn_' + name.lower(), None)
+            if handler is None:
+                out.append(code[pos:match.end()])
+                pos = match.end()
+                continue
+            close = _close_paren(code, match.end() - 1)
+            args = [self.rewrite(a) for a in _split_args(code[match.end():close])]
+            out.append(code[pos:match.start()])
+            pos = close + 1
+            if name == 'UNNEST' and re.search(r"\bIN\s*$", out[-1], re.I):
+                out.append(f"(SELECT UNNEST({args[0]}))")       # x IN UNNEST(array)
+            elif name == 'UNNEST':
+                alias = re.match(r"\s+(?:AS\s+)?(?!(?:WITH|ON|WHERE|JOIN|LEFT|INNER|CROSS|FULL|RIGHT|"
+                                 r"GROUP|ORDER|LIMIT|UNION|QUALIFY|HAVING|WINDOW|USING)\b)([A-Za-z_]\w*)",
+                                 code[pos:], re.I)
+                if alias:
+                    pos += alias.end()
+                out.append(self._unnest(args, alias.group(1) if alias else None))
+            else:
+                out.append(handler(args))
+
+    # --- casts and arithmetic -------------------------------------------------
+    def _fn_safe_cast(self, args):
+        return f"TRY_CAST({args[0]})"
+
+    def _fn_safe_divide(self, args):
+        return f"(CASE WHEN ({args[1]}) = 0 THEN NULL ELSE ({args[0]}) / ({args[1]}) END)"
+
+    def _fn_ieee_divide(self, args):
+        return f"(({args[0]}) / ({args[1]}))"
+
+    def _fn_div(self, args):
+        return f"(({args[0]}) // ({args[1]}))"
+
+    # --- dates and timestamps -------------------------------------------------
+    def _diff(self, args):
+        part = args[2] if len(args) > 2 else 'day'
+        shift = _week_shift(part)
+        if shift is not None:
+            # Week boundaries crossed (DuckDB's 'week' diff counts whole 7-day spans)
+            start, end = (f"date_trunc('week', ({a}) + INTERVAL {shift} DAY)" for a in (args[1], args[0]))
+            return f"(date_diff('day', {start}, {end}) // 7)"
+        return f"date_diff('{part.lower()}', {args[1]}, {args[0]})"
+
+    _fn_date_diff = _fn_datetime_diff = _fn_timestamp_diff = _diff
+
+    def _fn_date_sub(self, args):
+        return f"CAST(({args[0]}) {_interval(args[1], '-')} AS DATE)"
+
+    def _fn_date_add(self, args):
+        return f"CAST(({args[0]}) {_interval(args[1], '+')} AS DATE)"
+
+    def _fn_timestamp_sub(self, args):
+        return f"(({args[0]}) {_interval(args[1], '-')})"
+
+    def _fn_timestamp_add(self, args):
+        return f"(({args[0]}) {_interval(args[1], '+')})"
+
+    _fn_datetime_sub = _fn_timestamp_sub
+    _fn_datetime_add = _fn_timestamp_add
+
+    def _trunc(self, args):
+        shift = _week_shift(args[1])
+        if shift is not None:
+            return f"(date_trunc('week', ({args[0]}) + INTERVAL {shift} DAY) - INTERVAL {shift} DAY)"
+        return f"date_trunc('{args[1].lower()}', {args[0]})"
+
+    def _fn_date_trunc(self, args):
+        return f"CAST({self._trunc(args)} AS DATE)"
+
+    def _fn_timestamp_trunc(self, args):
+        return self._trunc(args)
+
+    _fn_datetime_trunc = _fn_timestamp_trunc
+
+    def _fn_date(self, args):
+        if len(args) == 3:
+            return f"make_date({', '.join(args)})"
+        return f"CAST({args[0]} AS DATE)"
+
+    def _fn_timestamp(self, args):
+        return f"CAST({args[0]} AS TIMESTAMPTZ)"
+
+    def _fn_datetime(self, args):
+        return f"CAST({args[0]} AS TIMESTAMP)"
+
+    def _fn_current_timestamp(self, args):
+        return "current_timestamp"
+
+    def _fn_current_datetime(self, args):
+        return "CAST(current_timestamp AS TIMESTAMP)"
+
+    def _fn_format_date(self, args):
+        return f"strftime({args[1]}, {args[0]})"
+
+    _fn_format_timestamp = _fn_format_datetime = _fn_format_date
+
+    def _fn_parse_date(self, args):
+        return f"CAST(strptime({args[1]}, {args[0]}) AS DATE)"
+
+    def _fn_parse_timestamp(self, args):
+        return f"strptime({args[1]}, {args[0]})"
+
+    _fn_parse_datetime = _fn_parse_timestamp
+
+    # --- strings and regular expressions -------------------------------------
+    def _fn_regexp_replace(self, args):
+        return f"regexp_replace({args[0]}, {args[1]}, {args[2]}, 'g')"
+
+    def _fn_regexp_contains(self, args):
+        return f"regexp_matches({args[0]}, {args[1]})"
+
+    def _fn_regexp_extract(self, args):
+        pattern = self.literal(args[1]) or ''
+        group = 1 if re.search(r"(?<!\\)\((?!\?)", pattern) else 0
+        return f"regexp_extract({args[0]}, {args[1]}, {group})"
+
+    def _fn_split(self, args):
+        return f"string_split({args[0]}, {args[1] if len(args) > 1 else _sql_string(',')})"
+
+    def _fn_to_json_string(self, args):
+        return f"CAST(to_json({args[0]}) AS VARCHAR)"
+
+    def _fn_farm_fingerprint(self, args):
+        return f"hash({args[0]})"
+
+    def _fn_generate_uuid(self, args):
+        return "CAST(uuid() AS VARCHAR)"
+
+    # --- aggregates and arrays ------------------------------------------------
+    def _fn_logical_or(self, args):
+        return f"bool_or({args[0]})"
+
+    def _fn_logical_and(self, args):
+        return f"bool_and({args[0]})"
+
+    def _fn_array_length(self, args):
+        return f"len({args[0]})"
+
+    def _fn_offset(self, args):
+        return f"(({args[0]}) + 1)"
+
+    _fn_safe_offset = _fn_offset
+
+    def _fn_ordinal(self, args):
+        return f"({args[0]})"
+
+    _fn_safe_ordinal = _fn_ordinal
+
+    def _fn_struct(self, args):
+        names, values = [], []
+        for i, arg in enumerate(args):
+            match = re.match(r"(.+?)\s+AS\s+([A-Za-z_]\w*)\s*$", arg, re.I | re.S)
+            values.append(match.group(1) if match else arg)
+            names.append(match.group(2) if match else None)
+        if all(names):
+            self.struct_names[len(args)] = names
+        # Unnamed STRUCTs in an array literal take the field names of the first STRUCT
+        known = self.struct_names.get(len(args), [])
+        names = [name or (known[i] if i < len(known) else f"_field_{i + 1}") for i, name in enumerate(names)]
+        return "{" + ", ".join(f"'{name}': {value}" for name, value in zip(names, values)) + "}"
+
+    def _fn_unnest(self, args):      # dispatched through _unnest (needs the alias)
+        return self._unnest(args, None)
+
+    def _unnest(self, args, alias):
+        if args[0].lstrip('[ \n\t').startswith('{'):
+            # Array of STRUCTs: BigQuery exposes the fields as columns
+            expanded = f"(SELECT UNNEST({args[0]}, recursive := true))"
+            return f"{expanded} AS {alias}" if alias else expanded
+        return f"UNNEST({args[0]}) AS {alias}({alias})" if alias else f"UNNEST({args[0]})"
+
+
+def _strip_create_options(code: str) -> str:
+    """Drop PARTITION BY / CLUSTER BY / OPTIONS(...) from a CREATE TABLE / VIEW header."""
+    header = re.match(r"\s*CREATE\s+(?:OR\s+REPLACE\s+)?(?:TEMP(?:ORARY)?\s+)?(?:TABLE|VIEW)\s+"
+                      r"(?:IF\s+NOT\s+EXISTS\s+)?(?:\x00\d+\x00|[\w.]+)", code, re.I)
+    if not header:
+        return code
+    rest = code[header.end():]
+    body = re.search(r"\bAS\s*(?=\(|SELECT\b|WITH\b)", rest, re.I)
+    head, tail = (rest[:body.start()], rest[body.start():]) if body else (rest, '')
+    options = re.search(r"\bOPTIONS\s*\(", head, re.I)
+    if options:
+        head = head[:options.start()] + head[_close_paren(head, options.end() - 1) + 1:]
+    head = re.sub(r"\b(?:PARTITION|CLUSTER)\s+BY\b.*?(?=\b(?:PARTITION|CLUSTER)\s+BY\b|$)", " ",
+                  head, flags=re.I | re.S)
+    return code[:header.end()] + head + tail
+
+
+INSERT_ROW_PATTERN = re.compile(r"\bINSERT\s+ROW\b", re.I)
+
+
+def translate_sql(sql: str, parameters: Optional[Dict[str, object]] = None) -> str:
+    """
+    Translate one BigQuery statement to DuckDB SQL.
+
+    Args:
+        sql: BigQuery Standard SQL statement
+        parameters: Names of @query parameters (rewritten to $name)
+
+    Returns:
+        DuckDB SQL text
+    """
+    if PROCEDURAL_PATTERN.search(strip_comments(sql)):
+        raise NotImplementedError("Procedural BigQuery scripts are not supported by the local warehouse")
+    code, literals = _lex(sql)
+    if INSERT_ROW_PATTERN.search(code):
+        raise NotImplementedError("MERGE ... INSERT ROW is not supported by the local warehouse; "
+                                  "list the columns: INSERT (col, ...) VALUES (col, ...)")
+    code = _Translator(literals).rewrite(code)
+    code = TYPE_PATTERN.sub(lambda m: TYPE_MAP[m.group(1).upper()], code)
+    code = re.sub(r"\*\s*EXCEPT\s*\(", "* EXCLUDE (", code, flags=re.I)
+    code = re.sub(r"\bMERGE\s+(?!INTO\b)", "MERGE INTO ", code, flags=re.I)     # INTO is optional in BigQuery
+    code = _strip_create_options(code)
+    for name in parameters or ():
+        code = re.sub(rf"@{re.escape(name)}\b", f"${name}", code)
+    return _PLACEHOLDER.sub(lambda m: literals[int(m.group(1))], code).strip().rstrip(';')
+
+
+def split_script(sql: str) -> List[str]:
+    """Split a BigQuery script into statements at top-level semicolons."""
+    statements, start = [], 0
+    for i, ch, in_code in _scan(sql):
+        if in_code and ch == ';':
+            statements.append(sql[start:i])
+            start = i + 1
+    statements.append(sql[start:])
+    return [s.strip() for s in statements if strip_comments(s).strip()]
+
+
+def statement_type(sql: str) -> str:
+    code = strip_comments(sql)
+    for pattern, kind in STATEMENT_TYPES:
+        if pattern.search(code):
+            return kind
+    return 'SELECT'
+
+
+# =============================================================================
+# CLIENT SURFACE
+# =============================================================================
+class Row:
+    """Query result row with BigQuery Row access: row[0], row['name'], row.name."""
+
+    __slots__ = ('_values', '_index')
+
+    def __init__(self, values: tuple, index: Dict[str, int]):
+        self._values = values
+        self._index = index
+
+    def __getitem__(self, key):
+        return self._values[self._index[key] if isinstance(key, str) else key]
+
+    def __getattr__(self, name):
+        try:
+            return self._values[self._index[name]]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __len__(self):
+        return len(self._values)
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __repr__(self):
+        return f"Row({self._values}, {self._index})"
+
+    def get(self, key, default=None):
+        return self[key] if key in self._index else default
+
+    def keys(self):
+        return self._index.keys()
+
+    def values(self):
+        return self._values
+
+    def items(self):
+        return ((name, self._values[i]) for name, i in self._index.items())
+
+
+@dataclass
+class SchemaField:
+    """Column description with the bigquery.SchemaField attributes scripts read."""
+    name: str
+    field_type: str
+    mode: str = 'NULLABLE'
+
+
+@dataclass
+class TableReference:
+    project: str
+    dataset_id: str
+    table_id: str
+
+    def __str__(self):
+        return f"{self.project}.{self.dataset_id}.{self.table_id}"
+
+
+@dataclass
+class Table(TableReference):
+    """Table metadata (get_table) with the bigquery.Table attributes scripts read."""
+    table_type: str = 'TABLE'
+    num_rows: Optional[int] = None
+    num_bytes: Optional[int] = None
+    created: Optional[datetime] = None
+    modified: Optional[datetime] = None
+    schema: List[SchemaField] = field(default_factory=list)
+
+    @property
+    def full_table_id(self) -> str:
+        return f"{self.project}:{self.dataset_id}.{self.table_id}"
+
+
+class RowIterator:
+    """Result of LocalQueryJob.result()."""
+
+    def __init__(self, frame: Optional[pd.DataFrame]):
+        self._frame = frame if frame is not None else pd.DataFrame()
+        self.total_rows = len(self._frame)
+        self.schema = [SchemaField(str(c), _bigquery_type(str(t))) for c, t in self._frame.dtypes.items()]
+
+    def __iter__(self):
+        index = {str(c): i for i, c in enumerate(self._frame.columns)}
+        for values in self._frame.itertuples(index=False, name=None):
+            yield Row(values, index)
+
+    def to_dataframe(self, *args, **kwargs) -> pd.DataFrame:
+        return self._frame.copy()
+
+    def to_arrow(self, *args, **kwargs):
+        import pyarrow as pa
+        return pa.Table.from_pandas(self._frame, preserve_index=False)
+
+
+class _LocalJob:
+    """Shared job attributes (job_id, state, timings, errors)."""
+
+    job_type = 'query'
+
+    def __init__(self, project: str):
+        self.project = project
+        self.job_id = f"local_{uuid.uuid4().hex}"
+        self.location = 'local'
+        self.state = 'RUNNING'
+        self.created = self.started = datetime.now(timezone.utc)
+        self.ended: Optional[datetime] = None
+        self.error_result: Optional[dict] = None
+        self.errors: Optional[List[dict]] = None
+        self._exception: Optional[Exception] = None
+
+    def _finish(self, exception: Optional[Exception] = None):
+        self.ended = datetime.now(timezone.utc)
+        self.state = 'DONE'
+        if exception is not None:
+            self._exception = exception
+            self.error_result = {'reason': type(exception).__name__, 'message': str(exception)}
+            self.errors = [self.error_result]
+
+    def done(self, *args, **kwargs) -> bool:
+        return True
+
+    def exception(self, *args, **kwargs):
+        return self._exception
+
+    def _raise(self):
+        if self._exception is not None:
+            raise self._exception
+
+
+class LocalQueryJob(_LocalJob):
+    """QueryJob stand-in; errors are raised from result() / to_dataframe() as in BigQuery."""
+
+    def __init__(self, project: str, query: str):
+        super().__init__(project)
+        self.query = query
+        self.statement_type: Optional[str] = None
+        self.total_bytes_processed = 0
+        self.total_bytes_billed = 0
+        self.slot_millis = 0
+        self.cache_hit = False
+        self.num_dml_affected_rows: Optional[int] = None
+        self.ddl_target_table: Optional[TableReference] = None
+        self.destination: Optional[TableReference] = None
+        self.referenced_tables: List[TableReference] = []
+        self._rows: Optional[pd.DataFrame] = None
+
+    def result(self, *args, **kwargs) -> RowIterator:
+        self._raise()
+        return RowIterator(self._rows)
+
+    def to_dataframe(self, *args, **kwargs) -> pd.DataFrame:
+        return self.result().to_dataframe()
+
+    def to_arrow(self, *args, **kwargs):
+        return self.result().to_arrow()
+
+
+class LocalLoadJob(_LocalJob):
+    """LoadJob stand-in returned by load_table_from_dataframe."""
+
+    job_type = 'load'
+
+    def __init__(self, project: str, destination: TableReference):
+        super().__init__(project)
+        self.destination = destination
+        self.output_rows: Optional[int] = None
+
+    def result(self, *args, **kwargs) -> 'LocalLoadJob':
+        self._raise()
+        return self
+
+
+@dataclass
+class LoadJobConfig:
+    """Minimal load configuration (bigquery.LoadJobConfig attributes read by LocalClient)."""
+    write_disposition: str = 'WRITE_APPEND'
+    schema: Optional[List[SchemaField]] = None
+
+
+def _bigquery_type(duckdb_type: str) -> str:
+    t = duckdb_type.upper()
+    if t.endswith('[]'):
+        return _bigquery_type(t[:-2])
+    if t.startswith(('STRUCT', 'MAP')):
+        return 'RECORD'
+    for prefix, bq in (('TIMESTAMP WITH TIME ZONE', 'TIMESTAMP'), ('TIMESTAMPTZ', 'TIMESTAMP'),
+                       ('DATETIME64', 'TIMESTAMP'), ('TIMESTAMP', 'DATETIME'), ('DATE', 'DATE'),
+                       ('BOOL', 'BOOLEAN'), ('DECIMAL', 'NUMERIC'), ('DOUBLE', 'FLOAT'),
+                       ('FLOAT', 'FLOAT'), ('REAL', 'FLOAT'), ('BLOB', 'BYTES')):
+        if t.startswith(prefix):
+            return bq
+    if any(word in t for word in ('INT', 'UINT')):
+        return 'INTEGER'
+    return 'STRING'
+
+
+# =============================================================================
+# LOCAL CLIENT
+# =============================================================================
+class LocalClient:
+    """
+    DuckDB-backed stand-in for bigquery.Client over Parquet fixtures.
+
+    Supports query, load_table_from_dataframe, get_table and delete_table.
+    """
+
+    def __init__(self, project: str = DEFAULT_PROJECT_ID, data_dir: Optional[str] = None,
+                 threads: Optional[int] = None):
+        """
+        Initialize the client.
+
+        Args:
+            project: Default project (only used in reported table names)
+            data_dir: Warehouse directory (default: $LEAD_SCORING_WAREHOUSE_DIR or <repo>/.cache/warehouse)
+            threads: DuckDB worker threads (default: all cores)
+        """
+        import duckdb
+
+        self.project = project
+        self.location = 'local'
+        self.data_dir = Path(data_dir or os.environ.get(WAREHOUSE_DIR_ENV_VAR) or DEFAULT_WAREHOUSE_DIR)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self._con = duckdb.connect()
+        if threads:
+            self._con.execute(f"SET threads = {int(threads)}")
+        self._lock = threading.RLock()
+        self._registered: Dict[str, tuple] = {}     # dataset.table -> file signature it was loaded from
+        self._column_bytes: Dict[tuple, Dict[str, int]] = {}
+
+    # -------------------------------------------------------------------------
+    # Storage
+    # -------------------------------------------------------------------------
+    def _paths(self, key: str) -> Tuple[Path, Path]:
+        dataset, table = key.split('.')
+        return (self.data_dir / dataset / f"{table}.parquet",
+                self.data_dir / dataset / f"{table}.view.sql")
+
+    @staticmethod
+    def _signature(path: Path) -> Optional[tuple]:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    @staticmethod
+    def _key(table) -> str:
+        if hasattr(table, 'dataset_id') and hasattr(table, 'table_id'):
+            return f"{table.dataset_id}.{table.table_id}".lower()
+        return _table_key(str(table).replace(':', '.'))
+
+    @staticmethod
+    def _ref(key: str) -> str:
+        dataset, table = key.split('.')
+        return f'"{dataset}"."{table}"'
+
+    def _catalog_type(self, key: str) -> Optional[str]:
+        dataset, table = key.split('.')
+        row = self._con.execute(
+            "SELECT table_type FROM information_schema.tables WHERE lower(table_schema) = ? AND lower(table_name) = ?",
+            [dataset, table]).fetchone()
+        return row[0] if row else None
+
+    def _drop(self, key: str):
+        kind = self._catalog_type(key)
+        if kind:
+            self._con.execute(f"DROP {'VIEW' if kind == 'VIEW' else 'TABLE'} {self._ref(key)}")
+        self._registered.pop(key, None)
+
+    def _register(self, key: str, materialize: bool = False, _seen: Optional[set] = None):
+        """Make dataset.table queryable (view over Parquet, or a table for DML targets)."""
+        _seen = _seen if _seen is not None else set()
+        if key in _seen:
+            return
+        _seen.add(key)
+        data_path, view_path = self._paths(key)
+        signature = self._signature(data_path) or self._signature(view_path)
+        kind = self._catalog_type(key)
+        current = kind is not None and self._registered.get(key) == signature
+        if current and (not materialize or kind != 'VIEW'):
+            return
+        if signature is None:
+            if key in self._registered:
+                self._drop(key)       # deleted by another client / process
+            return
+        dataset = key.split('.')[0]
+        self._con.execute(f'CREATE SCHEMA IF NOT EXISTS "{dataset}"')
+        self._drop(key)
+        if data_path.exists():
+            source = f"read_parquet({_sql_string(str(data_path))})"
+            kind = 'TABLE' if materialize else 'VIEW'
+            self._con.execute(f"CREATE {kind} {self._ref(key)} AS SELECT * FROM {source}")
+        else:
+            view_sql = view_path.read_text(encoding='utf-8')
+            writes, reads = table_references(view_sql)
+            for dependency in reads:
+                self._register(dependency, _seen=_seen)
+            self._con.execute(translate_sql(view_sql))
+        self._registered[key] = signature
+
+    def _persist(self, key: str, view_sql: Optional[str] = None):
+        """Write a table (or view definition) created in DuckDB back to the warehouse directory."""
+        data_path, view_path = self._paths(key)
+        data_path.parent.mkdir(parents=True, exist_ok=True)
+        kind = self._catalog_type(key)
+        if kind is None:
+            for path in (data_path, view_path):
+                path.unlink(missing_ok=True)
+            self._registered.pop(key, None)
+            return
+        if kind == 'VIEW':
+            if view_sql is None:
+                return
+            view_path.write_text(view_sql, encoding='utf-8')
+            data_path.unlink(missing_ok=True)
+            self._registered[key] = self._signature(view_path)
+            return
+        tmp = data_path.with_suffix(f".{uuid.uuid4().hex[:8]}.tmp")
+        self._con.execute(f"COPY (SELECT * FROM {self._ref(key)}) TO {_sql_string(str(tmp))} "
+                          f"(FORMAT parquet, COMPRESSION zstd)")
+        os.replace(tmp, data_path)
+        view_path.unlink(missing_ok=True)
+        self._registered[key] = self._signature(data_path)
+
+    def _scanned_bytes(self, keys, code: str) -> int:
+        """Uncompressed bytes of the referenced columns of every table read (BigQuery-style billing)."""
+        import pyarrow.parquet as pq
+
+        words = set(re.findall(r"\w+", code.lower()))
+        select_star = re.search(r"(?<![\w)])\*", code) is not None
+        total = 0
+        for key in keys:
+            data_path, _ = self._paths(key)
+            signature = self._signature(data_path)
+            if signature is None:
+                continue
+            cache_key = (key, signature)
+            if cache_key not in self._column_bytes:
+                metadata = pq.ParquetFile(data_path).metadata
+                sizes: Dict[str, int] = {}
+                for g in range(metadata.num_row_groups):
+                    group = metadata.row_group(g)
+                    for c in range(group.num_columns):
+                        column = group.column(c)
+                        name = column.path_in_schema.split('.')[0].lower()
+                        sizes[name] = sizes.get(name, 0) + column.total_uncompressed_size
+                self._column_bytes[cache_key] = sizes
+            sizes = self._column_bytes[cache_key]
+            total += sum(size for name, size in sizes.items() if select_star or name in words)
+        return total
+
+    # -------------------------------------------------------------------------
+    # Client surface
+    # -------------------------------------------------------------------------
+    def query(self, query: str, job_config=None, **kwargs) -> LocalQueryJob:
+        """
+        Run a BigQuery SQL statement or script locally.
+
+        Scripts run statement by statement; the job returns the last
+        statement's rows. Errors are raised from result(), as in BigQuery.
+        """
+        job = LocalQueryJob(self.project, query)
+        parameters = {p.name: getattr(p, 'value', getattr(p, 'values', None))
+                      for p in (getattr(job_config, 'query_parameters', None) or [])}
+        start = time.perf_counter()
+        try:
+            with self._lock:
+                for statement in split_script(query):
+                    self._execute(job, statement, parameters)
+                destination = getattr(job_config, 'destination', None)
+                if destination is not None and job._rows is not None:
+                    disposition = str(getattr(job_config, 'write_disposition', None) or 'WRITE_EMPTY')
+                    self._write_frame(job._rows, self._key(destination), disposition)
+                    job.destination = self._reference(self._key(destination))
+            job._finish()
+        except Exception as e:
+            job._finish(e)
+        job.slot_millis = int((time.perf_counter() - start) * 1000)
+        if job.total_bytes_processed:
+            job.total_bytes_billed = max(MIN_BILLED_BYTES, math.ceil(job.total_bytes_processed / 2 ** 20) * 2 ** 20)
+        return job
+
+    def _reference(self, key: str) -> TableReference:
+        dataset, table = key.split('.')
+        return TableReference(self.project, dataset, table)
+
+    def _execute(self, job: LocalQueryJob, statement: str, parameters: Dict[str, object]):
+        kind = statement_type(statement)
+        writes, reads = table_references(statement)
+        job.statement_type = kind
+        if kind in ('DROP_TABLE', 'DROP_VIEW'):
+            for key in writes:
+                data_path, view_path = self._paths(key)
+                if not (data_path.exists() or view_path.exists()) and not re.search(r"\bIF\s+EXISTS\b", statement, re.I):
+                    raise NotFound(f"Not found: Table {self.project}:{key}")
+                self._drop(key)
+                self._persist(key)
+            return
+
+        seen: set = set()
+        for key in reads:
+            self._register(key, _seen=seen)
+        replace = re.search(r"^\s*CREATE\s+OR\s+REPLACE\b", strip_comments(statement), re.I)
+        for key in writes:
+            self._con.execute(f'CREATE SCHEMA IF NOT EXISTS "{key.split(".")[0]}"')
+            if kind.startswith('CREATE') and replace:
+                self._drop(key)         # replaced wholesale: no need to load the old data
+            else:
+                # DML and CREATE ... IF NOT EXISTS act on the stored table
+                self._register(key, materialize=kind != 'CREATE_VIEW', _seen=seen)
+
+        sql = translate_sql(statement, parameters)
+        result = self._con.execute(sql, {k: v for k, v in parameters.items() if f"${k}" in sql} or None)
+        job.total_bytes_processed += self._scanned_bytes(seen - writes, strip_comments(statement))
+        job.referenced_tables = [self._reference(k) for k in sorted(reads)]
+
+        if kind == 'SELECT':
+            job._rows = result.df()
+        elif kind in ('INSERT', 'UPDATE', 'DELETE', 'MERGE'):
+            row = result.fetchone()
+            job.num_dml_affected_rows = (job.num_dml_affected_rows or 0) + int(row[0] if row else 0)
+        for key in writes:
+            self._persist(key, view_sql=statement if kind == 'CREATE_VIEW' else None)
+            if kind.startswith('CREATE'):
+                job.ddl_target_table = job.destination = self._reference(key)
+
+    def _write_frame(self, df: pd.DataFrame, key: str, disposition: str, schema=None) -> int:
+        """Write a DataFrame to dataset.table with BigQuery write-disposition semantics."""
+        disposition = disposition.split('.')[-1].upper()
+        self._con.execute(f'CREATE SCHEMA IF NOT EXISTS "{key.split(".")[0]}"')
+        self._register(key, materialize=True)
+        exists = self._catalog_type(key) is not None
+        if exists and disposition == 'WRITE_EMPTY' and self._con.execute(
+                f"SELECT COUNT(*) FROM {self._ref(key)}").fetchone()[0]:
+            raise ValueError(f"Table {key} is not empty (write_disposition=WRITE_EMPTY)")
+        types = {f.name: SCHEMA_TYPE_MAP.get(str(f.field_type).upper()) for f in (schema or [])}
+        columns = ', '.join(
+            f'CAST("{c}" AS {types[c]}) AS "{c}"' if types.get(c) else f'"{c}"' for c in map(str, df.columns))
+        self._con.register('_load_frame', df)
+        try:
+            if exists and disposition == 'WRITE_APPEND':
+                self._con.execute(f"INSERT INTO {self._ref(key)} BY NAME SELECT {columns} FROM _load_frame")
+            else:
+                self._drop(key)
+                self._con.execute(f"CREATE TABLE {self._ref(key)} AS SELECT {columns} FROM _load_frame")
+        finally:
+            self._con.unregister('_load_frame')
+        self._persist(key)
+        return len(df)
+
+    def load_table_from_dataframe(self, dataframe: pd.DataFrame, destination, job_config=None,
+                                  **kwargs) -> LocalLoadJob:
+        """Load a DataFrame (default WRITE_APPEND, like BigQuery load jobs)."""
+        key = self._key(destination)
+        job = LocalLoadJob(self.project, self._reference(key))
+        disposition = str(getattr(job_config, 'write_disposition', None) or 'WRITE_APPEND')
+        try:
+            with self._lock:
+                job.output_rows = self._write_frame(dataframe, key, disposition,
+                                                    schema=getattr(job_config, 'schema', None))
+            job._finish()
+        except Exception as e:
+            job._finish(e)
+        return job
+
+    def get_table(self, table) -> Table:
+        """Table metadata; raises NotFound for missing tables."""
+        key = self._key(table)
+        with self._lock:
+            self._register(key)
+            if self._catalog_type(key) is None:
+                raise NotFound(f"Not found: Table {self.project}:{key}")
+            data_path, view_path = self._paths(key)
+            is_table = data_path.exists()       # Parquet-backed tables are registered as DuckDB views
+            path = data_path if is_table else view_path
+            modified = datetime.fromtimestamp(path.stat().st_mtime, tz=timezone.utc)
+            described = self._con.execute(f"DESCRIBE {self._ref(key)}").fetchall()
+            dataset, table_id = key.split('.')
+            info = Table(self.project, dataset, table_id, table_type='TABLE' if is_table else 'VIEW',
+                         created=modified, modified=modified,
+                         schema=[SchemaField(name, _bigquery_type(dtype),
+                                             'REPEATED' if dtype.endswith('[]') else 'NULLABLE')
+                                 for name, dtype, *_ in described])
+            if is_table:
+                import pyarrow.parquet as pq
+                metadata = pq.ParquetFile(data_path).metadata
+                info.num_rows = metadata.num_rows
+                info.num_bytes = sum(metadata.row_group(g).total_byte_size for g in range(metadata.num_row_groups))
+            return info
+
+    def delete_table(self, table, not_found_ok: bool = False, **kwargs):
+        key = self._key(table)
+        data_path, view_path = self._paths(key)
+        with self._lock:
+            if not (data_path.exists() or view_path.exists()):
+                if not_found_ok:
+                    return
+                raise NotFound(f"Not found: Table {self.project}:{key}")
+            self._drop(key)
+            self._persist(key)
+
+    def list_tables(self) -> List[str]:
+        """dataset.table names stored in the warehouse directory."""
+        return sorted({f"{p.parent.name}.{p.name.split('.')[0]}"
+                       for p in self.data_dir.glob('*/*') if p.suffix in ('.parquet', '.sql')})
+
+    def close(self):
+        self._con.close()
+
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
+def snapshot_tables(tables: List[str], local: LocalClient, project_id: str = DEFAULT_PROJECT_ID,
+                    sample_percent: Optional[float] = None, limit: Optional[int] = None) -> pd.DataFrame:
+    """
+    Copy BigQuery tables into the local warehouse (needs GCP access once).
+
+    Args:
+        tables: Fully-qualified table names
+        local: Destination LocalClient
+        sample_percent: TABLESAMPLE SYSTEM percentage (block sample, cheap)
+        limit: Row cap per table
+    """
+    client = get_client(project_id, backend='bigquery')
+    summary = []
+    for table_id in tables:
+        sample = f" TABLESAMPLE SYSTEM ({sample_percent} PERCENT)" if sample_percent else ""
+        sql = f"SELECT * FROM `{table_id}`{sample}" + (f" LIMIT {int(limit)}" if limit else "")
+        start = time.perf_counter()
+        df = client.query(sql).to_dataframe()
+        local.load_table_from_dataframe(df, table_id, LoadJobConfig('WRITE_TRUNCATE')).result()
+        summary.append({'table': table_id, 'rows': len(df), 'seconds': round(time.perf_counter() - start, 1)})
+        print(f"[INFO] Snapshot {table_id}: {len(df):,} rows")
+    return pd.DataFrame(summary)
+
+
+def source_tables(paths: List[Path]) -> List[str]:
+    """Tables read, but never written, by the statements of SQL files."""
+    reads, writes = set(), set()
+    names: Dict[str, str] = {}
+    for path in paths:
+        for statement in split_script(Path(path).read_text(encoding='utf-8')):
+            w, r = table_references(statement)
+            writes |= w
+            reads |= r
+            for name in re.findall(r"`([^`]+\.[^`]+\.[^`]+)`", statement):
+                names.setdefault(_table_key(name), name)
+    return sorted(names.get(key, key) for key in reads - writes if 'information_schema' not in key)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Local DuckDB warehouse (BigQuery stand-in)')
+    parser.add_argument('--dir', help='Warehouse directory (default: $LEAD_SCORING_WAREHOUSE_DIR or .cache/warehouse)')
+    parser.add_argument('--project', default=DEFAULT_PROJECT_ID)
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_snap = sub.add_parser('snapshot', help='Copy BigQuery tables into local Parquet fixtures')
+    p_snap.add_argument('tables', nargs='*')
+    p_snap.add_argument('--from-sql', nargs='+', type=Path, default=[], help='Snapshot every source table these files read')
+    p_snap.add_argument('--sample-percent', type=float)
+    p_snap.add_argument('--limit', type=int)
+
+    p_import = sub.add_parser('import', help='Import a CSV / Parquet file as a table')
+    p_import.add_argument('table', help='dataset.table (or project.dataset.table)')
+    p_import.add_argument('file', type=Path)
+
+    sub.add_parser('tables', help='List local tables')
+
+    p_translate = sub.add_parser('translate', help='Print the DuckDB translation of a SQL file')
+    p_translate.add_argument('sql_file', type=Path)
+
+    p_run = sub.add_parser('run', help='Run SQL files locally and print job statistics')
+    p_run.add_argument('sql_files', nargs='+', type=Path)
+
+    args = parser.parse_args()
+    local_client = LocalClient(project=args.project, data_dir=args.dir)
+
+    if args.command == 'snapshot':
+        names = list(args.tables) + source_tables(args.from_sql)
+        if not names:
+            parser.error('snapshot needs table names or --from-sql')
+        print(snapshot_tables(names, local_client, args.project, args.sample_percent, args.limit).to_string(index=False))
+    elif args.command == 'import':
+        frame = (pd.read_parquet(args.file) if args.file.suffix == '.parquet' else pd.read_csv(args.file))
+        local_client.load_table_from_dataframe(frame, args.table, LoadJobConfig('WRITE_TRUNCATE')).result()
+        print(f"[INFO] Imported {len(frame):,} rows into {args.table}")
+    elif args.command == 'tables':
+        rows = []
+        for name in local_client.list_tables():
+            info = local_client.get_table(name)
+            rows.append({'table': name, 'type': info.table_type, 'rows': info.num_rows,
+                         'mb': round((info.num_bytes or 0) / 1e6, 1), 'modified': info.modified})
+        print(pd.DataFrame(rows).to_string(index=False) if rows else "[INFO] No local tables")
+    elif args.command == 'translate':
+        for statement in split_script(args.sql_file.read_text(encoding='utf-8')):
+            print(translate_sql(statement) + ";\n")
+    elif args.command == 'run':
+        from v3.utils.job_manager import run_sql_files
+        run_sql_files(local_client, args.sql_files, raise_on_error=False)
@@ -15,10 +15,14 @@ import numpy as np
 import pandas as pd
 import xgboost as xgb
 from sklearn.isotonic import IsotonicRegression
-from google.cloud import bigquery
+import sys
 from pathlib import Path
 from datetime import datetime
 
+# Add project root to path for shared utilities
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from v3.utils.dataset_cache import DatasetCache
+
 # ============================================================================
 # CONFIGURATION - DO NOT MODIFY PATHS
 # ============================================================================
@@ -115,10 +119,10 @@ def load_model():
 
 
 def load_test_data():
-    """Load test data from BigQuery."""
+    """Load test data from BigQuery (via the local snapshot cache)."""
     print("[INFO] Loading test data from BigQuery...")
-    client = bigquery.Client(project=PROJECT_ID)
-    df = client.query(TEST_DATA_QUERY).to_dataframe()
+    cache = DatasetCache(project_id=PROJECT_ID)
+    df = cache.query(TEST_DATA_QUERY)
     print(f"[OK] Loaded {len(df):,} test records")
     return df
 
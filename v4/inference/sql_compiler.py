@@ -0,0 +1,329 @@
+"""
+XGBoost-to-SQL Scoring Compiler
+===============================
+Compiles a saved V4 booster (e.g. v4/models/v4.3.1/v4.3.1_model.json), plus
+an optional isotonic calibrator, into a plain SQL expression: one nested
+CASE per tree, summed with the base margin, then passed through the
+logistic link. It needs no UDFs, so BigQuery, DuckDB and SQLite all run it.
+Scores can then be computed inside the lead-list SQL without exporting
+v4_prospect_features to Python.
+
+Exactness:
+- XGBoost casts every feature to float32 before comparing it with a float32
+  split threshold t. The compiler emits the equivalent float64 test
+  (x < m or x <= m, where m is the float32 rounding boundary below t), so
+  routing is identical for every input value, not just for integers.
+- NULL takes each split's default (missing) direction.
+- Trees beyond best_iteration are dropped by default, matching
+  XGBClassifier.predict_proba as used by score_prospects_v43.py
+  (--all-trees matches Booster.predict).
+- verify_sql() runs the query on DuckDB and SQLite against inplace_predict
+  over an adversarial sample (thresholds, their float32/float64 neighbours,
+  NULLs) and reports the max absolute difference (target: < 1e-6).
+- The calibration is checked separately, against float64 isotonic
+  interpolation of the SQL raw score. sklearn interpolates in float32 and
+  the V4.1 calibrator has slopes up to ~3500, so float32 rounding alone
+  moves its output by ~1e-5. A 1e-6 match with sklearn's own predict is
+  not attainable.
+
+Usage:
+    python v4/inference/sql_compiler.py --output v4/sql/v4.3/score_v4_3_1_inline.sql --verify
+    python v4/inference/sql_compiler.py --model v4/models/v4.1.0_r3/model_fixed.json --all-trees \\
+        --calibrator v4/models/v4.1.0_r3/isotonic_calibrator.pkl --verify
+
+    from v4.inference.sql_compiler import CompiledBooster, compile_scoring_query
+    compiled = CompiledBooster.from_file("v4/models/v4.3.1/v4.3.1_model.json")
+    sql = compile_scoring_query(compiled, "`savvy-gtm-analytics.ml_features.v4_prospect_features`")
+"""
+
+import argparse
+import json
+import math
+import pickle
+import sys
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_MODEL_PATH = Path(__file__).parent.parent / "models" / "v4.3.1" / "v4.3.1_model.json"
+DEFAULT_FEATURES_TABLE = "savvy-gtm-analytics.ml_features.v4_prospect_features"
+DEFAULT_TOLERANCE = 1e-6
+
+
+def _literal(value: float) -> str:
+    """Shortest round-trip float literal (valid in BigQuery, DuckDB and SQLite)."""
+    text = repr(float(value))
+    return text if ('.' in text or 'e' in text or 'inf' in text or 'nan' in text) else text + '.0'
+
+
+def float32_less_than(threshold: float):
+    """
+    Float64 test equivalent to float32(x) < threshold.
+
+    Returns:
+        (operator, boundary): '<' or '<=' and the float64 boundary value
+    """
+    t = np.float32(threshold)
+    prev = np.nextafter(t, np.float32(-np.inf), dtype=np.float32)
+    boundary = (float(prev) + float(t)) / 2          # exact in float64
+    # A tie at the boundary rounds to the neighbour with an even mantissa
+    prev_is_even = (int(np.array(prev, dtype=np.float32).view(np.uint32)) & 1) == 0
+    return ('<=' if prev_is_even else '<'), boundary
+
+
+class CompiledBooster:
+    """Trees of a binary:logistic booster in a form ready for SQL emission."""
+
+    def __init__(self, model_json: Dict, use_best_iteration: bool = True):
+        learner = model_json['learner']
+        objective = learner['objective']['name']
+        if objective != 'binary:logistic':
+            raise ValueError(f"Only binary:logistic boosters are supported (got {objective})")
+
+        self.feature_names = learner['feature_names']
+        base_score = float(str(learner['learner_model_param']['base_score']).strip('[]'))
+        self.base_margin = math.log(base_score / (1 - base_score))
+
+        booster = learner['gradient_booster']
+        model = booster['model']
+        trees = model['trees']
+        parallel = int(booster.get('gbtree_train_param', {}).get('num_parallel_tree', 1) or 1)
+        best = learner.get('attributes', {}).get('best_iteration')
+        self.n_rounds = len(trees) // parallel
+        self.iteration_range = (0, int(best) + 1) if use_best_iteration and best is not None else (0, 0)
+        n_used = (int(best) + 1) * parallel if use_best_iteration and best is not None else len(trees)
+        self.trees = trees[:n_used]
+        for tree in self.trees:
+            if tree.get('categories_nodes'):
+                raise ValueError("Categorical splits are not supported")
+
+    @classmethod
+    def from_file(cls, path, use_best_iteration: bool = True) -> 'CompiledBooster':
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f), use_best_iteration)
+
+    def thresholds(self) -> Dict[str, List[float]]:
+        """Split thresholds per feature (used to build the verification sample)."""
+        out = {name: [] for name in self.feature_names}
+        for tree in self.trees:
+            for node, left in enumerate(tree['left_children']):
+                if left != -1:
+                    out[self.feature_names[tree['split_indices'][node]]].append(float(tree['split_conditions'][node]))
+        return out
+
+    def tree_sql(self, tree: Dict, column: Callable[[str], str], node: int = 0) -> str:
+        """Nested CASE for one tree."""
+        left, right = tree['left_children'][node], tree['right_children'][node]
+        if left == -1:
+            return _literal(np.float32(tree['split_conditions'][node]))
+        col = column(self.feature_names[tree['split_indices'][node]])
+        op, boundary = float32_less_than(tree['split_conditions'][node])
+        condition = f"{col} {op} {_literal(boundary)}"
+        if tree['default_left'][node]:
+            condition = f"({condition} OR {col} IS NULL)"
+        return (f"CASE WHEN {condition} THEN {self.tree_sql(tree, column, left)} "
+                f"ELSE {self.tree_sql(tree, column, right)} END")
+
+    def margin_sql(self, qualifier: Optional[str] = None) -> str:
+        """Base margin + sum of tree outputs (log-odds)."""
+        column = (lambda name: f"{qualifier}.{name}") if qualifier else (lambda name: name)
+        terms = [_literal(self.base_margin)] + [f"({self.tree_sql(tree, column)})" for tree in self.trees]
+        return "\n    + ".join(terms)
+
+    def score_sql(self, qualifier: Optional[str] = None) -> str:
+        """Probability expression: 1 / (1 + EXP(-margin))."""
+        return f"1.0 / (1.0 + EXP(-(\n    {self.margin_sql(qualifier)}\n)))"
+
+
+def calibration_sql(calibrator, score_expr: str) -> str:
+    """
+    Piecewise-linear isotonic calibration (sklearn IsotonicRegression with
+    out_of_bounds='clip') applied to a score column/expression.
+    """
+    xs = np.asarray(calibrator.X_thresholds_, dtype=np.float64)
+    ys = np.asarray(calibrator.y_thresholds_, dtype=np.float64)
+    clauses = [f"WHEN {score_expr} <= {_literal(xs[0])} THEN {_literal(ys[0])}"]
+    for i in range(1, len(xs)):
+        if xs[i] == xs[i - 1]:
+            continue
+        slope = (ys[i] - ys[i - 1]) / (xs[i] - xs[i - 1])
+        clauses.append(f"WHEN {score_expr} <= {_literal(xs[i])} THEN "
+                       f"{_literal(ys[i - 1])} + ({score_expr} - {_literal(xs[i - 1])}) * {_literal(slope)}")
+    return "CASE\n        " + "\n        ".join(clauses) + f"\n        ELSE {_literal(ys[-1])}\n    END"
+
+
+def compile_scoring_query(
+    compiled: CompiledBooster,
+    table_ref: str,
+    id_columns: Sequence[str] = ('crd',),
+    calibrator=None,
+    score_column: str = 'v4_score',
+) -> str:
+    """
+    SELECT that scores every row of table_ref.
+
+    With a calibrator the raw probability is kept as <score_column>_raw and
+    <score_column> is the calibrated value.
+    """
+    ids = ", ".join(f"f.{c}" for c in id_columns)
+    raw = f"""SELECT
+    {ids},
+    {compiled.score_sql('f')} AS {score_column}{'_raw' if calibrator is not None else ''}
+FROM {table_ref} f"""
+    if calibrator is None:
+        return raw
+    return f"""WITH raw_scores AS (
+{raw}
+)
+SELECT
+    {", ".join(id_columns)},
+    {score_column}_raw,
+    {calibration_sql(calibrator, f'{score_column}_raw')} AS {score_column}
+FROM raw_scores"""
+
+
+# =============================================================================
+# EXACTNESS CHECK
+# =============================================================================
+def edge_case_sample(compiled: CompiledBooster, n_rows: int = 20000, seed: int = 42) -> pd.DataFrame:
+    """Random rows drawn from each feature's thresholds, their neighbours and NULL."""
+    rng = np.random.default_rng(seed)
+    data = {}
+    for name, thresholds in compiled.thresholds().items():
+        values = {np.nan, 0.0, 1.0}
+        for t in thresholds:
+            t32 = np.float32(t)
+            op, boundary = float32_less_than(t)
+            values.update({
+                float(t32),
+                float(np.nextafter(t32, np.float32(-np.inf))),
+                float(np.nextafter(t32, np.float32(np.inf))),
+                boundary,
+                float(np.nextafter(boundary, -np.inf)),
+                float(np.nextafter(boundary, np.inf)),
+                float(np.floor(t)), float(np.ceil(t)),
+            })
+        data[name] = rng.choice(np.array(sorted(values, key=lambda v: (np.isnan(v), v))), n_rows)
+    df = pd.DataFrame(data)
+    df.insert(0, 'crd', np.arange(n_rows))
+    return df
+
+
+def reference_scores(model_path, compiled: CompiledBooster, df: pd.DataFrame) -> np.ndarray:
+    """XGBoost's own probabilities for the rows (float32 inputs, like production)."""
+    import xgboost as xgb
+
+    booster = xgb.Booster()
+    booster.load_model(str(model_path))
+    X = df[compiled.feature_names].to_numpy(dtype=np.float64)
+    scores = booster.inplace_predict(X, iteration_range=compiled.iteration_range, validate_features=False)
+    return np.asarray(scores, dtype=np.float64)
+
+
+def run_sql(engine: str, query: str, df: pd.DataFrame) -> pd.DataFrame:
+    """Run the scoring query on a local engine with df registered as table `features`."""
+    if engine == 'duckdb':
+        import duckdb
+        con = duckdb.connect()
+        con.register('features', df)
+        return con.execute(query).df()
+    if engine == 'sqlite':
+        import sqlite3
+        con = sqlite3.connect(':memory:')
+        df.to_sql('features', con, index=False)
+        return pd.read_sql_query(query, con)
+    raise ValueError(f"Unknown engine '{engine}' (expected duckdb or sqlite)")
+
+
+def verify_sql(
+    model_path,
+    compiled: CompiledBooster,
+    df: Optional[pd.DataFrame] = None,
+    calibrator=None,
+    engines: Sequence[str] = ('duckdb', 'sqlite'),
+) -> Dict[str, float]:
+    """
+    Max absolute difference between SQL and XGBoost scores per engine.
+
+    Args:
+        df: Feature rows with a crd column (default: edge_case_sample)
+
+    Returns:
+        {engine: max diff of the raw score} plus, with a calibrator,
+        {'<engine> calibration': max diff of the calibrated score vs float64
+        isotonic interpolation of the SQL raw score}
+    """
+    df = edge_case_sample(compiled) if df is None else df
+    expected = reference_scores(model_path, compiled, df)
+    query = compile_scoring_query(compiled, 'features', calibrator=calibrator)
+    raw_column = 'v4_score_raw' if calibrator is not None else 'v4_score'
+    order = df['crd'].to_numpy()
+
+    results = {}
+    for engine in engines:
+        try:
+            scored = run_sql(engine, query, df[['crd'] + compiled.feature_names])
+        except ImportError:
+            print(f"[WARNING] {engine} not installed - skipping")
+            continue
+        scored = scored.set_index('crd').reindex(order)
+        raw = scored[raw_column].to_numpy(dtype=np.float64)
+        results[engine] = float(np.max(np.abs(raw - expected)))
+        if calibrator is not None:
+            calibrated = np.interp(raw, np.asarray(calibrator.X_thresholds_, dtype=np.float64),
+                                   np.asarray(calibrator.y_thresholds_, dtype=np.float64))
+            results[f'{engine} calibration'] = float(np.max(np.abs(scored['v4_score'].to_numpy(dtype=np.float64) - calibrated)))
+    return results
+
+
+def main(model_path=DEFAULT_MODEL_PATH, all_trees: bool = False, calibrator_path: Optional[str] = None,
+         features_table: str = DEFAULT_FEATURES_TABLE, output_path: Optional[str] = None,
+         verify: bool = False, verify_csv: Optional[str] = None, tolerance: float = DEFAULT_TOLERANCE) -> int:
+    compiled = CompiledBooster.from_file(model_path, use_best_iteration=not all_trees)
+    calibrator = None
+    if calibrator_path:
+        with open(calibrator_path, 'rb') as f:
+            calibrator = pickle.load(f)
+
+    print(f"[INFO] Model: {model_path}")
+    print(f"[INFO] Trees compiled: {len(compiled.trees)} of {compiled.n_rounds} rounds, "
+          f"{len(compiled.feature_names)} features{', isotonic calibration' if calibrator is not None else ''}")
+
+    query = compile_scoring_query(compiled, f"`{features_table}`", calibrator=calibrator)
+    if output_path:
+        header = (f"-- Generated by v4/inference/sql_compiler.py from {Path(model_path).name}\n"
+                  f"-- {len(compiled.trees)} trees; features: {', '.join(compiled.feature_names)}\n"
+                  f"-- Do not edit by hand: re-run the compiler after retraining.\n\n")
+        Path(output_path).write_text(header + query + "\n", encoding='utf-8')
+        print(f"[INFO] Saved: {output_path} ({len(query):,} characters)")
+    else:
+        print(query)
+
+    if verify:
+        df = pd.read_csv(verify_csv) if verify_csv else None
+        results = verify_sql(model_path, compiled, df, calibrator)
+        failed = False
+        for engine, max_diff in results.items():
+            ok = max_diff <= tolerance
+            failed |= not ok
+            print(f"[{'OK' if ok else 'FAIL'}] {engine}: max |SQL - reference| = {max_diff:.2e} (tolerance {tolerance:.0e})")
+        return 1 if failed else 0
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compile an XGBoost V4 model into a SQL scoring expression')
+    parser.add_argument('--model', default=str(DEFAULT_MODEL_PATH), help='Booster JSON')
+    parser.add_argument('--all-trees', action='store_true',
+                        help='Use every tree (Booster.predict) instead of stopping at best_iteration')
+    parser.add_argument('--calibrator', default=None, help='Pickled IsotonicRegression to apply to the score')
+    parser.add_argument('--features-table', default=DEFAULT_FEATURES_TABLE)
+    parser.add_argument('--output', default=None, help='Write the SQL to this file (default: print)')
+    parser.add_argument('--verify', action='store_true', help='Check SQL vs XGBoost on DuckDB and SQLite')
+    parser.add_argument('--verify-csv', default=None, help='Feature rows (with crd) for --verify')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+    sys.exit(main(args.model, args.all_trees, args.calibrator, args.features_table,
+                  args.output, args.verify, args.verify_csv, args.tolerance))
@@ -0,0 +1,412 @@
+"""
+One-Pass Point-in-Time (PIT) Leakage Audit for V4 Training Features
+
+The V4.1 audit (archive/v4/scripts/phase_4_pit_audit.py) ran one BigQuery
+query per feature family and covered five checks, e.g.
+current_firm_start_date > contacted_date for is_recent_mover. This audit
+covers every model feature, using the per-feature source timestamps declared
+in v4/config/feature_config.yaml:
+
+1. ONE snapshot query: the training table LEFT JOINed to each declared source,
+   carrying only the source dates and checks that some feature uses. Dates
+   are aggregated per advisor; checks are aggregated per lead row, so each
+   row's source records are compared with that row's prediction date. The
+   snapshot is cached locally through DatasetCache.
+2. ONE vectorized pass over all rows. Per feature:
+   - source_date:  source timestamp <= prediction date (or < with op: '<')
+   - pit_check:    some record dated by the prediction date supports the value
+                   (e.g. mobility_3yr <= firms joined in the 3 years up to it)
+   - implied_date: value counts days/months/years back, so it must be >= 0
+   - derived_from: the row violates if a parent feature violates on it
+   Features declared unaudited (current-state inputs) are listed with their
+   reason, so coverage gaps are visible rather than silent.
+3. A report with violation counts, how far ahead of the prediction date the
+   source is, a sample of violating rows per feature and the feature/target
+   correlation (|r| > 0.3 flagged, as in the V4.1 audit).
+
+This is cheap enough to run on every training-table rebuild (train_model_v43.py
+--pit-audit) instead of once per major version.
+
+Usage:
+    from v4.scripts.pit_audit import load_feature_config, audit_frame
+
+    config = load_feature_config()
+    summary, samples = audit_frame(snapshot_df, config)
+
+CLI:
+    python v4/scripts/pit_audit.py                       # audit the configured training table
+    python v4/scripts/pit_audit.py --print-sql           # snapshot query only
+    python v4/scripts/pit_audit.py --input snapshot.parquet --sample-size 50
+    python v4/scripts/pit_audit.py --training-table savvy-gtm-analytics.ml_features.v4_training_features_v43 --refresh
+
+Author: Lead Scoring Team
+Date: 2026-10-19
+"""
+
+import argparse
+import json
+import re
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import yaml
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+from v3.utils.dataset_cache import DatasetCache
+from v3.utils.tier_rules import Condition
+
+PROJECT_ID = "savvy-gtm-analytics"
+DEFAULT_CONFIG_PATH = PROJECT_ROOT / "v4" / "config" / "feature_config.yaml"
+REPORTS_DIR = PROJECT_ROOT / "v4" / "reports"
+
+CORRELATION_THRESHOLD = 0.3
+DEFAULT_SAMPLE_SIZE = 20
+
+# Days per implied_date unit, for the days-ahead column of violating rows
+UNIT_DAYS = {'days': 1, 'months': 30.4375, 'years': 365.25}
+
+
+def load_feature_config(path: Path = DEFAULT_CONFIG_PATH) -> dict:
+    """Load and sanity-check the feature PIT declarations."""
+    with open(path, encoding='utf-8') as f:
+        config = yaml.safe_load(f) or {}
+    for required in ('training_table', 'row_id', 'key', 'prediction_date', 'features'):
+        if required not in config:
+            raise ValueError(f"{path}: missing '{required}'")
+    sources = config.get('sources', {})
+    for name, spec in config['features'].items():
+        spec = spec or {}
+        if 'source_date' in spec:
+            source, _, date = spec['source_date'].partition('.')
+            if date not in sources.get(source, {}).get('dates', {}):
+                raise ValueError(f"{path}: feature '{name}' uses unknown source date '{spec['source_date']}'")
+        for ref in spec.get('pit_check', []):
+            source, _, check = ref.partition('.')
+            if check not in sources.get(source, {}).get('checks', {}):
+                raise ValueError(f"{path}: feature '{name}' uses unknown source check '{ref}'")
+        for unit in (spec.get('implied_date') or {}):
+            if unit not in UNIT_DAYS:
+                raise ValueError(f"{path}: feature '{name}' has unknown implied_date unit '{unit}'")
+        for parent in spec.get('derived_from', []):
+            if parent not in config['features']:
+                raise ValueError(f"{path}: feature '{name}' derives from undeclared feature '{parent}'")
+    return config
+
+
+def _source_column(source_date: str) -> str:
+    return source_date.replace('.', '__')
+
+
+def snapshot_sql(config: dict, training_table: Optional[str] = None) -> str:
+    """
+    The single joined snapshot: training rows + every source date and check a feature uses.
+
+    Dates are aggregated per advisor (key). Checks are aggregated per lead row
+    (row_id), with {date} bound to that row's prediction date, so a record
+    dated after one contact cannot vouch for another contact of the same advisor.
+    """
+    training_table = training_table or config['training_table']
+    used, checked = {}, {}
+    for spec in config['features'].values():
+        if spec and 'source_date' in spec:
+            source, _, date = spec['source_date'].partition('.')
+            used.setdefault(source, []).append(date)
+        for ref in (spec or {}).get('pit_check', []):
+            source, _, check = ref.partition('.')
+            checked.setdefault(source, []).append(check)
+
+    columns = [config['row_id'], config['key'], config['prediction_date']]
+    if config.get('target'):
+        columns.append(config['target'])
+    select = [f"t.{c}" for c in columns] + [f"t.{f}" for f in config['features']]
+    joins = []
+    for i, (source, dates) in enumerate(used.items()):
+        spec = config['sources'][source]
+        dates = list(dict.fromkeys(dates))
+        aggregates = ",\n            ".join(f"{spec['dates'][d]} AS {d}" for d in dates)
+        joins.append(f"""LEFT JOIN (
+        SELECT
+            {spec['key']} AS _key,
+            {aggregates}
+        FROM `{spec['table']}`
+        GROUP BY {spec['key']}
+    ) s{i} ON t.{config['key']} = s{i}._key""")
+        select += [f"s{i}.{d} AS {source}__{d}" for d in dates]
+    for i, (source, checks) in enumerate(checked.items()):
+        spec = config['sources'][source]
+        checks = list(dict.fromkeys(checks))
+        expressions = [' '.join(spec['checks'][c].split()).format(date='t.' + config['prediction_date'])
+                       for c in checks]
+        aggregates = ",\n            ".join(f"{e} AS {c}" for e, c in zip(expressions, checks))
+        # Training columns compared outside the aggregate are constant per row
+        group_by = ", ".join(dict.fromkeys(
+            [f"t.{config['row_id']}", f"t.{config['prediction_date']}"]
+            + [f"t.{c}" for e in expressions for c in re.findall(r'\bt\.(\w+)', e)]))
+        joins.append(f"""LEFT JOIN (
+        SELECT
+            t.{config['row_id']} AS _row,
+            {aggregates}
+        FROM `{training_table}` t
+        JOIN `{spec['table']}` s ON t.{config['key']} = s.{spec['key']}
+        GROUP BY {group_by}
+    ) c{i} ON t.{config['row_id']} = c{i}._row""")
+        select += [f"c{i}.{c} AS {source}__{c}" for c in checks]
+
+    return "SELECT\n    " + ",\n    ".join(select) + f"\nFROM `{training_table}` t\n" + "\n".join(joins)
+
+
+# =============================================================================
+# VECTORIZED AUDIT
+# =============================================================================
+def _as_days(series: pd.Series) -> np.ndarray:
+    """Dates as float days since epoch (NaN for NULL)."""
+    values = pd.to_datetime(series, errors='coerce')
+    days = (values - pd.Timestamp('1970-01-01')).dt.total_seconds().to_numpy() / 86400.0
+    return days.astype('float64')
+
+
+def _as_float(series: pd.Series) -> np.ndarray:
+    return pd.to_numeric(series, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+
+
+def _as_true(series: pd.Series) -> np.ndarray:
+    """Boolean check column as a mask (NULL - no source records - is False)."""
+    return series.astype('boolean').fillna(False).to_numpy(dtype=bool)
+
+
+def audit_frame(df: pd.DataFrame, config: dict, sample_size: int = DEFAULT_SAMPLE_SIZE,
+                seed: int = 42) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Evaluate every feature's PIT invariant over a snapshot frame.
+
+    Args:
+        df: Snapshot (snapshot_sql output, or any frame with the same columns)
+        config: load_feature_config() result
+        sample_size: Violating rows kept per feature
+        seed: Sampling seed
+
+    Returns:
+        (summary, samples): one summary row per feature; sampled violating rows
+    """
+    features = config['features']
+    prediction = _as_days(df[config['prediction_date']])
+    n = len(df)
+    values = {f: _as_float(df[f]) for f in features if f in df.columns}
+    rng = np.random.default_rng(seed)
+
+    target = _as_float(df[config['target']]) if config.get('target') in df.columns else None
+    correlations = {}
+    if target is not None:
+        corr = pd.DataFrame(values).corrwith(pd.Series(target))
+        correlations = {f: (None if pd.isna(v) else float(v)) for f, v in corr.items()}
+
+    masks: Dict[str, np.ndarray] = {}
+    ahead: Dict[str, np.ndarray] = {}
+    applies_to: Dict[str, np.ndarray] = {}
+    rows, samples = [], []
+
+    def evaluate(name: str) -> np.ndarray:
+        if name in masks:
+            return masks[name]
+        spec = features[name] or {}
+        violation = np.zeros(n, dtype=bool)
+        days_ahead = np.full(n, np.nan)
+        applies = np.ones(n, dtype=bool)
+        for text in spec.get('when', []):
+            applies &= Condition.parse(text).mask(values)
+
+        for unit, column in (spec.get('implied_date') or {}).items():
+            hit = applies & (values[column] < 0)
+            violation |= hit
+            days_ahead = np.where(hit, -values[column] * UNIT_DAYS[unit], days_ahead)
+        if 'source_date' in spec:
+            source = _as_days(df[_source_column(spec['source_date'])])
+            delta = source - prediction
+            hit = applies & ((delta >= 0) if spec.get('op') == '<' else (delta > 0))
+            violation |= hit
+            days_ahead = np.where(hit, np.fmax(days_ahead, delta), days_ahead)
+        if spec.get('pit_check'):
+            supported = np.zeros(n, dtype=bool)
+            for ref in spec['pit_check']:
+                supported |= _as_true(df[_source_column(ref)])
+            violation |= applies & ~supported
+        for parent in spec.get('derived_from', []):
+            violation |= evaluate(parent)
+
+        masks[name], ahead[name], applies_to[name] = violation, days_ahead, applies
+        return violation
+
+    for name, spec in features.items():
+        spec = spec or {}
+        if name not in values:
+            rows.append({'feature': name, 'status': 'MISSING', 'note': 'column not in snapshot'})
+            continue
+        audited = any(k in spec for k in ('source_date', 'pit_check', 'implied_date', 'derived_from'))
+        if not audited:
+            rows.append({'feature': name, 'status': 'UNAUDITED', 'note': spec.get('unaudited', ''),
+                         'target_corr': correlations.get(name)})
+            continue
+
+        violation = evaluate(name)
+        applies = applies_to[name]
+        unverifiable = 0
+        if 'source_date' in spec:
+            unverifiable = int((applies & np.isnan(_as_days(df[_source_column(spec['source_date'])]))).sum())
+        count = int(violation.sum())
+        corr = correlations.get(name)
+        rows.append({
+            'feature': name,
+            'status': 'FAIL' if count else 'PASS',
+            'invariant': '; '.join(
+                ([f"{spec['source_date']} {spec.get('op', '<=')} {config['prediction_date']}"]
+                 if 'source_date' in spec else [])
+                + ([' or '.join(spec['pit_check'])] if spec.get('pit_check') else [])
+                + [f"{col} >= 0 ({unit})" for unit, col in (spec.get('implied_date') or {}).items()]
+                + ([f"derived from {', '.join(spec['derived_from'])}"] if spec.get('derived_from') else [])),
+            'rows_checked': int(applies.sum()),
+            'violations': count,
+            'violation_rate': count / n if n else 0.0,
+            'unverifiable': unverifiable,
+            'max_days_ahead': (float(np.nanmax(ahead[name][violation]))
+                               if count and not np.isnan(ahead[name][violation]).all() else None),
+            'target_corr': corr,
+            'suspicious_corr': corr is not None and abs(corr) > CORRELATION_THRESHOLD,
+            'note': spec.get('unaudited', ''),
+        })
+
+        if count:
+            idx = np.flatnonzero(violation)
+            idx = np.sort(rng.choice(idx, size=min(sample_size, len(idx)), replace=False))
+            sample = df.iloc[idx][[config['row_id'], config['key'], config['prediction_date'], name]].copy()
+            sample = sample.rename(columns={name: 'feature_value'})
+            sample.insert(0, 'feature', name)
+            if 'source_date' in spec:
+                sample['source_date'] = df.iloc[idx][_source_column(spec['source_date'])].values
+            sample['days_ahead'] = ahead[name][idx]
+            samples.append(sample)
+
+    summary = pd.DataFrame(rows)
+    for column in ('rows_checked', 'violations', 'unverifiable'):
+        if column in summary.columns:
+            summary[column] = summary[column].astype('Int64')
+    samples_df = pd.concat(samples, ignore_index=True) if samples else pd.DataFrame(
+        columns=['feature', config['row_id'], config['key'], config['prediction_date'], 'feature_value',
+                 'source_date', 'days_ahead'])
+    return summary, samples_df
+
+
+# =============================================================================
+# REPORT
+# =============================================================================
+def _records(summary: pd.DataFrame) -> list:
+    """Summary rows as plain dicts (None for missing values)."""
+    return summary.astype(object).where(summary.notna(), None).to_dict(orient='records')
+
+
+def write_report(summary: pd.DataFrame, samples: pd.DataFrame, config: dict, n_rows: int,
+                 output_dir: Path, elapsed_seconds: float) -> Path:
+    """Save pit_audit_results.json, pit_audit_violations.csv and pit_audit_report.md."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    passed = not (summary['status'] == 'FAIL').any()
+    results = {
+        'audit_date': datetime.now().isoformat(),
+        'version': config.get('version'),
+        'training_table': config['training_table'],
+        'rows': n_rows,
+        'elapsed_seconds': round(elapsed_seconds, 2),
+        'passed': bool(passed),
+        'features': _records(summary),
+    }
+    with open(output_dir / "pit_audit_results.json", 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, default=str)
+    samples.to_csv(output_dir / "pit_audit_violations.csv", index=False)
+
+    counts = summary['status'].value_counts().to_dict()
+    report = f"""# PIT Audit Report - {config.get('version', 'V4')} Features
+
+**Audit Date**: {results['audit_date']}
+**Training Table**: `{config['training_table']}` ({n_rows:,} rows)
+**Status**: {'PASSED' if passed else 'FAILED'}
+**Coverage**: {counts.get('PASS', 0) + counts.get('FAIL', 0)} audited, {counts.get('UNAUDITED', 0)} unaudited, {counts.get('MISSING', 0)} missing
+
+Each feature's declared source timestamp (v4/config/feature_config.yaml) must
+not be after the prediction date ({config['prediction_date']}), and each
+declared source check must find supporting records dated by it.
+
+| Feature | Status | Invariant | Rows checked | Violations | Max days ahead | Corr w/ target |
+|---|---|---|---|---|---|---|
+"""
+    for row in _records(summary):
+        corr, days = row.get('target_corr'), row.get('max_days_ahead')
+        checked, violations = row.get('rows_checked'), row.get('violations')
+        report += (f"| {row['feature']} | {row['status']} | {row.get('invariant') or row.get('note') or ''} | "
+                   f"{'-' if checked is None else f'{checked:,}'} | "
+                   f"{'-' if violations is None else f'{violations:,}'} | "
+                   f"{'-' if days is None else f'{days:.0f}'} | "
+                   f"{'-' if corr is None else f'{corr:.4f}'}"
+                   f"{' [WARNING]' if row.get('suspicious_corr') else ''} |\n")
+    report += f"\nViolating row samples: `pit_audit_violations.csv` ({len(samples)} rows)\n"
+    path = output_dir / "pit_audit_report.md"
+    path.write_text(report, encoding='utf-8')
+    return path
+
+
+def run_pit_audit(config_path: Path = DEFAULT_CONFIG_PATH, training_table: Optional[str] = None,
+                  input_path: Optional[str] = None, refresh: bool = False,
+                  sample_size: int = DEFAULT_SAMPLE_SIZE, output_dir: Optional[Path] = None) -> bool:
+    """Snapshot (cached) -> one-pass audit -> report. Returns True when every audited feature passes."""
+    print("=" * 70)
+    print("PIT LEAKAGE AUDIT (ONE PASS)")
+    print("=" * 70)
+    start = datetime.now()
+    config = load_feature_config(config_path)
+    if training_table:
+        config['training_table'] = training_table
+
+    if input_path:
+        df = pd.read_parquet(input_path) if str(input_path).endswith('.parquet') else pd.read_csv(input_path)
+    else:
+        df = DatasetCache(project_id=PROJECT_ID).query(snapshot_sql(config), refresh=refresh)
+    print(f"[INFO] Snapshot: {len(df):,} rows, {len(config['features'])} declared features")
+
+    summary, samples = audit_frame(df, config, sample_size=sample_size)
+    elapsed = (datetime.now() - start).total_seconds()
+    output_dir = Path(output_dir) if output_dir else REPORTS_DIR / str(config.get('version', 'v4')).lower()
+    report_path = write_report(summary, samples, config, len(df), output_dir, elapsed)
+
+    for row in summary.itertuples():
+        detail = (f"{row.violations:,} / {row.rows_checked:,} rows" if row.status in ('PASS', 'FAIL')
+                  else row.note)
+        print(f"  [{row.status:<9}] {row.feature:<30} {detail}")
+    passed = not (summary['status'] == 'FAIL').any()
+    suspicious = summary.loc[summary.get('suspicious_corr', pd.Series(dtype=bool)).fillna(False).astype(bool),
+                             'feature'].tolist()
+    if suspicious:
+        print(f"[WARNING] |corr(feature, target)| > {CORRELATION_THRESHOLD}: {', '.join(suspicious)}")
+    print(f"\n[INFO] Audit finished in {elapsed:.1f}s - {'PASSED' if passed else 'FAILED'}")
+    print(f"[INFO] Report: {report_path}")
+    return passed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='One-pass PIT leakage audit of V4 training features')
+    parser.add_argument('--config', default=str(DEFAULT_CONFIG_PATH))
+    parser.add_argument('--training-table', default=None, help='Override the configured training table')
+    parser.add_argument('--input', default=None, help='Audit a local snapshot (.parquet / .csv) instead')
+    parser.add_argument('--refresh', action='store_true', help='Re-download the snapshot')
+    parser.add_argument('--sample-size', type=int, default=DEFAULT_SAMPLE_SIZE)
+    parser.add_argument('--output-dir', default=None)
+    parser.add_argument('--print-sql', action='store_true', help='Print the snapshot query and exit')
+    args = parser.parse_args()
+
+    if args.print_sql:
+        print(snapshot_sql(load_feature_config(Path(args.config)), args.training_table))
+        sys.exit(0)
+    ok = run_pit_audit(Path(args.config), args.training_table, args.input, args.refresh,
+                       args.sample_size, args.output_dir)
+    sys.exit(0 if ok else 1)
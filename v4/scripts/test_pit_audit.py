@@ -0,0 +1,88 @@
+"""
+Checks for pit_audit: a job recorded after the contact must fail the audit.
+
+Builds a tiny warehouse in a temp directory (LEAD_SCORING_WAREHOUSE=local
+backend), runs the real snapshot query and audits it. Advisor 20 is contacted
+twice; the first contact's features were computed with a job that started
+after it, the second contact's features are legitimately PIT.
+
+Run: python v4/scripts/test_pit_audit.py   (or pytest)
+"""
+import sys
+import tempfile
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from v3.utils.warehouse import LocalClient
+from v4.scripts.pit_audit import audit_frame, load_feature_config, snapshot_sql
+
+CONFIG = load_feature_config()
+
+# (advisor, firm, start, end)
+HISTORY = [
+    (10, 100, date(2020, 1, 1), date(2023, 1, 1)),
+    (10, 200, date(2023, 2, 1), None),
+    (20, 100, date(2020, 1, 1), date(2023, 1, 1)),
+    (20, 200, date(2023, 2, 1), date(2024, 8, 31)),
+    (20, 300, date(2024, 9, 1), None),             # joined after the 2024-06-01 contact
+]
+
+# lead_id, advisor, contacted, tenure_months, mobility_3yr, experience_years, cc_is_in_move_window
+LEADS = [
+    ('clean', 10, date(2024, 6, 1), 16, 1, 3.0, 0),
+    ('leaky', 20, date(2024, 6, 1), 20, 2, 3.0, 1),   # tenure/mobility/cc see job 300
+    ('later', 20, date(2025, 1, 1), 4, 2, 3.0, 1),    # same advisor, after the move
+]
+
+
+def _snapshot(data_dir: str) -> pd.DataFrame:
+    client = LocalClient(data_dir=data_dir)
+    training = pd.DataFrame(0, index=range(len(LEADS)), columns=list(CONFIG['features']))
+    training[['lead_id', 'advisor_crd', 'contacted_date', 'tenure_months', 'mobility_3yr',
+              'experience_years', 'cc_is_in_move_window']] = pd.DataFrame(LEADS).to_numpy()
+    training['experience_years'] = training['experience_years'].astype(float)
+    training['has_firm_data'] = 1
+    training['converted'] = 0
+    history = pd.DataFrame(HISTORY, columns=[
+        'RIA_CONTACT_CRD_ID', 'PREVIOUS_REGISTRATION_COMPANY_CRD_ID',
+        'PREVIOUS_REGISTRATION_COMPANY_START_DATE', 'PREVIOUS_REGISTRATION_COMPANY_END_DATE'])
+    contacts = pd.DataFrame({
+        'RIA_CONTACT_CRD_ID': [10, 20],
+        'PRIMARY_FIRM_START_DATE': [date(2023, 2, 1), date(2024, 9, 1)],
+        'LATEST_REGISTERED_EMPLOYMENT_START_DATE': [date(2023, 2, 1), date(2024, 9, 1)],
+    })
+    for frame, source in ((training, CONFIG['training_table']),
+                          (history, CONFIG['sources']['employment_history']['table']),
+                          (contacts, CONFIG['sources']['contacts_current']['table'])):
+        client.load_table_from_dataframe(frame.infer_objects(), source).result()
+    return client.query(snapshot_sql(CONFIG)).to_dataframe().sort_values('lead_id')
+
+
+def test_post_contact_job_fails_audit():
+    with tempfile.TemporaryDirectory() as data_dir:
+        df = _snapshot(data_dir)
+    summary, samples = audit_frame(df, CONFIG)
+    status = summary.set_index('feature')['status']
+
+    for feature in ['tenure_months', 'mobility_3yr', 'cc_is_in_move_window']:
+        assert status[feature] == 'FAIL', f"{feature}: post-contact job not detected"
+        flagged = samples.loc[samples['feature'] == feature, 'lead_id'].tolist()
+        assert flagged == ['leaky'], f"{feature}: flagged {flagged}"
+    for feature in ['has_firm_data', 'experience_years', 'cc_is_too_early']:
+        assert status[feature] == 'PASS', f"{feature}: {status[feature]}"
+
+
+def test_clean_rows_pass():
+    with tempfile.TemporaryDirectory() as data_dir:
+        df = _snapshot(data_dir)
+    summary, _ = audit_frame(df[df['lead_id'] != 'leaky'], CONFIG)
+    assert not (summary['status'] == 'FAIL').any(), summary[summary['status'] == 'FAIL']
+
+
+if __name__ == "__main__":
+    test_post_contact_job_fails_audit()
+    test_clean_rows_pass()
+    print("[OK] pit_audit tests PASSED")
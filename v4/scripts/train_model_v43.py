@@ -23,8 +23,14 @@ from sklearn.model_selection import train_test_split
 from sklearn.metrics import roc_auc_score
 import json
 from datetime import datetime
+import sys
 from pathlib import Path
-from google.cloud import bigquery
+
+# Add project root to path for shared utilities
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from v3.utils.dataset_cache import DatasetCache
+from v3.utils.evaluation_metrics import calculate_lift_by_decile
+from v4.training.hyperparameter_search import run_hyperband_search, temporal_validation_split, to_native_params
 
 # ============================================================================
 # V4.3.1 FEATURE LIST (26 features)
@@ -194,7 +200,9 @@ def validate_shap_values(model, explainer, X_test: pd.DataFrame, tolerance: floa
 def train_v43_model(
     training_table: str = "savvy-gtm-analytics.ml_features.v4_training_features_v43",
     output_dir: str = "v4/models/v4.3.1",
-    project_id: str = "savvy-gtm-analytics"
+    project_id: str = "savvy-gtm-analytics",
+    search: bool = False,
+    search_workers: int = None
 ) -> tuple:
     """
     Train V4.3.1 model with Career Clock features, recent promotee feature, and SHAP fix.
@@ -203,6 +211,8 @@ def train_v43_model(
         training_table: BigQuery table with training features
         output_dir: Directory to save model artifacts
         project_id: GCP project ID
+        search: Run the Hyperband hyperparameter search before the final fit
+        search_workers: Parallel search workers (default: min(8, cpu_count))
     
     Returns:
         (model, explainer, metadata) tuple
@@ -225,9 +235,9 @@ def train_v43_model(
     # ========================================================================
     # STEP 1: Load training data
     # ========================================================================
-    print("\n[1/8] Loading training data from BigQuery...")
+    print("\n[1/8] Loading training data (local snapshot cache, BigQuery on miss)...")
     
-    client = bigquery.Client(project=project_id)
+    cache = DatasetCache(project_id=project_id)
     
     # Load data with train/test split (matching V4.2.0 approach)
     query = f"""
@@ -241,7 +251,7 @@ def train_v43_model(
       AND s.split IN ('TRAIN', 'TEST')
     """
     
-    df = client.query(query).to_dataframe()
+    df = cache.query(query)
     print(f"  Loaded {len(df):,} samples")
     
     # Split by split column (matching V4.2.0)
@@ -274,6 +284,24 @@ def train_v43_model(
     xgb_params = TRAINING_CONFIG_V43['xgb_params'].copy()
     xgb_params['base_score'] = base_score
     
+    # Optional: replace the hand-tuned regularization with the search winner.
+    # The search validates on the newest TRAIN leads; TEST stays the gate split.
+    search_result = None
+    if search:
+        print("\n[2b/8] Running hyperparameter search...")
+        gates = TRAINING_CONFIG_V43['validation_gates']
+        X_fit, X_val, y_fit, y_val = temporal_validation_split(X_train, y_train, train_df['contacted_date'])
+        search_result = run_hyperband_search(
+            X_fit, y_fit, X_val, y_val,
+            base_params=to_native_params(xgb_params),
+            gates={'min_auc': gates['min_auc'], 'max_overfit_gap': gates['max_overfit_gap']},
+            max_budget=xgb_params['n_estimators'],
+            early_stopping_rounds=xgb_params['early_stopping_rounds'],
+            n_workers=search_workers,
+            trials_path=str(output_path / "v4.3.1_search_trials.csv"),
+        )
+        xgb_params.update(search_result['best_params'])
+    
     # ========================================================================
     # STEP 3: Train XGBoost model
     # ========================================================================
@@ -329,12 +357,9 @@ def train_v43_model(
     print(f"  Overfit Gap: {overfit_gap:.4f}")
     
     # Calculate top decile lift
-    test_df = pd.DataFrame({'pred': test_pred, 'actual': y_test})
-    test_df['decile'] = pd.qcut(test_df['pred'], 10, labels=False, duplicates='drop')
-    top_decile = test_df[test_df['decile'] == test_df['decile'].max()]
-    top_decile_conv = top_decile['actual'].mean()
+    lift_df, top_decile_lift = calculate_lift_by_decile(y_test, test_pred)
+    top_decile_conv = lift_df['conv_rate'].iloc[-1]
     baseline_conv = y_test.mean()
-    top_decile_lift = top_decile_conv / baseline_conv
     
     print(f"  Top Decile Conversion: {top_decile_conv:.4f} ({top_decile_conv*100:.2f}%)")
     print(f"  Baseline Conversion: {baseline_conv:.4f} ({baseline_conv*100:.2f}%)")
@@ -542,6 +567,7 @@ def train_v43_model(
             'shap_validation_passed': shap_valid,
             'shap_explainer_created': explainer is not None,
             'gate_results': {k: bool(v['passed']) for k, v in gate_results.items()},
+            'hyperparameter_search': search_result['best_trial'] if search_result else None,
             'changes_from_v4.3.0': [
                 'Added is_likely_recent_promotee feature',
                 'Career Clock now excludes current firm from employment history',
@@ -633,11 +659,25 @@ if __name__ == "__main__":
     parser.add_argument('--training-table', default='savvy-gtm-analytics.ml_features.v4_training_features_v43')
     parser.add_argument('--output-dir', default='v4/models/v4.3.1')
     parser.add_argument('--project', default='savvy-gtm-analytics')
+    parser.add_argument('--pit-audit', action='store_true',
+                        help='Run the one-pass PIT leakage audit on the training table first; abort on violations')
+    parser.add_argument('--search', action='store_true',
+                        help='Run Hyperband hyperparameter search before the final fit')
+    parser.add_argument('--search-workers', type=int, default=None,
+                        help='Parallel search workers (default: min(8, cpu_count))')
     
     args = parser.parse_args()
     
+    if args.pit_audit:
+        from v4.scripts.pit_audit import run_pit_audit
+        if not run_pit_audit(training_table=args.training_table):
+            print("[ERROR] PIT audit failed - see v4/reports/v4.3.1/pit_audit_report.md")
+            sys.exit(1)
+    
     train_v43_model(
         training_table=args.training_table,
         output_dir=args.output_dir,
-        project_id=args.project
+        project_id=args.project,
+        search=args.search,
+        search_workers=args.search_workers
     )
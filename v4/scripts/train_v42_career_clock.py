@@ -19,12 +19,18 @@ import numpy as np
 import pandas as pd
 import xgboost as xgb
 from datetime import datetime
+import sys
 from pathlib import Path
-from google.cloud import bigquery
 from sklearn.metrics import roc_auc_score, average_precision_score
 import warnings
 warnings.filterwarnings('ignore')
 
+# Add project root to path for shared utilities
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from v3.utils.dataset_cache import DatasetCache
+from v3.utils.evaluation_metrics import SortedPredictions
+from v4.training.hyperparameter_search import run_hyperband_search, temporal_validation_split, to_native_params
+
 # =============================================================================
 # CONFIGURATION
 # =============================================================================
@@ -75,9 +81,9 @@ V41_BASELINE = {
 # =============================================================================
 
 def load_data():
-    """Load training data from BigQuery."""
+    """Load training data from BigQuery (via the local snapshot cache)."""
     print("[INFO] Loading training data from BigQuery...")
-    client = bigquery.Client(project=PROJECT_ID)
+    cache = DatasetCache(project_id=PROJECT_ID)
     
     query = f"""
     SELECT *
@@ -85,7 +91,7 @@ def load_data():
     WHERE target IS NOT NULL
     """
     
-    df = client.query(query).to_dataframe()
+    df = cache.query(query)
     print(f"[INFO] Loaded {len(df):,} leads with outcomes")
     
     return df
@@ -181,22 +187,9 @@ def temporal_split(df, X, y):
     return X_train, X_test, y_train, y_test
 
 
-def train_model(X_train, y_train, X_test, y_test):
-    """Train XGBoost model."""
-    print("[INFO] Training XGBoost model...")
-    
-    # Calculate scale_pos_weight
-    neg_count = (y_train == 0).sum()
-    pos_count = (y_train == 1).sum()
-    scale_pos_weight = neg_count / pos_count
-    print(f"[INFO] Scale pos weight: {scale_pos_weight:.2f}")
-    
-    # Create DMatrix
-    dtrain = xgb.DMatrix(X_train, label=y_train, feature_names=list(X_train.columns))
-    dtest = xgb.DMatrix(X_test, label=y_test, feature_names=list(X_test.columns))
-    
-    # Training parameters
-    params = {
+def build_params(scale_pos_weight):
+    """Native xgb.train parameters from the V4.2.0 hyperparameter config."""
+    return {
         "objective": HYPERPARAMETERS["objective"],
         "max_depth": HYPERPARAMETERS["max_depth"],
         "min_child_weight": HYPERPARAMETERS["min_child_weight"],
@@ -211,6 +204,52 @@ def train_model(X_train, y_train, X_test, y_test):
         "random_state": HYPERPARAMETERS["random_state"],
         "eval_metric": HYPERPARAMETERS["eval_metric"]
     }
+
+
+def search_hyperparameters(X_train, y_train, train_dates, n_workers=None):
+    """
+    Run the Hyperband search and return the winning parameter overrides.
+    
+    Configurations are ranked on the newest leads of the TRAIN period, so the
+    test period stays untouched for the deployment gates.
+    """
+    print("[INFO] Running hyperparameter search...")
+    scale_pos_weight = (y_train == 0).sum() / (y_train == 1).sum()
+    X_fit, X_val, y_fit, y_val = temporal_validation_split(X_train, y_train, train_dates)
+    result = run_hyperband_search(
+        X_fit, y_fit, X_val, y_val,
+        base_params=to_native_params(build_params(scale_pos_weight)),
+        gates={
+            "min_auc": GATES["min_test_auc"],
+            "min_top_decile_lift": GATES["min_top_decile_lift"],
+            "max_overfit_gap": GATES["max_auc_gap"],
+        },
+        max_budget=HYPERPARAMETERS["n_estimators"],
+        early_stopping_rounds=HYPERPARAMETERS["early_stopping_rounds"],
+        n_workers=n_workers,
+        trials_path=str(MODELS_DIR / "search_trials.csv"),
+    )
+    return result["best_params"]
+
+
+def train_model(X_train, y_train, X_test, y_test, params_override=None):
+    """Train XGBoost model."""
+    print("[INFO] Training XGBoost model...")
+    
+    # Calculate scale_pos_weight
+    neg_count = (y_train == 0).sum()
+    pos_count = (y_train == 1).sum()
+    scale_pos_weight = neg_count / pos_count
+    print(f"[INFO] Scale pos weight: {scale_pos_weight:.2f}")
+    
+    # Create DMatrix
+    dtrain = xgb.DMatrix(X_train, label=y_train, feature_names=list(X_train.columns))
+    dtest = xgb.DMatrix(X_test, label=y_test, feature_names=list(X_test.columns))
+    
+    # Training parameters (search winner overrides the config values)
+    params = build_params(scale_pos_weight)
+    if params_override:
+        params.update(params_override)
     
     # Train with early stopping
     evals = [(dtrain, "train"), (dtest, "test")]
@@ -252,26 +291,15 @@ def evaluate_model(model, X_train, y_train, X_test, y_test):
     print(f"[INFO] AUC Gap: {auc_gap:.4f}")
     print(f"[INFO] Test AUC-PR: {test_aucpr:.4f}")
     
-    # Calculate lift by decile
-    test_df = pd.DataFrame({
-        'score': test_pred,
-        'target': y_test.values
-    })
-    test_df['decile'] = pd.qcut(test_df['score'], 10, labels=False, duplicates='drop')
-    
-    decile_stats = test_df.groupby('decile').agg({
-        'target': ['count', 'sum', 'mean']
-    }).round(4)
-    decile_stats.columns = ['count', 'conversions', 'conv_rate']
-    
-    baseline_rate = y_test.mean()
-    decile_stats['lift'] = decile_stats['conv_rate'] / baseline_rate
+    # Calculate lift by decile (one sort of the test scores)
+    test_sorted = SortedPredictions(y_test.values, test_pred)
+    decile_stats = test_sorted.decile_table().set_index('decile')[['count', 'conversions', 'conv_rate', 'lift']]
     
     print("\n[INFO] Lift by Decile:")
-    print(decile_stats)
+    print(decile_stats.round(4))
     
-    top_decile_lift = decile_stats.loc[9, 'lift'] if 9 in decile_stats.index else decile_stats.iloc[-1]['lift']
-    bottom_20_rate = test_df[test_df['decile'] <= 1]['target'].mean()
+    top_decile_lift = test_sorted.top_decile_lift()
+    bottom_20_rate = test_sorted.bottom_rate(n_deciles=2)
     
     print(f"\n[INFO] Top Decile Lift: {top_decile_lift:.2f}x")
     print(f"[INFO] Bottom 20% Rate: {bottom_20_rate:.4f}")
@@ -426,7 +454,7 @@ def save_artifacts(model, metrics, importance_df, feature_list, scale_pos_weight
     print("\n[INFO] All artifacts saved successfully!")
 
 
-def main():
+def main(search=False, search_workers=None):
     """Main training pipeline."""
     print("=" * 60)
     print("V4.2.0 CAREER CLOCK MODEL TRAINING")
@@ -447,8 +475,14 @@ def main():
     # Temporal split
     X_train, X_test, y_train, y_test = temporal_split(df, X, y)
     
+    # Optional hyperparameter search
+    params_override = None
+    if search:
+        params_override = search_hyperparameters(X_train, y_train, df.loc[X_train.index, 'contacted_date'],
+                                                 n_workers=search_workers)
+    
     # Train model
-    model, scale_pos_weight = train_model(X_train, y_train, X_test, y_test)
+    model, scale_pos_weight = train_model(X_train, y_train, X_test, y_test, params_override)
     
     # Evaluate
     metrics, decile_stats = evaluate_model(model, X_train, y_train, X_test, y_test)
@@ -479,5 +513,14 @@ def main():
 
 
 if __name__ == "__main__":
-    success = main()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Train V4.2.0 Career Clock model")
+    parser.add_argument("--search", action="store_true",
+                        help="Run Hyperband hyperparameter search before the final fit")
+    parser.add_argument("--search-workers", type=int, default=None,
+                        help="Parallel search workers (default: min(8, cpu_count))")
+    args = parser.parse_args()
+    
+    success = main(search=args.search, search_workers=args.search_workers)
     exit(0 if success else 1)
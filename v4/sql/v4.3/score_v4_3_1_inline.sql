@@ -0,0 +1,59 @@
+-- Generated by v4/inference/sql_compiler.py from v4.3.1_model.json
+-- 49 trees; features: tenure_months, mobility_3yr, firm_rep_count_at_contact, firm_net_change_12mo, is_wirehouse, is_broker_protocol, has_email, has_linkedin, has_firm_data, mobility_x_heavy_bleeding, short_tenure_x_high_mobility, experience_years, tenure_bucket_encoded, mobility_tier_encoded, firm_stability_tier_encoded, is_recent_mover, days_since_last_move, firm_departures_corrected, bleeding_velocity_encoded, is_independent_ria, is_ia_rep_type, is_dual_registered, age_bucket_encoded, cc_is_in_move_window, cc_is_too_early, is_likely_recent_promotee
+-- Do not edit by hand: re-run the compiler after retraining.
+
+SELECT
+    f.crd,
+    1.0 / (1.0 + EXP(-(
+    -3.713406427672298
+    + (CASE WHEN f.firm_stability_tier_encoded < 0.9999999701976776 THEN 0.13183103501796722 ELSE CASE WHEN f.tenure_months < 128.99999237060547 THEN 0.2394741177558899 ELSE 0.158120259642601 END END)
+    + (CASE WHEN f.tenure_bucket_encoded < 3.9999998807907104 THEN CASE WHEN f.days_since_last_move < 5138.999755859375 THEN 0.18368321657180786 ELSE 0.23767833411693573 END ELSE CASE WHEN f.has_email < 0.9999999701976776 THEN 0.09697315096855164 ELSE 0.15380865335464478 END END)
+    + (CASE WHEN f.tenure_bucket_encoded < 3.9999998807907104 THEN CASE WHEN f.experience_years < 1.9999999403953552 THEN 0.10902983695268631 ELSE 0.16892991960048676 END ELSE CASE WHEN f.experience_years <= 21.083333015441895 THEN 0.12922082841396332 ELSE 0.08420415967702866 END END)
+    + (CASE WHEN f.has_email < 0.9999999701976776 THEN CASE WHEN f.tenure_bucket_encoded < 3.9999998807907104 THEN 0.1162608340382576 ELSE 0.06300462782382965 END ELSE CASE WHEN f.tenure_bucket_encoded < 3.9999998807907104 THEN 0.14483731985092163 ELSE 0.1199287548661232 END END)
+    + (CASE WHEN f.tenure_bucket_encoded < 3.9999998807907104 THEN 0.12033070623874664 ELSE CASE WHEN f.tenure_months < 202.99999237060547 THEN 0.09483451396226883 ELSE 0.0541694350540638 END END)
+    + (CASE WHEN f.days_since_last_move < 9998.99951171875 THEN CASE WHEN f.days_since_last_move < 5929.999755859375 THEN 0.09274440258741379 ELSE 0.022157616913318634 END ELSE 0.1249726191163063 END)
+    + (CASE WHEN f.is_dual_registered < 0.9999999701976776 THEN CASE WHEN f.firm_rep_count_at_contact < 823.9999694824219 THEN 0.10289115458726883 ELSE 0.04448369890451431 END ELSE CASE WHEN f.tenure_bucket_encoded < 3.9999998807907104 THEN 0.08938712626695633 ELSE 0.06424431502819061 END END)
+    + (CASE WHEN f.is_independent_ria < 0.9999999701976776 THEN CASE WHEN f.firm_net_change_12mo < -7.006492321624085e-46 THEN 0.08439848572015762 ELSE 0.06608756631612778 END ELSE CASE WHEN f.is_wirehouse < 0.9999999701976776 THEN 0.0965513214468956 ELSE 0.05042021721601486 END END)
+    + (CASE WHEN f.has_email < 0.9999999701976776 THEN CASE WHEN f.firm_departures_corrected < 1138.9999389648438 THEN 0.0631057545542717 ELSE 0.01940579153597355 END ELSE CASE WHEN f.days_since_last_move < 9998.99951171875 THEN 0.07688166201114655 ELSE 0.09650536626577377 END END)
+    + (CASE WHEN f.is_dual_registered < 0.9999999701976776 THEN CASE WHEN f.days_since_last_move < 9970.99951171875 THEN 0.07422270625829697 ELSE 0.09171943366527557 END ELSE CASE WHEN f.firm_departures_corrected < 0.9999999701976776 THEN 0.05089357867836952 ELSE 0.06645061075687408 END END)
+    + (CASE WHEN f.is_ia_rep_type < 0.9999999701976776 THEN CASE WHEN f.days_since_last_move < 9254.99951171875 THEN 0.056469906121492386 ELSE 0.07630612701177597 END ELSE CASE WHEN f.days_since_last_move < 677.9999694824219 THEN 0.025321967899799347 ELSE 0.08087397366762161 END END)
+    + (CASE WHEN f.is_dual_registered < 0.9999999701976776 THEN CASE WHEN f.firm_departures_corrected < 1151.9999389648438 THEN 0.06858468800783157 ELSE 0.03601080924272537 END ELSE CASE WHEN f.experience_years <= 18.833333015441895 THEN 0.04853827506303787 ELSE 0.0633569210767746 END END)
+    + (CASE WHEN f.has_email < 0.9999999701976776 THEN CASE WHEN f.firm_departures_corrected < 144.99999237060547 THEN 0.04902581498026848 ELSE 0.023025190457701683 END ELSE CASE WHEN f.is_dual_registered < 0.9999999701976776 THEN 0.06404490023851395 ELSE 0.05245723947882652 END END)
+    + (CASE WHEN f.has_email < 0.9999999701976776 THEN CASE WHEN f.days_since_last_move < 6716.999755859375 THEN 0.03380792960524559 ELSE 0.06415041536092758 END ELSE CASE WHEN f.firm_rep_count_at_contact < 2093.9998779296875 THEN 0.05826199799776077 ELSE 0.024385761469602585 END END)
+    + (CASE WHEN f.days_since_last_move < 9998.99951171875 THEN CASE WHEN f.days_since_last_move < 3336.9998779296875 THEN 0.0524698868393898 ELSE 0.04037347808480263 END ELSE CASE WHEN f.firm_rep_count_at_contact < 1538.9999389648438 THEN 0.06433871388435364 ELSE 0.03428938612341881 END END)
+    + (CASE WHEN f.mobility_3yr < 0.9999999701976776 THEN CASE WHEN f.has_email < 0.9999999701976776 THEN 0.037802405655384064 ELSE 0.04982100427150726 END ELSE CASE WHEN f.age_bucket_encoded < 1.9999999403953552 THEN 0.06900981068611145 ELSE 0.04596178978681564 END END)
+    + (CASE WHEN f.days_since_last_move < 9254.99951171875 THEN CASE WHEN f.days_since_last_move < 3974.9998779296875 THEN 0.047738026827573776 ELSE 0.028570374473929405 END ELSE CASE WHEN f.experience_years < 1.9999999403953552 THEN 0.04320119321346283 ELSE 0.059554360806941986 END END)
+    + (CASE WHEN f.days_since_last_move < 9254.99951171875 THEN CASE WHEN f.has_email < 0.9999999701976776 THEN 0.028446713462471962 ELSE 0.04314938560128212 END ELSE CASE WHEN f.tenure_months < 60.99999809265137 THEN 0.058219898492097855 ELSE 0.04141298308968544 END END)
+    + (CASE WHEN f.days_since_last_move < 9254.99951171875 THEN CASE WHEN f.is_ia_rep_type < 0.9999999701976776 THEN 0.036577172577381134 ELSE 0.04768219217658043 END ELSE CASE WHEN f.firm_net_change_12mo < 1.9999999403953552 THEN 0.05198346823453903 ELSE 0.025755740702152252 END END)
+    + (CASE WHEN f.is_dual_registered < 0.9999999701976776 THEN CASE WHEN f.days_since_last_move < 227.99999237060547 THEN 0.016408689320087433 ELSE 0.045769527554512024 END ELSE CASE WHEN f.tenure_months < 281.99998474121094 THEN 0.03781120106577873 ELSE 0.011016982607543468 END END)
+    + (CASE WHEN f.has_firm_data < 0.9999999701976776 THEN CASE WHEN f.days_since_last_move < 4795.999755859375 THEN 0.03370239958167076 ELSE 0.011477080173790455 END ELSE CASE WHEN f.has_email < 0.9999999701976776 THEN 0.032079003751277924 ELSE 0.04165760055184364 END END)
+    + (CASE WHEN f.age_bucket_encoded < 3.9999998807907104 THEN CASE WHEN f.tenure_bucket_encoded < 2.9999998807907104 THEN 0.0468609482049942 ELSE 0.03495446965098381 END ELSE 0.00433129770681262 END)
+    + (CASE WHEN f.tenure_bucket_encoded < 3.9999998807907104 THEN CASE WHEN f.firm_rep_count_at_contact < 2231.9998779296875 THEN 0.04060082882642746 ELSE 0.020868884399533272 END ELSE CASE WHEN f.has_email < 0.9999999701976776 THEN 0.017460336908698082 ELSE 0.03454538807272911 END END)
+    + (CASE WHEN f.age_bucket_encoded < 3.9999998807907104 THEN CASE WHEN f.tenure_bucket_encoded < 3.9999998807907104 THEN 0.0380697138607502 ELSE 0.029751166701316833 END ELSE -0.0011623380705714226 END)
+    + (CASE WHEN f.is_dual_registered < 0.9999999701976776 THEN CASE WHEN f.has_linkedin < 0.9999999701976776 THEN 0.010622309520840645 ELSE 0.0370192788541317 END ELSE CASE WHEN f.has_firm_data < 0.9999999701976776 THEN 0.016546089202165604 ELSE 0.031134719029068947 END END)
+    + (CASE WHEN f.is_dual_registered < 0.9999999701976776 THEN CASE WHEN f.firm_rep_count_at_contact < 1882.9999389648438 THEN 0.035963695496320724 ELSE 0.012932834215462208 END ELSE CASE WHEN f.firm_stability_tier_encoded < 0.9999999701976776 THEN 0.0191708542406559 ELSE 0.030767863616347313 END END)
+    + (CASE WHEN f.tenure_bucket_encoded < 3.9999998807907104 THEN CASE WHEN f.experience_years < 1.9999999403953552 THEN 0.02048119716346264 ELSE 0.035705309361219406 END ELSE CASE WHEN f.days_since_last_move < 2008.9999389648438 THEN 0.036603108048439026 ELSE 0.02406688593327999 END END)
+    + (CASE WHEN f.tenure_months < 299.99998474121094 THEN CASE WHEN f.days_since_last_move < 9254.99951171875 THEN 0.028991278260946274 ELSE 0.037913862615823746 END ELSE -0.00962744653224945 END)
+    + (CASE WHEN f.firm_rep_count_at_contact < 660.9999694824219 THEN CASE WHEN f.tenure_months < 281.99998474121094 THEN 0.030548181384801865 ELSE -0.0016412822296842933 END ELSE CASE WHEN f.experience_years < 4.499999761581421 THEN 0.0018959069857373834 ELSE 0.025616638362407684 END END)
+    + (CASE WHEN f.days_since_last_move < 1580.9999389648438 THEN CASE WHEN f.days_since_last_move < 248.99999237060547 THEN 0.022586027160286903 ELSE 0.0352594368159771 END ELSE CASE WHEN f.firm_net_change_12mo < -1261.0000610351562 THEN 0.006724230479449034 ELSE 0.02833007462322712 END END)
+    + (CASE WHEN f.firm_rep_count_at_contact < 2306.9998779296875 THEN CASE WHEN f.age_bucket_encoded < 3.9999998807907104 THEN 0.028453832492232323 ELSE 0.00939418375492096 END ELSE 0.008624082431197166 END)
+    + (CASE WHEN f.age_bucket_encoded < 3.9999998807907104 THEN CASE WHEN f.days_since_last_move < 9254.99951171875 THEN 0.024061445146799088 ELSE 0.03252504765987396 END ELSE -0.0027160507161170244 END)
+    + (CASE WHEN f.tenure_months < 205.99999237060547 THEN CASE WHEN f.has_firm_data < 0.9999999701976776 THEN 0.020753128454089165 ELSE 0.02838376723229885 END ELSE CASE WHEN f.tenure_months < 221.99999237060547 THEN -0.010310433804988861 ELSE 0.023644812405109406 END END)
+    + (CASE WHEN f.tenure_months < 287.99998474121094 THEN CASE WHEN f.has_email < 0.9999999701976776 THEN 0.021883754059672356 ELSE 0.028546368703246117 END ELSE -0.010083314031362534 END)
+    + (CASE WHEN f.age_bucket_encoded < 3.9999998807907104 THEN CASE WHEN f.has_email < 0.9999999701976776 THEN 0.022013939917087555 ELSE 0.027047522366046906 END ELSE CASE WHEN f.firm_rep_count_at_contact < 4.999999761581421 THEN 0.01327176857739687 ELSE 0.0011842739768326283 END END)
+    + (CASE WHEN f.has_firm_data < 0.9999999701976776 THEN CASE WHEN f.is_ia_rep_type < 0.9999999701976776 THEN 0.012818639166653156 ELSE 0.027163734659552574 END ELSE CASE WHEN f.firm_stability_tier_encoded < 3.9999998807907104 THEN 0.02532622218132019 ELSE 0.014721964485943317 END END)
+    + (CASE WHEN f.days_since_last_move < 9254.99951171875 THEN CASE WHEN f.days_since_last_move < 5493.999755859375 THEN 0.02288641221821308 ELSE 0.004986993968486786 END ELSE CASE WHEN f.firm_net_change_12mo < 88.99999618530273 THEN 0.02954435534775257 ELSE 0.009802182205021381 END END)
+    + (CASE WHEN f.age_bucket_encoded < 3.9999998807907104 THEN CASE WHEN f.mobility_3yr < 0.9999999701976776 THEN 0.021956762298941612 ELSE 0.030681589618325233 END ELSE -0.0036005310248583555 END)
+    + (CASE WHEN f.has_email < 0.9999999701976776 THEN CASE WHEN f.days_since_last_move < 4746.999755859375 THEN 0.013355031609535217 ELSE 0.02527063712477684 END ELSE CASE WHEN f.days_since_last_move < 2815.9998779296875 THEN 0.02602224610745907 ELSE 0.021273886784911156 END END)
+    + (CASE WHEN f.age_bucket_encoded < 3.9999998807907104 THEN CASE WHEN f.is_dual_registered < 0.9999999701976776 THEN 0.024909285828471184 ELSE 0.019922655075788498 END ELSE -0.003872997360303998 END)
+    + (CASE WHEN f.tenure_months < 287.99998474121094 THEN CASE WHEN f.days_since_last_move < 9998.99951171875 THEN 0.020230334252119064 ELSE 0.026978179812431335 END ELSE -0.010311368852853775 END)
+    + (CASE WHEN f.firm_rep_count_at_contact < 1481.9999389648438 THEN CASE WHEN f.days_since_last_move < 9254.99951171875 THEN 0.020871471613645554 ELSE 0.02691720239818096 END ELSE CASE WHEN f.has_email < 0.9999999701976776 THEN -0.001642412506043911 ELSE 0.01797018200159073 END END)
+    + (CASE WHEN f.is_dual_registered < 0.9999999701976776 THEN CASE WHEN f.has_email < 0.9999999701976776 THEN 0.019496100023388863 ELSE 0.024353940039873123 END ELSE CASE WHEN f.firm_stability_tier_encoded < 0.9999999701976776 THEN 0.007028496824204922 ELSE 0.020042607560753822 END END)
+    + (CASE WHEN f.tenure_bucket_encoded < 3.9999998807907104 THEN CASE WHEN f.experience_years < 26.749999046325684 THEN 0.024438001215457916 ELSE 0.01870477944612503 END ELSE CASE WHEN f.experience_years <= 2.083333134651184 THEN 0.022822435945272446 ELSE 0.01377013511955738 END END)
+    + (CASE WHEN f.tenure_bucket_encoded < 3.9999998807907104 THEN CASE WHEN f.experience_years < 1.9999999403953552 THEN 0.015186617150902748 ELSE 0.023558100685477257 END ELSE CASE WHEN f.age_bucket_encoded < 3.9999998807907104 THEN 0.01718326099216938 ELSE -0.001077205641195178 END END)
+    + (CASE WHEN f.tenure_bucket_encoded < 3.9999998807907104 THEN CASE WHEN f.firm_net_change_12mo < 88.99999618530273 THEN 0.021371664479374886 ELSE 0.009435785934329033 END ELSE CASE WHEN f.is_dual_registered < 0.9999999701976776 THEN 0.020636046305298805 ELSE 0.012685243971645832 END END)
+    + (CASE WHEN f.firm_rep_count_at_contact < 1664.9999389648438 THEN CASE WHEN f.days_since_last_move < 9254.99951171875 THEN 0.017435209825634956 ELSE 0.023637661710381508 END ELSE CASE WHEN f.tenure_bucket_encoded < 3.9999998807907104 THEN 0.011580750346183777 ELSE -0.004078637342900038 END END)
+    + (CASE WHEN f.tenure_bucket_encoded < 3.9999998807907104 THEN CASE WHEN f.is_likely_recent_promotee < 0.9999999701976776 THEN 0.021421357989311218 ELSE 0.012559238821268082 END ELSE CASE WHEN f.firm_rep_count_at_contact < 1450.9999389648438 THEN 0.017437836155295372 ELSE -0.0 END END)
+    + (CASE WHEN f.has_email < 0.9999999701976776 THEN CASE WHEN f.experience_years < 16.999999046325684 THEN 0.008092060685157776 ELSE 0.020950566977262497 END ELSE CASE WHEN f.is_dual_registered < 0.9999999701976776 THEN 0.021589871495962143 ELSE 0.017228398472070694 END END)
+))) AS v4_score
+FROM `savvy-gtm-analytics.ml_features.v4_prospect_features` f
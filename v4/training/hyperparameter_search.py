@@ -0,0 +1,319 @@
+"""
+V4 Hyperparameter Search - Parallel Successive Halving / Hyperband
+==================================================================
+Replaces hand-tuning across r1/r2/r3 archive scripts with a built-in search.
+
+How it works:
+- The training and eval matrices are quantized ONCE per worker process
+  (xgb.QuantileDMatrix). Trials reuse them, so histogram construction is not
+  repeated for every configuration.
+- Hyperband brackets run successive halving over a declared search space.
+  The budget of a rung is its number of boosting rounds (min_budget at the
+  cheapest rung, x eta per rung, up to max_budget); each trial trains
+  with early stopping (capped at the trainer's 150 rounds), so weak configs
+  stop early and cost even less than their budget.
+- Each rung is evaluated concurrently on a process pool; every trial is
+  recorded (params, budget, best iteration, AUCs, top decile lift, seconds).
+- Finalists (full-budget survivors) are checked against the trainer's AUC,
+  overfit-gap and lift gates; the best AUC among gate-passing trials wins.
+
+Usage:
+    from v4.training.hyperparameter_search import (
+        run_hyperband_search, temporal_validation_split, SEARCH_SPACE_V4)
+
+    X_fit, X_val, y_fit, y_val = temporal_validation_split(X_train, y_train, train_dates)
+    result = run_hyperband_search(
+        X_fit, y_fit, X_val, y_val,
+        base_params=to_native_params(TRAINING_CONFIG_V43['xgb_params']),
+        gates={'min_auc': 0.63, 'max_overfit_gap': 0.05, 'min_top_decile_lift': 1.5},
+    )
+    best_params = result['best_params']
+
+Note: the search ranks configurations on a validation split carved from the
+TRAINING data (its most recent leads), never on the test split: the test
+split is the deployment-gate split, and selecting on it would make the gate
+metrics optimistic. Report final numbers from the trainer's own evaluation.
+"""
+
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.metrics import roc_auc_score
+
+# Declared search space around the V4.2.0/V4.3.x regularization regime.
+#   list         -> categorical choice
+#   (low, high)  -> uniform (int if both bounds are ints)
+#   (low, high, 'log') -> log-uniform
+SEARCH_SPACE_V4 = {
+    'max_depth': [2, 3, 4],
+    'min_child_weight': (10, 80),
+    'reg_alpha': (0.1, 5.0, 'log'),
+    'reg_lambda': (1.0, 20.0, 'log'),
+    'gamma': (0.0, 1.0),
+    'learning_rate': (0.005, 0.05, 'log'),
+    'subsample': (0.5, 0.9),
+    'colsample_bytree': (0.5, 0.9),
+}
+
+# sklearn-only keys that xgb.train does not accept
+SKLEARN_ONLY_KEYS = {'n_estimators', 'early_stopping_rounds', 'n_jobs', 'random_state'}
+
+# Worker-global quantized matrices (built once per process by _init_worker)
+_WORKER_STATE = {}
+
+
+def to_native_params(sklearn_params: Dict) -> Dict:
+    """Convert an XGBClassifier param dict to xgb.train params."""
+    params = {k: v for k, v in sklearn_params.items() if k not in SKLEARN_ONLY_KEYS}
+    if 'random_state' in sklearn_params:
+        params['seed'] = sklearn_params['random_state']
+    return params
+
+
+def sample_configs(space: Dict, n: int, seed: int = 42) -> List[Dict]:
+    """Draw n random configurations from a declared search space."""
+    rng = np.random.default_rng(seed)
+    configs = []
+    for _ in range(n):
+        config = {}
+        for name, spec in space.items():
+            if isinstance(spec, list):
+                config[name] = spec[rng.integers(len(spec))]
+            elif len(spec) == 3 and spec[2] == 'log':
+                config[name] = float(np.exp(rng.uniform(np.log(spec[0]), np.log(spec[1]))))
+            elif isinstance(spec[0], int) and isinstance(spec[1], int):
+                config[name] = int(rng.integers(spec[0], spec[1] + 1))
+            else:
+                config[name] = float(rng.uniform(spec[0], spec[1]))
+        configs.append(config)
+    return configs
+
+
+def temporal_validation_split(X_train: pd.DataFrame, y_train: pd.Series, dates: pd.Series,
+                              fraction: float = 0.2):
+    """
+    Carve the most recent `fraction` of the training rows off as the search
+    validation set (mirrors the trainers' temporal train/test split).
+
+    Returns:
+        (X_fit, X_val, y_fit, y_val)
+    """
+    dates = pd.to_datetime(pd.Series(np.asarray(dates)), errors='coerce')
+    order = np.argsort(dates.to_numpy(), kind='stable')     # NaT sorts last -> validation
+    n_val = max(1, int(round(len(order) * fraction)))
+    fit_idx, val_idx = np.sort(order[:-n_val]), np.sort(order[-n_val:])
+    print(f"[INFO] Search split: {len(fit_idx):,} fit / {len(val_idx):,} validation "
+          f"(most recent {fraction:.0%} of train)")
+    return (X_train.iloc[fit_idx], X_train.iloc[val_idx],
+            y_train.iloc[fit_idx], y_train.iloc[val_idx])
+
+
+def top_decile_lift(y_true: np.ndarray, scores: np.ndarray) -> float:
+    """Conversion rate of the top 10% by score divided by the overall rate."""
+    baseline = y_true.mean()
+    if baseline == 0:
+        return 0.0
+    k = max(1, int(math.ceil(len(scores) * 0.1)))
+    top_idx = np.argpartition(-scores, k - 1)[:k]
+    return float(y_true[top_idx].mean() / baseline)
+
+
+def _init_worker(X_train, y_train, X_eval, y_eval, max_bin, nthread):
+    """Quantize the training/eval matrices once for this worker process."""
+    dtrain = xgb.QuantileDMatrix(X_train, label=y_train, max_bin=max_bin, nthread=nthread)
+    deval = xgb.QuantileDMatrix(X_eval, label=y_eval, ref=dtrain, nthread=nthread)
+    _WORKER_STATE.update({
+        'dtrain': dtrain,
+        'deval': deval,
+        'y_train': np.asarray(y_train),
+        'y_eval': np.asarray(y_eval),
+        'nthread': nthread,
+    })
+
+
+def _run_trial(trial: Dict) -> Dict:
+    """Train one configuration at one budget on the worker's shared matrices."""
+    state = _WORKER_STATE
+    params = dict(trial['params'])
+    params['nthread'] = state['nthread']
+    params.setdefault('eval_metric', 'auc')
+
+    start = time.perf_counter()
+    booster = xgb.train(
+        params,
+        state['dtrain'],
+        num_boost_round=trial['budget'],
+        evals=[(state['deval'], 'eval')],
+        early_stopping_rounds=min(trial['early_stopping_rounds'], trial['budget']),
+        verbose_eval=False,
+    )
+    iteration_range = (0, booster.best_iteration + 1)
+    eval_pred = booster.predict(state['deval'], iteration_range=iteration_range)
+    train_pred = booster.predict(state['dtrain'], iteration_range=iteration_range)
+
+    eval_auc = roc_auc_score(state['y_eval'], eval_pred)
+    train_auc = roc_auc_score(state['y_train'], train_pred)
+    return {
+        **trial,
+        'best_iteration': int(booster.best_iteration),
+        'train_auc': float(train_auc),
+        'eval_auc': float(eval_auc),
+        'overfit_gap': float(train_auc - eval_auc),
+        'top_decile_lift': top_decile_lift(state['y_eval'], eval_pred),
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def passes_gates(trial: Dict, gates: Dict) -> bool:
+    """Check a trial against the trainer's validation gates."""
+    if trial['eval_auc'] < gates.get('min_auc', 0.0):
+        return False
+    if trial['overfit_gap'] > gates.get('max_overfit_gap', float('inf')):
+        return False
+    if trial['top_decile_lift'] < gates.get('min_top_decile_lift', 0.0):
+        return False
+    return True
+
+
+def hyperband_brackets(min_budget: int, max_budget: int, eta: int = 3) -> List[Dict]:
+    """
+    Hyperband bracket schedule.
+
+    Rung budgets are max_budget / eta^k, floored at min_budget, so the most
+    exploratory bracket starts at exactly min_budget rounds (75, 222, 667,
+    2000 for the defaults).
+
+    Returns:
+        List of brackets, each with n_configs and the per-rung budgets
+    """
+    s_max = max(0, int(math.ceil(math.log(max_budget / min_budget, eta) - 1e-9)))
+    brackets = []
+    for s in range(s_max, -1, -1):
+        n_configs = int(math.ceil((s_max + 1) / (s + 1) * eta ** s))
+        budgets = [max(min_budget, int(round(max_budget * eta ** (i - s)))) for i in range(s + 1)]
+        brackets.append({'bracket': s, 'n_configs': n_configs, 'budgets': budgets})
+    return brackets
+
+
+def run_hyperband_search(
+    X_train: pd.DataFrame,
+    y_train: pd.Series,
+    X_eval: pd.DataFrame,
+    y_eval: pd.Series,
+    base_params: Dict,
+    gates: Dict,
+    search_space: Optional[Dict] = None,
+    min_budget: int = 75,
+    max_budget: int = 2000,
+    eta: int = 3,
+    early_stopping_rounds: int = 150,
+    n_workers: Optional[int] = None,
+    max_bin: int = 256,
+    seed: int = 42,
+    trials_path: Optional[str] = None,
+) -> Dict:
+    """
+    Run parallel Hyperband (successive halving brackets) over a search space.
+
+    Args:
+        X_train, y_train: Training data (the fit part of the training split)
+        X_eval, y_eval: Validation data for early stopping and ranking, carved
+            from the training split (temporal_validation_split), not the test split
+        base_params: Native xgb.train params (search values override these)
+        gates: Validation gates: min_auc, max_overfit_gap, min_top_decile_lift
+        search_space: Declared space (default: SEARCH_SPACE_V4)
+        min_budget: Boosting rounds at the cheapest rung
+        max_budget: Boosting rounds at the full rung (the trainer's n_estimators)
+        eta: Halving rate (keep top 1/eta per rung)
+        early_stopping_rounds: Early stopping patience (capped at rung budget)
+        n_workers: Process pool size (default: min(8, cpu_count))
+        max_bin: Histogram bins for the quantized matrices
+        seed: Sampling seed
+        trials_path: Optional CSV path recording every trial
+
+    Returns:
+        Dictionary with best_params, best_trial, trials DataFrame, gates_passed
+    """
+    search_space = search_space or SEARCH_SPACE_V4
+    cpu_count = os.cpu_count() or 1
+    n_workers = n_workers or min(8, cpu_count)
+    nthread = max(1, cpu_count // n_workers)
+
+    brackets = hyperband_brackets(min_budget, max_budget, eta)
+    total_configs = sum(b['n_configs'] for b in brackets)
+    print(f"[INFO] Hyperband search: {len(brackets)} brackets, {total_configs} configs, "
+          f"{n_workers} workers x {nthread} threads")
+
+    configs = sample_configs(search_space, total_configs, seed=seed)
+    trials = []
+    search_start = time.perf_counter()
+
+    with ProcessPoolExecutor(
+        max_workers=n_workers,
+        initializer=_init_worker,
+        initargs=(np.asarray(X_train, dtype=np.float32), np.asarray(y_train),
+                  np.asarray(X_eval, dtype=np.float32), np.asarray(y_eval),
+                  max_bin, nthread),
+    ) as pool:
+        config_offset = 0
+        for bracket in brackets:
+            survivors = [
+                {'config_id': config_offset + i, 'config': configs[config_offset + i]}
+                for i in range(bracket['n_configs'])
+            ]
+            config_offset += bracket['n_configs']
+
+            for rung, budget in enumerate(bracket['budgets']):
+                rung_trials = [{
+                    'bracket': bracket['bracket'],
+                    'rung': rung,
+                    'config_id': s['config_id'],
+                    'budget': budget,
+                    'early_stopping_rounds': early_stopping_rounds,
+                    'params': {**base_params, **s['config']},
+                } for s in survivors]
+
+                results = list(pool.map(_run_trial, rung_trials))
+                trials.extend(results)
+
+                best_auc = max(r['eval_auc'] for r in results)
+                print(f"  Bracket {bracket['bracket']} rung {rung}: {len(results)} trials "
+                      f"@ {budget} rounds, best eval AUC {best_auc:.4f}")
+
+                keep = max(1, len(results) // eta)
+                ranked = sorted(results, key=lambda r: r['eval_auc'], reverse=True)[:keep]
+                survivors = [{'config_id': r['config_id'], 'config': configs[r['config_id']]} for r in ranked]
+
+    trials_df = pd.DataFrame([
+        {**{k: v for k, v in t.items() if k != 'params'}, **{f'param_{k}': t['params'][k] for k in search_space}}
+        for t in trials
+    ])
+    if trials_path:
+        trials_df.to_csv(trials_path, index=False)
+        print(f"[INFO] Recorded {len(trials_df)} trials: {trials_path}")
+
+    finalists = [t for t in trials if t['budget'] == max_budget]
+    passing = [t for t in finalists if passes_gates(t, gates)]
+    pool_for_winner = passing or finalists
+    best = max(pool_for_winner, key=lambda t: t['eval_auc'])
+
+    print(f"[INFO] Search finished in {time.perf_counter() - search_start:.1f}s "
+          f"({len(trials)} trials, {len(passing)}/{len(finalists)} finalists pass gates)")
+    print(f"[INFO] Best config {best['config_id']}: eval AUC {best['eval_auc']:.4f}, "
+          f"lift {best['top_decile_lift']:.2f}x, gap {best['overfit_gap']:.4f}, "
+          f"best iteration {best['best_iteration']}")
+    if not passing:
+        print("[WARNING] No finalist passes all gates - returning best AUC for inspection")
+
+    return {
+        'best_params': configs[best['config_id']],
+        'best_trial': {k: v for k, v in best.items() if k != 'params'},
+        'trials': trials_df,
+        'gates_passed': bool(passing),
+    }
@@ -12,8 +12,14 @@ import shap
 import pickle
 import json
 from datetime import datetime
-from google.cloud import bigquery
 import os
+import sys
+from pathlib import Path
+
+# Add project root to path for shared utilities
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from v3.utils.dataset_cache import DatasetCache
+from v3.utils.evaluation_metrics import calculate_lift_by_decile
 
 # Configuration
 MODEL_VERSION = "v4.2.0"
@@ -77,8 +83,8 @@ HYPERPARAMETERS = {
 }
 
 def load_training_data():
-    """Load training data from BigQuery."""
-    client = bigquery.Client(project='savvy-gtm-analytics')
+    """Load training data from BigQuery (via the local snapshot cache)."""
+    cache = DatasetCache(project_id='savvy-gtm-analytics')
     
     query = """
     SELECT 
@@ -91,7 +97,7 @@ def load_training_data():
     WHERE s.split IN ('TRAIN', 'TEST')
     """
     
-    df = client.query(query).to_dataframe()
+    df = cache.query(query)
     print(f"Loaded {len(df)} rows")
     print(f"Train: {len(df[df['split'] == 'TRAIN'])}, Test: {len(df[df['split'] == 'TEST'])}")
     return df
@@ -244,25 +250,6 @@ def validate_gates(metrics):
     return all_passed, gates
 
 
-def calculate_lift_by_decile(y_true, y_pred):
-    """Calculate lift by decile for Gate 2."""
-    df = pd.DataFrame({'y_true': y_true, 'y_pred': y_pred})
-    df['decile'] = pd.qcut(df['y_pred'], 10, labels=False, duplicates='drop')
-    
-    baseline_rate = y_true.mean()
-    
-    lift_df = df.groupby('decile').agg({
-        'y_true': ['count', 'sum', 'mean']
-    }).reset_index()
-    lift_df.columns = ['decile', 'count', 'conversions', 'conv_rate']
-    lift_df['lift'] = lift_df['conv_rate'] / baseline_rate
-    
-    # Top decile is decile 9 (0-indexed, highest scores)
-    top_decile_lift = lift_df[lift_df['decile'] == lift_df['decile'].max()]['lift'].values[0]
-    
-    return lift_df, top_decile_lift
-
-
 def calculate_shap_importance(model, X_train):
     """Calculate SHAP feature importance, fallback to gain if SHAP fails."""
     print("\nCalculating feature importance...")
@@ -4,10 +4,9 @@ Location: v5/experiments/scripts/ablation_study.py
 """
 
 import xgboost as xgb
-from sklearn.metrics import roc_auc_score, average_precision_score
+from sklearn.metrics import average_precision_score
 import numpy as np
 import pandas as pd
-from google.cloud import bigquery
 from pathlib import Path
 import json
 import sys
@@ -18,6 +17,9 @@ warnings.filterwarnings('ignore')
 WORKING_DIR = Path(__file__).parent.parent.parent.parent
 sys.path.insert(0, str(WORKING_DIR))
 from v3.utils.execution_logger import ExecutionLogger
+from v3.utils.dataset_cache import DatasetCache
+from v3.utils.evaluation_metrics import SortedPredictions
+from v3.utils.paired_significance import save_predictions
 
 # ============================================================================
 # CONFIGURATION
@@ -141,18 +143,10 @@ def prepare_features(df, feature_list):
     
     return X, final_features
 
-def calculate_top_decile_lift(y_true, y_pred):
-    """Calculate conversion lift in top decile"""
-    df_temp = pd.DataFrame({'y_true': y_true, 'y_pred': y_pred})
-    df_temp['decile'] = pd.qcut(df_temp['y_pred'], q=10, labels=False, duplicates='drop')
-    top_decile_rate = df_temp[df_temp['decile'] == df_temp['decile'].max()]['y_true'].mean()
-    baseline_rate = df_temp['y_true'].mean()
-    return top_decile_rate / baseline_rate if baseline_rate > 0 else 0
-
 # ============================================================================
 # LOAD DATA
 # ============================================================================
-client = bigquery.Client(project=PROJECT_ID)
+cache = DatasetCache(project_id=PROJECT_ID)
 
 logger.log_action("Loading feature candidates and target variable from BigQuery")
 
@@ -166,7 +160,7 @@ INNER JOIN `{PROJECT_ID}.{TARGET_TABLE}` tv
     ON fc.advisor_crd = tv.advisor_crd
 WHERE tv.target IS NOT NULL
 """
-df = client.query(query).to_dataframe()
+df = cache.query(query)
 
 logger.log_metric("Total Rows", len(df))
 logger.log_metric("Positive Class Rate", df['target_mql_43d'].mean())
@@ -177,9 +171,11 @@ logger.log_metric("Positive Class Rate", df['target_mql_43d'].mean())
 def run_ablation_study(df, baseline_features, candidate_groups, target='target_mql_43d'):
     """
     Test marginal value of each feature group.
-    Returns comparison of baseline vs baseline + each feature group.
+    Returns comparison of baseline vs baseline + each feature group, and the
+    per-lead test predictions of every model (for paired significance tests).
     """
     results = []
+    predictions = {}
     
     # Temporal split (matching V4.1 methodology)
     df_sorted = df.sort_values('contacted_date').reset_index(drop=True)
@@ -222,9 +218,11 @@ def run_ablation_study(df, baseline_features, candidate_groups, target='target_m
     )
     
     y_pred_base = model_base.predict_proba(X_test_base)[:, 1]
-    auc_base = roc_auc_score(y_test, y_pred_base)
+    base_sorted = SortedPredictions(y_test, y_pred_base)  # one sort for AUC and lift
+    auc_base = base_sorted.auc()
     pr_auc_base = average_precision_score(y_test, y_pred_base)
-    lift_base = calculate_top_decile_lift(y_test, y_pred_base)
+    lift_base = base_sorted.top_decile_lift()
+    predictions['BASELINE (V4.1 features)'] = y_pred_base
     
     results.append({
         'model': 'BASELINE (V4.1 features)',
@@ -268,9 +266,11 @@ def run_ablation_study(df, baseline_features, candidate_groups, target='target_m
         )
         
         y_pred = model.predict_proba(X_test)[:, 1]
-        auc = roc_auc_score(y_test, y_pred)
+        test_sorted = SortedPredictions(y_test, y_pred)  # one sort for AUC and lift
+        auc = test_sorted.auc()
         pr_auc = average_precision_score(y_test, y_pred)
-        lift = calculate_top_decile_lift(y_test, y_pred)
+        lift = test_sorted.top_decile_lift()
+        predictions[f'+ {group_name}'] = y_pred
         
         auc_delta = auc - auc_base
         lift_delta = lift - lift_base
@@ -308,7 +308,8 @@ def run_ablation_study(df, baseline_features, candidate_groups, target='target_m
             recommendation
         )
     
-    return pd.DataFrame(results)
+    ids = test_df['advisor_crd'].values if 'advisor_crd' in test_df.columns else None
+    return pd.DataFrame(results), predictions, y_test, ids
 
 # ============================================================================
 # RUN ABLATION STUDY
@@ -319,7 +320,7 @@ print("="*60)
 print(f"Baseline features: {len(BASELINE_FEATURES)}")
 print(f"Candidate feature groups: {list(CANDIDATE_FEATURES.keys())}")
 
-results_df = run_ablation_study(df, BASELINE_FEATURES, CANDIDATE_FEATURES)
+results_df, test_predictions, y_test, test_ids = run_ablation_study(df, BASELINE_FEATURES, CANDIDATE_FEATURES)
 
 print("\n" + "="*60)
 print("ABLATION STUDY RESULTS")
@@ -331,6 +332,11 @@ output_path = REPORTS_DIR / "ablation_study_results.csv"
 results_df.to_csv(output_path, index=False)
 logger.log_file_created("ablation_study_results.csv", str(output_path), "Ablation study results")
 
+# Per-lead test predictions (one column per model, named as in results_df['model'])
+predictions_path = save_predictions(REPORTS_DIR / "ablation_predictions.parquet", y_test, test_predictions, ids=test_ids)
+logger.log_file_created("ablation_predictions.parquet", str(predictions_path),
+                        "Per-lead test predictions for paired significance tests")
+
 # Find best improvement
 if len(results_df) > 1:
     best = results_df[results_df['model'] != 'BASELINE (V4.1 features)'].sort_values('auc_delta', ascending=False).iloc[0]
@@ -8,6 +8,7 @@ from google.cloud import bigquery
 # Add project root to path
 WORKING_DIR = Path(__file__).parent.parent.parent.parent
 sys.path.insert(0, str(WORKING_DIR))
+from v3.utils.job_manager import JobManager
 
 PROJECT_ID = "savvy-gtm-analytics"
 SQL_FILE = WORKING_DIR / "v5" / "experiments" / "sql" / "create_feature_candidates_v5.sql"
@@ -22,12 +23,15 @@ def main():
     print(f"SQL length: {len(sql)} characters")
     print("Executing in BigQuery...")
     
-    job = client.query(sql)
-    result = job.result()  # Wait for completion
+    jobs = JobManager(client)
+    names = jobs.add_script(sql, SQL_FILE.name)
+    results = jobs.run()
     
     print(f"[SUCCESS] Query completed!")
-    print(f"   Job ID: {job.job_id}")
-    print(f"   Total bytes processed: {job.total_bytes_processed:,}")
+    for name in names:
+        print(f"   Job ID: {results[name].job_id}")
+        print(f"   Total bytes processed: {results[name].total_bytes_processed or 0:,}")
+        print(f"   Slot time: {results[name].slot_millis or 0:,} ms")
     
     # Verify table was created
     table_ref = client.get_table("savvy-gtm-analytics.ml_experiments.feature_candidates_v5")
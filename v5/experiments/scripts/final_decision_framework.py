@@ -39,7 +39,6 @@ print("="*60)
 ablation_path = REPORTS_DIR / "ablation_study_results.csv"
 ablation_df = pd.read_csv(ablation_path)
 baseline_row = ablation_df[ablation_df['model'] == 'BASELINE (V4.1 features)']
-enhanced_row = ablation_df[ablation_df['model'] != 'BASELINE (V4.1 features)'].iloc[0]
 
 # Load Phase 4 (Multi-Period Backtest)
 backtest_path = REPORTS_DIR / "multi_period_backtest_results.csv"
@@ -50,6 +49,13 @@ sig_path = REPORTS_DIR / "statistical_significance_results.json"
 with open(sig_path, 'r') as f:
     sig_results = json.load(f)
 
+# Evaluate the same enhanced model that Phase 5 tested
+enhanced_models = ablation_df[ablation_df['model'] != 'BASELINE (V4.1 features)']
+if sig_results.get('enhanced_model') in set(enhanced_models['model']):
+    enhanced_row = enhanced_models[enhanced_models['model'] == sig_results['enhanced_model']].iloc[0]
+else:
+    enhanced_row = enhanced_models.iloc[0]
+
 # ============================================================================
 # EVALUATE ALL GATES
 # ============================================================================
@@ -82,7 +88,9 @@ gates['G-NEW-3'] = {
     'threshold': 0.05,
     'actual': auc_p_value,
     'passed': auc_p_value < 0.05,
-    'description': f"P-value < 0.05 (actual: {auc_p_value:.4f})"
+    'description': f"P-value < 0.05 (actual: {auc_p_value:.4f}"
+                   + (f", AUC diff 95% CI [{sig_results['auc_diff_ci_95'][0]:+.4f}, {sig_results['auc_diff_ci_95'][1]:+.4f}])"
+                      if 'auc_diff_ci_95' in sig_results else ")")
 }
 
 # G-NEW-4: Temporal stability (>= 3/4 periods improved)
@@ -97,16 +105,27 @@ gates['G-NEW-4'] = {
 }
 
 # G-NEW-5: Bottom 20% not degraded (< 10% increase)
-# For this framework, we'll check if lift in bottom decile degraded
-# Simplified: if overall lift degraded, bottom 20% likely also degraded
-bottom_20_degraded = lift_delta < 0  # If overall lift decreased, bottom likely also decreased
-gates['G-NEW-5'] = {
-    'name': 'Bottom 20% Not Degraded',
-    'threshold': 0.10,
-    'actual': 'N/A',  # Would need bottom decile analysis
-    'passed': not bottom_20_degraded,  # Pass if lift didn't decrease
-    'description': f"Bottom 20% conversion rate not degraded (overall lift: {lift_delta:+.2f}x)"
-}
+# Conversion rate among the enhanced model's bottom 20% vs the baseline's bottom 20%,
+# computed from the per-lead predictions in statistical_significance.py
+if 'bottom_20_rate_change' in sig_results:
+    bottom_20_change = float(sig_results['bottom_20_rate_change'])
+    gates['G-NEW-5'] = {
+        'name': 'Bottom 20% Not Degraded',
+        'threshold': 0.10,
+        'actual': bottom_20_change,
+        'passed': bottom_20_change < 0.10,
+        'description': f"Bottom 20% conversion rate increase < 10% (actual: {bottom_20_change:+.1%})"
+    }
+else:
+    # Older significance results without predictions: fall back to the overall lift proxy
+    bottom_20_degraded = lift_delta < 0
+    gates['G-NEW-5'] = {
+        'name': 'Bottom 20% Not Degraded',
+        'threshold': 0.10,
+        'actual': 'N/A',
+        'passed': not bottom_20_degraded,
+        'description': f"Bottom 20% conversion rate not degraded (overall lift: {lift_delta:+.2f}x)"
+    }
 
 # G-NEW-6: PIT compliance (verified in SQL design)
 # This is verified by SQL design - all features use PIT-safe logic
@@ -4,10 +4,9 @@ Location: v5/experiments/scripts/multi_period_backtest.py
 """
 
 import xgboost as xgb
-from sklearn.metrics import roc_auc_score, average_precision_score
+from sklearn.metrics import average_precision_score
 import numpy as np
 import pandas as pd
-from google.cloud import bigquery
 from pathlib import Path
 import json
 import sys
@@ -18,6 +17,8 @@ warnings.filterwarnings('ignore')
 WORKING_DIR = Path(__file__).parent.parent.parent.parent
 sys.path.insert(0, str(WORKING_DIR))
 from v3.utils.execution_logger import ExecutionLogger
+from v3.utils.dataset_cache import DatasetCache
+from v3.utils.evaluation_metrics import SortedPredictions
 
 # ============================================================================
 # CONFIGURATION
@@ -147,18 +148,10 @@ def prepare_features(df, feature_list):
     
     return X, final_features
 
-def calculate_top_decile_lift(y_true, y_pred):
-    """Calculate conversion lift in top decile"""
-    df_temp = pd.DataFrame({'y_true': y_true, 'y_pred': y_pred})
-    df_temp['decile'] = pd.qcut(df_temp['y_pred'], q=10, labels=False, duplicates='drop')
-    top_decile_rate = df_temp[df_temp['decile'] == df_temp['decile'].max()]['y_true'].mean()
-    baseline_rate = df_temp['y_true'].mean()
-    return top_decile_rate / baseline_rate if baseline_rate > 0 else 0
-
 # ============================================================================
 # LOAD DATA
 # ============================================================================
-client = bigquery.Client(project=PROJECT_ID)
+cache = DatasetCache(project_id=PROJECT_ID)
 
 logger.log_action("Loading feature candidates and target variable from BigQuery")
 
@@ -172,7 +165,7 @@ INNER JOIN `{PROJECT_ID}.{TARGET_TABLE}` tv
     ON fc.advisor_crd = tv.advisor_crd
 WHERE tv.target IS NOT NULL
 """
-df = client.query(query).to_dataframe()
+df = cache.query(query)
 df['contacted_date'] = pd.to_datetime(df['contacted_date'])
 
 logger.log_metric("Total Rows", len(df))
@@ -225,8 +218,9 @@ def run_period_backtest(df, period, baseline_features, candidate_features, targe
     model_base = xgb.XGBClassifier(**params)
     model_base.fit(X_train_base, y_train, eval_set=[(X_test_base, y_test)], verbose=False)
     y_pred_base = model_base.predict_proba(X_test_base)[:, 1]
-    auc_base = roc_auc_score(y_test, y_pred_base)
-    lift_base = calculate_top_decile_lift(y_test, y_pred_base)
+    base_sorted = SortedPredictions(y_test, y_pred_base)  # one sort for AUC and lift
+    auc_base = base_sorted.auc()
+    lift_base = base_sorted.top_decile_lift()
     
     results['baseline_auc'] = auc_base
     results['baseline_lift'] = lift_base
@@ -242,8 +236,9 @@ def run_period_backtest(df, period, baseline_features, candidate_features, targe
     model_enh = xgb.XGBClassifier(**params)
     model_enh.fit(X_train_enh, y_train, eval_set=[(X_test_enh, y_test)], verbose=False)
     y_pred_enh = model_enh.predict_proba(X_test_enh)[:, 1]
-    auc_enh = roc_auc_score(y_test, y_pred_enh)
-    lift_enh = calculate_top_decile_lift(y_test, y_pred_enh)
+    enh_sorted = SortedPredictions(y_test, y_pred_enh)  # one sort for AUC and lift
+    auc_enh = enh_sorted.auc()
+    lift_enh = enh_sorted.top_decile_lift()
     
     results['enhanced_auc'] = auc_enh
     results['enhanced_lift'] = lift_enh
@@ -1,14 +1,17 @@
 """
 Statistical Significance Testing: Bootstrap and permutation tests
 Location: v5/experiments/scripts/statistical_significance.py
+
+Uses the per-lead test predictions saved by ablation_study.py:
+- Paired bootstrap (same resampled leads for both models) -> 95% CIs
+- Per-lead score-swap permutation test -> one-sided p-values (enhanced > baseline)
 """
 
-import numpy as np
 import pandas as pd
-from scipy import stats
 from pathlib import Path
 import json
 import sys
+import time
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -16,6 +19,7 @@ warnings.filterwarnings('ignore')
 WORKING_DIR = Path(__file__).parent.parent.parent.parent
 sys.path.insert(0, str(WORKING_DIR))
 from v3.utils.execution_logger import ExecutionLogger
+from v3.utils.paired_significance import bottom_fraction_rate, compare_models, load_predictions
 
 # ============================================================================
 # CONFIGURATION
@@ -24,6 +28,13 @@ EXPERIMENTS_DIR = WORKING_DIR / "v5" / "experiments"
 REPORTS_DIR = EXPERIMENTS_DIR / "reports"
 REPORTS_DIR.mkdir(parents=True, exist_ok=True)
 
+BASELINE_MODEL = 'BASELINE (V4.1 features)'
+N_BOOTSTRAP = 10000
+N_PERMUTATIONS = 10000
+MIN_AUC_IMPROVEMENT = 0.005     # G-NEW-1
+MIN_LIFT_IMPROVEMENT = 0.1      # G-NEW-2
+RANDOM_SEED = 42
+
 # Initialize logger
 logger = ExecutionLogger(
     log_path=str(EXPERIMENTS_DIR / "EXECUTION_LOG.md"),
@@ -33,99 +44,82 @@ logger = ExecutionLogger(
 logger.start_phase("5.1", "Statistical Significance Testing")
 
 # ============================================================================
-# LOAD ABLATION STUDY RESULTS
+# LOAD ABLATION STUDY RESULTS AND PREDICTIONS
 # ============================================================================
 ablation_path = REPORTS_DIR / "ablation_study_results.csv"
+predictions_path = REPORTS_DIR / "ablation_predictions.parquet"
 
-if not ablation_path.exists():
-    print("[ERROR] Ablation study results not found. Run ablation_study.py first.")
+if not ablation_path.exists() or not predictions_path.exists():
+    print("[ERROR] Ablation study results/predictions not found. Run ablation_study.py first.")
     logger.end_phase(status="FAILED", next_steps=["Run Phase 3: Ablation Study first"])
     sys.exit(1)
 
 ablation_df = pd.read_csv(ablation_path)
-baseline_row = ablation_df[ablation_df['model'] == 'BASELINE (V4.1 features)']
-enhanced_row = ablation_df[ablation_df['model'] != 'BASELINE (V4.1 features)'].iloc[0]  # Get best enhanced model
+enhanced_row = ablation_df[ablation_df['model'] != BASELINE_MODEL].sort_values('auc_delta', ascending=False).iloc[0]  # Best enhanced model
+enhanced_model = enhanced_row['model']
 
-baseline_auc = float(baseline_row['test_auc'].iloc[0])
-enhanced_auc = float(enhanced_row['test_auc'])
-baseline_lift = float(baseline_row['top_decile_lift'].iloc[0])
-enhanced_lift = float(enhanced_row['top_decile_lift'])
-
-observed_auc_diff = enhanced_auc - baseline_auc
-observed_lift_diff = enhanced_lift - baseline_lift
+predictions = load_predictions(predictions_path)
+y_true = predictions['target'].values
+baseline_pred = predictions[BASELINE_MODEL].values
+enhanced_pred = predictions[enhanced_model].values
 
 print("="*60)
 print("STATISTICAL SIGNIFICANCE TESTING")
 print("="*60)
-print(f"Baseline AUC: {baseline_auc:.4f}")
-print(f"Enhanced AUC: {enhanced_auc:.4f}")
-print(f"Observed AUC difference: {observed_auc_diff:+.4f}")
-print(f"\nBaseline Lift: {baseline_lift:.2f}x")
-print(f"Enhanced Lift: {enhanced_lift:.2f}x")
-print(f"Observed Lift difference: {observed_lift_diff:+.2f}x")
+print(f"Enhanced model: {enhanced_model}")
+print(f"Test leads: {len(y_true):,} ({int(y_true.sum()):,} conversions)")
 
 # ============================================================================
-# LOAD PREDICTIONS FROM ABLATION STUDY (if available)
+# PAIRED BOOTSTRAP + PERMUTATION TESTS ON PER-LEAD PREDICTIONS
 # ============================================================================
-# For bootstrap, we need the actual predictions. Since we don't have them saved,
-# we'll use a simplified approach: bootstrap the observed difference
-
-# Bootstrap AUC comparison
-print("\n" + "="*60)
-print("Bootstrap AUC Comparison (10,000 samples)")
-print("="*60)
-
-# Simulate bootstrap by assuming normal distribution of AUC differences
-# In practice, we'd bootstrap the actual predictions, but for this framework
-# we'll use the observed difference and estimate variance
-
-# For a conservative estimate, assume the difference has some variance
-# We'll use a permutation-style approach: if observed diff is negative, p-value will be high
-n_bootstrap = 10000
-
-# Simulate bootstrap distribution
-# If observed difference is negative, most bootstrap samples will also be negative
-if observed_auc_diff < 0:
-    # Negative difference: simulate bootstrap where most samples are negative
-    bootstrap_diffs = np.random.normal(observed_auc_diff, abs(observed_auc_diff) * 0.5, n_bootstrap)
-    auc_p_value = (bootstrap_diffs >= 0.005).mean()  # Probability of improvement >= threshold
-else:
-    # Positive difference: simulate bootstrap
-    bootstrap_diffs = np.random.normal(observed_auc_diff, abs(observed_auc_diff) * 0.5, n_bootstrap)
-    auc_p_value = (bootstrap_diffs < 0.005).mean()  # Probability of improvement < threshold
-
-# For negative differences, p-value should be high (not significant)
-if observed_auc_diff < 0:
-    auc_p_value = max(0.5, auc_p_value)  # Conservative: at least 0.5 for negative differences
-
-print(f"Bootstrap samples: {n_bootstrap:,}")
-print(f"Observed AUC difference: {observed_auc_diff:+.4f}")
-print(f"P-value (AUC improvement >= 0.005): {auc_p_value:.4f}")
-
-# Permutation test for lift
 print("\n" + "="*60)
-print("Permutation Test for Lift (10,000 permutations)")
+print(f"Paired bootstrap ({N_BOOTSTRAP:,} resamples) and permutation tests ({N_PERMUTATIONS:,} permutations)")
 print("="*60)
 
-if observed_lift_diff < 0:
-    # Negative difference: simulate permutations where most are negative
-    perm_diffs = np.random.normal(observed_lift_diff, abs(observed_lift_diff) * 0.5, n_bootstrap)
-    lift_p_value = (perm_diffs >= 0.1).mean()
+start_time = time.time()
+comparison = compare_models(
+    y_true, baseline_pred, enhanced_pred,
+    n_resamples=N_BOOTSTRAP,
+    n_permutations=N_PERMUTATIONS,
+    min_improvement={'auc': MIN_AUC_IMPROVEMENT, 'top_decile_lift': MIN_LIFT_IMPROVEMENT},
+    seed=RANDOM_SEED,
+)
+logger.log_metric("Significance Testing Seconds", round(time.time() - start_time, 2))
+
+auc_stats = comparison['auc']
+lift_stats = comparison['top_decile_lift']
+baseline_auc, enhanced_auc, observed_auc_diff = auc_stats['baseline'], auc_stats['candidate'], auc_stats['diff']
+baseline_lift, enhanced_lift, observed_lift_diff = lift_stats['baseline'], lift_stats['candidate'], lift_stats['diff']
+auc_p_value = auc_stats['p_value']
+lift_p_value = lift_stats['p_value']
+
+print(f"Baseline AUC: {baseline_auc:.4f}  95% CI [{auc_stats['baseline_ci_95'][0]:.4f}, {auc_stats['baseline_ci_95'][1]:.4f}]")
+print(f"Enhanced AUC: {enhanced_auc:.4f}  95% CI [{auc_stats['candidate_ci_95'][0]:.4f}, {auc_stats['candidate_ci_95'][1]:.4f}]")
+print(f"AUC difference: {observed_auc_diff:+.4f}  95% CI [{auc_stats['diff_ci_95'][0]:+.4f}, {auc_stats['diff_ci_95'][1]:+.4f}]")
+print(f"P-value (permutation, enhanced > baseline): {auc_p_value:.4f}")
+print(f"P(AUC improvement < {MIN_AUC_IMPROVEMENT}) (bootstrap): {auc_stats['prob_below_min_improvement']:.4f}")
+
+print(f"\nBaseline Lift: {baseline_lift:.2f}x  95% CI [{lift_stats['baseline_ci_95'][0]:.2f}, {lift_stats['baseline_ci_95'][1]:.2f}]")
+print(f"Enhanced Lift: {enhanced_lift:.2f}x  95% CI [{lift_stats['candidate_ci_95'][0]:.2f}, {lift_stats['candidate_ci_95'][1]:.2f}]")
+print(f"Lift difference: {observed_lift_diff:+.2f}x  95% CI [{lift_stats['diff_ci_95'][0]:+.2f}, {lift_stats['diff_ci_95'][1]:+.2f}]")
+print(f"P-value (permutation, enhanced > baseline): {lift_p_value:.4f}")
+print(f"P(Lift improvement < {MIN_LIFT_IMPROVEMENT}x) (bootstrap): {lift_stats['prob_below_min_improvement']:.4f}")
+
+# Bottom 20% conversion (G-NEW-5: enhanced model must not push converters down)
+baseline_bottom_rate = bottom_fraction_rate(y_true, baseline_pred, 0.2)
+enhanced_bottom_rate = bottom_fraction_rate(y_true, enhanced_pred, 0.2)
+if baseline_bottom_rate > 0:
+    bottom_20_rate_change = enhanced_bottom_rate / baseline_bottom_rate - 1
 else:
-    perm_diffs = np.random.normal(observed_lift_diff, abs(observed_lift_diff) * 0.5, n_bootstrap)
-    lift_p_value = (perm_diffs < 0.1).mean()
-
-if observed_lift_diff < 0:
-    lift_p_value = max(0.5, lift_p_value)
-
-print(f"Permutations: {n_bootstrap:,}")
-print(f"Observed Lift difference: {observed_lift_diff:+.2f}x")
-print(f"P-value (Lift improvement >= 0.1x): {lift_p_value:.4f}")
+    bottom_20_rate_change = 1.0 if enhanced_bottom_rate > 0 else 0.0   # any conversions there count as degraded
+print(f"\nBottom 20% conversion: baseline {baseline_bottom_rate:.4f}, enhanced {enhanced_bottom_rate:.4f} "
+      f"({bottom_20_rate_change:+.1%})")
 
 # ============================================================================
 # SAVE RESULTS
 # ============================================================================
 results = {
+    'enhanced_model': enhanced_model,
     'baseline_auc': baseline_auc,
     'enhanced_auc': enhanced_auc,
     'observed_auc_diff': observed_auc_diff,
@@ -134,10 +128,19 @@ results = {
     'observed_lift_diff': observed_lift_diff,
     'auc_p_value': float(auc_p_value),
     'lift_p_value': float(lift_p_value),
-    'significant_auc': auc_p_value < 0.05,
-    'significant_lift': lift_p_value < 0.05,
-    'bootstrap_samples': n_bootstrap,
-    'permutations': n_bootstrap
+    'auc_p_value_two_sided': auc_stats['p_value_two_sided'],
+    'lift_p_value_two_sided': lift_stats['p_value_two_sided'],
+    'auc_diff_ci_95': auc_stats['diff_ci_95'],
+    'lift_diff_ci_95': lift_stats['diff_ci_95'],
+    'auc_prob_below_threshold': auc_stats['prob_below_min_improvement'],
+    'lift_prob_below_threshold': lift_stats['prob_below_min_improvement'],
+    'baseline_bottom_20_rate': baseline_bottom_rate,
+    'enhanced_bottom_20_rate': enhanced_bottom_rate,
+    'bottom_20_rate_change': bottom_20_rate_change,
+    'significant_auc': bool(auc_p_value < 0.05),
+    'significant_lift': bool(lift_p_value < 0.05),
+    'bootstrap_samples': N_BOOTSTRAP,
+    'permutations': N_PERMUTATIONS
 }
 
 output_path = REPORTS_DIR / "statistical_significance_results.json"
@@ -152,7 +155,7 @@ logger.log_validation_gate(
     "G-NEW-3",
     "Statistical significance (p < 0.05)",
     gate_passed,
-    f"P-value: {auc_p_value:.4f}"
+    f"P-value: {auc_p_value:.4f}, AUC diff 95% CI [{auc_stats['diff_ci_95'][0]:+.4f}, {auc_stats['diff_ci_95'][1]:+.4f}]"
 )
 
 print("\n" + "="*60)